@@ -445,7 +445,8 @@ class EngineManager:
 
         for engine_file in self.engines_dir.glob("*_engine.py"):
             engine_name = engine_file.stem.replace('_engine', '')
-            data_folder = self.engines_dir / ("protocols" if engine_name == 'protocol' else engine_name)
+            folder = {'protocol': 'protocols', 'diagram': 'diagrams'}.get(engine_name, engine_name)
+            data_folder = self.engines_dir / folder
             data_folder.mkdir(exist_ok=True)
 
             self.available_engines[engine_name] = {
@@ -465,7 +466,12 @@ class EngineManager:
             spec.loader.exec_module(module)
             cls = getattr(module, f"{engine_name.capitalize()}Engine", None)
             if cls:
-                inst = cls(str(info['data_folder']))
+                if engine_name == 'protocol' and 'classification' in self.available_engines:
+                    # One shared classification engine - schemes are loaded once
+                    inst = cls(str(info['data_folder']),
+                               classification_engine=self.load_engine('classification'))
+                else:
+                    inst = cls(str(info['data_folder']))
                 info['loaded'] = True
                 info['instance'] = inst
                 return inst
@@ -532,7 +538,7 @@ class ScientificToolkit:
         self._load_chemical_elements()
         self.color_manager = ColorManager(self.config_dir)
 
-        self.data_hub = DataHub()
+        self.data_hub = DataHub(backend=self.settings.get('data', 'storage_backend') or 'dict')
         self.samples = self.data_hub.get_all()
         self.menu_bar = None
         self.current_engine_name = 'classification'
@@ -1,13 +1,444 @@
 """
 data_hub.py - The Heart of the application
 Holds all data, notifies observers of changes
+
+Two storage backends are available:
+  'dict'     - every sample is a plain dict in self.samples (default)
+  'columnar' - samples live in a ColumnStore (float64 arrays + presence masks
+               for float columns, object arrays for anything else - ints
+               included, so they read back as ints); self.samples is a
+               list-like view whose rows behave like dicts, so panels and
+               plugins keep working while engines read whole columns.
 """
 
 from datetime import datetime
+from collections.abc import MutableMapping, Sequence
+
+# Lazy numpy import — only the columnar backend needs it
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+BACKENDS = ('dict', 'columnar')
+
+# Marks "key not present in this row" inside object columns (None is a real value)
+_ABSENT = object()
+
+
+def _is_float(value):
+    """
+    True for float values, the only ones a float64 column holds. Ints stay in
+    object columns so they read back as ints, as with the dict backend.
+    """
+    return isinstance(value, float)
+
+
+class ColumnStore:
+    """
+    Column-oriented sample storage.
+
+    Float columns are float64 arrays with a boolean presence mask; any other
+    column (text, ints, mixed) is an object array using _ABSENT for missing
+    cells. A numeric column that receives a non-float value is demoted to an
+    object column.
+    """
+
+    def __init__(self, capacity=1024):
+        if _np is None:
+            raise ImportError("The columnar backend requires numpy")
+        self._size = 0
+        self._capacity = max(int(capacity), 16)
+        self._numeric = {}   # name -> float64 values
+        self._present = {}   # name -> bool mask (numeric columns only)
+        self._text = {}      # name -> object values
+        self._order = []     # column names in first-seen order
+        self.version = 0     # bumped on every write, notified or not
+
+    def __len__(self):
+        return self._size
+
+    # ---------- capacity ----------
+
+    def _reserve(self, needed):
+        """Grow every column so at least `needed` rows fit (amortised doubling)."""
+        if needed <= self._capacity:
+            return
+        new_cap = self._capacity
+        while new_cap < needed:
+            new_cap *= 2
+        for name, arr in self._numeric.items():
+            grown = _np.zeros(new_cap, dtype=_np.float64)
+            grown[:self._size] = arr[:self._size]
+            self._numeric[name] = grown
+            mask = _np.zeros(new_cap, dtype=bool)
+            mask[:self._size] = self._present[name][:self._size]
+            self._present[name] = mask
+        for name, arr in self._text.items():
+            grown = _np.full(new_cap, _ABSENT, dtype=object)
+            grown[:self._size] = arr[:self._size]
+            self._text[name] = grown
+        self._capacity = new_cap
+
+    # ---------- column management ----------
+
+    def _add_numeric_column(self, name):
+        self._numeric[name] = _np.zeros(self._capacity, dtype=_np.float64)
+        self._present[name] = _np.zeros(self._capacity, dtype=bool)
+        self._order.append(name)
+
+    def _add_text_column(self, name):
+        self._text[name] = _np.full(self._capacity, _ABSENT, dtype=object)
+        self._order.append(name)
+
+    def _demote(self, name):
+        """Convert a numeric column to an object column, keeping its values."""
+        values = self._numeric.pop(name)
+        mask = self._present.pop(name)
+        text = _np.full(self._capacity, _ABSENT, dtype=object)
+        rows = _np.flatnonzero(mask[:self._size])
+        for r in rows:
+            text[r] = float(values[r])
+        self._text[name] = text
+
+    def _drop_column(self, name):
+        self._numeric.pop(name, None)
+        self._present.pop(name, None)
+        self._text.pop(name, None)
+        if name in self._order:
+            self._order.remove(name)
+
+    def has_column(self, name):
+        return name in self._numeric or name in self._text
+
+    def is_numeric(self, name):
+        return name in self._numeric
+
+    def column_names(self):
+        return list(self._order)
+
+    # ---------- cell access ----------
+
+    def get(self, row, key, default=_ABSENT):
+        """Return the value of `key` in `row`; raise KeyError if absent and no default."""
+        if key in self._numeric:
+            if self._present[key][row]:
+                return float(self._numeric[key][row])
+        elif key in self._text:
+            value = self._text[key][row]
+            if value is not _ABSENT:
+                return value
+        if default is _ABSENT:
+            raise KeyError(key)
+        return default
+
+    def contains(self, row, key):
+        if key in self._numeric:
+            return bool(self._present[key][row])
+        if key in self._text:
+            return self._text[key][row] is not _ABSENT
+        return False
+
+    def set(self, row, key, value):
+        """Set a single cell, creating or demoting the column as needed."""
+        self.version += 1
+        if _is_float(value) and key not in self._text:
+            if key not in self._numeric:
+                self._add_numeric_column(key)
+            self._numeric[key][row] = value
+            self._present[key][row] = True
+            return
+        if key in self._numeric:
+            self._demote(key)
+        elif key not in self._text:
+            self._add_text_column(key)
+        self._text[key][row] = value
+
+    def delete(self, row, key):
+        self.version += 1
+        if not self.contains(row, key):
+            raise KeyError(key)
+        if key in self._numeric:
+            self._present[key][row] = False
+        else:
+            self._text[key][row] = _ABSENT
+
+    def row_keys(self, row):
+        """Column names present in `row`, in column order."""
+        return [name for name in self._order if self.contains(row, name)]
+
+    def row_dict(self, row):
+        """Materialise one row as a plain dict."""
+        out = {}
+        for name in self._order:
+            if name in self._numeric:
+                if self._present[name][row]:
+                    out[name] = float(self._numeric[name][row])
+            else:
+                value = self._text[name][row]
+                if value is not _ABSENT:
+                    out[name] = value
+        return out
+
+    # ---------- bulk operations ----------
+
+    def append_rows(self, rows):
+        """Append a batch of dict rows, filling columns in bulk."""
+        n = len(rows)
+        if not n:
+            return
+        self.version += 1
+        start = self._size
+        self._reserve(start + n)
+
+        # Gather (row, value) pairs per column once, then scatter them
+        gathered = {}
+        for offset, row in enumerate(rows):
+            for key, value in row.items():
+                entry = gathered.get(key)
+                if entry is None:
+                    entry = gathered[key] = ([], [])
+                entry[0].append(start + offset)
+                entry[1].append(value)
+
+        for key, (positions, values) in gathered.items():
+            numeric = key not in self._text and all(_is_float(v) for v in values)
+            if numeric:
+                if key not in self._numeric:
+                    self._add_numeric_column(key)
+                idx = _np.asarray(positions, dtype=_np.intp)
+                self._numeric[key][idx] = _np.asarray(values, dtype=_np.float64)
+                self._present[key][idx] = True
+            else:
+                if key in self._numeric:
+                    self._demote(key)
+                elif key not in self._text:
+                    self._add_text_column(key)
+                column = self._text[key]
+                for pos, value in zip(positions, values):
+                    column[pos] = value
+
+        self._size = start + n
+
+    def append_columns(self, columns, count):
+        """
+        Append `count` rows given column-wise: name -> (values, present).
+        float64 values fill a numeric column directly; object values are
+        stored as they are (a numeric column receiving text is demoted).
+        Into an empty store, writable float64 arrays of length `count` are
+        taken over without a copy; the first growth copies them.
+        """
+        if not count:
+            return
+        self.version += 1
+        start = self._size
+        # An empty store keeps writable float64 arrays (memory maps too) as they are
+        adopt = not start and not self._order
+        if adopt:
+            self._capacity = count
+        self._reserve(start + count)
+        for name, (values, present) in columns.items():
+            if (adopt and values.dtype == _np.float64 and values.flags.writeable
+                    and len(values) == count):
+                self._numeric[name] = values
+                self._present[name] = _np.array(present, dtype=bool)
+                self._order.append(name)
+                continue
+            rows = _np.flatnonzero(present)
+            if not len(rows):
+                continue
+            numeric = name not in self._text and (
+                values.dtype == _np.float64 or all(_is_float(v) for v in values[rows]))
+            if numeric:
+                if name not in self._numeric:
+                    self._add_numeric_column(name)
+                self._numeric[name][start + rows] = _np.asarray(values[rows], dtype=_np.float64)
+                self._present[name][start + rows] = True
+            else:
+                if name in self._numeric:
+                    self._demote(name)
+                elif name not in self._text:
+                    self._add_text_column(name)
+                self._text[name][start + rows] = values[rows]
+        self._size = start + count
+
+    def detach(self):
+        """Copy memory-mapped columns into memory, releasing the mapped file."""
+        for name, values in self._numeric.items():
+            if isinstance(values, _np.memmap):
+                self._numeric[name] = _np.array(values)
+
+    def copy(self):
+        """Independent copy of the store: arrays copied, cell objects shared."""
+        other = ColumnStore.__new__(ColumnStore)
+        other._size = self._size
+        other._capacity = self._capacity
+        other._numeric = {name: _np.array(values) for name, values in self._numeric.items()}
+        other._present = {name: mask.copy() for name, mask in self._present.items()}
+        other._text = {name: values.copy() for name, values in self._text.items()}
+        other._order = list(self._order)
+        other.version = 0
+        return other
+
+    def clear_row(self, row):
+        self.version += 1
+        for name in self._order:
+            if name in self._numeric:
+                self._present[name][row] = False
+            else:
+                self._text[name][row] = _ABSENT
+
+    def delete_rows(self, indices):
+        """Remove rows by position, compacting every column; drops emptied columns."""
+        if not len(indices):
+            return
+        self.version += 1
+        keep = _np.ones(self._size, dtype=bool)
+        keep[_np.asarray(list(indices), dtype=_np.intp)] = False
+        new_size = int(keep.sum())
+
+        for name in list(self._numeric):
+            values = self._numeric[name]
+            mask = self._present[name]
+            kept_mask = mask[:self._size][keep]
+            values[:new_size] = values[:self._size][keep]
+            mask[:new_size] = kept_mask
+            mask[new_size:] = False
+            if not kept_mask.any():
+                self._drop_column(name)
+        for name in list(self._text):
+            column = self._text[name]
+            kept = column[:self._size][keep]
+            column[:new_size] = kept
+            column[new_size:] = _ABSENT
+            if not any(v is not _ABSENT for v in kept):
+                self._drop_column(name)
+
+        self._size = new_size
+
+    # ---------- column access for engines ----------
+
+    def column(self, name):
+        """
+        Return (values, present) for a column, both sliced to the live row count.
+        Numeric columns give a float64 view; text columns give an object array.
+        """
+        if name in self._numeric:
+            return self._numeric[name][:self._size], self._present[name][:self._size]
+        if name in self._text:
+            values = self._text[name][:self._size]
+            present = _np.fromiter((v is not _ABSENT for v in values),
+                                   dtype=bool, count=self._size)
+            return values, present
+        return (_np.full(self._size, _np.nan),
+                _np.zeros(self._size, dtype=bool))
+
+    def numeric_column(self, name):
+        """Column as float64 with NaN wherever the cell is missing or not a number."""
+        if name in self._numeric:
+            out = self._numeric[name][:self._size].copy()
+            out[~self._present[name][:self._size]] = _np.nan
+            return out
+        out = _np.full(self._size, _np.nan)
+        if name in self._text:
+            for i, value in enumerate(self._text[name][:self._size]):
+                if value is _ABSENT or value is None:
+                    continue
+                try:
+                    out[i] = float(value)
+                except (TypeError, ValueError):
+                    pass
+        return out
+
+
+class RowView(MutableMapping):
+    """Dict-like view of one ColumnStore row; writes go straight to the columns."""
+
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, key):
+        return self._store.get(self._row, key)
+
+    def __setitem__(self, key, value):
+        self._store.set(self._row, key, value)
+
+    def __delitem__(self, key):
+        self._store.delete(self._row, key)
+
+    def __iter__(self):
+        return iter(self._store.row_keys(self._row))
+
+    def __len__(self):
+        return len(self._store.row_keys(self._row))
+
+    def __contains__(self, key):
+        return self._store.contains(self._row, key)
+
+    def get(self, key, default=None):
+        return self._store.get(self._row, key, default)
+
+    def copy(self):
+        return self._store.row_dict(self._row)
+
+    def __repr__(self):
+        return f"RowView({self._store.row_dict(self._row)!r})"
+
+
+class RowList(Sequence):
+    """List-like view over a ColumnStore; indexing yields RowView objects."""
+
+    def __init__(self, store):
+        self._store = store
+
+    def __len__(self):
+        return len(self._store)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [RowView(self._store, i) for i in range(*index.indices(len(self._store)))]
+        n = len(self._store)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("row index out of range")
+        return RowView(self._store, index)
+
+    def __iter__(self):
+        for i in range(len(self._store)):
+            yield RowView(self._store, i)
+
+    def __bool__(self):
+        return len(self._store) > 0
+
+    def snapshot(self):
+        """A RowList over a copy of the store (array copies, no per-row work)."""
+        return RowList(self._store.copy())
+
+    @property
+    def version(self):
+        """Write counter of the underlying store (RowView edits included)."""
+        return self._store.version
+
+    def column(self, name):
+        """(values, present) arrays for one column — lets engines skip the row views."""
+        return self._store.column(name)
+
 
 class DataHub:
-    def __init__(self):
+    def __init__(self, backend='dict'):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown DataHub backend: {backend}")
+        if backend == 'columnar' and _np is None:
+            print("⚠️ numpy not available - falling back to dict storage")
+            backend = 'dict'
+        self.backend = backend
+        self._store = None
         self.samples = []
+        self._reset_storage()
         self.columns = set()
         self.observers = []
         # Add these for auto-save tracking
@@ -16,11 +447,20 @@ class DataHub:
         self._change_count = 0
         self.id_to_index = {}
         self._column_order = []
+        self._version = 0   # bumped on every change notification or mark_unsaved()
+
+    def _reset_storage(self):
+        if self.backend == 'columnar':
+            self._store = ColumnStore()
+            self.samples = RowList(self._store)
+        else:
+            self.samples = []
 
     def mark_unsaved(self):
         """Mark that there are unsaved changes"""
         self._unsaved_changes = True
         self._change_count += 1
+        self._version += 1
         self._last_change_time = datetime.now()  # time of most recent change
 
     def mark_saved(self):
@@ -39,33 +479,117 @@ class DataHub:
 
         start_idx = len(self.samples)
 
-        for sample in new_samples:
+        for offset, sample in enumerate(new_samples):
             # Ensure Sample_ID
             if 'Sample_ID' not in sample:
-                sample['Sample_ID'] = f"SAMPLE_{len(self.samples)+1:04d}"
+                sample['Sample_ID'] = f"SAMPLE_{start_idx+offset+1:04d}"
 
-            self.id_to_index[sample['Sample_ID']] = len(self.samples)
-            self.samples.append(sample)
+            self.id_to_index[sample['Sample_ID']] = start_idx + offset
             self.columns.update(sample.keys())
 
+        if self._store is not None:
+            self._store.append_rows(new_samples)
+        else:
+            self.samples.extend(new_samples)
+
         self.mark_unsaved()
         self._notify('samples_added', start_idx, len(new_samples))
         return len(new_samples)
 
+    def add_columns(self, columns, count):
+        """
+        Add `count` samples given column-wise: name -> (values, present) numpy
+        arrays, as produced by bulk importers and project files. The columnar
+        backend stores the arrays (into an empty hub, writable float64 ones -
+        memory maps included - without a copy); the dict backend builds the
+        row dicts.
+        """
+        if not count:
+            return 0
+
+        start_idx = self.row_count()
+        columns = {name: (values, present) for name, (values, present) in columns.items()
+                   if present.any()}
+        ids = columns.get('Sample_ID')
+        if ids is None or not ids[1].all():
+            # Ensure Sample_ID
+            values = _np.array([f"SAMPLE_{start_idx+i+1:04d}" for i in range(count)], dtype=object)
+            if ids is not None:
+                values[ids[1]] = ids[0][ids[1]]
+            columns['Sample_ID'] = (values, _np.ones(count, dtype=bool))
+
+        if self._store is not None:
+            self._store.append_columns(columns, count)
+        else:
+            cells = [(name, values.tolist(), present.tolist())
+                     for name, (values, present) in columns.items()]
+            self.samples.extend(
+                {name: values[i] for name, values, present in cells if present[i]}
+                for i in range(count))
+
+        for offset, sample_id in enumerate(columns['Sample_ID'][0].tolist()):
+            self.id_to_index[sample_id] = start_idx + offset
+        self.columns.update(columns)
+
+        self.mark_unsaved()
+        self._notify('samples_added', start_idx, count)
+        return count
+
+    def detach_mapped_columns(self):
+        """Stop using memory-mapped project columns as storage (copies them in)."""
+        if self._store is not None:
+            self._store.detach()
+
     def update_rows(self, updated_samples):
         """Bulk-replace samples by position while keeping id_to_index consistent."""
+        changed = []
         for i, sample in enumerate(updated_samples):
             if i < len(self.samples):
+                changed.append(i)
                 old_id = self.samples[i].get('Sample_ID')
                 if old_id and old_id in self.id_to_index:
                     del self.id_to_index[old_id]
-                self.samples[i] = sample
+                if self._store is not None:
+                    if isinstance(sample, RowView) and sample._store is self._store and sample._row == i:
+                        pass  # same row handed back - already up to date
+                    else:
+                        values = dict(sample)
+                        self._store.clear_row(i)
+                        for key, value in values.items():
+                            self._store.set(i, key, value)
+                else:
+                    self.samples[i] = sample
                 self.columns.update(sample.keys())
                 new_id = sample.get('Sample_ID')
                 if new_id is not None:
                     self.id_to_index[new_id] = i
         self.mark_unsaved()
-        self._notify('samples_updated')
+        self._notify('samples_updated', changed)
+
+    def update_samples(self, changes):
+        """
+        Merge {row index: {column: value}} into existing rows with a single
+        'samples_updated' notification. Returns the number of rows updated.
+        """
+        changed = sorted(idx for idx in changes if 0 <= idx < len(self.samples))
+        for idx in changed:
+            updates = changes[idx]
+            old_id = self.samples[idx].get('Sample_ID')
+            new_id = updates.get('Sample_ID', old_id)
+            if new_id != old_id and old_id in self.id_to_index:
+                del self.id_to_index[old_id]
+            if self._store is not None:
+                for key, value in updates.items():
+                    self._store.set(idx, key, value)
+            else:
+                self.samples[idx].update(updates)
+            self.columns.update(updates.keys())
+            if new_id is not None:
+                self.id_to_index[new_id] = idx
+        if changed:
+            self.mark_unsaved()
+            self._notify('samples_updated', changed)
+        return len(changed)
 
     def update_row(self, index, updates):
         """Update a row with new values, adding new columns if needed"""
@@ -74,7 +598,11 @@ class DataHub:
                 if key not in self.columns:
                     self.columns.add(key)
                     print(f"📝 Added new column: {key}")
-            self.samples[index].update(updates)
+            if self._store is not None:
+                for key, value in updates.items():
+                    self._store.set(index, key, value)
+            else:
+                self.samples[index].update(updates)
             self.mark_unsaved()
             self._notify('update', index)
             print(f"✅ Updated row {index} with: {list(updates.keys())}")
@@ -82,16 +610,20 @@ class DataHub:
             print(f"❌ Index {index} out of range (max: {len(self.samples)-1})")
 
     def delete_rows(self, indices):
-        for idx in sorted(indices, reverse=True):
-            if 0 <= idx < len(self.samples):
-                sample_id = self.samples[idx].get('Sample_ID')
-                if sample_id in self.id_to_index:
-                    del self.id_to_index[sample_id]
+        valid = sorted({idx for idx in indices if 0 <= idx < len(self.samples)}, reverse=True)
+        for idx in valid:
+            sample_id = self.samples[idx].get('Sample_ID')
+            if sample_id in self.id_to_index:
+                del self.id_to_index[sample_id]
+        if self._store is not None:
+            self._store.delete_rows(valid)
+        else:
+            for idx in valid:
                 del self.samples[idx]
         self._rebuild_columns()
         self._rebuild_index()   # re-number remaining rows after deletions shift positions
         self.mark_unsaved()
-        self._notify('samples_deleted', len(indices))
+        self._notify('samples_deleted', len(indices), valid[::-1])
 
     def get_all(self):
         return self.samples
@@ -114,10 +646,64 @@ class DataHub:
     def get_column_names(self):
         return sorted(list(self.columns))
 
+    def to_records(self):
+        """Return samples as plain dicts (for JSON export / project files)."""
+        if self._store is not None:
+            return [self._store.row_dict(i) for i in range(len(self._store))]
+        return self.samples
+
+    # ---------- column access for engines ----------
+
+    def get_column(self, name):
+        """
+        Return (values, present) numpy arrays for one column.
+        Zero-copy for the columnar backend; built from the dicts otherwise.
+        """
+        if self._store is not None:
+            return self._store.column(name)
+        if _np is None:
+            raise ImportError("get_column requires numpy")
+        values = _np.empty(len(self.samples), dtype=object)
+        present = _np.zeros(len(self.samples), dtype=bool)
+        for i, sample in enumerate(self.samples):
+            if name in sample:
+                values[i] = sample[name]
+                present[i] = True
+        return values, present
+
+    def get_numeric_column(self, name):
+        """Return one column as float64, NaN where missing or non-numeric."""
+        if self._store is not None:
+            return self._store.numeric_column(name)
+        if _np is None:
+            raise ImportError("get_numeric_column requires numpy")
+        out = _np.full(len(self.samples), _np.nan)
+        for i, sample in enumerate(self.samples):
+            value = sample.get(name)
+            if value is None:
+                continue
+            try:
+                out[i] = float(value)
+            except (TypeError, ValueError):
+                pass
+        return out
+
     def register_observer(self, observer):
         self.observers.append(observer)
 
+    @property
+    def version(self):
+        """
+        Data version - changes whenever observers are notified of a change,
+        mark_unsaved() is called, or (columnar backend) any cell is written,
+        including in-place RowView edits that skip notification.
+        """
+        if self._store is not None:
+            return (self._version, self._store.version)
+        return (self._version, 0)
+
     def _notify(self, event, *args):
+        self._version += 1
         for observer in self.observers:
             if hasattr(observer, 'on_data_changed'):
                 try:
@@ -127,11 +713,21 @@ class DataHub:
 
     def _rebuild_columns(self):
         self.columns.clear()
+        if self._store is not None:
+            self.columns.update(self._store.column_names())
+            return
         for sample in self.samples:
             self.columns.update(sample.keys())
 
     def _rebuild_index(self):
         """Rebuild id_to_index from scratch — needed after deletions shift row positions."""
+        if self._store is not None:
+            _, present = self._store.column('Sample_ID')
+            self.id_to_index = {
+                self._store.get(int(i), 'Sample_ID'): int(i)
+                for i in _np.flatnonzero(present)
+            }
+            return
         self.id_to_index = {
             sample['Sample_ID']: i
             for i, sample in enumerate(self.samples)
@@ -140,7 +736,7 @@ class DataHub:
 
     def clear_all(self):
         """Clear all samples and reset state"""
-        self.samples = []
+        self._reset_storage()
         self.columns = set()
         self.id_to_index = {}
         self._column_order = []
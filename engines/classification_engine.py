@@ -11,20 +11,140 @@ FIXED: Replaced eval() with safe formula parser
 import json
 import re
 import operator
+import numbers as _numbers
+from collections.abc import Mapping, MutableMapping, Sequence
+from itertools import repeat
 from pathlib import Path
 from typing import Dict, List, Any, Tuple, Optional
 
+from engines.scheme_cache import get_scheme_cache
+
 # Lazy pandas import — loaded once, avoids repeated import overhead
 try:
     import pandas as _pd
 except ImportError:
     _pd = None
 
+# numpy is only needed for vectorized (column) evaluation
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+
+class CompiledFormula:
+    """
+    A formula parsed and validated once by SafeFormulaEvaluator.compile().
+
+    The expression tree is turned into nested closures, so evaluate() is just
+    a chain of Python calls with no tokenizing or parsing. evaluate_array()
+    walks the same tree with NumPy to compute a whole column in one call.
+
+    Tree nodes:
+        ('num', value) | ('var', name) | ('bin', op, left, right) | ('call', name, arg)
+    """
+
+    def __init__(self, formula: str, tree: tuple):
+        self.formula = formula
+        self.tree = tree
+        self.variables = frozenset(self._collect_variables(tree))
+        self._fn = self._build_closure(tree)
+
+    @classmethod
+    def _collect_variables(cls, node) -> List[str]:
+        kind = node[0]
+        if kind == 'var':
+            return [node[1]]
+        if kind == 'bin':
+            return cls._collect_variables(node[2]) + cls._collect_variables(node[3])
+        if kind == 'call':
+            return cls._collect_variables(node[2])
+        return []
+
+    @classmethod
+    def _build_closure(cls, node):
+        kind = node[0]
+
+        if kind == 'num':
+            value = node[1]
+            return lambda env: value
+
+        if kind == 'var':
+            name = node[1]
+
+            def var(env):
+                try:
+                    return env[name]
+                except KeyError:
+                    raise ValueError(f"Unknown variable: '{name}'")
+            return var
+
+        if kind == 'call':
+            func = SafeFormulaEvaluator.FUNCTIONS[node[1]]
+            arg = cls._build_closure(node[2])
+            return lambda env: func(arg(env))
+
+        op = node[1]
+        left = cls._build_closure(node[2])
+        right = cls._build_closure(node[3])
+        if op == '/':
+            def divide(env):
+                lhs = left(env)
+                rhs = right(env)
+                if rhs == 0:
+                    raise ValueError("Division by zero")
+                return lhs / rhs
+            return divide
+        func = SafeFormulaEvaluator.OPERATORS[op]
+        return lambda env: func(left(env), right(env))
+
+    def evaluate(self, variables: Dict[str, float]) -> float:
+        """Evaluate for one set of scalar variables (same errors as SafeFormulaEvaluator.evaluate)."""
+        return self._fn(variables)
+
+    def evaluate_array(self, columns: Dict[str, Any]) -> Any:
+        """
+        Vectorized evaluation over NumPy columns (1-D arrays of equal length).
+
+        Cells where the scalar path would raise — division by zero, missing
+        (NaN) inputs, log/sqrt domain errors, overflow — come back as NaN.
+        """
+        if _np is None:
+            raise ImportError("Vectorized formula evaluation requires numpy")
+        missing = self.variables.difference(columns)
+        if missing:
+            raise ValueError(f"Unknown variable: '{sorted(missing)[0]}'")
+        with _np.errstate(all='ignore'):
+            result = _np.asarray(self._eval_array(self.tree, columns), dtype=_np.float64)
+            if result.ndim == 0 and columns:
+                length = len(next(iter(columns.values())))
+                result = _np.full(length, float(result))
+            result = _np.where(_np.isfinite(result), result, _np.nan)
+        return result
+
+    def _eval_array(self, node, columns):
+        kind = node[0]
+        if kind == 'num':
+            return node[1]
+        if kind == 'var':
+            return _np.asarray(columns[node[1]], dtype=_np.float64)
+        if kind == 'call':
+            return SafeFormulaEvaluator.ARRAY_FUNCTIONS[node[1]](self._eval_array(node[2], columns))
+        lhs = self._eval_array(node[2], columns)
+        rhs = self._eval_array(node[3], columns)
+        if node[1] == '/':
+            return _np.where(_np.asarray(rhs) == 0, _np.nan, _np.true_divide(lhs, rhs))
+        return SafeFormulaEvaluator.OPERATORS[node[1]](lhs, rhs)
+
+    def __repr__(self):
+        return f"CompiledFormula({self.formula!r})"
+
 
 class SafeFormulaEvaluator:
     """
     Safely evaluate mathematical formulas without using eval()
     Supports basic arithmetic operations: +, -, *, /, **, sqrt, log, etc.
+    Formulas are compiled once into a validated expression tree and cached.
     """
 
     # Allowed functions mapped to safe implementations
@@ -38,6 +158,19 @@ class SafeFormulaEvaluator:
         'max': max,
     }
 
+    # Array counterparts of FUNCTIONS for vectorized evaluation.
+    # min/max take a single argument here, which is an error on the scalar
+    # path, so they yield NaN rather than silently reducing the column.
+    ARRAY_FUNCTIONS = {
+        'sqrt': lambda x: _np.power(x, 0.5),   # mirrors x ** 0.5 on the scalar path
+        'log': lambda x: _np.log(x),
+        'log10': lambda x: _np.log10(x),
+        'exp': lambda x: _np.exp(x),
+        'abs': lambda x: _np.abs(x),
+        'min': lambda x: _np.full(_np.shape(x), _np.nan),
+        'max': lambda x: _np.full(_np.shape(x), _np.nan),
+    }
+
     # Allowed operators
     OPERATORS = {
         '+': operator.add,
@@ -52,25 +185,34 @@ class SafeFormulaEvaluator:
         r'(\d+\.?\d*|\b[a-zA-Z_][a-zA-Z0-9_]*\b|[+\-*/()]|:=|<=|>=|==|!=)'
     )
 
+    # formula string -> CompiledFormula (only successfully compiled formulas)
+    _cache: Dict[str, CompiledFormula] = {}
+
     @classmethod
     def evaluate(cls, formula: str, variables: Dict[str, float]) -> float:
         """
         Safely evaluate a formula with given variables
         Raises ValueError if formula is unsafe or invalid
         """
-        # Remove all whitespace
-        formula = formula.replace(' ', '')
+        return cls.compile(formula).evaluate(variables)
 
-        # Tokenize
-        tokens = cls._tokenize(formula)
+    @classmethod
+    def compile(cls, formula: str) -> CompiledFormula:
+        """
+        Tokenize, validate and parse a formula once; later calls hit the cache.
+        Raises ValueError if formula is unsafe or invalid
+        """
+        compiled = cls._cache.get(formula)
+        if compiled is not None:
+            return compiled
 
-        # Validate tokens
+        # Remove all whitespace
+        tokens = cls._tokenize(formula.replace(' ', ''))
         cls._validate_tokens(tokens)
+        compiled = CompiledFormula(formula, cls._parse_expression(tokens))
 
-        # Parse and evaluate
-        result = cls._parse_expression(tokens, variables)
-
-        return result
+        cls._cache[formula] = compiled
+        return compiled
 
     @classmethod
     def _tokenize(cls, formula: str) -> List[str]:
@@ -129,49 +271,41 @@ class SafeFormulaEvaluator:
             raise ValueError(f"Unsafe token in formula: '{token}'")
 
     @classmethod
-    def _parse_expression(cls, tokens: List[str], variables: Dict[str, float]) -> float:
+    def _parse_expression(cls, tokens: List[str]) -> tuple:
         """
-        Simple recursive descent parser for expressions
+        Simple recursive descent parser producing an expression tree
         Grammar:
         expr   ::= term { ('+'|'-') term }
-        term   ::= factor { ('*'|'/') factor }
+        term   ::= power { ('*'|'/') power }
+        power  ::= factor [ '**' power ]
         factor ::= number | variable | '(' expr ')' | function '(' expr ')'
         """
+        if not tokens:
+            raise ValueError("Empty formula")
+
         pos = 0
 
         def parse_expr():
             nonlocal pos
-            value = parse_term()
+            node = parse_term()
 
             while pos < len(tokens) and tokens[pos] in ('+', '-'):
                 op = tokens[pos]
                 pos += 1
-                right = parse_term()
+                node = ('bin', op, node, parse_term())
 
-                if op == '+':
-                    value = cls.OPERATORS['+'](value, right)
-                else:  # '-'
-                    value = cls.OPERATORS['-'](value, right)
-
-            return value
+            return node
 
         def parse_term():
             nonlocal pos
-            value = parse_power()
+            node = parse_power()
 
             while pos < len(tokens) and tokens[pos] in ('*', '/'):
                 op = tokens[pos]
                 pos += 1
-                right = parse_power()
-
-                if op == '*':
-                    value = cls.OPERATORS['*'](value, right)
-                else:  # '/'
-                    if right == 0:
-                        raise ValueError("Division by zero")
-                    value = cls.OPERATORS['/'](value, right)
+                node = ('bin', op, node, parse_power())
 
-            return value
+            return node
 
         def parse_power():
             """Right-associative exponentiation: 2**3**2 == 2**(3**2) == 512"""
@@ -181,13 +315,14 @@ class SafeFormulaEvaluator:
             if pos < len(tokens) and tokens[pos] == '**':
                 pos += 1
                 # Right-associative: recurse into parse_power (not parse_factor)
-                exp = parse_power()
-                return cls.OPERATORS['**'](base, exp)
+                return ('bin', '**', base, parse_power())
 
             return base
 
         def parse_factor():
             nonlocal pos
+            if pos >= len(tokens):
+                raise ValueError("Unexpected end of formula")
             token = tokens[pos]
 
             # Function call
@@ -200,43 +335,362 @@ class SafeFormulaEvaluator:
                     raise ValueError(f"Missing closing parenthesis for function {func_name}")
                 pos += 1  # Skip ')'
 
-                return cls.FUNCTIONS[func_name](arg)
+                return ('call', func_name, arg)
 
             # Parenthesized expression
             if token == '(':
                 pos += 1
-                value = parse_expr()
+                node = parse_expr()
 
                 if pos >= len(tokens) or tokens[pos] != ')':
                     raise ValueError("Missing closing parenthesis")
                 pos += 1
-                return value
+                return node
 
             # Number
             try:
                 value = float(token)
                 pos += 1
-                return value
+                return ('num', value)
             except ValueError:
                 pass
 
             # Variable
             if token.isidentifier():
-                if token not in variables:
-                    raise ValueError(f"Unknown variable: '{token}'")
-                value = variables[token]
                 pos += 1
-                return value
+                return ('var', token)
 
             raise ValueError(f"Unexpected token: '{token}'")
 
-        pos = 0
-        result = parse_expr()
+        tree = parse_expr()
 
         if pos < len(tokens):
             raise ValueError(f"Unexpected tokens at end: {tokens[pos:]}")
 
-        return result
+        return tree
+
+
+# Sentinel for "field not present in this sample" (None is a real value)
+_MISSING = object()
+
+# Rule operators the batch path understands; anything else never matches,
+# exactly like evaluate_rule_with_value()'s "Unknown operator" branch.
+_COMPARISONS = ('>', '<', '>=', '<=', '==')
+_RANGES = ('between', 'not_between')
+
+
+def _compile_rule(rule: Dict) -> Tuple[str, Optional[str], Optional[float], Optional[float]]:
+    """
+    Pre-convert a rule's thresholds once: (field, operator, a, b).
+    operator is None when the scalar path could never pass the rule.
+    """
+    field = rule.get('field', '')
+    op = rule.get('operator', '')
+    try:
+        if op in _COMPARISONS:
+            return (field, op, float(rule.get('value', 0)), None)
+        if op in _RANGES:
+            if 'min' in rule and 'max' in rule:
+                return (field, op, float(rule['min']), float(rule['max']))
+            if isinstance(rule.get('value'), list):
+                lo, hi = map(float, rule['value'])
+                return (field, op, lo, hi)
+    except (ValueError, TypeError):
+        pass
+    return (field, None, None, None)
+
+
+class CompiledScheme:
+    """
+    A classification scheme compiled for batch evaluation.
+
+    Each classification becomes a list of pre-converted rules; match()
+    turns them into boolean masks over whole columns and resolves
+    first-match-wins ordering with mask arithmetic.
+    """
+
+    def __init__(self, scheme: Dict[str, Any]):
+        self.scheme = scheme
+        self.classifications = []
+        self.fields = set()
+
+        for classification in scheme.get("classifications") or scheme.get("rules") or []:
+            rules = [_compile_rule(rule) for rule in classification.get('rules', [])]
+            self.fields.update(field for field, _, _, _ in rules)
+            self.classifications.append({
+                'name': classification.get("name", "UNNAMED"),
+                'logic': classification.get('logic', 'AND'),
+                'rules': rules,
+                'confidence': classification.get("confidence_score", 0.0),
+                'color': classification.get("color", "#A9A9A9"),
+            })
+
+        self.flag_uncertain = scheme.get('flag_uncertain', False)
+        self.uncertain_threshold = scheme.get('uncertain_threshold', 0.7)
+
+    @staticmethod
+    def _rule_mask(rule, lookup, n):
+        field, op, a, b = rule
+        if op is None:
+            return _np.zeros(n, dtype=bool)
+        values, valid = lookup(field)
+        with _np.errstate(invalid='ignore'):
+            if op == '>':
+                hit = values > a
+            elif op == '<':
+                hit = values < a
+            elif op == '>=':
+                hit = values >= a
+            elif op == '<=':
+                hit = values <= a
+            elif op == '==':
+                hit = _np.abs(values - a) < 0.0001
+            else:
+                hit = (a <= values) & (values <= b)
+                if op == 'not_between':
+                    hit = ~hit
+        return hit & valid
+
+    def match(self, lookup, n: int) -> Any:
+        """
+        Return, per sample, the index of the first matching classification
+        (-1 when none matches). lookup(field) -> (float64 values, valid mask),
+        where valid is False for missing, None or non-numeric values.
+        """
+        assigned = _np.full(n, -1, dtype=_np.intp)
+        open_rows = _np.ones(n, dtype=bool)
+
+        for k, classification in enumerate(self.classifications):
+            rules = classification['rules']
+            logic = classification['logic']
+
+            if logic == 'DEFAULT' and not rules:
+                hit = _np.ones(n, dtype=bool)
+            elif logic == 'OR':
+                hit = _np.zeros(n, dtype=bool)
+                for rule in rules:
+                    hit |= self._rule_mask(rule, lookup, n)
+            else:  # AND (default)
+                hit = _np.ones(n, dtype=bool)
+                for rule in rules:
+                    hit &= self._rule_mask(rule, lookup, n)
+
+            hit &= open_rows
+            assigned[hit] = k
+            open_rows &= ~hit
+            if not open_rows.any():
+                break
+
+        return assigned
+
+
+def _scheme_rule_fields(scheme: Dict[str, Any]) -> set:
+    """Every field referenced by a rule anywhere in a scheme."""
+    return {
+        rule.get('field', '')
+        for classification in scheme.get("classifications") or scheme.get("rules") or []
+        for rule in classification.get('rules', [])
+    }
+
+
+class SchemeLoadError(KeyError):
+    """A listed scheme whose file can no longer be read or validated."""
+
+    def __str__(self):
+        return str(self.args[0]) if self.args else ''
+
+
+class _SchemeStore(MutableMapping):
+    """
+    scheme_id -> scheme dict, parsed from disk the first time it is used.
+    Membership, iteration and len() never touch the files. A file that
+    changed or broke after the scan falls back to the copy parsed then
+    (fallback(path)); without one, SchemeLoadError says what went wrong.
+    """
+
+    def __init__(self, loader, fallback=None):
+        self._loader = loader
+        self._fallback = fallback
+        self._paths: Dict[str, Path] = {}
+        self._loaded: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, scheme_id: str, path: Path):
+        self._paths[scheme_id] = path
+        self._loaded.pop(scheme_id, None)
+
+    def is_loaded(self, scheme_id: str) -> bool:
+        return scheme_id in self._loaded
+
+    def __getitem__(self, scheme_id):
+        scheme = self._loaded.get(scheme_id)
+        if scheme is None:
+            path = self._paths[scheme_id]
+            try:
+                scheme = self._loader(path)
+            except Exception as e:
+                scheme = self._fallback(path) if self._fallback else None
+                if scheme is None:
+                    raise SchemeLoadError(
+                        f"Scheme '{scheme_id}' is listed but {path.name} could not be loaded: {e}") from e
+                print(f"⚠️ Error loading {path.name}: {e} - using the version read at start-up")
+            self._loaded[scheme_id] = scheme
+        return scheme
+
+    def __setitem__(self, scheme_id, scheme):
+        self._loaded[scheme_id] = scheme
+
+    def __delitem__(self, scheme_id):
+        found = self._paths.pop(scheme_id, None) is not None
+        found = self._loaded.pop(scheme_id, None) is not None or found
+        if not found:
+            raise KeyError(scheme_id)
+
+    def __contains__(self, scheme_id):
+        return scheme_id in self._paths or scheme_id in self._loaded
+
+    def __iter__(self):
+        yield from self._paths
+        for scheme_id in self._loaded:
+            if scheme_id not in self._paths:
+                yield scheme_id
+
+    def __len__(self):
+        return len(self._paths) + sum(1 for sid in self._loaded if sid not in self._paths)
+
+
+class _DerivedMemo:
+    """
+    Derived values already computed for one sample sequence at one data
+    version, shared by consecutive classify_all_samples() calls so running
+    every scheme computes each derived field once. Columnar row lists also
+    key the memo on their store's write counter, so in-place edits that
+    never reach a DataHub notification still invalidate it.
+    """
+
+    def __init__(self, samples: Sequence, version: Any):
+        self.samples = samples
+        self.version = version
+        self.store_version = getattr(samples, 'version', None)
+        self.n = len(samples)
+        self.batch = None    # _BatchColumns (batch path)
+        self.columns = {}    # derived name -> (values, array, valid) (batch path)
+        self.rows = None     # per-sample {derived name: value} (scalar path)
+
+    def matches(self, samples: Sequence, version: Any) -> bool:
+        return (version is not None and self.samples is samples
+                and self.version == version and self.n == len(samples)
+                and self.store_version == getattr(samples, 'version', None))
+
+
+class _BatchColumns:
+    """
+    Field values pulled out of a batch of samples once, as NumPy arrays.
+
+    `rows` holds normalized sample mappings (None for invalid samples).
+    `source` may be a columnar DataHub row list, whose columns are read
+    directly instead of walking the rows.
+    """
+
+    def __init__(self, rows: List[Optional[Dict]], source: Any = None):
+        self.rows = rows
+        self.n = len(rows)
+        self.source = source
+        self._raw = {}
+        self._rule = {}
+        self._inputs = {}
+
+    def prefetch(self, fields):
+        """Pull several fields in a single pass over the rows."""
+        wanted = {f for f in fields if f not in self._raw}
+        if not wanted:
+            return
+        if self.source is not None:
+            for field in wanted:
+                self.raw(field)
+            return
+
+        found = {field: ([], []) for field in wanted}
+        for i, row in enumerate(self.rows):
+            if row is None:
+                continue
+            for key, value in row.items():
+                entry = found.get(key)
+                if entry is not None:
+                    entry[0].append(i)
+                    entry[1].append(value)
+
+        for field, (positions, values) in found.items():
+            column = _np.empty(self.n, dtype=object)
+            present = _np.zeros(self.n, dtype=bool)
+            for pos, value in zip(positions, values):
+                column[pos] = value
+            present[positions] = True
+            self._raw[field] = (column, present, False)
+
+    def raw(self, field):
+        """(values, present, is_float_column) for one field."""
+        cached = self._raw.get(field)
+        if cached is not None:
+            return cached
+        if self.source is not None:
+            values, present = self.source.column(field)
+            self._raw[field] = (values, present, values.dtype == _np.float64)
+        else:
+            self.prefetch([field])
+        return self._raw[field]
+
+    def present(self, field):
+        return self.raw(field)[1]
+
+    def rule_values(self, field):
+        """(float64 values, valid) with scalar-path semantics: only real numbers compare."""
+        cached = self._rule.get(field)
+        if cached is not None:
+            return cached
+        values, present, is_float = self.raw(field)
+        if is_float:
+            cached = (values, present)
+        elif all(type(value) is float for value in values[present]):
+            # Common case: every present cell is already a float
+            out = _np.full(self.n, _np.nan)
+            out[present] = values[present].astype(_np.float64)
+            cached = (out, present.copy())
+        else:
+            out = _np.full(self.n, _np.nan)
+            valid = _np.zeros(self.n, dtype=bool)
+            for i in _np.flatnonzero(present):
+                value = values[i]
+                if type(value) is float or isinstance(value, _numbers.Real):
+                    try:
+                        out[i] = value
+                        valid[i] = True
+                    except (OverflowError, TypeError, ValueError):
+                        pass
+            cached = (out, valid)
+        self._rule[field] = cached
+        return cached
+
+    def formula_input(self, field):
+        """float64 inputs as _compute_derived_fields builds them: float(v), else 0.0."""
+        cached = self._inputs.get(field)
+        if cached is not None:
+            return cached
+        values, present, is_float = self.raw(field)
+        if is_float:
+            cached = _np.where(present, values, 0.0)
+        else:
+            cached = _np.zeros(self.n)
+            try:
+                # object -> float64 calls float() per cell; fall back cell by cell on failure
+                cached[present] = values[present].astype(_np.float64)
+            except (ValueError, TypeError, OverflowError):
+                for i in _np.flatnonzero(present):
+                    try:
+                        cached[i] = float(values[i])
+                    except (ValueError, TypeError, OverflowError):
+                        pass
+        self._inputs[field] = cached
+        return cached
 
 
 class ClassificationEngine:
@@ -245,24 +699,38 @@ class ClassificationEngine:
     """
 
     DEBUG = False  # Set to True to enable verbose classification logging
+    VECTORIZED = True  # Batch-classify with NumPy masks when numpy is available
 
     def _log(self, msg):
         """Internal debug logger — only prints when DEBUG is True."""
         if self.DEBUG:
             print(msg)
 
-    def __init__(self, schemes_dir: str = None):
-        """Initialize classification engine"""
+    def __init__(self, schemes_dir: str = None, cache_file: str = None):
+        """
+        Initialize classification engine.
+        cache_file overrides the scheme index location (config/scheme_cache.json).
+        """
         if schemes_dir is None:
             # Default to engines/classification/
             base_dir = Path(__file__).parent
             schemes_dir = base_dir / "classification"  # Look in classification subfolder
         self.schemes_dir = Path(schemes_dir)
 
-        self.schemes: Dict[str, Dict[str, Any]] = {}
+        # On-disk index of scheme summaries (config/scheme_cache.json); full
+        # schemes are parsed the first time they are used
+        self.scheme_cache = get_scheme_cache(cache_file)
+        self.schemes: MutableMapping = _SchemeStore(self._load_scheme_file, self._scanned_scheme)
+        self._scheme_summaries: Dict[str, Dict[str, Any]] = {}
+        self._compiled_schemes: Dict[str, CompiledScheme] = {}
+        self._scheme_derived: Dict[str, List[str]] = {}
+        self._derived_memo: Optional[_DerivedMemo] = None
 
         # Load derived fields from parent directory
         self.derived_fields_path = Path(__file__).parent / "derived_fields.json"
+        self._compiled_formulas: Dict[str, CompiledFormula] = {}
+        self._derived_defs: Dict[str, Dict[str, Any]] = {}
+        self._derived_order: List[str] = []
         self.derived_fields = self._load_derived_fields()
 
         self.load_all_schemes()
@@ -274,12 +742,19 @@ class ClassificationEngine:
             return {"fields": []}
 
         try:
-            with open(self.derived_fields_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            # 🔐 Validate formulas
+            # 🔐 Formulas are validated once per version of the file (see scheme_cache)
+            entry = self.scheme_cache.entry(self.derived_fields_path, 'derived_fields',
+                                           self._check_derived_formulas)
+            self.scheme_cache.save()
+            if 'error' in entry:
+                raise ValueError(entry['error'])
+            invalid = entry['summary']['invalid']
+            data = dict(self.scheme_cache.load(self.derived_fields_path))
+
+            # Compile each valid formula once
             fields = data.get('fields', [])
             valid_fields = []
+            self._compiled_formulas = {}
 
             for field in fields:
                 formula = field.get('formula', '')
@@ -289,13 +764,22 @@ class ClassificationEngine:
                 if not formula or not requires:
                     continue
 
-                # Test the formula with dummy values to ensure it's safe
+                name = field.get('name')
+                if name in invalid:
+                    print(f"⚠️ Invalid formula in field '{name}': {invalid[name]}")
+                    continue
                 try:
-                    test_vars = {req: 1.0 for req in requires}
-                    SafeFormulaEvaluator.evaluate(formula, test_vars)
+                    self._compiled_formulas[name] = SafeFormulaEvaluator.compile(formula)
                     valid_fields.append(field)
                 except Exception as e:
-                    print(f"⚠️ Invalid formula in field '{field.get('name')}': {e}")
+                    print(f"⚠️ Invalid formula in field '{name}': {e}")
+
+            # Dependency order: a derived field may require other derived fields
+            valid_fields = self._order_derived_fields(valid_fields)
+            self._derived_defs = {field.get('name'): field for field in valid_fields}
+            self._derived_order = list(self._derived_defs)
+            self._scheme_derived = {}
+            self._derived_memo = None
 
             data['fields'] = valid_fields
             print(f"✅ Loaded {len(valid_fields)} validated derived field calculators")
@@ -304,116 +788,241 @@ class ClassificationEngine:
             print(f"⚠️ Error loading derived fields: {e}")
             return {"fields": []}
 
+    @staticmethod
+    def _check_derived_formulas(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Test every formula with dummy values to ensure it's safe: {'invalid': {name: error}}."""
+        invalid = {}
+        for field in data.get('fields', []):
+            formula = field.get('formula', '')
+            requires = field.get('requires', [])
+            if not formula or not requires:
+                continue
+            try:
+                SafeFormulaEvaluator.compile(formula).evaluate({req: 1.0 for req in requires})
+            except Exception as e:
+                invalid[field.get('name')] = str(e)
+        return {'invalid': invalid}
+
+    @staticmethod
+    def _order_derived_fields(fields: List[Dict]) -> List[Dict]:
+        """Sort fields so each follows the derived fields it requires; drop cycles."""
+        by_name = {field.get('name'): field for field in fields}
+        ordered = []
+        resolved: Dict[str, bool] = {}
+        visiting = set()
+
+        def visit(name):
+            if name in resolved:
+                return resolved[name]
+            if name in visiting:
+                return False
+            visiting.add(name)
+            ok = all([visit(req) for req in by_name[name].get('requires', []) if req in by_name])
+            visiting.discard(name)
+            resolved[name] = ok
+            if ok:
+                ordered.append(by_name[name])
+            else:
+                print(f"⚠️ Circular dependency in derived field '{name}' - skipped")
+            return ok
+
+        for name in by_name:
+            visit(name)
+        return ordered
+
+    def _derived_closure(self, fields) -> List[str]:
+        """Derived fields needed for `fields`, with their dependencies, in dependency order."""
+        needed = set()
+        stack = [field for field in fields if field in self._derived_defs]
+        while stack:
+            name = stack.pop()
+            if name in needed:
+                continue
+            needed.add(name)
+            stack.extend(req for req in self._derived_defs[name].get('requires', [])
+                         if req in self._derived_defs)
+        return [name for name in self._derived_order if name in needed]
+
+    def get_scheme_derived_fields(self, scheme_id: str) -> List[str]:
+        """Names of the derived fields a scheme's rules depend on, in evaluation order."""
+        names = self._scheme_derived.get(scheme_id)
+        if names is None:
+            summary = self._scheme_summaries.get(scheme_id)
+            if summary is not None:
+                names = self._derived_closure(summary['rule_fields'])
+            else:
+                scheme = self.schemes.get(scheme_id)
+                names = self._derived_closure(_scheme_rule_fields(scheme)) if scheme else []
+            self._scheme_derived[scheme_id] = names
+        return names
+
     def load_all_schemes(self):
-        """Auto-discover and load all JSON classification schemes"""
-        self.schemes = {}
+        """
+        Auto-discover all JSON classification schemes.
+        Only the cached summaries are read here; each scheme itself is
+        parsed on first use.
+        """
+        self.schemes = _SchemeStore(self._load_scheme_file, self._scanned_scheme)
+        self._scheme_summaries = {}
+        self._compiled_schemes = {}
+        self._scheme_derived = {}
+        self._derived_memo = None
 
         if not self.schemes_dir.exists():
             print(f"⚠️ Classification schemes directory not found: {self.schemes_dir}")
             return
 
-        # Find all JSON files (except _TEMPLATE.json)
-        json_files = [f for f in self.schemes_dir.glob("*.json")
-                      if not f.name.startswith('_')]
+        # All JSON files except _TEMPLATE.json and friends
+        entries = self.scheme_cache.scan(self.schemes_dir, 'scheme', self._summarize_scheme)
 
-        for json_file in json_files:
-            try:
-                scheme = self.load_scheme(json_file)
-                if scheme:
-                    scheme_id = json_file.stem  # filename without .json
-                    self.schemes[scheme_id] = scheme
-                    print(f"✅ Loaded classification scheme: {scheme['scheme_name']}")
-            except Exception as e:
-                print(f"⚠️ Error loading {json_file.name}: {e}")
+        for scheme_id, entry in entries.items():
+            if 'error' in entry:
+                print(f"⚠️ Error loading {scheme_id}.json: {entry['error']}")
+                continue
+            self.schemes.add(scheme_id, self.schemes_dir / f"{scheme_id}.json")
+            self._scheme_summaries[scheme_id] = entry['summary']
+            self.get_scheme_derived_fields(scheme_id)
+            self._log(f"✅ Loaded classification scheme: {entry['summary']['scheme_name']}")
 
         print(f"\n📊 Total schemes loaded: {len(self.schemes)}")
 
+    @staticmethod
+    def _validate_scheme(scheme: Dict[str, Any]):
+        """Raise ValueError unless the scheme has every required top-level field."""
+        required = ['scheme_name', 'version', 'classifications', 'requires_fields']
+        for field in required:
+            if field not in scheme:
+                raise ValueError(f"Missing required field: {field}")
+
+    def _summarize_scheme(self, scheme: Dict[str, Any]) -> Dict[str, Any]:
+        """What the index keeps per scheme: listing info plus the fields its rules use."""
+        self._validate_scheme(scheme)
+        return {
+            'scheme_name': scheme['scheme_name'],
+            'description': scheme.get('description', ''),
+            'icon': scheme.get('icon', '📊'),
+            'version': scheme.get('version', '1.0'),
+            'field': scheme.get('field', 'General'),
+            'category': scheme.get('category', ''),
+            'rule_fields': sorted(_scheme_rule_fields(scheme)),
+        }
+
+    def _load_scheme_file(self, filepath: Path) -> Dict[str, Any]:
+        """Parse (through the scheme cache) and validate one scheme file."""
+        scheme = self.scheme_cache.load(filepath)
+        self._validate_scheme(scheme)
+        return scheme
+
+    def _scanned_scheme(self, filepath: Path) -> Optional[Dict[str, Any]]:
+        """The copy of a scheme parsed by the last scan, if it was valid."""
+        scheme = self.scheme_cache.last_parsed(filepath)
+        try:
+            self._validate_scheme(scheme)
+        except Exception:
+            return None
+        return scheme
+
     def load_scheme(self, filepath: Path) -> Optional[Dict[str, Any]]:
         """Load and validate a single classification scheme"""
         with open(filepath, 'r', encoding='utf-8') as f:
             scheme = json.load(f)
 
         # Validate required fields
-        required = ['scheme_name', 'version', 'classifications', 'requires_fields']
-        for field in required:
-            if field not in scheme:
-                raise ValueError(f"Missing required field: {field}")
+        self._validate_scheme(scheme)
 
         return scheme
 
     def get_available_schemes(self) -> List[Dict[str, str]]:
-        """Get list of available classification schemes"""
+        """Get list of available classification schemes (no scheme files are parsed)"""
         schemes_list: List[Dict[str, str]] = []
-        for scheme_id, scheme in self.schemes.items():
+        for scheme_id in self.schemes:
+            summary = self._scheme_summaries.get(scheme_id)
+            if summary is None:
+                summary = self._summarize_scheme(self.schemes[scheme_id])
             schemes_list.append({
                 'id': scheme_id,
-                'name': scheme['scheme_name'],
-                'description': scheme.get('description', ''),
-                'icon': scheme.get('icon', '📊'),
-                'version': scheme.get('version', '1.0'),
-                'field': scheme.get('field', 'General'),
-                'category': scheme.get('category', ''),
+                'name': summary['scheme_name'],
+                'description': summary['description'],
+                'icon': summary['icon'],
+                'version': summary['version'],
+                'field': summary['field'],
+                'category': summary['category'],
             })
         return schemes_list
 
     def _normalize_sample(self, sample: Any) -> Optional[Dict[str, Any]]:
         """
         Internal helper: ensure sample is a dict.
-        Accepts plain dict or pandas Series; rejects everything else.
+        Accepts plain dict, dict-like rows (e.g. columnar DataHub views) or
+        pandas Series; rejects everything else.
         """
         if _pd is not None and isinstance(sample, _pd.Series):
             return sample.to_dict()
 
-        if isinstance(sample, dict):
+        if isinstance(sample, Mapping):
             return sample
 
         # Anything else is invalid for this engine
         return None
 
-    def _compute_derived_fields(self, sample: Dict) -> Dict:
+    def _compute_derived_fields(self, sample: Dict, names: Optional[List[str]] = None,
+                                computed: Optional[Dict] = None) -> Dict:
         """
-        Compute all derived fields needed for classification schemes
+        Compute derived fields needed for classification schemes
         Loads formulas from derived_fields.json
         Uses safe evaluator instead of eval()
-        """
-        fields = self.derived_fields.get('fields', [])
-        derived = {}
 
-        for field_def in fields:
-            field_name = field_def.get('name')
-            requires = field_def.get('requires', [])
-            formula = field_def.get('formula', '')
+        names limits the work to those fields (in dependency order, see
+        get_scheme_derived_fields); None computes all of them. computed is an
+        optional memo of values already worked out for this sample and is
+        filled in place.
+        """
+        if names is None:
+            names = self._derived_order
+        derived = {} if computed is None else computed
 
-            # Skip if formula is missing
-            if not formula or not requires:
+        for field_name in names:
+            if field_name in derived:
                 continue
+            field_def = self._derived_defs[field_name]
+            requires = field_def.get('requires', [])
 
-            # Check if we have all required fields
-            if all(req in sample for req in requires):
-                try:
-                    # Build evaluation context with required values
-                    eval_context = {}
-                    for req in requires:
-                        try:
-                            eval_context[req] = float(sample[req])
-                        except (ValueError, TypeError):
-                            eval_context[req] = 0.0
-
-                    # 🔐 SAFELY evaluate the formula (no eval!)
-                    result = SafeFormulaEvaluator.evaluate(formula, eval_context)
-                    derived[field_name] = result
-                    if self.DEBUG:
-                        print(f"    Computed {field_name}: {result:.4f}")
+            try:
+                # Build evaluation context with required values - sample values
+                # first, then derived fields computed earlier in the order
+                eval_context = {}
+                for req in requires:
+                    if req in sample:
+                        value = sample[req]
+                    elif req in self._derived_defs and derived.get(req) is not None:
+                        value = derived[req]
+                    else:
+                        # Not all required fields present
+                        eval_context = None
+                        break
+                    try:
+                        eval_context[req] = float(value)
+                    except (ValueError, TypeError):
+                        eval_context[req] = 0.0
 
-                except Exception as e:
-                    if self.DEBUG:
-                        print(f"    Warning: Could not compute {field_name}: {e}")
+                if eval_context is None:
                     derived[field_name] = None
-            else:
-                # Not all required fields present
+                    continue
+
+                # 🔐 SAFELY evaluate the pre-compiled formula (no eval!)
+                result = self._compiled_formulas[field_name].evaluate(eval_context)
+                derived[field_name] = result
+                if self.DEBUG:
+                    print(f"    Computed {field_name}: {result:.4f}")
+
+            except Exception as e:
+                if self.DEBUG:
+                    print(f"    Warning: Could not compute {field_name}: {e}")
                 derived[field_name] = None
 
-        return derived
+        if computed is None:
+            return derived
+        return {name: derived[name] for name in names}
 
     def _clean_error_fields(self, sample: Dict) -> Dict:
         """Clean up error fields that might have symbols"""
@@ -433,11 +1042,16 @@ class ClassificationEngine:
 
         return cleaned
 
-    def classify_sample(self, sample: Dict, scheme_id: str) -> Tuple[str, float, str, Dict]:
+    def classify_sample(self, sample: Dict, scheme_id: str,
+                        derived_memo: Optional[Dict] = None) -> Tuple[str, float, str, Dict]:
         """
         Classify a single sample.
         Returns (classification_name, confidence, color, derived_fields)
         Does NOT modify the input sample.
+
+        Only the derived fields the scheme depends on are computed.
+        derived_memo: optional dict of derived values already computed for
+        this sample (reused and filled in place across schemes).
         """
         self._log(f"\n{'='*60}\n>>> CLASSIFY_SAMPLE: {scheme_id} | Sample: {sample.get('Sample_ID', 'Unknown')}\n{'='*60}")
 
@@ -451,7 +1065,9 @@ class ClassificationEngine:
             return ("INVALID_SAMPLE", 0.0, "#808080", {})
 
         cleaned_errors = self._clean_error_fields(sample_norm)
-        derived = self._compute_derived_fields(sample_norm)
+        derived = self._compute_derived_fields(
+            sample_norm, self.get_scheme_derived_fields(scheme_id), derived_memo
+        )
 
         scheme = self.schemes[scheme_id]
         self._log(f"\n>>> SCHEME: {scheme.get('scheme_name')}")
@@ -577,12 +1193,20 @@ class ClassificationEngine:
             print(f"      Error evaluating rule: {e}")
             return False
 
-    def classify_all_samples(self, samples: Any, scheme_id: str) -> List[Dict]:
+    def classify_all_samples(self, samples: Any, scheme_id: str, version: Any = None) -> List[Dict]:
         """
         Classify all samples using ONLY the selected scheme.
         Returns a list of result dictionaries (one per sample) with keys:
             'classification', 'confidence', 'color', 'derived_fields', 'flag_for_review'
         Does NOT modify input samples.
+
+        Uses the vectorized batch path when numpy is available (and DEBUG is
+        off); it returns the same results as calling classify_sample per row.
+
+        version: optional data version (e.g. DataHub.version). Consecutive
+        calls with the same samples object and version reuse the derived
+        fields already computed, so running every scheme computes each
+        derived field once.
         """
         if scheme_id not in self.schemes:
             print(f"⚠️ Classification scheme not found: {scheme_id}")
@@ -595,38 +1219,216 @@ class ClassificationEngine:
         if _pd is not None and isinstance(samples, _pd.DataFrame):
             samples = samples.to_dict(orient='records')
 
-        if not isinstance(samples, list):
+        if not isinstance(samples, Sequence) or isinstance(samples, str):
             print("⚠️ 'samples' must be a list of dicts or a pandas DataFrame")
             return []
 
-        results = []
-        classified_count = 0
-
-        for i, sample in enumerate(samples):
-            classification, confidence, color, derived = self.classify_sample(sample, scheme_id)
-
-            # Build result entry
-            result = {
-                'classification': classification,
-                'confidence': confidence,
-                'color': color,
-                'derived_fields': derived
-            }
-
-            # Add flag for review based on confidence threshold
-            flag_uncertain = scheme.get('flag_uncertain', False)
-            uncertain_threshold = scheme.get('uncertain_threshold', 0.7)
-            if flag_uncertain:
-                result['flag_for_review'] = (confidence < uncertain_threshold)
-            else:
-                result['flag_for_review'] = False
+        results = self._classify(samples, scheme_id, self._derived_memo_for(samples, version))
+
+        classified_count = sum(
+            1 for r in results
+            if r['classification'] not in ['INSUFFICIENT_DATA', 'UNCLASSIFIED', 'INVALID_SAMPLE']
+        )
+        print(f"✅ Classified {classified_count}/{len(samples)} samples using '{scheme['scheme_name']}'")
 
-            results.append(result)
+        return results
 
-            if classification not in ['INSUFFICIENT_DATA', 'UNCLASSIFIED', 'INVALID_SAMPLE']:
-                classified_count += 1
+    def classify_many(self, samples: Any, scheme_ids: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Classify the same samples with several schemes in one pass.
+        Returns scheme_id -> classify_all_samples() results. Derived fields
+        are computed once and shared by every scheme; unknown schemes are
+        skipped. Used by the "Run all schemes" scheduler.
+        """
+        if _pd is not None and isinstance(samples, _pd.DataFrame):
+            samples = samples.to_dict(orient='records')
 
-        print(f"✅ Classified {classified_count}/{len(samples)} samples using '{scheme['scheme_name']}'")
+        if not isinstance(samples, Sequence) or isinstance(samples, str):
+            print("⚠️ 'samples' must be a list of dicts or a pandas DataFrame")
+            return {}
+
+        memo = _DerivedMemo(samples, None)
+        return {scheme_id: self._classify(samples, scheme_id, memo)
+                for scheme_id in scheme_ids if scheme_id in self.schemes}
+
+    def _classify(self, samples: Sequence, scheme_id: str, memo: _DerivedMemo) -> List[Dict]:
+        """Pick the batch or scalar path for one scheme."""
+        if self.VECTORIZED and _np is not None and not self.DEBUG:
+            return self._classify_batch(samples, scheme_id, memo)
+        return self._classify_scalar(samples, scheme_id, memo)
+
+    @staticmethod
+    def _result_entry(scheme: Dict[str, Any], classification: str, confidence: float,
+                      color: str, derived: Dict) -> Dict:
+        """Build one classify_all_samples result, including the review flag."""
+        result = {
+            'classification': classification,
+            'confidence': confidence,
+            'color': color,
+            'derived_fields': derived
+        }
+
+        # Add flag for review based on confidence threshold
+        flag_uncertain = scheme.get('flag_uncertain', False)
+        uncertain_threshold = scheme.get('uncertain_threshold', 0.7)
+        if flag_uncertain:
+            result['flag_for_review'] = (confidence < uncertain_threshold)
+        else:
+            result['flag_for_review'] = False
+        return result
+
+    def _derived_memo_for(self, samples: Sequence, version: Any) -> _DerivedMemo:
+        """Reuse the last memo when samples and version match; only versioned memos are kept."""
+        memo = self._derived_memo
+        if memo is None or not memo.matches(samples, version):
+            memo = _DerivedMemo(samples, version)
+            self._derived_memo = memo if version is not None else None
+        return memo
+
+    def _classify_scalar(self, samples: Sequence, scheme_id: str,
+                         memo: Optional[_DerivedMemo] = None) -> List[Dict]:
+        """Reference path: classify_sample() on every sample in turn."""
+        scheme = self.schemes[scheme_id]
+        if memo is None:
+            return [self._result_entry(scheme, *self.classify_sample(sample, scheme_id))
+                    for sample in samples]
+        if memo.rows is None:
+            memo.rows = [{} for _ in range(memo.n)]
+        return [self._result_entry(scheme, *self.classify_sample(sample, scheme_id, computed))
+                for sample, computed in zip(samples, memo.rows)]
+
+    def get_compiled_scheme(self, scheme_id: str) -> Optional[CompiledScheme]:
+        """Return the batch-compiled form of a scheme (compiled on first use)."""
+        compiled = self._compiled_schemes.get(scheme_id)
+        if compiled is None and scheme_id in self.schemes:
+            compiled = CompiledScheme(self.schemes[scheme_id])
+            self._compiled_schemes[scheme_id] = compiled
+        return compiled
+
+    def _compute_derived_columns(self, batch: _BatchColumns, names: Optional[List[str]] = None,
+                                 computed: Optional[Dict] = None) -> Dict[str, Tuple[List, Any, Any]]:
+        """
+        Column-wise _compute_derived_fields: name -> (per-sample values, float64 array, valid mask).
+
+        Per-sample values match the scalar path (None when a required field is
+        missing or the formula raises). Rows where the vectorized result is not
+        finite are re-run through the scalar formula so NaN/inf/complex inputs
+        and errors behave exactly as they do per sample. names and computed
+        work as in _compute_derived_fields, with whole columns memoized.
+        """
+        if names is None:
+            names = self._derived_order
+        derived = {} if computed is None else computed
+
+        for field_name in names:
+            if field_name in derived:
+                continue
+            requires = self._derived_defs[field_name].get('requires', [])
+
+            present = _np.ones(batch.n, dtype=bool)
+            inputs = {}
+            for req in requires:
+                in_sample = batch.present(req)
+                if req in self._derived_defs:
+                    # Sample value first, then the derived value computed earlier
+                    d_values, d_array, d_valid = derived[req]
+                    available = _np.fromiter((v is not None for v in d_values), bool, batch.n)
+                    present &= in_sample | available
+                    inputs[req] = _np.where(in_sample, batch.formula_input(req),
+                                            _np.where(d_valid, d_array, 0.0))
+                else:
+                    present &= in_sample
+                    inputs[req] = batch.formula_input(req)
+
+            values = [None] * batch.n
+            array = _np.full(batch.n, _np.nan)
+            valid = _np.zeros(batch.n, dtype=bool)
+
+            if present.any():
+                compiled = self._compiled_formulas[field_name]
+                try:
+                    result = compiled.evaluate_array(inputs)
+                except Exception:
+                    result = _np.full(batch.n, _np.nan)
+
+                finite = _np.isfinite(result)
+                ok = present & finite
+                array[ok] = result[ok]
+                valid[ok] = True
+                result_list = result.tolist()
+                for i in _np.flatnonzero(ok):
+                    values[i] = result_list[i]
+
+                # Re-run the scalar formula wherever the array result is not finite
+                for i in _np.flatnonzero(present & ~finite):
+                    try:
+                        value = compiled.evaluate({req: float(inputs[req][i]) for req in requires})
+                    except Exception:
+                        value = None
+                    values[i] = value
+                    if isinstance(value, _numbers.Real):
+                        array[i] = value
+                        valid[i] = True
+
+            derived[field_name] = (values, array, valid)
+
+        return {name: derived[name] for name in names}
+
+    def _classify_batch(self, samples: Sequence, scheme_id: str,
+                        memo: Optional[_DerivedMemo] = None) -> List[Dict]:
+        """Vectorized classify_all_samples: rule masks over columns, first match wins."""
+        scheme = self.schemes[scheme_id]
+        compiled = self.get_compiled_scheme(scheme_id)
+        if memo is None:
+            memo = _DerivedMemo(samples, None)
+
+        if memo.batch is None:
+            source = samples if hasattr(samples, 'column') else None
+            rows = [self._normalize_sample(sample) for sample in samples]
+            memo.batch = _BatchColumns(rows, source)
+        batch = memo.batch
+        rows = batch.rows
+        n = batch.n
+
+        derived_needed = self.get_scheme_derived_fields(scheme_id)
+        needed = set(compiled.fields)
+        for name in derived_needed:
+            needed.update(self._derived_defs[name].get('requires', []))
+        batch.prefetch(needed)
+
+        derived = self._compute_derived_columns(batch, derived_needed, memo.columns)
+
+        lookups = {}
+
+        def lookup(field):
+            # Sample values take precedence over derived values, as in classify_sample()
+            cached = lookups.get(field)
+            if cached is None:
+                values, valid = batch.rule_values(field)
+                if field in derived:
+                    in_sample = batch.present(field)
+                    _, d_array, d_valid = derived[field]
+                    values = _np.where(in_sample, values, d_array)
+                    valid = _np.where(in_sample, valid, d_valid)
+                cached = lookups[field] = (values, valid)
+            return cached
+
+        assigned = compiled.match(lookup, n).tolist()
+
+        outcomes = [(c['name'], c['confidence'], c['color']) for c in compiled.classifications]
+        unclassified = ("UNCLASSIFIED", 0.0, "#A9A9A9")
+        derived_names = list(derived)
+        derived_rows = zip(*(derived[name][0] for name in derived_names)) if derived_names else repeat(())
+
+        results = []
+        for row, k, derived_values in zip(rows, assigned, derived_rows):
+            if row is None:
+                results.append(self._result_entry(scheme, "INVALID_SAMPLE", 0.0, "#808080", {}))
+                continue
+            name, confidence, color = outcomes[k] if k >= 0 else unclassified
+            results.append(self._result_entry(
+                scheme, name, confidence, color, dict(zip(derived_names, derived_values))
+            ))
 
         return results
 
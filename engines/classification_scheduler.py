@@ -0,0 +1,217 @@
+"""
+Run-All Scheduler - classifies samples with every scheme off the UI thread
+
+Samples are split into shards and each shard is classified with all schemes
+in one pass (ClassificationEngine.classify_many), so derived fields are
+computed once per shard instead of once per scheme. Large runs fan the
+shards out over a forked process pool (Linux, see plugin_workers); small
+runs, other platforms, or machines where a pool cannot start, use a single
+background thread.
+
+The samples are snapshotted when the job is created - a columnar hub by
+copying its arrays, a list of rows by copying the list - and each shard is
+turned into plain dicts on the scheduler thread just before it is run, so
+the UI thread never walks the rows.
+
+Finished shards are queued as they complete - the UI polls drain() to
+stream them into the HUD, reads completed/total for progress and may
+cancel() at any time.
+"""
+
+import io
+import os
+import queue
+import multiprocessing
+import threading
+import contextlib
+from pathlib import Path
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Tuple
+
+from plugins.plugin_workers import fork_available
+
+# Below this many samples the pool start-up costs more than it saves
+PARALLEL_MIN_SAMPLES = 5000
+# Shards per worker - more shards = smoother progress, fewer = less overhead
+SHARDS_PER_WORKER = 4
+MIN_SHARD_SIZE = 500
+
+# One engine per worker process, built by _init_worker
+_worker_engine = None
+
+
+def _init_worker(schemes_dir: str, derived_fields_path: str):
+    """Pool initializer: load the schemes once per worker process."""
+    global _worker_engine
+    from engines.classification_engine import ClassificationEngine
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ClassificationEngine(schemes_dir)
+        if Path(derived_fields_path) != engine.derived_fields_path:
+            engine.derived_fields_path = Path(derived_fields_path)
+            engine.derived_fields = engine._load_derived_fields()
+            engine.load_all_schemes()
+    _worker_engine = engine
+
+
+def _pack_results(results: Dict[str, List[Dict]]) -> Dict[str, Tuple]:
+    """
+    Column form of classify_many() output - far cheaper to pickle than one
+    dict per sample: scheme_id -> (classifications, confidences,
+    derived names, one list of values per derived name).
+    """
+    packed = {}
+    for scheme_id, rows in results.items():
+        names = list(rows[0]['derived_fields']) if rows else []
+        packed[scheme_id] = (
+            [r['classification'] for r in rows],
+            [r['confidence'] for r in rows],
+            names,
+            [[r['derived_fields'].get(name) for r in rows] for name in names],
+        )
+    return packed
+
+
+def _unpack_results(packed: Dict[str, Tuple]) -> Dict[str, Tuple[List, List, List[Dict]]]:
+    """scheme_id -> (classifications, confidences, derived dict per sample)."""
+    results = {}
+    for scheme_id, (classes, confidences, names, columns) in packed.items():
+        if names:
+            derived = [dict(zip(names, values)) for values in zip(*columns)]
+        else:
+            derived = [{} for _ in classes]
+        results[scheme_id] = (classes, confidences, derived)
+    return results
+
+
+def _classify_shard(start: int, samples: List[Dict], scheme_ids: List[str]) -> Tuple[int, Dict]:
+    """Pool task: classify one shard with every scheme."""
+    return start, _pack_results(_worker_engine.classify_many(samples, scheme_ids))
+
+
+class RunAllScheduler:
+    """
+    Background "Run all schemes" job.
+
+    start() returns immediately. drain() hands back the shards finished
+    since the last call as (start offset, {scheme_id: (classifications,
+    confidences, derived dicts)}), one entry per sample in the shard; once
+    `finished` is True every shard has been drained.
+    """
+
+    def __init__(self, engine, samples, scheme_ids: List[str], max_workers: int = 0):
+        self.engine = engine
+        # Snapshot, safe from edits mid-run; rows become dicts shard by shard
+        snapshot = getattr(samples, 'snapshot', None)
+        self.samples = snapshot() if snapshot is not None else list(samples)
+        self.scheme_ids = [sid for sid in scheme_ids if sid in engine.schemes]
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+        self.total = len(self.samples)
+        self.completed = 0
+        self.mode = None          # 'process' or 'thread' once running
+        self.error = None
+        self.cancelled = False
+        self.finished = False
+
+        self._queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._pending = {}
+        self._thread = None
+
+    def _shards(self, workers: int) -> List[Tuple[int, int]]:
+        size = max(MIN_SHARD_SIZE, -(-self.total // (workers * SHARDS_PER_WORKER)))
+        return [(i, min(i + size, self.total)) for i in range(0, self.total, size)]
+
+    def _rows(self, start: int, stop: int) -> List:
+        """Plain-dict copies of one shard's rows (picklable for the pool)."""
+        return [dict(s) if isinstance(s, Mapping) else s for s in self.samples[start:stop]]
+
+    def start(self) -> 'RunAllScheduler':
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Stop scheduling shards; shards already delivered stay valid."""
+        self.cancelled = True
+        self._cancel.set()
+
+    def drain(self) -> List[Tuple[int, Dict[str, Tuple[List, List, List[Dict]]]]]:
+        """Shards finished since the last call (never blocks)."""
+        shards = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.finished = True
+            else:
+                start, packed = item
+                shards.append((start, _unpack_results(packed)))
+        return shards
+
+    def wait(self, timeout: float = None):
+        """Block until the background run ends (for scripts and tests)."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _deliver(self, start: int, packed: Dict[str, Tuple]):
+        stop = self._pending.pop(start, start)
+        self.completed += stop - start
+        self._queue.put((start, packed))
+
+    def _run(self):
+        try:
+            workers = min(self.max_workers, -(-self.total // MIN_SHARD_SIZE) or 1)
+            self._pending = dict(self._shards(workers))
+            # Pool workers rebuild a ClassificationEngine; other engines run inline
+            poolable = getattr(self.engine, 'derived_fields_path', None) is not None
+            if (poolable and workers > 1 and self.total >= PARALLEL_MIN_SAMPLES
+                    and fork_available()):
+                try:
+                    self._run_pool(workers)
+                except (OSError, ImportError, BrokenProcessPool) as e:
+                    print(f"⚠️ Process pool unavailable ({e}) - classifying in one thread")
+            self._run_inline()
+        except Exception as e:
+            self.error = e
+            print(f"❌ Run all schemes failed: {e}")
+        finally:
+            self._queue.put(None)
+
+    def _run_pool(self, workers: int):
+        self.mode = 'process'
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_worker,
+            initargs=(str(self.engine.schemes_dir), str(self.engine.derived_fields_path)),
+        )
+        try:
+            # A few shards per worker in flight, so only those are copied at a time
+            waiting = sorted(self._pending.items())
+            pending = set()
+            while (waiting or pending) and not self._cancel.is_set():
+                while waiting and len(pending) < workers * 2:
+                    start, stop = waiting.pop(0)
+                    pending.add(pool.submit(_classify_shard, start, self._rows(start, stop),
+                                            self.scheme_ids))
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._deliver(*future.result())
+        finally:
+            pool.shutdown(wait=not self._cancel.is_set(), cancel_futures=True)
+
+    def _run_inline(self):
+        """Classify whatever shards are left in this thread."""
+        if self.mode is None:
+            self.mode = 'thread'
+        for start, stop in sorted(self._pending.items()):
+            if self._cancel.is_set():
+                break
+            chunk = self._rows(start, stop)
+            self._deliver(start, _pack_results(self.engine.classify_many(chunk, self.scheme_ids)))
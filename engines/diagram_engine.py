@@ -0,0 +1,391 @@
+"""
+Diagram Engine for Scientific Toolkit
+Batch-classifies samples against the discrimination diagrams in
+engines/diagrams/*.json (the same files GeoPlot Pro draws).
+
+Each diagram is compiled once: its region polygons are moved into plot
+space (log10 on log axes, ternary percentages to 2-D), given bounding
+boxes and bucketed into a coarse grid. Classifying a batch then works on
+whole columns - per region, only samples in grid cells the region touches
+are tested, with a vectorized point-in-polygon.
+
+Exposes the same classify_all_samples / get_available_schemes interface
+as the classification engine, so it can be picked from the Engine menu.
+"""
+
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from engines.scheme_cache import get_scheme_cache
+from engines.classification_engine import ClassificationEngine, SafeFormulaEvaluator, _BatchColumns
+
+try:
+    import pandas as _pd
+except ImportError:
+    _pd = None
+
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+# Grid cells per side of a diagram's region extent
+GRID_SIZE = 16
+# Log-axis vertices at or below zero mean "off the low end of the axis";
+# they are pinned this many decades below the axis limit
+LOG_FLOOR_DECADES = 6.0
+# Ternary apex height for unit side length
+_SQRT3_2 = 3 ** 0.5 / 2
+
+CONFIDENCE_LEVELS = {'high': 0.9, 'medium': 0.7, 'low': 0.5}
+
+
+def _summarize_diagram(diagram: Dict[str, Any]) -> Dict[str, Any]:
+    """What get_available_schemes() needs, kept in the scheme cache index."""
+    if diagram.get('diagram_type') not in ('xy', 'ternary'):
+        raise ValueError(f"unsupported diagram_type {diagram.get('diagram_type')!r}")
+    if not diagram.get('fields'):
+        raise ValueError("no fields")
+    return {
+        'name': diagram.get('diagram_name') or diagram.get('scheme_name', ''),
+        'description': diagram.get('description', ''),
+        'type': diagram['diagram_type'],
+        'requires_fields': diagram.get('requires_fields', []),
+    }
+
+
+def _ternary_xy(a, b, c):
+    """Barycentric (a, b, c) -> 2-D plot coordinates (a at bottom left, c on top)."""
+    total = a + b + c
+    return (b + c / 2) / total, c * _SQRT3_2 / total
+
+
+def points_in_polygon(x, y, polygon):
+    """
+    Even-odd ray casting for many points against one polygon.
+    x, y: 1-D float arrays; polygon: (k, 2) vertex array. Returns a bool mask.
+    """
+    inside = _np.zeros(len(x), dtype=bool)
+    x1, y1 = polygon[-1]
+    for x2, y2 in polygon:
+        crosses = (y1 > y) != (y2 > y)
+        if crosses.any():
+            with _np.errstate(divide='ignore', invalid='ignore'):
+                x_at = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+            inside ^= crosses & (x < x_at)
+        x1, y1 = x2, y2
+    return inside
+
+
+class CompiledDiagram:
+    """
+    One diagram, ready for batch classification.
+
+    regions: list of (name, confidence, color, vertices in plot space, bbox)
+    in file order - the first region containing a point wins, as in a
+    classification scheme. cell_regions[r] is a bool mask over grid cells
+    whose extent overlaps region r's bounding box.
+    """
+
+    def __init__(self, diagram: Dict[str, Any]):
+        self.diagram = diagram
+        self.ternary = diagram.get('diagram_type') == 'ternary'
+        axes = diagram.get('axes', {})
+        names = ('a', 'b', 'c') if self.ternary else ('x', 'y')
+        self.axes = [axes.get(name, {}) for name in names]
+        self.axis_fields = [axis.get('field', '') for axis in self.axes]
+        self.log_axes = [axis.get('scale') == 'log' and not self.ternary for axis in self.axes]
+
+        self.derived = []       # (name, CompiledFormula), in dependency order
+        self.skipped = {}       # derived name -> why it cannot be computed
+        defs = [d for d in diagram.get('derived_fields', []) if d.get('name') and d.get('formula')]
+        for field in ClassificationEngine._order_derived_fields(defs):
+            try:
+                self.derived.append((field['name'], SafeFormulaEvaluator.compile(field['formula'])))
+            except ValueError as e:
+                self.skipped[field['name']] = str(e)
+        # Every field read from the samples (derived names too: sample values win)
+        self.sample_fields = set(self.axis_fields).union(
+            *(formula.variables for _, formula in self.derived), (name for name, _ in self.derived))
+
+        self.regions = []
+        for field in diagram.get('fields', []):
+            vertices = field.get('points') or field.get('polygon')
+            if field.get('type', 'polygon') != 'polygon' or not vertices or len(vertices) < 3:
+                continue
+            polygon = self._to_plot_space(_np.asarray(vertices, dtype=_np.float64))
+            confidence = field.get('confidence', 1.0)
+            if not isinstance(confidence, (int, float)):
+                confidence = CONFIDENCE_LEVELS.get(str(confidence).lower(), 1.0)
+            bbox = (*polygon.min(axis=0), *polygon.max(axis=0))
+            self.regions.append((field.get('name', ''), float(confidence),
+                                 field.get('color', '#808080'), polygon, bbox))
+        self._build_grid()
+
+    def _to_plot_space(self, vertices):
+        if self.ternary:
+            return _np.column_stack(_ternary_xy(vertices[:, 0], vertices[:, 1], vertices[:, 2]))
+        out = vertices[:, :2].copy()
+        for i, is_log in enumerate(self.log_axes):
+            if is_log:
+                column = out[:, i]
+                positive = column > 0
+                low = self.axes[i].get('limits', [None])[0]
+                if not low or low <= 0:
+                    low = column[positive].min() if positive.any() else 1.0
+                floor = _np.log10(low) - LOG_FLOOR_DECADES
+                out[:, i] = _np.where(positive, _np.log10(_np.where(positive, column, 1.0)), floor)
+        return out
+
+    def _build_grid(self):
+        if not self.regions:
+            self.extent = (0.0, 0.0, 1.0, 1.0)
+            self.cell_regions = []
+            return
+        boxes = _np.array([region[4] for region in self.regions])
+        x0, y0 = boxes[:, 0].min(), boxes[:, 1].min()
+        x1, y1 = boxes[:, 2].max(), boxes[:, 3].max()
+        self.extent = (x0, y0, max(x1 - x0, 1e-12), max(y1 - y0, 1e-12))
+
+        # Cell index range covered by each bounding box -> mask over all cells
+        self.cell_regions = []
+        for bx0, by0, bx1, by1 in boxes:
+            ix0, iy0 = self._cell(bx0, by0)
+            ix1, iy1 = self._cell(bx1, by1)
+            mask = _np.zeros((GRID_SIZE, GRID_SIZE), dtype=bool)
+            mask[ix0:ix1 + 1, iy0:iy1 + 1] = True
+            self.cell_regions.append(mask.ravel())
+
+    def _cell(self, x, y):
+        x0, y0, width, height = self.extent
+        ix = _np.clip(((_np.asarray(x) - x0) / width * GRID_SIZE).astype(_np.int64), 0, GRID_SIZE - 1)
+        iy = _np.clip(((_np.asarray(y) - y0) / height * GRID_SIZE).astype(_np.int64), 0, GRID_SIZE - 1)
+        return ix, iy
+
+    def plot_coordinates(self, columns: List[Any]):
+        """Axis value columns -> (x, y, valid) in plot space."""
+        if self.ternary:
+            a, b, c = columns
+            with _np.errstate(divide='ignore', invalid='ignore'):
+                valid = (a >= 0) & (b >= 0) & (c >= 0) & (a + b + c > 0)
+                x, y = _ternary_xy(a, b, c)
+            return x, y, valid & _np.isfinite(x) & _np.isfinite(y)
+        x, y = columns
+        valid = _np.isfinite(x) & _np.isfinite(y)
+        with _np.errstate(divide='ignore', invalid='ignore'):
+            if self.log_axes[0]:
+                valid &= x > 0
+                x = _np.log10(x)
+            if self.log_axes[1]:
+                valid &= y > 0
+                y = _np.log10(y)
+        return x, y, valid
+
+    def locate(self, x, y, valid):
+        """Index of the first region containing each point (-1 if none)."""
+        assigned = _np.full(len(x), -1, dtype=_np.int64)
+        if not self.regions:
+            return assigned
+        x0, y0, width, height = self.extent
+        in_extent = valid & (x >= x0) & (x <= x0 + width) & (y >= y0) & (y <= y0 + height)
+        ix, iy = self._cell(_np.where(in_extent, x, x0), _np.where(in_extent, y, y0))
+        cells = ix * GRID_SIZE + iy
+
+        for k, (_, _, _, polygon, (bx0, by0, bx1, by1)) in enumerate(self.regions):
+            candidates = _np.flatnonzero(in_extent & (assigned < 0) & self.cell_regions[k][cells])
+            if not len(candidates):
+                continue
+            cx, cy = x[candidates], y[candidates]
+            in_box = (cx >= bx0) & (cx <= bx1) & (cy >= by0) & (cy <= by1)
+            candidates, cx, cy = candidates[in_box], cx[in_box], cy[in_box]
+            if len(candidates):
+                assigned[candidates[points_in_polygon(cx, cy, polygon)]] = k
+        return assigned
+
+
+class DiagramEngine:
+    """
+    Classifies samples by the diagram region they plot in.
+    Diagrams are listed from the scheme cache index and compiled on first use.
+    """
+
+    def __init__(self, diagrams_dir: str = None, cache_file: str = None):
+        if diagrams_dir is None:
+            diagrams_dir = Path(__file__).parent / "diagrams"
+        self.diagrams_dir = Path(diagrams_dir)
+        self.scheme_cache = get_scheme_cache(cache_file)
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+        self._paths: Dict[str, Path] = {}
+        self._compiled: Dict[str, CompiledDiagram] = {}
+        self.load_all_diagrams()
+
+    @property
+    def schemes(self) -> Dict[str, Path]:
+        """Diagram ids (membership test used by the UI, like ClassificationEngine.schemes)."""
+        return self._paths
+
+    def load_all_diagrams(self):
+        """Index every diagram file; full definitions are parsed on first use."""
+        self._summaries.clear()
+        self._paths.clear()
+        self._compiled.clear()
+        if not self.diagrams_dir.exists():
+            print(f"⚠️ Diagrams directory not found: {self.diagrams_dir}")
+            return
+        entries = self.scheme_cache.scan(self.diagrams_dir, 'diagram_engine', _summarize_diagram)
+        for diagram_id, entry in entries.items():
+            if 'error' in entry:
+                print(f"⚠️ Skipping diagram {diagram_id}: {entry['error']}")
+                continue
+            self._summaries[diagram_id] = entry['summary']
+            self._paths[diagram_id] = self.diagrams_dir / f"{diagram_id}.json"
+        print(f"✅ Indexed {len(self._summaries)} diagrams")
+
+    def get_available_schemes(self) -> List[Dict[str, str]]:
+        """Diagrams in the same shape as ClassificationEngine.get_available_schemes()."""
+        return [{
+            'id': diagram_id,
+            'name': summary['name'],
+            'description': summary['description'],
+            'icon': '🔺' if summary['type'] == 'ternary' else '📈',
+            'version': '',
+            'field': 'Diagram',
+            'category': summary['type'],
+        } for diagram_id, summary in self._summaries.items()]
+
+    def get_compiled_diagram(self, diagram_id: str) -> Optional[CompiledDiagram]:
+        """Compiled form of a diagram (compiled on first use)."""
+        compiled = self._compiled.get(diagram_id)
+        if compiled is None and diagram_id in self._paths:
+            compiled = CompiledDiagram(self.scheme_cache.load(self._paths[diagram_id]))
+            for name, error in compiled.skipped.items():
+                print(f"⚠️ {diagram_id}: derived field '{name}' not computable: {error}")
+            self._compiled[diagram_id] = compiled
+        return compiled
+
+    @staticmethod
+    def _rows(samples: Any) -> Optional[Sequence]:
+        if _pd is not None and isinstance(samples, _pd.DataFrame):
+            samples = samples.to_dict(orient='records')
+        if not isinstance(samples, Sequence) or isinstance(samples, str):
+            print("⚠️ 'samples' must be a list of dicts or a pandas DataFrame")
+            return None
+        return samples
+
+    @staticmethod
+    def _columns(diagram: CompiledDiagram, batch: _BatchColumns) -> Dict[str, Any]:
+        """Axis and derived columns as float64 (NaN = missing); sample values win."""
+        columns = {}
+
+        def column(field):
+            if field not in columns:
+                values, valid = batch.rule_values(field)
+                columns[field] = _np.where(valid, values, _np.nan)
+            return columns[field]
+
+        batch.prefetch(diagram.sample_fields)
+        for name, formula in diagram.derived:
+            result = formula.evaluate_array({v: column(v) for v in formula.variables})
+            in_sample = batch.present(name)
+            if in_sample.any():
+                result = _np.where(in_sample, column(name), result)
+            columns[name] = result
+        for field in diagram.axis_fields:
+            column(field)
+        return columns
+
+    def _batch(self, samples: Any, diagram_ids: List[str]):
+        """(_BatchColumns with every diagram's fields prefetched, known diagram ids)."""
+        if _np is None:
+            raise ImportError("Diagram classification requires numpy")
+        samples = self._rows(samples)
+        if samples is None:
+            return None, []
+        rows = [s if isinstance(s, Mapping) else None for s in samples]
+        batch = _BatchColumns(rows, samples if hasattr(samples, 'column') else None)
+        diagram_ids = [d for d in diagram_ids if d in self._paths]
+        # One walk over the rows for the fields of every diagram
+        batch.prefetch(set().union(*(self.get_compiled_diagram(d).sample_fields for d in diagram_ids)))
+        return batch, diagram_ids
+
+    def locate_many(self, samples: Any, diagram_ids: List[str]) -> Dict[str, Any]:
+        """
+        Array form of classify_many(): diagram_id -> int array, one code per
+        sample - the index into get_compiled_diagram(id).regions, -1 outside
+        every region, -2 when the sample cannot be plotted (missing, negative
+        or, on a log axis, non-positive values) or is not a mapping.
+        """
+        batch, diagram_ids = self._batch(samples, diagram_ids)
+        return {diagram_id: self._locate(batch, diagram_id)[0] for diagram_id in diagram_ids}
+
+    def classify_many(self, samples: Any, diagram_ids: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Classify the same samples against several diagrams in one pass.
+        Returns diagram_id -> classify_all_samples() results; sample columns
+        are extracted once and shared by every diagram.
+        """
+        batch, diagram_ids = self._batch(samples, diagram_ids)
+        return {diagram_id: self._classify_batch(batch, diagram_id) for diagram_id in diagram_ids}
+
+    def classify_all_samples(self, samples: Any, scheme_id: str, version: Any = None) -> List[Dict]:
+        """
+        Classify samples against one diagram. Same result dicts as
+        ClassificationEngine.classify_all_samples(); derived_fields holds the
+        sample's axis values. version is accepted for interface parity.
+        """
+        rows = self._rows(samples)
+        if rows is None:
+            return []
+        if scheme_id not in self._paths:
+            print(f"⚠️ Diagram not found: {scheme_id}")
+            return [{'classification': 'SCHEME_NOT_FOUND', 'confidence': 0.0,
+                     'color': '#808080', 'derived_fields': {}, 'flag_for_review': False} for _ in rows]
+        results = self.classify_many(rows, [scheme_id])[scheme_id]
+        classified = sum(1 for r in results
+                         if r['classification'] not in ('INSUFFICIENT_DATA', 'UNCLASSIFIED', 'INVALID_SAMPLE'))
+        print(f"✅ Classified {classified}/{len(results)} samples using '{self._summaries[scheme_id]['name']}'")
+        return results
+
+    def classify_sample(self, sample: Dict, scheme_id: str):
+        """(classification, confidence, color, axis values) for one sample."""
+        result = self.classify_many([sample], [scheme_id]).get(scheme_id)
+        if not result:
+            return "SCHEME_NOT_FOUND", 0.0, "#808080", {}
+        r = result[0]
+        return r['classification'], r['confidence'], r['color'], r['derived_fields']
+
+    def _locate(self, batch: _BatchColumns, diagram_id: str):
+        """(region code per sample, axis value columns) - see locate_many()."""
+        diagram = self.get_compiled_diagram(diagram_id)
+        columns = self._columns(diagram, batch)
+        axis_columns = [columns[field] for field in diagram.axis_fields]
+        x, y, valid = diagram.plot_coordinates(axis_columns)
+        valid &= _np.fromiter((row is not None for row in batch.rows), bool, batch.n)
+        codes = diagram.locate(x, y, valid)
+        codes[~valid] = -2
+        return codes, axis_columns
+
+    def _classify_batch(self, batch: _BatchColumns, diagram_id: str) -> List[Dict]:
+        diagram = self.get_compiled_diagram(diagram_id)
+        codes, axis_columns = self._locate(batch, diagram_id)
+
+        outcomes = [region[:3] for region in diagram.regions]
+        outcomes.append(("INSUFFICIENT_DATA", 0.0, "#808080"))   # code -2
+        outcomes.append(("UNCLASSIFIED", 0.0, "#A9A9A9"))        # code -1
+        fields = diagram.axis_fields
+        axis_values = zip(*(column.tolist() for column in axis_columns))
+        results = []
+        for row, k, values in zip(batch.rows, codes.tolist(), axis_values):
+            if row is None:
+                results.append({'classification': "INVALID_SAMPLE", 'confidence': 0.0, 'color': "#808080",
+                                'derived_fields': {}, 'flag_for_review': False})
+                continue
+            name, confidence, color = outcomes[k]
+            if k == -2:
+                derived = {field: value for field, value in zip(fields, values) if value == value}
+            else:
+                derived = dict(zip(fields, values))
+            results.append({'classification': name, 'confidence': confidence, 'color': color,
+                            'derived_fields': derived, 'flag_for_review': False})
+        return results
@@ -36,9 +36,12 @@ class ProtocolEngine:
     # 🔐 Security: Signature file for trusted protocols
     SIGNATURE_FILE = Path(__file__).parent / "protocols" / "signatures.json"
 
-    def __init__(self, protocols_dir: Optional[str] = None, schemes_dir: Optional[str] = None):
+    def __init__(self, protocols_dir: Optional[str] = None, schemes_dir: Optional[str] = None,
+                 classification_engine: Optional[Any] = None):
         """
         Initialize the protocol engine.
+        Pass the app's classification_engine to share it instead of loading
+        every scheme a second time.
         """
 
         # Protocols directory
@@ -56,8 +59,10 @@ class ProtocolEngine:
 
         self.protocols: Dict[str, Dict[str, Any]] = {}
 
-        # Classification engine (optional)
-        if ClassificationEngine is not None:
+        # Classification engine (optional) - shared when one is provided
+        if classification_engine is not None:
+            self.classification_engine = classification_engine
+        elif ClassificationEngine is not None:
             if schemes_dir is None:
                 schemes_dir_path = current_dir / "classification"
             else:
@@ -0,0 +1,149 @@
+"""
+Scheme Cache - on-disk index of classification schemes and diagram definitions
+
+One small JSON index under config/ records, for every scheme / diagram file,
+its mtime, size and SHA-1 plus the summary the engine and UI need at start-up
+(name, icon, rule fields, ...), grouped by kind ('scheme', 'diagram', ...)
+since each kind is summarized differently. Start-up then costs one index
+read and a stat per file instead of parsing every definition; full
+definitions are parsed on first use. An entry is rebuilt when a file's
+mtime or size changes - unless its hash is unchanged, in which case only
+the stamp is refreshed.
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+CACHE_FORMAT = 1
+DEFAULT_CACHE_FILE = Path(__file__).parent.parent / "config" / "scheme_cache.json"
+
+_shared_caches: Dict[str, 'SchemeCache'] = {}
+
+
+def get_scheme_cache(cache_file: Optional[Path] = None) -> 'SchemeCache':
+    """Process-wide cache instance for one index file."""
+    path = Path(cache_file) if cache_file else DEFAULT_CACHE_FILE
+    key = str(path.resolve())
+    cache = _shared_caches.get(key)
+    if cache is None:
+        cache = _shared_caches[key] = SchemeCache(path)
+    return cache
+
+
+class SchemeCache:
+    """
+    Index of JSON definition files keyed by kind, then absolute path.
+
+    scan(directory, kind, summarize) returns {file stem: entry} where entry holds
+    either 'summary' (what summarize(data) returned) or 'error' (why the
+    file was rejected). load(path) returns the parsed file, reusing the
+    copy parsed during the scan when the file has not changed since.
+    """
+
+    def __init__(self, cache_file: Path):
+        self.cache_file = Path(cache_file)
+        self._entries: Dict[str, Dict[str, Dict[str, Any]]] = self._read_index()
+        self._documents: Dict[str, tuple] = {}   # path -> (stamp, parsed data)
+        self._touched = set()                    # (kind, path) pairs to write back
+
+    def _read_index(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('format') == CACHE_FORMAT:
+                return index.get('entries', {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {}
+
+    @staticmethod
+    def _stamp(path: Path) -> list:
+        st = path.stat()
+        return [st.st_mtime_ns, st.st_size]
+
+    def entry(self, path: Path, kind: str, summarize: Callable[[Any], Any]) -> Dict[str, Any]:
+        """Up-to-date index entry for one file (re-summarized only if it changed)."""
+        path = Path(path)
+        key = str(path.resolve())
+        stamp = self._stamp(path)
+        entries = self._entries.setdefault(kind, {})
+        entry = entries.get(key)
+        if entry is not None and entry.get('stamp') == stamp:
+            return entry
+
+        raw = path.read_bytes()
+        digest = hashlib.sha1(raw).hexdigest()
+        if entry is not None and entry.get('sha1') == digest:
+            entry['stamp'] = stamp          # touched, not changed
+            self._touched.add((kind, key))
+            return entry
+
+        entry = {'stamp': stamp, 'sha1': digest}
+        try:
+            data = json.loads(raw.decode('utf-8'))
+            self._documents[key] = (stamp, data)
+            entry['summary'] = summarize(data)
+        except Exception as e:
+            entry['error'] = str(e)
+        entries[key] = entry
+        self._touched.add((kind, key))
+        return entry
+
+    def scan(self, directory: Path, kind: str, summarize: Callable[[Any], Any],
+             pattern: str = "*.json", skip_private: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Index every matching file in a directory: {stem: entry}."""
+        found = {}
+        directory = Path(directory)
+        for path in sorted(directory.glob(pattern)):
+            if skip_private and path.name.startswith('_'):
+                continue
+            try:
+                found[path.stem] = self.entry(path, kind, summarize)
+            except OSError as e:
+                found[path.stem] = {'error': str(e)}
+        self.save()
+        return found
+
+    def load(self, path: Path) -> Any:
+        """Parsed JSON for a file, parsed at most once per version of the file."""
+        path = Path(path)
+        key = str(path.resolve())
+        stamp = self._stamp(path)
+        cached = self._documents.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self._documents[key] = (stamp, data)
+        return data
+
+    def last_parsed(self, path: Path) -> Optional[Any]:
+        """The last copy of a file this cache parsed, even if it has changed since."""
+        cached = self._documents.get(str(Path(path).resolve()))
+        return None if cached is None else cached[1]
+
+    def save(self):
+        """Write changed entries back (merged with the file, stale paths pruned)."""
+        if not self._touched:
+            return
+        index = self._read_index()
+        for kind, key in self._touched:
+            entry = self._entries.get(kind, {}).get(key)
+            if entry is not None:
+                index.setdefault(kind, {})[key] = entry
+        index = {
+            kind: {key: entry for key, entry in entries.items() if os.path.exists(key)}
+            for kind, entries in index.items()
+        }
+        self._touched = set()
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'format': CACHE_FORMAT, 'entries': index}, f)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            print(f"⚠️ Could not write scheme cache {self.cache_file}: {e}")
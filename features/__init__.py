@@ -1,23 +1,32 @@
 """
 Enhanced Features Package for Scientific Toolkit
 Contains all new productivity and workflow features
+
+The GUI classes below are imported on first use, so the non-GUI modules
+here (CSV and sheet import, batch import, project format, change journal)
+load without tkinter.
 """
 
-from .tooltip_manager import ToolTip, ToolTipManager
-from .recent_files_manager import RecentFilesManager
-from .macro_recorder import MacroRecorder, MacroManagerDialog
-from .project_manager import ProjectManager
-from .script_exporter import ScriptExporter
-
-__all__ = [
-    'ToolTip',
-    'ToolTipManager',
-    'RecentFilesManager',
-    'MacroRecorder',
-    'MacroManagerDialog',
-    'ProjectManager',
-    'ScriptExporter',
-]
+from importlib import import_module
+
+_EXPORTS = {
+    'ToolTip': '.tooltip_manager',
+    'ToolTipManager': '.tooltip_manager',
+    'RecentFilesManager': '.recent_files_manager',
+    'MacroRecorder': '.macro_recorder',
+    'MacroManagerDialog': '.macro_recorder',
+    'ProjectManager': '.project_manager',
+    'ScriptExporter': '.script_exporter',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __version__ = '1.0.0'
 __author__ = 'Enhanced by Claude (Anthropic)'
@@ -1,9 +1,12 @@
 """
 Auto-Save Manager - Automatically saves work in progress
 FIXED: Added proper cleanup of after callbacks and thread safety
+
+Auto-saves append the DataHub changes since the last save to a journal
+(features/change_journal.py) and only now and then write a full snapshot, so
+each save costs the size of the edits rather than of the dataset.
 """
 
-import json
 import threading
 import time
 from pathlib import Path
@@ -11,6 +14,9 @@ from datetime import datetime, timedelta
 import tkinter as tk
 from tkinter import messagebox
 
+from features.change_journal import ChangeJournal
+from features.project_format import ProjectFormatError, is_binary_project
+
 class AutoSaveManager:
     """
     Manages automatic saving of work in progress
@@ -22,7 +28,8 @@ class AutoSaveManager:
         self.last_auto_save = None
         self.is_running = False
         self.auto_save_thread = None
-        self.recovery_file = self.auto_save_dir / "recovery.stproj"
+        self.journal = ChangeJournal(self.auto_save_dir)
+        self.recovery_file = self.journal.snapshot_path
 
         # 🔹 Track after callbacks to cancel them on shutdown
         self._after_ids = []
@@ -40,6 +47,9 @@ class AutoSaveManager:
         # Check for recovery on startup
         self._check_for_recovery()
 
+        # Journal every DataHub change from now on
+        self.app.data_hub.register_observer(self)
+
         # Start auto-save thread
         self._start_auto_save()
 
@@ -73,6 +83,10 @@ class AutoSaveManager:
                 # If any error occurs (like app shutting down), exit gracefully
                 break
 
+    def on_data_changed(self, event, *args):
+        """DataHub observer: queue the change for the journal"""
+        self.journal.record(event, args, self.app.data_hub.samples)
+
     def _perform_auto_save(self):
         """Perform an auto-save with thread safety"""
         # 🔐 Use lock to prevent concurrent saves
@@ -82,24 +96,15 @@ class AutoSaveManager:
                 if not hasattr(self.app, 'project_manager') or self.app.project_manager is None:
                     return
 
-                # Get project data with thread safety
-                with self._data_lock:
-                    project_data = self.app.project_manager._collect_project_data()
-
-                # Add auto-save metadata
-                project_data['metadata']['auto_save'] = True
-                project_data['metadata']['auto_save_time'] = datetime.now().isoformat()
-
-                # Write to temporary file first, then rename (atomic operation)
-                temp_file = self.recovery_file.with_suffix('.tmp')
-                with open(temp_file, 'w', encoding='utf-8') as f:
-                    json.dump(project_data, f, indent=2)
+                # Append the changes since the last auto-save
+                self.journal.flush()
 
-                # Atomic rename (POSIX) - on Windows, replace if exists
-                if temp_file.exists():
-                    if self.recovery_file.exists():
-                        self.recovery_file.unlink()
-                    temp_file.rename(self.recovery_file)
+                # Now and then (and on first save) replace journal with a snapshot
+                if self.journal.needs_compaction():
+                    snapshot = self._capture_snapshot()
+                    if snapshot is None:
+                        return
+                    self.journal.compact(snapshot)
 
                 with self._data_lock:
                     self.last_auto_save = datetime.now()
@@ -114,12 +119,28 @@ class AutoSaveManager:
             except Exception as e:
                 # Log error silently - don't crash
                 print(f"Auto-save error: {e}")
-                # Clean up temp file if it exists
-                if 'temp_file' in locals() and temp_file.exists():
-                    try:
-                        temp_file.unlink()
-                    except:
-                        pass
+
+    def _capture_snapshot(self):
+        """Copy project state and columns on the UI thread, where the data changes"""
+        done = threading.Event()
+        captured = []
+
+        def capture():
+            try:
+                with self._data_lock:
+                    state = self.app.project_manager._collect_project_state()
+                    # Add auto-save metadata
+                    state['metadata']['auto_save'] = True
+                    state['metadata']['auto_save_time'] = datetime.now().isoformat()
+                    captured.append(self.journal.capture(self.app.data_hub, state))
+            finally:
+                done.set()
+
+        self._safe_after_call(capture)
+        while not done.wait(timeout=0.1):
+            if self._stop_event.is_set() or self._shutdown_flag:
+                return None
+        return captured[0] if captured else None
 
     def _safe_after_call(self, callback, *args, **kwargs):
         """Safely schedule a callback with proper cleanup"""
@@ -191,9 +212,9 @@ class AutoSaveManager:
 
     def _check_for_recovery(self):
         """Check if there's a recovery file from a previous crash"""
-        if self.recovery_file.exists():
+        if self.journal.exists():
             # Check if it's recent (less than 24 hours old)
-            mod_time = datetime.fromtimestamp(self.recovery_file.stat().st_mtime)
+            mod_time = datetime.fromtimestamp(self.journal.mtime())
             age = datetime.now() - mod_time
 
             if age < timedelta(hours=24):
@@ -219,22 +240,37 @@ class AutoSaveManager:
             if not self._shutdown_flag:
                 if response:
                     # Load recovery file
-                    success = self.app.project_manager.load_project(str(self.recovery_file))
+                    success = self._recover()
                     if success:
                         self.app.center.set_status("✅ Recovered auto-saved work", "success")
                 else:
                     # Delete recovery file
-                    self.recovery_file.unlink()
+                    self.journal.discard()
         except (tk.TclError, RuntimeError, AttributeError):
             # Window has been destroyed - ignore
             pass
 
+    def _recover(self):
+        """Load the snapshot and replay the journal on top of it"""
+        if not is_binary_project(self.recovery_file):
+            # Recovery file from a version that saved full JSON snapshots
+            return self.app.project_manager.load_project(str(self.recovery_file))
+        try:
+            with self._data_lock:
+                replayed = self.journal.recover(self.app.data_hub,
+                                                self.app.project_manager._restore_project_data)
+        except (OSError, ProjectFormatError) as e:
+            messagebox.showerror("❌ Recovery Error", f"Could not recover auto-saved work:\n{e}")
+            return False
+        # Restoring the snapshot and replaying the journal notified observers
+        print(f"♻️ Recovered auto-save snapshot + {replayed} journaled changes")
+        return True
+
     def manual_save_triggered(self):
         """Called when user manually saves - we can clean up auto-save"""
         try:
             with self._data_lock:
-                if self.recovery_file.exists():
-                    self.recovery_file.unlink()
+                self.journal.discard()
                 self.app.data_hub.mark_saved()
         except (AttributeError, RuntimeError):
             # App is shutting down - ignore
@@ -247,6 +283,12 @@ class AutoSaveManager:
         self.is_running = False
         self._stop_event.set()  # Signal thread to stop
 
+        # Stop journaling changes
+        try:
+            self.app.data_hub.observers.remove(self)
+        except (AttributeError, ValueError):
+            pass
+
         # 🔹 Cancel all pending after callbacks FIRST
         self._cancel_all_after_callbacks()
 
@@ -0,0 +1,182 @@
+"""
+Batch Import - many CSV files into the DataHub in one commit
+
+Files are parsed in worker processes with the same normalization as the
+Import Data button (features/csv_import.py), rows are de-duplicated on
+Sample_ID (against the DataHub and across the batch, first one wins) and
+everything is added with a single DataHub.add_samples() call, so
+observers refresh once per batch rather than once per file. Rows of a
+file that was imported before and has changed since replace the rows
+with the same Sample_ID (one DataHub.update_samples() call) instead of
+being dropped as duplicates.
+
+Each imported file's mtime and size are remembered in a small JSON state
+file; running the same directory again only reads files that are new or
+have changed since. A forced scan re-reads one directory's files without
+touching what is remembered for any other, and nothing is recorded until
+commit() succeeds.
+"""
+
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from features.csv_import import read_csv_file
+
+STATE_FORMAT = 1
+DEFAULT_STATE_FILE = Path(__file__).parent.parent / "config" / "batch_import_state.json"
+# Fewer files than this are read in this process
+PARALLEL_MIN_FILES = 2
+
+
+class BatchImporter:
+    """
+    scan() lists the files that need reading, read() parses them (in a
+    process pool when worthwhile), collect() de-duplicates the rows and
+    commit() adds them and records the files as imported.
+    """
+
+    def __init__(self, mappings: Optional[Dict[str, str]] = None,
+                 state_file: Optional[Path] = None, max_workers: int = 0):
+        self.mappings = mappings or {}
+        self.state_file = Path(state_file) if state_file else DEFAULT_STATE_FILE
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.mode = None        # 'process' or 'inline' after read()
+        self._stamps: Dict[str, list] = self._load_state()
+        self._scanned: Dict[str, list] = {}     # stamps seen by the last scan()
+        self.reread: Set[str] = set()           # scanned files that were imported before
+
+    def _load_state(self) -> Dict[str, list]:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('format') == STATE_FORMAT:
+                return state.get('files', {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {}
+
+    def _save_state(self):
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'format': STATE_FORMAT, 'files': self._stamps}, f)
+            os.replace(tmp, self.state_file)
+        except OSError as e:
+            print(f"⚠️ Could not write batch import state {self.state_file}: {e}")
+
+    @staticmethod
+    def _stamp(path: Path) -> list:
+        st = path.stat()
+        return [st.st_mtime_ns, st.st_size]
+
+    def scan(self, directory, recursive: bool = False,
+             force: bool = False) -> Tuple[List[Path], int]:
+        """
+        (files that are new or changed, number of unchanged files skipped).
+        force: list every file under `directory` as changed, ignoring what
+        was remembered for it (other directories are not affected).
+        """
+        pattern = "**/*.csv" if recursive else "*.csv"
+        changed, unchanged = [], 0
+        for path in sorted(Path(directory).glob(pattern)):
+            if not path.is_file():
+                continue
+            key = str(path.resolve())
+            stamp = self._stamp(path)
+            if not force and self._stamps.get(key) == stamp:
+                unchanged += 1
+            else:
+                self._scanned[key] = stamp
+                if key in self._stamps:
+                    self.reread.add(key)
+                changed.append(path)
+        return changed, unchanged
+
+    def read(self, files: List[Path]) -> List[Tuple[Path, Any]]:
+        """[(path, rows or the exception that stopped it)], in file order."""
+        tasks = [(str(path), self.mappings, f"IMP_{path.stem}") for path in files]
+        workers = min(self.max_workers, len(files))
+        if workers > 1 and len(files) >= PARALLEL_MIN_FILES:
+            try:
+                return self._read_pool(files, tasks, workers)
+            except (OSError, ImportError, BrokenProcessPool) as e:
+                print(f"⚠️ Process pool unavailable ({e}) - reading files one by one")
+        self.mode = 'inline'
+        results = []
+        for path, task in zip(files, tasks):
+            try:
+                results.append((path, read_csv_file(*task)))
+            except Exception as e:
+                results.append((path, e))
+        return results
+
+    def _read_pool(self, files, tasks, workers):
+        self.mode = 'process'
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(read_csv_file, *task) for task in tasks]
+            results = []
+            for path, future in zip(files, futures):
+                try:
+                    results.append((path, future.result()))
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    results.append((path, e))
+            return results
+
+    def collect(self, results: Iterable[Tuple[Path, Any]], existing_ids: Set[str]) -> Dict[str, Any]:
+        """
+        New rows from read() results, skipping Sample_IDs already in
+        existing_ids or earlier in the batch. Rows of re-read files whose
+        Sample_ID is in existing_ids are kept apart as updates.
+        """
+        seen = set(existing_ids)
+        replaced = set()
+        rows, updates, duplicates, imported, errors = [], [], 0, [], {}
+        for path, result in results:
+            if isinstance(result, Exception):
+                errors[str(path)] = str(result)
+                continue
+            reread = str(Path(path).resolve()) in self.reread
+            for row in result:
+                sample_id = row.get('Sample_ID')
+                if sample_id in seen:
+                    if reread and sample_id in existing_ids and sample_id not in replaced:
+                        replaced.add(sample_id)
+                        updates.append(row)
+                    else:
+                        duplicates += 1
+                    continue
+                seen.add(sample_id)
+                rows.append(row)
+            imported.append(path)
+        return {'rows': rows, 'updates': updates, 'duplicates': duplicates,
+                'files': imported, 'errors': errors}
+
+    def commit(self, data_hub, batch: Dict[str, Any]) -> Tuple[int, int]:
+        """
+        Add the batch's rows and apply its updates (one call each) and
+        remember its files as imported. Returns (added, updated).
+        """
+        changes, rows = {}, list(batch['rows'])
+        for row in batch.get('updates', ()):
+            index = data_hub.id_to_index.get(row['Sample_ID'])
+            if index is None:
+                rows.append(row)    # deleted since the scan - add it back
+            else:
+                changes[index] = row
+        added = data_hub.add_samples(rows) if rows else 0
+        updated = data_hub.update_samples(changes) if changes else 0
+        for path in batch['files']:
+            key = str(Path(path).resolve())
+            stamp = self._scanned.pop(key, None)
+            if stamp is not None:
+                self._stamps[key] = stamp
+            self.reread.discard(key)
+        self._save_state()
+        return added, updated
@@ -0,0 +1,299 @@
+"""
+Change Journal - append-only auto-save behind AutoSaveManager
+
+Recovery state is a snapshot (a binary project, features/project_format.py)
+plus a journal of the DataHub changes made since it, one JSON line per
+change:
+    {"seq": 12, "op": "add", "start": 40, "rows": [{...}, ...]}
+    {"seq": 13, "op": "set", "rows": [[7, {...}], ...]}      # whole rows
+    {"seq": 14, "op": "delete", "rows": [3, 9]}
+    {"seq": 15, "op": "clear"}
+    {"seq": 16, "op": "gap"}       # change too large to journal
+record() turns DataHub change events into entries (copying only the rows
+the event names), flush() appends them, and compact() writes a fresh
+snapshot and empties the journal once the journal grows past a fraction of
+the snapshot or after a gap. An auto-save therefore costs the size of the
+edits, and a full snapshot is written only now and then.
+
+Entries are numbered across sessions; the snapshot stores the number of
+the last change it contains, so recover() replays exactly the entries
+after it - a journal left over from before the snapshot is harmless.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from features.project_format import ProjectReader, hub_columns, write_project
+
+SNAPSHOT_NAME = "recovery.stproj"
+JOURNAL_NAME = "recovery.journal"
+# Compact when the journal is larger than this share of the snapshot ...
+COMPACT_RATIO = 0.5
+# ... but never for less than this many bytes of journal
+MIN_COMPACT_BYTES = 1 << 20
+# Changes touching more rows than this (one event, or all the entries
+# waiting for flush()) are left to the next snapshot
+MAX_ENTRY_ROWS = 5000
+
+
+def _json_default(value):
+    """numpy scalars and anything else json can't write."""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def _row(samples: Sequence, index: int) -> Optional[Dict[str, Any]]:
+    sample = samples[index] if 0 <= index < len(samples) else None
+    return None if sample is None else dict(sample)
+
+
+def _copied_rows(entry: Dict[str, Any]) -> int:
+    """Number of row copies an entry holds."""
+    return len(entry['rows']) if entry['op'] in ('add', 'set') else 0
+
+
+class ChangeJournal:
+    """Snapshot + write-ahead change journal in one directory."""
+
+    def __init__(self, directory, compact_ratio: float = COMPACT_RATIO,
+                 min_compact_bytes: int = MIN_COMPACT_BYTES,
+                 max_entry_rows: int = MAX_ENTRY_ROWS):
+        self.directory = Path(directory)
+        self.snapshot_path = self.directory / SNAPSHOT_NAME
+        self.journal_path = self.directory / JOURNAL_NAME
+        self.compact_ratio = compact_ratio
+        self.min_compact_bytes = min_compact_bytes
+        self.max_entry_rows = max_entry_rows
+        self._lock = threading.Lock()
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_rows = 0          # row copies held in _pending
+        self._snapshot_seq = None       # last change in this session's snapshot
+        self._snapshot_bytes = 0
+        self._journal_bytes = 0
+        self._gap_seq = None            # a change that was not journaled
+        self._paused = False
+        self._seq = self._last_seq_on_disk()
+
+    # ---------- files ----------
+
+    def exists(self) -> bool:
+        return self.snapshot_path.exists()
+
+    def mtime(self) -> float:
+        """Time of the last auto-save (snapshot or journal write)."""
+        return max(path.stat().st_mtime for path in (self.snapshot_path, self.journal_path)
+                   if path.exists())
+
+    def _read_journal(self) -> List[Dict[str, Any]]:
+        """Journal entries up to the first unreadable line (a torn last write)."""
+        entries = []
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    if not isinstance(entry, dict) or 'seq' not in entry:
+                        break
+                    entries.append(entry)
+        except OSError:
+            pass
+        return entries
+
+    def _last_seq_on_disk(self) -> int:
+        seq = 0
+        try:
+            seq = int(ProjectReader(self.snapshot_path).project.get('journal_seq', 0))
+        except (OSError, ValueError, TypeError, ImportError):
+            pass
+        for entry in self._read_journal():
+            seq = max(seq, entry['seq'])
+        return seq
+
+    def discard(self):
+        """Delete the snapshot and journal (the work was saved or declined)."""
+        with self._lock:
+            self._pending = []
+            self._pending_rows = 0
+            self._snapshot_seq = None
+            self._journal_bytes = 0
+        for path in (self.snapshot_path, self.journal_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    # ---------- recording ----------
+
+    def record(self, event: str, args: Sequence, samples: Sequence):
+        """Turn one DataHub change event into a pending journal entry."""
+        with self._lock:
+            if self._paused:
+                return
+            entry = self._entry(event, args, samples)
+            if entry is None:
+                return
+            rows = _copied_rows(entry)
+            if self._pending_rows + rows > self.max_entry_rows:
+                # Many small changes (a chunked import) add up to one large
+                # one: drop the copies and leave it all to the next snapshot
+                self._pending = []
+                self._pending_rows = 0
+                entry, rows = {'op': 'gap'}, 0
+            self._seq += 1
+            entry['seq'] = self._seq
+            if entry['op'] == 'gap':
+                self._gap_seq = self._seq
+            self._pending.append(entry)
+            self._pending_rows += rows
+
+    def _entry(self, event, args, samples) -> Optional[Dict[str, Any]]:
+        if event == 'samples_added':
+            start, count = args
+            if count > self.max_entry_rows:
+                return {'op': 'gap'}
+            return {'op': 'add', 'start': start,
+                    'rows': [_row(samples, i) for i in range(start, start + count)]}
+        if event in ('update', 'samples_updated'):
+            indices = [args[0]] if event == 'update' else list(args[0])
+            if len(indices) > self.max_entry_rows:
+                return {'op': 'gap'}
+            return {'op': 'set', 'rows': [[i, _row(samples, i)] for i in indices]}
+        if event == 'samples_deleted':
+            return {'op': 'delete', 'rows': list(args[1])}
+        if event == 'samples_cleared':
+            return {'op': 'clear'}
+        return None
+
+    def flush(self) -> int:
+        """Append pending entries to the journal; returns the bytes written."""
+        with self._lock:
+            if self._snapshot_seq is None:
+                return 0        # nothing to append to until the first snapshot
+            entries, self._pending = self._pending, []
+            self._pending_rows = 0
+        if not entries:
+            return 0
+        data = ''.join(json.dumps(entry, default=_json_default, separators=(',', ':')) + '\n'
+                       for entry in entries).encode('utf-8')
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_path, 'ab') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            print(f"⚠️ Could not write auto-save journal {self.journal_path}: {e}")
+            with self._lock:
+                self._gap_seq = entries[-1]['seq']
+            return 0
+        self._journal_bytes += len(data)
+        return len(data)
+
+    # ---------- snapshots ----------
+
+    def needs_compaction(self) -> bool:
+        with self._lock:
+            if self._snapshot_seq is None or self._gap_seq is not None:
+                return True
+            limit = max(self.min_compact_bytes, self.compact_ratio * self._snapshot_bytes)
+            return self._journal_bytes > limit
+
+    def capture(self, data_hub, state: Dict[str, Any]) -> Tuple:
+        """
+        Copy the DataHub's columns for compact(). Call it where DataHub
+        changes happen (the UI thread) so the copy matches the change count.
+        """
+        with self._lock:
+            count, columns = hub_columns(data_hub)
+            columns = {name: (values.copy(), present.copy())
+                       for name, (values, present) in columns.items()}
+            return self._seq, state, count, columns
+
+    def compact(self, snapshot: Tuple) -> int:
+        """Write a captured snapshot and start an empty journal; returns its size."""
+        seq, state, count, columns = snapshot
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.snapshot_path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            size = write_project(tmp, dict(state, journal_seq=seq), columns, count)
+            os.replace(tmp, self.snapshot_path)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        # Entries up to seq are in the snapshot; recovery skips any left on disk
+        with open(self.journal_path, 'wb'):
+            pass
+        with self._lock:
+            self._pending = [entry for entry in self._pending if entry['seq'] > seq]
+            self._pending_rows = sum(_copied_rows(entry) for entry in self._pending)
+            self._snapshot_seq = seq
+            self._snapshot_bytes = size
+            self._journal_bytes = 0
+            if self._gap_seq is not None and self._gap_seq <= seq:
+                self._gap_seq = None
+        return size
+
+    # ---------- recovery ----------
+
+    def recover(self, data_hub, restore: Callable[[Dict[str, Any], Tuple], Any]) -> int:
+        """
+        Load the snapshot with restore(state, (count, columns)) and replay
+        the journal on data_hub. Returns the number of changes replayed.
+        The next auto-save writes a fresh snapshot.
+        """
+        reader = ProjectReader(self.snapshot_path)
+        base = reader.project.get('journal_seq', 0)
+        with self._lock:
+            self._paused = True
+        applied = 0
+        try:
+            restore(reader.project, (reader.count, reader.columns()))
+            pending_sets: Dict[int, Dict[str, Any]] = {}
+            for entry in self._read_journal():
+                if entry['seq'] <= base:
+                    continue
+                op = entry.get('op')
+                if op != 'set' and pending_sets:
+                    self._replace_rows(data_hub, pending_sets)
+                    pending_sets = {}
+                if op == 'gap':
+                    break
+                if op == 'add':
+                    if entry['start'] != data_hub.row_count():
+                        print("⚠️ Auto-save journal does not match its snapshot - stopped replaying")
+                        break
+                    data_hub.add_samples([row or {} for row in entry['rows']])
+                elif op == 'set':
+                    for index, row in entry['rows']:
+                        if row is not None:
+                            pending_sets[index] = row
+                elif op == 'delete':
+                    data_hub.delete_rows(entry['rows'])
+                elif op == 'clear':
+                    data_hub.clear_all()
+                applied += 1
+            if pending_sets:
+                self._replace_rows(data_hub, pending_sets)
+        finally:
+            with self._lock:
+                self._paused = False
+                self._pending = []
+                self._pending_rows = 0
+                self._snapshot_seq = None
+                self._seq = max(self._seq, self._last_seq_on_disk())
+        return applied
+
+    @staticmethod
+    def _replace_rows(data_hub, rows: Dict[int, Dict[str, Any]]):
+        """Replace whole rows by position with one update_rows() call."""
+        samples = data_hub.get_all()
+        last = min(max(rows), len(samples) - 1)
+        if last < 0:
+            return
+        data_hub.update_rows([rows[i] if i in rows else samples[i] for i in range(last + 1)])
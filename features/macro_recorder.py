@@ -247,7 +247,7 @@ class MacroRecorder:
             search_text = self.app.center.search_var.get() if hasattr(self.app.center, 'search_var') else ''
             self.record_action('apply_filter', filter=filter_val, search=search_text)
 
-    def _record_import(self, path=None, silent=False):
+    def _record_import(self, path=None, silent=False, **kwargs):
         """Record file import"""
         if self.is_recording and path:
             self.record_action('import_file', filepath=str(path))
@@ -411,13 +411,13 @@ class MacroRecorder:
         if action_type == "import_file":
             filepath = params.get('filepath')
             if filepath and Path(filepath).exists():
-                self.app.left.import_csv(filepath, silent=True)
+                self.app.left.import_csv(filepath, silent=True, wait=True)
 
         elif action_type == "import_files":
             filepaths = params.get('filepaths', [])
             for filepath in filepaths:
                 if Path(filepath).exists():
-                    self.app.left.import_csv(filepath, silent=True)
+                    self.app.left.import_csv(filepath, silent=True, wait=True)
 
         elif action_type == "export_csv":
             filepath = params.get('filepath')
@@ -484,9 +484,7 @@ class MacroRecorder:
             column = params.get('column')
             reverse = params.get('reverse', False)
             if column and hasattr(self.app, 'center'):
-                self.app.center.sort_column = column
-                self.app.center.sort_reverse = reverse
-                self.app.center._refresh()
+                self.app.center._apply_sort([(column, reverse)])
 
         # ============ PAGINATION ============
         elif action_type == "prev_page":
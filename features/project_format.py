@@ -0,0 +1,280 @@
+"""
+Project Format - binary, column-wise .stproj container
+
+Layout (little-endian):
+    MAGIC (8 bytes) | format version (uint32) | header length (uint64)
+    header: UTF-8 JSON - row count, the project state (metadata, UI state,
+            settings, column order) and one entry per column
+    data blocks, each starting on a 64-byte boundary
+
+Every column is stored whole: a presence mask (bit-packed, zlib) and its
+values - float64 / int64 arrays as raw bytes, anything else (text, mixed
+cells) as a zlib-compressed JSON list of the present cells. Each block
+carries its CRC-32, so verify() costs one pass over the bytes instead of
+re-parsing the project.
+
+Raw numeric blocks are memory-mapped when read: ProjectReader reads only
+the header up front, and a numeric column's values are paged in from the
+file as they are used. The columnar DataHub backend keeps those maps
+(copy-on-write) as its column storage, so opening a project decodes just
+the presence masks and the text / integer columns; the dict backend still
+builds every row dict. Older JSON projects are still read and written by
+ProjectManager; is_binary_project() tells the two apart by the magic bytes.
+"""
+
+import json
+import os
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as _np
+    HAS_NUMPY = True
+except ImportError:
+    _np = None
+    HAS_NUMPY = False
+
+MAGIC = b'STPROJ\x00\x01'
+FORMAT_VERSION = 1
+ALIGN = 64
+_PREFIX = struct.Struct('<IQ')
+# CRC / verify reads at most this much at a time
+_CHUNK = 1 << 22
+
+
+class ProjectFormatError(ValueError):
+    """The file is not a readable binary project (or is damaged)."""
+
+
+def is_binary_project(path) -> bool:
+    """True when the file starts with the binary project magic."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _padding(position: int) -> int:
+    return -position % ALIGN
+
+
+def _cell_kind(values) -> str:
+    """'f8', 'i8' or 'json' for an object array of present cells."""
+    types = set(map(type, values.tolist()))
+    if types <= {float}:
+        return 'f8'
+    if types <= {int}:
+        try:
+            values.astype(_np.int64)
+        except OverflowError:
+            return 'json'
+        return 'i8'
+    return 'json'
+
+
+def _encode_column(values, present) -> Tuple[str, Any, Optional[bytes]]:
+    """(dtype, values payload, packed presence or None when every cell is present)."""
+    count = len(present)
+    mask = None if present.all() else zlib.compress(_np.packbits(present).tobytes(), 1)
+    if values.dtype == _np.float64:
+        return 'f8', _np.ascontiguousarray(values, dtype='<f8'), mask
+    cells = values[present]
+    kind = _cell_kind(cells)
+    if kind == 'json':
+        text = json.dumps(cells.tolist(), ensure_ascii=False, separators=(',', ':'))
+        return kind, zlib.compress(text.encode('utf-8'), 1), mask
+    full = _np.zeros(count, dtype='<' + kind)
+    full[present] = cells.astype(full.dtype)
+    return kind, full, mask
+
+
+def write_project(path, project: Dict[str, Any], columns: Dict[str, Tuple], count: int,
+                  compress_numbers: bool = False) -> int:
+    """
+    Write a binary project. project: the JSON-able project state (everything
+    but the samples); columns: name -> (values, present) arrays of length
+    count. compress_numbers zlib-compresses numeric blocks too (smaller file,
+    but those columns are then decoded on load instead of mapped).
+    Returns the file size.
+    """
+    blocks: List[Any] = []
+    entries = []
+    offset = 0
+
+    def add_block(payload, codec):
+        nonlocal offset
+        offset += _padding(offset)
+        if codec == 'zlib' and not isinstance(payload, bytes):
+            payload = zlib.compress(memoryview(payload).cast('B'), 1)
+        size = payload.nbytes if hasattr(payload, 'nbytes') else len(payload)
+        block = {'offset': offset, 'size': size, 'codec': codec,
+                 'crc': zlib.crc32(memoryview(payload).cast('B'))}
+        blocks.append((offset, payload))
+        offset += size
+        return block
+
+    for name, (values, present) in columns.items():
+        present = _np.asarray(present, dtype=bool)[:count]
+        kind, payload, mask = _encode_column(values[:count], present)
+        if kind == 'json':
+            codec = 'zlib'
+        else:
+            codec = 'zlib' if compress_numbers else 'raw'
+        entries.append({
+            'name': name,
+            'dtype': kind,
+            'values': add_block(payload, codec),
+            'present': None if mask is None else add_block(mask, 'zlib'),
+        })
+
+    header = json.dumps({'count': int(count), 'project': project, 'columns': entries},
+                        ensure_ascii=False).encode('utf-8')
+    start = len(MAGIC) + _PREFIX.size + len(header)
+    data_start = start + _padding(start)
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_PREFIX.pack(FORMAT_VERSION, len(header)))
+        f.write(header)
+        f.write(b'\0' * (data_start - start))
+        position = 0
+        for block_offset, payload in blocks:
+            f.write(b'\0' * (block_offset - position))
+            f.write(memoryview(payload).cast('B'))
+            position = block_offset + (payload.nbytes if hasattr(payload, 'nbytes') else len(payload))
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def hub_columns(data_hub) -> Tuple[int, Dict[str, Tuple]]:
+    """(row count, {column: (values, present)}) straight from a DataHub."""
+    return data_hub.row_count(), {name: data_hub.get_column(name)
+                                  for name in data_hub.get_column_names()}
+
+
+class ProjectReader:
+    """
+    Opens a binary project by its header. columns() / column(name) give
+    (values, present) arrays - raw numeric values are memory maps of the
+    file, read-only unless private - and to_json_dict() rebuilds the JSON
+    project layout.
+    """
+
+    def __init__(self, path):
+        if not HAS_NUMPY:
+            raise ImportError("Binary projects require numpy")
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ProjectFormatError("Not a binary project file")
+            prefix = f.read(_PREFIX.size)
+            if len(prefix) != _PREFIX.size:
+                raise ProjectFormatError("Truncated project header")
+            version, length = _PREFIX.unpack(prefix)
+            if version > FORMAT_VERSION:
+                raise ProjectFormatError(
+                    f"Project format {version} is newer than this version supports ({FORMAT_VERSION})")
+            raw = f.read(length)
+        if len(raw) != length:
+            raise ProjectFormatError("Truncated project header")
+        try:
+            header = json.loads(raw.decode('utf-8'))
+        except ValueError as e:
+            raise ProjectFormatError(f"Damaged project header: {e}")
+
+        start = len(MAGIC) + _PREFIX.size + length
+        self._data_start = start + _padding(start)
+        self.count: int = header['count']
+        self.project: Dict[str, Any] = header['project']
+        self._columns = {entry['name']: entry for entry in header['columns']}
+
+        end = max([block['offset'] + block['size']
+                   for entry in header['columns']
+                   for block in (entry['values'], entry['present']) if block] or [0])
+        if os.path.getsize(self.path) < self._data_start + end:
+            raise ProjectFormatError("Project file is truncated")
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self._columns)
+
+    def _read(self, block) -> bytes:
+        with open(self.path, 'rb') as f:
+            f.seek(self._data_start + block['offset'])
+            return f.read(block['size'])
+
+    def _array(self, block, dtype, private=False):
+        if self.count == 0:
+            return _np.zeros(0, dtype=dtype)
+        if block['codec'] == 'raw':
+            return _np.memmap(self.path, dtype=dtype, mode='c' if private else 'r',
+                              offset=self._data_start + block['offset'], shape=(self.count,))
+        values = _np.frombuffer(zlib.decompress(self._read(block)), dtype=dtype)
+        return values.copy() if private else values
+
+    def column(self, name: str, private: bool = False):
+        """
+        (values, present) for one column, decoded on demand. private: map
+        numeric values copy-on-write, so they can be written in memory (the
+        file is never changed) and kept as DataHub column storage.
+        """
+        entry = self._columns[name]
+        if entry['present'] is None:
+            present = _np.ones(self.count, dtype=bool)
+        else:
+            bits = _np.frombuffer(zlib.decompress(self._read(entry['present'])), dtype=_np.uint8)
+            present = _np.unpackbits(bits, count=self.count).astype(bool)
+
+        kind = entry['dtype']
+        if kind == 'f8':
+            return self._array(entry['values'], '<f8', private), present
+        values = _np.empty(self.count, dtype=object)
+        if kind == 'i8':
+            # Python ints, as they were in the samples
+            numbers = self._array(entry['values'], '<i8')
+            values[present] = numbers[present].tolist()
+        else:
+            cells = json.loads(zlib.decompress(self._read(entry['values'])).decode('utf-8'))
+            values[present] = cells
+        return values, present
+
+    def columns(self, private: bool = False) -> Dict[str, Tuple]:
+        """Every column, ready for DataHub.add_columns(columns, reader.count)."""
+        return {name: self.column(name, private) for name in self._columns}
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Samples as plain dicts (column by column, so cost follows the data)."""
+        rows: List[Dict[str, Any]] = [{} for _ in range(self.count)]
+        for name in self._columns:
+            values, present = self.column(name)
+            cells = values.tolist()
+            for i in _np.flatnonzero(present).tolist():
+                rows[i][name] = cells[i]
+        return rows
+
+    def to_json_dict(self) -> Dict[str, Any]:
+        """The project in the JSON layout (for export)."""
+        project = json.loads(json.dumps(self.project))
+        project.setdefault('data', {})['samples'] = self.records()
+        return project
+
+    def verify(self):
+        """Check every block against its CRC-32; raises ProjectFormatError."""
+        with open(self.path, 'rb') as f:
+            for entry in self._columns.values():
+                for block in (entry['values'], entry['present']):
+                    if block is None:
+                        continue
+                    f.seek(self._data_start + block['offset'])
+                    crc, left = 0, block['size']
+                    while left:
+                        chunk = f.read(min(left, _CHUNK))
+                        if not chunk:
+                            raise ProjectFormatError(f"Column {entry['name']!r} is truncated")
+                        crc = zlib.crc32(chunk, crc)
+                        left -= len(chunk)
+                    if crc != block['crc']:
+                        raise ProjectFormatError(f"Column {entry['name']!r} is damaged (checksum mismatch)")
@@ -4,6 +4,7 @@ Fully converted to ttkbootstrap with dark theme consistency
 FIXED: Added transactional saves with backup and recovery
 """
 
+import os
 import json
 import tkinter as tk
 from tkinter import messagebox, filedialog
@@ -15,6 +16,12 @@ from typing import Dict, Any
 import shutil
 import tempfile
 
+from features.project_format import (ProjectFormatError, ProjectReader, hub_columns,
+                                     is_binary_project, write_project)
+
+# JSON projects are parsed whole; binary ones are opened by their header
+JSON_SIZE_LIMIT = 100 * 1024 * 1024
+
 class ProjectManager:
     """
     Manages project save/load functionality
@@ -52,6 +59,8 @@ class ProjectManager:
         # 🔧 Transactional save with backup
         temp_file = None
         backup_file = None
+        # .json keeps the old text format; everything else is binary
+        as_json = str(filepath).lower().endswith('.json')
 
         try:
             # Create a temporary file in the same directory
@@ -65,15 +74,26 @@ class ProjectManager:
             ) as tf:
                 temp_file = Path(tf.name)
 
-                # Collect and write project data
-                project_data = self._collect_project_data()
-                json.dump(project_data, tf, indent=2)
-                tf.flush()
+                if as_json:
+                    # Collect and write project data
+                    project_data = self._collect_project_data()
+                    json.dump(project_data, tf, indent=2)
+                    tf.flush()
                 tf.close()
 
-            # Verify the temporary file is valid
-            with open(temp_file, 'r', encoding='utf-8') as f:
-                test_data = json.load(f)
+            if as_json:
+                # Verify the temporary file is valid
+                with open(temp_file, 'r', encoding='utf-8') as f:
+                    test_data = json.load(f)
+            else:
+                count, columns = hub_columns(self.app.data_hub)
+                write_project(temp_file, self._collect_project_state(), columns, count)
+                # Verify the temporary file: header and block checksums
+                ProjectReader(temp_file).verify()
+
+            # Windows cannot replace a file that is still mapped as column storage
+            if os.name == 'nt':
+                self.app.data_hub.detach_mapped_columns()
 
             # Create backup of existing file if it exists
             existing = Path(filepath)
@@ -133,10 +153,18 @@ class ProjectManager:
 
         # 🔧 Validate file before loading
         try:
+            if is_binary_project(filepath):
+                reader = ProjectReader(filepath)
+                self._restore_project_data(reader.project,
+                                           columns=(reader.count, reader.columns(private=True)))
+                self.current_project_file = filepath
+                messagebox.showinfo("✅ Success", f"Project loaded from:\n{filepath}")
+                return True
+
             # Check file size (prevent loading huge corrupted files)
             file_size = Path(filepath).stat().st_size
-            if file_size > 100 * 1024 * 1024:  # 100MB limit
-                messagebox.showerror("❌ Error", "File too large (max 100MB)")
+            if file_size > JSON_SIZE_LIMIT:
+                messagebox.showerror("❌ Error", "JSON project too large (max 100MB) - save it as .stproj")
                 return False
 
             # Validate JSON structure
@@ -163,6 +191,9 @@ class ProjectManager:
         except json.JSONDecodeError as e:
             messagebox.showerror("❌ Load Error", f"Invalid JSON in project file:\n{e}")
             return False
+        except ProjectFormatError as e:
+            messagebox.showerror("❌ Load Error", f"Invalid project file:\n{e}")
+            return False
         except Exception as e:
             messagebox.showerror("❌ Load Error", f"Failed to load project:\n{e}")
             return False
@@ -178,6 +209,12 @@ class ProjectManager:
 
     def _collect_project_data(self) -> Dict[str, Any]:
         """Collect all project data"""
+        data = self._collect_project_state()
+        data['data']['samples'] = self.app.data_hub.to_records()
+        return data
+
+    def _collect_project_state(self) -> Dict[str, Any]:
+        """Collect everything but the samples"""
         data = {
             'metadata': {
                 'version': '2.0',
@@ -185,7 +222,6 @@ class ProjectManager:
                 'app_version': '2.0'
             },
             'data': {
-                'samples': self.app.data_hub.get_all(),
                 'column_order': self.app.data_hub.column_order.copy()
             },
             'ui_state': {},
@@ -218,17 +254,22 @@ class ProjectManager:
 
         return data
 
-    def _restore_project_data(self, project_data: Dict[str, Any]):
-        """Restore project data"""
+    def _restore_project_data(self, project_data: Dict[str, Any], columns=None):
+        """Restore project data (columns: (count, {name: (values, present)}) of a binary project)"""
 
         # Clear existing data
         self.app.data_hub.clear_all()
 
         # Restore samples
         data = project_data.get('data', {})
-        samples = data.get('samples', [])
-        if samples:
-            self.app.data_hub.add_samples(samples)
+        if columns is not None:
+            count, arrays = columns
+            if count:
+                self.app.data_hub.add_columns(arrays, count)
+        else:
+            samples = data.get('samples', [])
+            if samples:
+                self.app.data_hub.add_samples(samples)
 
         # Restore column order
         if 'column_order' in data:
@@ -70,6 +70,14 @@ class SettingsManager:
                 "auto_size_columns": True,
                 "confirm_deletes": True
             },
+            # Data storage settings ('dict' or 'columnar' — see data_hub.py)
+            "data": {
+                "storage_backend": "dict"
+            },
+            # Classification settings (max_workers 0 = one per CPU core)
+            "classification": {
+                "max_workers": 0
+            },
             # Last session
             "last_session": {
                 "last_project": None,
@@ -0,0 +1,158 @@
+"""
+Sheet Import - Excel / ODS workbooks converted column by column
+
+Every sheet of a workbook is read into a DataFrame (the sheets of a large
+workbook in parallel worker processes) and turned into typed columns without walking
+rows: headers are mapped once with the same ColumnPlan as the CSV import,
+numeric columns are taken as float64 arrays, text columns are stripped
+and coerced to numbers with pandas string methods, and missing Sample_IDs
+are filled with IMP_#### ids in one go. The columns go to
+DataHub.add_columns() as they are.
+
+Values come out as LeftPanel._normalize_row() made them from the old
+row-by-row path: empty cells dropped, numbers (thousands separators
+removed) as float, Sample_ID as text.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as _np
+    import pandas as _pd
+    HAS_PANDAS = True
+except ImportError:
+    _np = None
+    _pd = None
+    HAS_PANDAS = False
+
+from features.csv_import import ColumnPlan
+
+# Smaller workbooks are parsed in this process - starting workers costs more
+PARALLEL_MIN_BYTES = 4 << 20
+
+
+def excel_engine(path) -> Optional[str]:
+    """pandas reader engine for a workbook path (None = pandas' choice)."""
+    return 'odf' if str(path).lower().endswith('.ods') else None
+
+
+def _read_sheet(path: str, engine: Optional[str], sheet: str):
+    """Pool task: one sheet as a DataFrame."""
+    return _pd.read_excel(path, sheet_name=sheet, engine=engine)
+
+
+def sheet_workers(path, sheets: int, max_workers: int = 0,
+                  min_bytes: int = PARALLEL_MIN_BYTES) -> int:
+    """Processes to parse a workbook with: 1 unless it is large and has several sheets."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+    if size < min_bytes:
+        return 1
+    return max(1, min(max_workers or os.cpu_count() or 1, sheets))
+
+
+def read_sheets(path, max_workers: int = 0) -> List[Tuple[str, Any]]:
+    """
+    (sheet name, DataFrame) for every sheet, in workbook order. Workbooks
+    of PARALLEL_MIN_BYTES or more with several sheets are parsed in
+    separate processes, one sheet each.
+    """
+    engine = excel_engine(path)
+    with _pd.ExcelFile(path, engine=engine) as workbook:
+        names = list(workbook.sheet_names)
+        workers = sheet_workers(path, len(names), max_workers)
+        if workers <= 1:
+            return [(name, workbook.parse(name)) for name in names]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            frames = pool.map(_read_sheet, [str(path)] * len(names), [engine] * len(names), names)
+            return list(zip(names, frames))
+    except (OSError, ImportError, BrokenProcessPool) as e:
+        print(f"⚠️ Process pool unavailable ({e}) - reading sheets one by one")
+        return list(_pd.read_excel(path, sheet_name=None, engine=engine).items())
+
+
+def _as_text(series):
+    """Stripped str() of every non-null cell, '' for nulls (object array)."""
+    present = series.notna().to_numpy()
+    cells = series.to_numpy(dtype=object)
+    text = _np.full(len(series), '', dtype=object)
+    if present.any():
+        text[present] = _pd.Series(cells[present]).map(str).str.strip().to_numpy(dtype=object)
+    return text
+
+
+def _to_number(text: str):
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def convert_column(series, as_text: bool = False):
+    """
+    One DataFrame column -> (values, present). values is float64 when every
+    present cell is a number, otherwise an object array of floats and text.
+    as_text keeps the stripped strings (Sample_ID).
+    """
+    kind = series.dtype.kind
+    if kind in 'iuf' and not as_text:
+        values = series.to_numpy(dtype=_np.float64)
+        return values, ~_np.isnan(values)
+
+    text = _as_text(series)
+    present = text != ''
+    if as_text:
+        return text, present
+
+    cleaned = _pd.Series(text).str.replace(',', '', regex=False)
+    numbers = _pd.to_numeric(cleaned, errors='coerce').to_numpy(dtype=_np.float64)
+    numeric = present & ~_np.isnan(numbers)
+    if numeric.sum() == present.sum():
+        return numbers, present
+
+    # Mixed column: text cells keep their (comma-less) text unless float()
+    # reads them after all ('nan', 'Infinity', ...)
+    values = cleaned.to_numpy(dtype=object)
+    values[numeric] = numbers[numeric].tolist()
+    rest = _np.flatnonzero(present & ~numeric)
+    lookup = {value: _to_number(value) for value in set(values[rest].tolist())}
+    values[rest] = [lookup[value] for value in values[rest].tolist()]
+    return values, present
+
+
+def frame_columns(frame, mappings: Optional[Dict[str, str]] = None,
+                  first_serial: int = 1) -> Tuple[int, Dict[str, Tuple]]:
+    """
+    DataFrame -> (row count, {column: (values, present)}) ready for
+    DataHub.add_columns(). Rows without a Sample_ID get IMP_#### ids
+    numbered from first_serial.
+    """
+    count = len(frame)
+    plan = ColumnPlan([str(name) for name in frame.columns], mappings or {})
+    columns: Dict[str, Tuple] = {}
+    for position, key, is_id in plan.columns:
+        values, present = convert_column(frame.iloc[:, position], as_text=is_id)
+        if key in columns:
+            # Several headers map to one column: the first filled cell wins
+            first, taken = columns[key]
+            if first.dtype != values.dtype:
+                first, values = first.astype(object), values.astype(object)
+            fill = present & ~taken
+            first = first.copy()
+            first[fill] = values[fill]
+            values, present = first, taken | present
+        columns[key] = (values, present)
+
+    ids, present = columns.get('Sample_ID', (None, _np.zeros(count, dtype=bool)))
+    if not present.all():
+        missing = _np.flatnonzero(~present)
+        filled = _np.full(count, '', dtype=object) if ids is None else ids.copy()
+        filled[missing] = [f"IMP_{first_serial + i:04d}" for i in missing.tolist()]
+        columns['Sample_ID'] = (filled, _np.ones(count, dtype=bool))
+    return count, columns
@@ -2,25 +2,36 @@
 Batch Processor - UI Add-on
 Process multiple CSV files in a directory
 
+Files are parsed in parallel with the same column normalization as
+Import Data, de-duplicated on Sample_ID and added to the DataHub in one
+go (features/batch_import.py). Files already imported and unchanged since are
+skipped on the next run; rows of changed files update the rows they
+were imported as.
+
 Author: Sefy Levy
 Category: UI Add-on
 """
 
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import csv
-from pathlib import Path
+
+from features.batch_import import BatchImporter
 
 PLUGIN_INFO = {
     'id': 'batch_processor',
     'name': 'Batch Processor',
     'category': 'add-ons',
     'icon': '📁',
-    'version': '2.0',
+    'version': '2.1',
     'requires': [],
     'description': 'Process multiple CSV files in a directory at once'
 }
 
+# How often the main thread checks for the parsed batch
+POLL_MS = 50
+
 
 class BatchProcessorPlugin:
     """Batch processor add-on"""
@@ -63,10 +74,15 @@ class BatchProcessorPlugin:
         self.recursive_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(options_frame, text="Include subdirectories",
                        variable=self.recursive_var).pack(anchor="w")
-        
+
+        self.rescan_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Re-read files imported before",
+                       variable=self.rescan_var).pack(anchor="w")
+
         # Process button
-        ttk.Button(window, text="Process Files", 
-                  command=lambda: self.process_batch(window)).pack(pady=20)
+        self.process_btn = ttk.Button(window, text="Process Files",
+                                      command=lambda: self.process_batch(window))
+        self.process_btn.pack(pady=20)
     
     def select_directory(self, window):
         """Select directory to process"""
@@ -75,50 +91,93 @@ class BatchProcessorPlugin:
             self.selected_dir = directory
             self.dir_label.config(text=directory, foreground="black")
     
+    def _importer(self):
+        """Batch importer using the Import Data column mappings."""
+        left = getattr(self.app, 'left', None)
+        mappings = getattr(left, 'column_mappings', None)
+        if mappings is None and left is not None and hasattr(left, '_load_column_mappings'):
+            mappings = left._load_column_mappings()
+        return BatchImporter(mappings or {})
+
     def process_batch(self, window):
-        """Process all CSV files in directory"""
+        """Process all new or changed CSV files in the directory"""
         if not hasattr(self, 'selected_dir'):
             messagebox.showwarning("No Directory", "Please select a directory first!")
             return
-        
+
         try:
-            path = Path(self.selected_dir)
-            pattern = "**/*.csv" if self.recursive_var.get() else "*.csv"
-            csv_files = list(path.glob(pattern))
-            
-            if not csv_files:
+            importer = self._importer()
+            csv_files, unchanged = importer.scan(self.selected_dir, self.recursive_var.get(),
+                                                 force=self.rescan_var.get())
+        except Exception as e:
+            messagebox.showerror("Error", f"Batch processing failed:\n{str(e)}")
+            return
+
+        if not csv_files:
+            if unchanged:
+                messagebox.showinfo("No New Files",
+                    f"All {unchanged} CSV file(s) were imported before and have not changed.")
+            else:
                 messagebox.showinfo("No Files", "No CSV files found in directory!")
+            return
+
+        self.process_btn.config(state="disabled", text=f"Reading {len(csv_files)} file(s)...")
+        existing_ids = set(self.app.data_hub.id_to_index)
+
+        classify = self.classify_var.get()
+        results = queue.Queue(maxsize=1)
+
+        # Parse off the UI thread; the main window polls for the result and
+        # commits it, so closing this dialog does not lose the batch
+        def worker():
+            try:
+                results.put(importer.collect(importer.read(csv_files), existing_ids))
+            except Exception as e:
+                results.put(e)
+
+        def poll():
+            try:
+                batch = results.get_nowait()
+            except queue.Empty:
+                self.app.root.after(POLL_MS, poll)
                 return
-            
-            # Process files
-            total_samples = 0
-            for csv_file in csv_files:
-                try:
-                    with open(csv_file, 'r', encoding='utf-8') as f:
-                        reader = csv.DictReader(f)
-                        for row in reader:
-                            if row.get('Sample_ID'):
-                                self.app.samples.append(row)
-                                total_samples += 1
-                except Exception as e:
-                    print(f"Error processing {csv_file}: {e}")
-            
-            # Classify if requested
-            if self.classify_var.get() and total_samples > 0:
-                self.app.classify_all()
-            
-            # Refresh
-            self.app.refresh_tree()
-            self.app._mark_unsaved_changes()
-            
-            messagebox.showinfo("Batch Processing Complete",
-                f"✅ Processed {len(csv_files)} file(s)\n"
-                f"Imported {total_samples} sample(s)")
-            
+            self._finish_batch(window, importer, batch, unchanged, classify)
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.app.root.after(POLL_MS, poll)
+
+    def _finish_batch(self, window, importer, batch, unchanged, classify):
+        """Add the parsed batch to the DataHub (one notification) and report."""
+        dialog_open = bool(window.winfo_exists())
+        parent = window if dialog_open else self.app.root
+        if isinstance(batch, Exception):
+            if dialog_open:
+                self.process_btn.config(state="normal", text="Process Files")
+            messagebox.showerror("Error", f"Batch processing failed:\n{str(batch)}", parent=parent)
+            return
+
+        total_samples, updated = importer.commit(self.app.data_hub, batch)
+        for path, error in batch['errors'].items():
+            print(f"Error processing {path}: {error}")
+
+        # Classify if requested
+        if classify and total_samples + updated > 0 and hasattr(self.app, 'right'):
+            self.app.right._run_classification()
+
+        summary = (f"✅ Processed {len(batch['files'])} file(s)\n"
+                   f"Imported {total_samples} sample(s)")
+        if updated:
+            summary += f"\nUpdated {updated} sample(s) from changed files"
+        if batch['duplicates']:
+            summary += f"\nSkipped {batch['duplicates']} duplicate Sample_ID(s)"
+        if unchanged:
+            summary += f"\nSkipped {unchanged} unchanged file(s)"
+        if batch['errors']:
+            summary += f"\n⚠️ {len(batch['errors'])} file(s) failed (see console)"
+        messagebox.showinfo("Batch Processing Complete", summary, parent=parent)
+
+        if dialog_open:
             window.destroy()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Batch processing failed:\n{str(e)}")
 
 
 def register_plugin(parent_app):
@@ -104,6 +104,31 @@ try:
 except ImportError:
     HAS_MPL = False
 
+# Shared on-disk index of diagram/scheme definitions (engines/scheme_cache.py)
+try:
+    from engines.scheme_cache import get_scheme_cache
+    HAS_SCHEME_CACHE = True
+except ImportError:
+    HAS_SCHEME_CACHE = False
+
+def _diagram_summary(data):
+    """Index entry for a diagram file: the name shown in the plot list."""
+    if not isinstance(data, dict):
+        raise ValueError("diagram definition must be a JSON object")
+    return {
+        'display': data.get('diagram_name') or data.get('scheme_name') or data.get('name'),
+        'requires_fields': data.get('requires_fields', []),
+    }
+
+
+def _load_diagram(diagram_path):
+    """Parsed diagram JSON, through the shared definition cache when available."""
+    if HAS_SCHEME_CACHE:
+        return get_scheme_cache().load(Path(diagram_path))
+    with open(diagram_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
 # ============================================================================
 # CONSTANTS (PRESERVED + NEW)
 # ============================================================================
@@ -3777,7 +3802,21 @@ class UltimatePlotter:
         """Load list of available tectonic diagrams from JSON files"""
         diagrams = []
         try:
-            if hasattr(self, 'diagrams_dir') and self.diagrams_dir.exists():
+            if hasattr(self, 'diagrams_dir') and self.diagrams_dir.exists() and HAS_SCHEME_CACHE:
+                # Names come from the cached index - only changed files are parsed
+                entries = get_scheme_cache().scan(self.diagrams_dir, 'diagram', _diagram_summary,
+                                                 skip_private=False)
+                for stem, entry in entries.items():
+                    if 'error' in entry:
+                        print(f"⚠️ Skipping invalid JSON file: {stem}.json - {entry['error']}")
+                        continue
+                    diagrams.append({
+                        'file': stem,
+                        'display': entry['summary']['display'] or stem
+                    })
+
+                print(f"✅ Found {len(diagrams)} valid diagrams")
+            elif hasattr(self, 'diagrams_dir') and self.diagrams_dir.exists():
                 for json_file in self.diagrams_dir.glob("*.json"):
                     try:
                         # Try to parse the JSON to get the diagram name
@@ -3836,8 +3875,7 @@ class UltimatePlotter:
     def render_tectonic_diagram(self, ax, diagram_path, diagram_name):
         """Render a tectonic diagram from JSON definition"""
         try:
-            with open(diagram_path, 'r', encoding='utf-8') as f:
-                diagram = json.load(f)
+            diagram = _load_diagram(diagram_path)
 
             # Set title
             ax.set_title(diagram.get('diagram_name', diagram_name),
@@ -4058,8 +4096,7 @@ class UltimatePlotter:
                 diagram_path = self.diagrams_dir / f"{diagram_file}.json"
                 if diagram_path.exists():
                     try:
-                        with open(diagram_path, 'r') as f:
-                            diagram = json.load(f)
+                        diagram = _load_diagram(diagram_path)
                         fields = diagram.get('requires_fields', [])
                         if fields:
                             self.diagram_info.config(text=f"Requires: {', '.join(fields)}")
@@ -0,0 +1,34 @@
+"""
+Plugin Workers - shared plumbing for plugins that hand work to processes
+
+Plugins are executed from file (spec_from_file_location) rather than
+imported, so pickle cannot find their functions by module name and a
+spawned worker could not re-import them. Plugins that use a process pool
+therefore fork: the workers inherit the plugin, its data and the module
+entry published here.
+"""
+
+import sys
+import types
+
+
+def fork_available() -> bool:
+    """
+    Whether worker processes can be forked. macOS lists the fork start
+    method but its system libraries are not fork-safe (Python defaults to
+    spawn there), so only Linux forks.
+    """
+    return sys.platform.startswith('linux')
+
+
+def publish_module(namespace: dict):
+    """
+    Register a plugin's namespace (its globals()) in sys.modules under the
+    plugin's module name, so pickle can find its functions by name; forked
+    workers inherit the entry.
+    """
+    name = namespace['__name__']
+    if sys.modules.get(name) is None:
+        module = types.ModuleType(name)
+        module.__dict__.update(namespace)
+        sys.modules[name] = module
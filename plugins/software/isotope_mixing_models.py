@@ -1,5 +1,5 @@
 """
-Isotope Mixing Models Plugin v3.0 - Integrated with Scientific Toolkit
+Isotope Mixing Models Plugin v3.1 - Integrated with Scientific Toolkit
 BINARY & TERNARY MIXING - END-MEMBER ESTIMATION - MONTE CARLO SIMULATIONS
 ADVANCED INVERSION: Least-squares, Bayesian MCMC, REE pattern inversion
 
@@ -10,11 +10,12 @@ NOW WITH:
 ✓ Auto-detection of isotope columns (Sr, Nd, Pb, Hf, O)
 ✓ Industry-standard mixing algorithms (after Faure, Albarede, Vollmer)
 ✓ FULLY FUNCTIONAL TERNARY MIXING for Pb isotopes and Sr-Nd-Pb systems
-✓ Uncertainty propagation with Monte Carlo
+✓ Uncertainty propagation with Monte Carlo (vectorized, per-sample distributions)
 ✓ Mahalanobis distance for provenance
 ✓ Publication-ready figures
 ✓ **LEAST-SQUARES INVERSION** for source composition estimation
-✓ **BAYESIAN MCMC INVERSION** with emcee (full posterior distributions)
+✓ **BAYESIAN MCMC INVERSION** with emcee (full posterior distributions,
+  vectorized likelihood, optional walker processes, resumable chains)
 ✓ **REE PATTERN INVERSION** with partition coefficients from magma_modeling.py
 """
 
@@ -24,7 +25,7 @@ PLUGIN_INFO = {
     "name": "Isotope Mixing Models",
     "icon": "🧪",
     "description": "Binary/ternary mixing, end-member estimation, Monte Carlo, Bayesian inversion, REE inversion",
-    "version": "3.0.0",
+    "version": "3.1.0",
     "requires": ["numpy", "scipy", "matplotlib", "pandas", "emcee"],
     "author": "Sefy Levy"
 }
@@ -35,7 +36,14 @@ import numpy as np
 from datetime import datetime
 from pathlib import Path
 import json
+import os
+import hashlib
+import multiprocessing
+import pickle
 import traceback
+import warnings
+
+from plugins.plugin_workers import fork_available, publish_module
 
 # ============ SCIENTIFIC IMPORTS ============
 try:
@@ -70,6 +78,361 @@ except ImportError:
     HAS_PANDAS = False
 
 
+# ============ VECTORIZED MIXING ENGINE ============
+# Monte Carlo works on blocks of samples x all iterations; this caps the
+# memory one block may use (draws, proportions and temporaries)
+MC_CHUNK_BYTES = 64 * 1024 * 1024
+_MC_BYTES_PER_DRAW = 48
+# Per-sample proportion draws are kept (float32) up to this size
+MC_KEEP_BYTES = 256 * 1024 * 1024
+# Pooled histogram resolution on [0, 1] (pooled percentiles are read from it)
+MC_POOLED_BINS = 2000
+# Pooled values kept for the Q-Q plot
+MC_QQ_POINTS = 20000
+# Ternary proportions are split across workers from this many samples
+PARALLEL_MIN_SAMPLES = 50000
+
+
+def binary_projection(x, y, em1_x, em1_y, em2_x, em2_y):
+    """
+    Proportion of EM2 for arrays of points: projection onto the EM1-EM2
+    line, clipped to [0, 1]. NaN where the two end-members coincide.
+    Arguments broadcast against each other.
+    """
+    vec_x = np.asarray(em2_x, dtype=float) - em1_x
+    vec_y = np.asarray(em2_y, dtype=float) - em1_y
+    norm_sq = vec_x * vec_x + vec_y * vec_y
+    dot_product = (x - em1_x) * vec_x + (y - em1_y) * vec_y
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f = np.where(norm_sq > 0, dot_product / norm_sq, np.nan)
+    return np.clip(f, 0, 1)
+
+
+def _hist_percentile(hist, edges, q):
+    """Percentile q (0-100) of the values counted in a histogram."""
+    cumulative = np.cumsum(hist)
+    target = q / 100 * cumulative[-1]
+    i = min(int(np.searchsorted(cumulative, target)), len(hist) - 1)
+    below = cumulative[i] - hist[i]
+    fraction = (target - below) / hist[i] if hist[i] else 0.0
+    return edges[i] + fraction * (edges[i + 1] - edges[i])
+
+
+class MixingMonteCarlo:
+    """
+    Batched Monte Carlo for binary mixing.
+
+    End-member perturbations are drawn once per iteration (shared by every
+    sample, as in a single realisation of the mixing line); samples are
+    then perturbed and projected onto the perturbed line for all iterations
+    at once, a block of samples at a time. A seed reproduces a run.
+    """
+
+    def __init__(self, n_iter=10000, seed=None, chunk_bytes=MC_CHUNK_BYTES,
+                 keep_bytes=MC_KEEP_BYTES):
+        self.n_iter = int(n_iter)
+        self.rng = np.random.default_rng(seed)
+        self.chunk_bytes = chunk_bytes
+        self.keep_bytes = keep_bytes
+
+    def block_size(self, n_samples):
+        return max(1, min(n_samples, self.chunk_bytes // (self.n_iter * _MC_BYTES_PER_DRAW)))
+
+    def binary(self, x, y, em1, em2, x_unc, y_unc, progress=None, cancelled=None):
+        """
+        x, y: sample arrays; em1, em2: (x, y) end-members; x_unc, y_unc: 1σ.
+        progress(done, n) is called after each block; cancelled() returning
+        True stops the run (returns None).
+
+        Returns per-sample statistics ('samples': mean/std/ci_lower/median/
+        ci_upper arrays), the per-sample distributions as an (n_iter, n)
+        float32 array when they fit in keep_bytes (else None), and pooled
+        statistics over every sample and iteration: histogram, mean, std,
+        95% CI and a thinned set of values for plotting.
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        n = len(x)
+
+        em = np.array([em1[0], em1[1], em2[0], em2[1]], dtype=float)
+        em_draws = em + self.rng.standard_normal((self.n_iter, 4)) * [x_unc, y_unc, x_unc, y_unc]
+        em1_x, em1_y, em2_x, em2_y = (em_draws[:, [i]] for i in range(4))
+
+        keep = self.n_iter * n * 4 <= self.keep_bytes
+        distributions = np.empty((self.n_iter, n), dtype=np.float32) if keep else None
+        samples = {key: np.full(n, np.nan) for key in ('mean', 'std', 'ci_lower', 'median', 'ci_upper')}
+        edges = np.linspace(0, 1, MC_POOLED_BINS + 1)
+        hist = np.zeros(MC_POOLED_BINS, dtype=np.int64)
+        total = total_sq = 0.0
+        qq_values = []
+        qq_stride = max(1, self.n_iter * n // MC_QQ_POINTS)
+
+        step = self.block_size(n)
+        for start in range(0, n, step):
+            if cancelled is not None and cancelled():
+                return None
+            block = slice(start, min(start + step, n))
+            width = block.stop - start
+            x_pert = x[block] + self.rng.normal(0, x_unc, (self.n_iter, width))
+            y_pert = y[block] + self.rng.normal(0, y_unc, (self.n_iter, width))
+            f = binary_projection(x_pert, y_pert, em1_x, em1_y, em2_x, em2_y)
+            if keep:
+                distributions[:, block] = f
+
+            valid = ~np.isnan(f)
+            if valid.all():
+                samples['mean'][block] = f.mean(axis=0)
+                samples['std'][block] = f.std(axis=0)
+                bounds = np.percentile(f, [2.5, 50, 97.5], axis=0)
+            else:
+                with np.errstate(invalid='ignore'), warnings.catch_warnings():
+                    warnings.simplefilter('ignore', RuntimeWarning)
+                    samples['mean'][block] = np.nanmean(f, axis=0)
+                    samples['std'][block] = np.nanstd(f, axis=0)
+                    bounds = np.nanpercentile(f, [2.5, 50, 97.5], axis=0)
+            samples['ci_lower'][block], samples['median'][block], samples['ci_upper'][block] = bounds
+
+            values = f[valid]
+            hist += np.histogram(values, bins=edges)[0]
+            total += values.sum()
+            total_sq += np.square(values).sum()
+            qq_values.append(values[::qq_stride])
+
+            if progress is not None:
+                progress(block.stop, n)
+
+        count = int(hist.sum())
+        mean = total / count if count else np.nan
+        return {
+            'n_iter': self.n_iter,
+            'samples': samples,
+            'distributions': distributions,
+            'histogram': hist,
+            'bin_edges': edges,
+            'count': count,
+            'mean': mean,
+            'std': np.sqrt(max(total_sq / count - mean * mean, 0.0)) if count else np.nan,
+            'ci': (_hist_percentile(hist, edges, 2.5), _hist_percentile(hist, edges, 97.5))
+                  if count else (np.nan, np.nan),
+            'qq_values': np.concatenate(qq_values) if qq_values else np.empty(0),
+        }
+
+
+def ternary_weights(points, em_values):
+    """
+    Barycentric proportions (n, 3) of three end-members for (n, 2) points
+    (solved with the sum-to-one row) or (n, 3) points; clipped to [0, 1]
+    and renormalized. A singular end-member matrix gives 1/3 each.
+    """
+    points = np.asarray(points, dtype=float)
+    em = np.asarray(em_values, dtype=float)
+    if points.shape[1] == 2:
+        A = np.vstack([em.T, np.ones(3)])
+        b = np.column_stack([points, np.ones(len(points))])
+    else:
+        A = em.T
+        b = points
+    try:
+        inverse = np.linalg.inv(A)
+    except np.linalg.LinAlgError:
+        return np.full((len(points), 3), 1 / 3)
+    w = np.clip(b @ inverse.T, 0, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return w / w.sum(axis=1, keepdims=True)
+
+
+_TERNARY_JOB = None
+
+
+def _init_ternary_worker(job):
+    global _TERNARY_JOB
+    _TERNARY_JOB = job
+
+
+def _ternary_block(bounds):
+    points, em_values = _TERNARY_JOB
+    start, stop = bounds
+    return ternary_weights(points[start:stop], em_values)
+
+
+def ternary_weights_parallel(points, em_values, workers=0, min_samples=PARALLEL_MIN_SAMPLES):
+    """
+    ternary_weights() split across forked worker processes for large
+    datasets (workers=0: one per CPU); the workers inherit the points.
+    Smaller inputs, and platforms that cannot fork, are solved in one call.
+    """
+    points = np.asarray(points, dtype=float)
+    workers = min(workers or os.cpu_count() or 1, max(1, len(points) // 1000))
+    if workers > 1 and len(points) >= min_samples and fork_available():
+        try:
+            publish_module(globals())
+            edges = np.linspace(0, len(points), workers + 1).astype(int)
+            blocks = list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+            with multiprocessing.get_context('fork').Pool(
+                    workers, initializer=_init_ternary_worker, initargs=((points, em_values),)) as pool:
+                return np.vstack(pool.map(_ternary_block, blocks))
+        except (OSError, pickle.PicklingError) as e:
+            print(f"⚠️ Process pool unavailable ({e}) - solving proportions in this process")
+    return ternary_weights(points, em_values)
+
+
+# ============ BAYESIAN INVERSION ENGINE ============
+# Production chains are checkpointed under the app's config folder
+MCMC_CHECKPOINT_DIR = Path(__file__).parent.parent.parent / "config" / "mcmc_checkpoints"
+MCMC_CHECKPOINT_EVERY = 100
+# Walkers are split across processes only above this much work per step
+# (walkers x samples x isotopes); below it one vectorized call is faster
+WALKER_POOL_MIN_WORK = 2_000_000
+
+
+class MCMCCancelled(Exception):
+    """The user pressed Cancel during an MCMC run."""
+
+
+class MixingPosterior:
+    """
+    Log-posterior of the binary mixing inversion, evaluated for a whole
+    batch of walkers at once (emcee's vectorize=True).
+
+    Parameters per walker: [em1 (m), em2 (m), proportions (n)]. Priors are
+    uniform - end-members within [lower, upper] per isotope, proportions in
+    [0, 1] - and the likelihood is Gaussian with one sigma per isotope.
+    With fixed_props the parameters are the end-members only. Bounds are
+    set once here instead of on every call.
+    """
+
+    def __init__(self, data_matrix, uncertainties, lower, upper, fixed_props=None):
+        self.data = np.asarray(data_matrix, dtype=float)
+        self.sigma = np.asarray(uncertainties, dtype=float)
+        self.lower = np.asarray(lower, dtype=float)
+        self.upper = np.asarray(upper, dtype=float)
+        self.fixed_props = None if fixed_props is None else np.asarray(fixed_props, dtype=float)
+        self.n_samples, self.n_isotopes = self.data.shape
+
+    def __call__(self, params):
+        params = np.asarray(params, dtype=float)
+        coords = np.atleast_2d(params)
+        m = self.n_isotopes
+        em1 = coords[:, :m]
+        em2 = coords[:, m:2*m]
+
+        ok = ((em1 >= self.lower) & (em1 <= self.upper) &
+              (em2 >= self.lower) & (em2 <= self.upper)).all(axis=1)
+        if self.fixed_props is None:
+            props = coords[:, 2*m:]
+            ok &= ((props >= 0) & (props <= 1)).all(axis=1)
+        else:
+            props = np.broadcast_to(self.fixed_props, (len(coords), self.n_samples))
+
+        log_prob = np.full(len(coords), -np.inf)
+        if ok.any():
+            start = em1[ok]
+            step = em2[ok] - start
+            # pred = (1-f)*em1 + f*em2 for every walker, sample and isotope
+            resid = (self.data - start[:, None, :] - props[ok][:, :, None] * step[:, None, :]) / self.sigma
+            log_prob[ok] = -0.5 * np.einsum('wij,wij->w', resid, resid)
+        return log_prob[0] if params.ndim == 1 else log_prob
+
+
+_WORKER_POSTERIOR = None
+
+
+def _init_walker_worker(posterior):
+    global _WORKER_POSTERIOR
+    _WORKER_POSTERIOR = posterior
+
+
+def _walker_log_prob(coords):
+    return _WORKER_POSTERIOR(coords)
+
+
+class WalkerPool:
+    """
+    A vectorized log-probability split across worker processes: each call
+    hands every worker a slice of the walkers. Workers are forked with the
+    posterior already in memory; where workers can't fork (anything but
+    Linux) the constructor raises OSError and the caller stays in-process.
+    """
+
+    def __init__(self, posterior, processes=0):
+        if not fork_available():
+            raise OSError("worker processes need the fork start method")
+        publish_module(globals())
+        self.processes = processes or os.cpu_count() or 1
+        self._pool = multiprocessing.get_context('fork').Pool(
+            self.processes, initializer=_init_walker_worker, initargs=(posterior,))
+
+    def __call__(self, coords):
+        chunks = [chunk for chunk in np.array_split(np.atleast_2d(coords), self.processes) if len(chunk)]
+        return np.concatenate(self._pool.map(_walker_log_prob, chunks))
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+
+
+class ChainCheckpoint:
+    """
+    The production chain of an MCMC run, kept on disk while it runs:
+    chain.npy (n_steps, n_walkers, ndim) is memory-mapped and filled in
+    place, state.npz holds the steps done, the walkers' positions and
+    log-probabilities and the run key. A later run with the same key (data,
+    uncertainties and settings) can resume from the last save.
+    """
+
+    def __init__(self, directory, key, n_steps, n_walkers, ndim):
+        self.directory = Path(directory)
+        self.key = key
+        self.shape = (n_steps, n_walkers, ndim)
+        self.chain_path = self.directory / "chain.npy"
+        self.state_path = self.directory / "state.npz"
+        self.chain = None
+
+    @staticmethod
+    def run_key(*parts):
+        digest = hashlib.sha1()
+        for part in parts:
+            digest.update(np.asarray(part).tobytes() if isinstance(part, np.ndarray) else repr(part).encode())
+        return digest.hexdigest()
+
+    def resume_point(self):
+        """(steps done, coords, log_prob) of an unfinished run with this key, or None."""
+        try:
+            with np.load(self.state_path) as state:
+                if str(state['key']) != self.key:
+                    return None
+                point = int(state['step']), state['coords'], state['log_prob']
+            chain = np.load(self.chain_path, mmap_mode='r+')
+        except (OSError, KeyError, ValueError):
+            return None
+        if chain.shape != self.shape:
+            return None
+        self.chain = chain
+        return point
+
+    def start(self):
+        """A new, empty chain file (replacing any earlier run)."""
+        self.discard()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.chain = np.lib.format.open_memmap(self.chain_path, mode='w+',
+                                               dtype=np.float64, shape=self.shape)
+
+    def save(self, step, coords, log_prob):
+        """Flush the chain and record that `step` steps are done."""
+        self.chain.flush()
+        tmp = self.state_path.with_suffix('.tmp.npz')
+        np.savez(tmp, key=self.key, step=step, coords=coords, log_prob=log_prob)
+        os.replace(tmp, self.state_path)
+
+    def discard(self):
+        self.chain = None
+        for path in (self.state_path, self.chain_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
 class IsotopeMixingModelsPlugin:
     """
     ============================================================================
@@ -616,6 +979,12 @@ class IsotopeMixingModelsPlugin:
                         variable=self.model_var, value=value,
                         bg="white", font=("Arial", 7)).pack(anchor=tk.W)
 
+        # Split ternary proportions across CPU workers (large datasets)
+        self.parallel_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(right_models, text="Parallel",
+                    variable=self.parallel_var,
+                    bg="white", font=("Arial", 7)).pack(anchor=tk.W)
+
         # ============ INVERSION PARAMETERS ============
         inv_frame = tk.LabelFrame(left_panel, text="⚙️ 4. PARAMETERS",
                                 font=("Arial", 8, "bold"),
@@ -1247,33 +1616,11 @@ class IsotopeMixingModelsPlugin:
                                      label='Samples', zorder=5)
 
             # Calculate ternary mixing proportions for each sample
-            # Using barycentric coordinates
-            proportions = []
-            for x, y in zip(x_data, y_data):
-                # Convert to barycentric coordinates
-                # Method: solve for weights w1, w2, w3 such that:
-                # x = w1*x1 + w2*x2 + w3*x3
-                # y = w1*y1 + w2*y2 + w3*y3
-                # w1 + w2 + w3 = 1
-                A = np.array([
-                    [em_values[0][0], em_values[1][0], em_values[2][0]],
-                    [em_values[0][1], em_values[1][1], em_values[2][1]],
-                    [1, 1, 1]
-                ])
-                b = np.array([x, y, 1])
-
-                try:
-                    w = np.linalg.solve(A, b)
-                    # Clip to [0,1] and renormalize
-                    w = np.clip(w, 0, 1)
-                    w = w / np.sum(w)
-                    proportions.append(w)
-                except:
-                    proportions.append([1/3, 1/3, 1/3])
-
-                # Draw tie lines to vertices (optional - would clutter)
-                # for (em_x, em_y) in em_values:
-                #     self.ax.plot([x, em_x], [y, em_y], 'gray', linewidth=0.3, alpha=0.2)
+            # Using barycentric coordinates: weights w1, w2, w3 such that
+            # x = w1*x1 + w2*x2 + w3*x3, y = w1*y1 + w2*y2 + w3*y3, w1 + w2 + w3 = 1
+            # (solved for all samples at once, split across workers if enabled)
+            proportions = ternary_weights_parallel(np.column_stack([x_data, y_data]), em_values,
+                                                   workers=0 if self.parallel_var.get() else 1)
 
             # Store results
             self.current_results = {
@@ -1299,9 +1646,9 @@ class IsotopeMixingModelsPlugin:
             # Log results
             self._log_result(f"🔺 Ternary Mixing Model Results (2D)")
             self._log_result(f"   End-members: {', '.join(em_names)}")
-            self._log_result(f"   Mean proportions: EM1={100*np.mean([w[0] for w in proportions]):.1f}%, "
-                           f"EM2={100*np.mean([w[1] for w in proportions]):.1f}%, "
-                           f"EM3={100*np.mean([w[2] for w in proportions]):.1f}%")
+            self._log_result(f"   Mean proportions: EM1={100*np.mean(proportions[:, 0]):.1f}%, "
+                           f"EM2={100*np.mean(proportions[:, 1]):.1f}%, "
+                           f"EM3={100*np.mean(proportions[:, 2]):.1f}%")
             self._log_result(f"   Samples analyzed: {len(proportions)}")
 
             # Format plot
@@ -1371,25 +1718,9 @@ class IsotopeMixingModelsPlugin:
                             label='Samples', depthshade=False)
 
             # Calculate ternary mixing proportions in 3D
-            # Using barycentric coordinates in 3D
-            proportions = []
-            for x, y, z in zip(x_data, y_data, z_data):
-                # Solve for weights
-                A = np.array([
-                    [em_values[0][0], em_values[1][0], em_values[2][0]],
-                    [em_values[0][1], em_values[1][1], em_values[2][1]],
-                    [em_values[0][2], em_values[1][2], em_values[2][2]]
-                ])
-                b = np.array([x, y, z])
-
-                try:
-                    w = np.linalg.solve(A, b)
-                    # Clip to [0,1] and ensure sum to 1
-                    w = np.clip(w, 0, 1)
-                    w = w / np.sum(w)
-                    proportions.append(w)
-                except:
-                    proportions.append([1/3, 1/3, 1/3])
+            # Using barycentric coordinates in 3D (all samples at once)
+            proportions = ternary_weights_parallel(np.column_stack([x_data, y_data, z_data]), em_values,
+                                                   workers=0 if self.parallel_var.get() else 1)
 
             # Store results
             self.current_results = {
@@ -1416,9 +1747,9 @@ class IsotopeMixingModelsPlugin:
             # Log results
             self._log_result(f"🔺 Ternary Mixing Model Results (3D)")
             self._log_result(f"   End-members: {', '.join(em_names)}")
-            self._log_result(f"   Mean proportions: EM1={100*np.mean([w[0] for w in proportions]):.1f}%, "
-                           f"EM2={100*np.mean([w[1] for w in proportions]):.1f}%, "
-                           f"EM3={100*np.mean([w[2] for w in proportions]):.1f}%")
+            self._log_result(f"   Mean proportions: EM1={100*np.mean(proportions[:, 0]):.1f}%, "
+                           f"EM2={100*np.mean(proportions[:, 1]):.1f}%, "
+                           f"EM3={100*np.mean(proportions[:, 2]):.1f}%")
             self._log_result(f"   Samples analyzed: {len(proportions)}")
 
             # Format plot
@@ -1442,7 +1773,6 @@ class IsotopeMixingModelsPlugin:
         """Monte Carlo simulation with progress bar"""
         try:
             n_iterations = 10000
-            batch_size = 100  # Update progress every 100 iterations
 
             # Get data
             x_col = self.available_isotopes[x_sys]['column']
@@ -1476,75 +1806,53 @@ class IsotopeMixingModelsPlugin:
                 f"Running {n_iterations:,} iterations..."
             )
 
-            # Monte Carlo iterations with progress updates
-            all_proportions = []
-
             # Start progress bar in status bar
             self.progress_bar.start(10)
             self.stats_label.config(text="Running Monte Carlo...")
 
-            for i in range(n_iterations):
-                # Check if cancelled
-                if cancel_var.get():
-                    self._log_result("❌ Monte Carlo cancelled by user")
-                    progress_window.destroy()
-                    self.progress_bar.stop()
-                    self.stats_label.config(text="Cancelled")
-                    return
-
-                # Perturb end-members within uncertainty
-                em1_x_pert = em1_x + np.random.normal(0, x_unc)
-                em1_y_pert = em1_y + np.random.normal(0, y_unc)
-                em2_x_pert = em2_x + np.random.normal(0, x_unc)
-                em2_y_pert = em2_y + np.random.normal(0, y_unc)
-
-                # For each sample
-                for j in range(len(x_data)):
-                    # Perturb sample
-                    x_pert = x_data[j] + np.random.normal(0, x_unc)
-                    y_pert = y_data[j] + np.random.normal(0, y_unc)
+            def progress(done, total):
+                self.stats_label.config(text=f"Monte Carlo: {100 * done / total:.1f}%")
+                progress_window.update()
 
-                    # Calculate mixing proportion
-                    vec_x = em2_x_pert - em1_x_pert
-                    vec_y = em2_y_pert - em1_y_pert
+            # All iterations of a block of samples are drawn and projected at once
+            engine = MixingMonteCarlo(n_iterations)
+            results = engine.binary(x_data, y_data, (em1_x, em1_y), (em2_x, em2_y),
+                                    x_unc, y_unc, progress=progress, cancelled=cancel_var.get)
 
-                    sample_vec_x = x_pert - em1_x_pert
-                    sample_vec_y = y_pert - em1_y_pert
-
-                    dot_product = sample_vec_x*vec_x + sample_vec_y*vec_y
-                    norm_sq = vec_x*vec_x + vec_y*vec_y
-
-                    if norm_sq > 0:
-                        f = dot_product / norm_sq
-                        f = np.clip(f, 0, 1)
-                        all_proportions.append(f)
-
-                # Update progress periodically
-                if (i + 1) % batch_size == 0:
-                    progress = (i + 1) / n_iterations * 100
-                    self.stats_label.config(text=f"Monte Carlo: {progress:.1f}%")
-                    progress_window.update()
+            if results is None:
+                self._log_result("❌ Monte Carlo cancelled by user")
+                progress_window.destroy()
+                self.progress_bar.stop()
+                self.stats_label.config(text="Cancelled")
+                return
 
             # Close progress window
             progress_window.destroy()
             self.progress_bar.stop()
             self.stats_label.config(text="Processing results...")
 
-            self.monte_carlo_results = all_proportions
+            self.monte_carlo_results = results
+            mean_prop = results['mean']
+            std_prop = results['std']
+            ci_low, ci_high = results['ci']
 
             # Create figure for Monte Carlo results
             self.fig.clear()
             ax1 = self.fig.add_subplot(1, 2, 1)
             ax2 = self.fig.add_subplot(1, 2, 2)
 
-            # Histogram
-            ax1.hist(all_proportions, bins=50, color='#3498db', alpha=0.7,
-                edgecolor='white', linewidth=0.5)
-            ax1.axvline(np.mean(all_proportions), color='red', linestyle='--',
-                    linewidth=2, label=f"Mean: {np.mean(all_proportions):.3f}")
-            ax1.axvline(np.percentile(all_proportions, 2.5), color='gray',
+            # Histogram (pooled over samples and iterations, 50 bins over the occupied range)
+            hist, edges = results['histogram'], results['bin_edges']
+            occupied = np.flatnonzero(hist)
+            centers = (edges[:-1] + edges[1:]) / 2
+            ax1.hist(centers[occupied], bins=50, range=(edges[occupied[0]], edges[occupied[-1] + 1]),
+                     weights=hist[occupied], color='#3498db', alpha=0.7,
+                     edgecolor='white', linewidth=0.5)
+            ax1.axvline(mean_prop, color='red', linestyle='--',
+                    linewidth=2, label=f"Mean: {mean_prop:.3f}")
+            ax1.axvline(ci_low, color='gray',
                     linestyle=':', linewidth=1.5)
-            ax1.axvline(np.percentile(all_proportions, 97.5), color='gray',
+            ax1.axvline(ci_high, color='gray',
                     linestyle=':', linewidth=1.5)
 
             ax1.set_xlabel('Proportion of EM2')
@@ -1554,17 +1862,26 @@ class IsotopeMixingModelsPlugin:
             ax1.grid(True, alpha=0.3)
 
             # Q-Q plot
-            stats.probplot(all_proportions, dist="norm", plot=ax2)
+            stats.probplot(results['qq_values'], dist="norm", plot=ax2)
             ax2.set_title('Q-Q Plot')
             ax2.grid(True, alpha=0.3)
 
             self.fig.tight_layout()
             self.canvas.draw()
 
-            # Statistics
-            mean_prop = np.mean(all_proportions)
-            std_prop = np.std(all_proportions)
-            ci_low, ci_high = np.percentile(all_proportions, [2.5, 97.5])
+            # Per-sample proportion distributions: mean and 95% CI
+            per_sample = results['samples']
+            self.props_tree.delete(*self.props_tree.get_children())
+            for i in range(len(x_data)):
+                sample_id = self.samples.iloc[i].get('Sample_ID', f"Sample_{i+1}")
+                prop = per_sample['mean'][i]
+                self.props_tree.insert('', tk.END, values=(
+                    sample_id,
+                    f"{100*(1-prop):.1f}",
+                    f"{100*prop:.1f} [{100*per_sample['ci_lower'][i]:.1f}-{100*per_sample['ci_upper'][i]:.1f}]",
+                    "-",
+                    "-"
+                ))
 
             self._log_result(f"🎲 Monte Carlo Simulation")
             self._log_result(f"   Iterations: {n_iterations:,}")
@@ -1919,6 +2236,9 @@ class IsotopeMixingModelsPlugin:
                             "Install with: pip install emcee")
             return
 
+        progress_window = None
+        walker_pool = None
+        checkpoint = None
         try:
             # Get selected isotopes
             selected = self.isotope_listbox.curselection()
@@ -1931,12 +2251,6 @@ class IsotopeMixingModelsPlugin:
             n_steps = int(self.mcmc_steps.get())
             n_burnin = int(self.mcmc_burnin.get())
 
-            # Show progress window
-            progress_window, cancel_var = self._show_progress(
-                "MCMC Inversion",
-                f"Initializing {n_walkers} walkers..."
-            )
-
             # Get isotope data
             isotope_names = []
             data_matrix = []
@@ -1952,127 +2266,61 @@ class IsotopeMixingModelsPlugin:
                 data_matrix.append(data)
                 uncertainties.append(unc)
 
-            data_matrix = np.array(data_matrix).T
+            data_matrix = np.array(data_matrix, dtype=float).T
             n_samples, n_isotopes = data_matrix.shape
 
             # Calculate dimension of parameter space
             ndim = 2 * n_isotopes + n_samples
 
+            # An unfinished run of the same inversion can be picked up again
+            checkpoint = ChainCheckpoint(
+                MCMC_CHECKPOINT_DIR,
+                ChainCheckpoint.run_key(data_matrix, uncertainties, isotope_names,
+                                        n_walkers, n_steps, n_burnin),
+                n_steps, n_walkers, ndim)
+            resume = checkpoint.resume_point()
+            if resume and not messagebox.askyesno(
+                    "Resume MCMC",
+                    f"An unfinished run of this inversion stopped at step "
+                    f"{resume[0]:,} of {n_steps:,}.\n\nResume it?"):
+                resume = None
+
+            # Show progress window
+            progress_window, cancel_var = self._show_progress(
+                "MCMC Inversion",
+                f"Initializing {n_walkers} walkers..."
+            )
+
             self._log_result(f"\n📊 Running Bayesian MCMC inversion with {n_walkers} walkers...")
             self._log_result(f"   Parameter dimensions: {ndim}")
             self._log_result(f"   Samples: {n_samples}, Isotopes: {n_isotopes}")
             self.progress_bar.start(10)
             self.stats_label.config(text="MCMC: Initializing...")
 
-            # Define log probability function with cancel check
-            def log_probability(params):
-                # Check if cancelled
-                if cancel_var.get():
-                    return -np.inf
-
-                # params: [em1_values..., em2_values..., mixing_proportions...]
-                em1 = params[:n_isotopes]
-                em2 = params[n_isotopes:2*n_isotopes]
-                props = params[2*n_isotopes:]
-
-                # Priors
-                # End-members should be within reasonable range
-                data_min = np.min(data_matrix, axis=0)
-                data_max = np.max(data_matrix, axis=0)
-                data_range = data_max - data_min
-
-                # Allow a bit of extrapolation but not too much
-                if np.any(em1 < data_min - 0.5 * data_range) or \
-                np.any(em1 > data_max + 0.5 * data_range):
-                    return -np.inf
-                if np.any(em2 < data_min - 0.5 * data_range) or \
-                np.any(em2 > data_max + 0.5 * data_range):
-                    return -np.inf
-
-                # Proportions must be between 0 and 1
-                if np.any(props < 0) or np.any(props > 1):
-                    return -np.inf
-
-                # Likelihood
-                log_like = 0
-                for i in range(n_samples):
-                    f = props[i]
-                    pred = (1-f)*em1 + f*em2
-
-                    # Gaussian likelihood with uncertainties
-                    for j in range(n_isotopes):
-                        sigma = uncertainties[j]
-                        diff = data_matrix[i, j] - pred[j]
-                        log_like += -0.5 * (diff / sigma)**2
-
-                return log_like
-
-            # Get data statistics for initialization
+            # Get data statistics for priors and initialization
             data_min = np.min(data_matrix, axis=0)
             data_max = np.max(data_matrix, axis=0)
             data_mean = np.mean(data_matrix, axis=0)
             data_std = np.std(data_matrix, axis=0)
+            data_range = data_max - data_min
 
-            # Use a simpler initialization strategy
-            # Instead of trying to create perfectly spaced walkers,
-            # we'll create them with random perturbations around reasonable starting points
-
-            # Starting points: use the 10th, 50th, and 90th percentiles
-            p10 = np.percentile(data_matrix, 10, axis=0)
-            p50 = np.percentile(data_matrix, 50, axis=0)
-            p90 = np.percentile(data_matrix, 90, axis=0)
-
-            # For proportions, start with a reasonable distribution
-            props_init = np.random.uniform(0.3, 0.7, n_samples)
-
-            # Create initial positions with large random spread
-            pos = []
-
-            # Scale for perturbations - use a fraction of the data range
-            scale = (data_max - data_min) * 0.2
-
-            for i in range(n_walkers):
-                # Randomly choose which end-member combination to start from
-                choice = np.random.randint(0, 3)
-
-                if choice == 0:
-                    # EM1 low, EM2 high
-                    em1_base = p10
-                    em2_base = p90
-                elif choice == 1:
-                    # Both around median but with offset
-                    em1_base = p50 - scale * 0.5
-                    em2_base = p50 + scale * 0.5
-                else:
-                    # EM1 moderate, EM2 very high
-                    em1_base = p50
-                    em2_base = p90 + scale * 0.3
-
-                # Add random noise to each base
-                em1 = em1_base + np.random.normal(0, scale * 0.1, n_isotopes)
-                em2 = em2_base + np.random.normal(0, scale * 0.1, n_isotopes)
-
-                # Ensure values are within reasonable bounds
-                em1 = np.clip(em1, data_min - scale, data_max + scale)
-                em2 = np.clip(em2, data_min - scale, data_max + scale)
-
-                # Proportions with random variation
-                props = props_init + np.random.normal(0, 0.15, n_samples)
-                props = np.clip(props, 0.05, 0.95)
-
-                pos.append(np.concatenate([em1, em2, props]))
+            # Priors: end-members may extrapolate half the data range; the
+            # likelihood is evaluated for all walkers in one call
+            log_probability = MixingPosterior(data_matrix, uncertainties,
+                                              data_min - 0.5 * data_range,
+                                              data_max + 0.5 * data_range)
 
-            pos = np.array(pos)
-
-            # Add significant jitter to ensure linear independence
-            pos += np.random.normal(0, 1e-4, pos.shape)
-
-            # Create sampler with a larger moves scale if needed
-            # Use a stretch move which is more robust
+            if self.parallel_var.get() and n_walkers * n_samples * n_isotopes >= WALKER_POOL_MIN_WORK:
+                try:
+                    walker_pool = WalkerPool(log_probability)
+                    log_probability = walker_pool
+                    self._log_result(f"   Walkers evaluated in {walker_pool.processes} processes")
+                except OSError as e:
+                    self._log_result(f"   ⚠️ Process pool unavailable ({e}) - evaluating walkers in-process")
+
+            # Stretch move is more robust; with more parameters than walkers
+            # fall back to differential evolution if available
             moves = emcee.moves.StretchMove(a=2.0)
-            sampler = emcee.EnsembleSampler(n_walkers, ndim, log_probability, moves=moves)
-
-            # Check if we need to reduce dimensionality
             if ndim > n_walkers:
                 self._log_result(f"⚠️ WARNING: Number of parameters ({ndim}) exceeds number of walkers ({n_walkers})")
                 self._log_result(f"   This can cause numerical issues. Consider increasing walkers or reducing parameters.")
@@ -2080,138 +2328,79 @@ class IsotopeMixingModelsPlugin:
                 # Try a different move if possible
                 if hasattr(emcee.moves, 'DEMove'):
                     moves = emcee.moves.DEMove()
-                    sampler = emcee.EnsembleSampler(n_walkers, ndim, log_probability, moves=moves)
-
-            # Burn-in phase - use run_mcmc directly instead of iterating for first attempt
-            self._log_result(f"   Burn-in phase ({n_burnin} steps)...")
-            self.stats_label.config(text=f"MCMC: Burn-in (0/{n_burnin})")
-
-            try:
-                # Run burn-in directly
-                state = sampler.run_mcmc(pos, n_burnin, progress=False)
-                pos = state.coords
-
-                # Check if we had any successes
-                if np.all(np.isnan(sampler.get_log_prob())):
-                    raise ValueError("All walkers have invalid log probabilities")
-
-            except Exception as e:
-                self._log_result(f"   Initial burn-in failed: {str(e)[:100]}")
-                self._log_result(f"   Trying alternative initialization...")
-
-                # Alternative: use a much simpler approach with fewer parameters
-                # Reduce the problem by fixing proportions for burn-in
-                self._log_result(f"   Attempting burn-in with fixed proportions...")
-
-                # For burn-in, we'll only vary the end-members
-                ndim_reduced = 2 * n_isotopes
-                pos_reduced = pos[:, :ndim_reduced]
-
-                def log_probability_reduced(params_reduced):
-                    # Fix proportions at initial values
-                    em1 = params_reduced[:n_isotopes]
-                    em2 = params_reduced[n_isotopes:]
-                    props = props_init  # Use the initial proportions
-
-                    # Check bounds
-                    if np.any(em1 < data_min - 2*scale) or np.any(em1 > data_max + 2*scale):
-                        return -np.inf
-                    if np.any(em2 < data_min - 2*scale) or np.any(em2 > data_max + 2*scale):
-                        return -np.inf
-
-                    # Likelihood
-                    log_like = 0
-                    for i in range(n_samples):
-                        f = props[i]
-                        pred = (1-f)*em1 + f*em2
-                        for j in range(n_isotopes):
-                            sigma = uncertainties[j]
-                            diff = data_matrix[i, j] - pred[j]
-                            log_like += -0.5 * (diff / sigma)**2
-                    return log_like
-
-                # Create new sampler with reduced dimensions
-                sampler_reduced = emcee.EnsembleSampler(n_walkers, ndim_reduced, log_probability_reduced)
-
-                # Run burn-in on reduced space
-                try:
-                    state_reduced = sampler_reduced.run_mcmc(pos_reduced, n_burnin // 2, progress=False)
-                    pos_reduced = state_reduced.coords
-
-                    # Now expand back to full space by adding proportions
-                    pos_full = []
-                    for i in range(n_walkers):
-                        pos_full.append(np.concatenate([pos_reduced[i], props_init]))
-                    pos = np.array(pos_full)
-
-                    # Add some noise to proportions
-                    pos[:, ndim_reduced:] += np.random.normal(0, 0.05, (n_walkers, n_samples))
-                    pos[:, ndim_reduced:] = np.clip(pos[:, ndim_reduced:], 0.05, 0.95)
-
-                    # Create final sampler
-                    sampler = emcee.EnsembleSampler(n_walkers, ndim, log_probability, moves=moves)
-
-                    # Run a short burn-in with full parameters
-                    self._log_result(f"   Final burn-in with full parameters...")
-                    state = sampler.run_mcmc(pos, n_burnin // 2, progress=False)
-                    pos = state.coords
-
-                except Exception as e2:
-                    self._log_result(f"   Reduced burn-in also failed: {str(e2)[:100]}")
-                    self._log_result(f"   Using simple random initialization with very large spread")
-
-                    # Last resort: huge random spread
-                    pos = []
-                    for i in range(n_walkers):
-                        em1 = data_mean + np.random.normal(0, data_std * 3, n_isotopes)
-                        em2 = data_mean + np.random.normal(0, data_std * 3, n_isotopes)
-                        props = np.random.uniform(0.1, 0.9, n_samples)
-                        pos.append(np.concatenate([em1, em2, props]))
-                    pos = np.array(pos)
-
-                    # Try one more time
-                    sampler = emcee.EnsembleSampler(n_walkers, ndim, log_probability, moves=moves)
-                    try:
-                        state = sampler.run_mcmc(pos, n_burnin, progress=False)
-                        pos = state.coords
-                    except:
-                        self._log_result(f"❌ Cannot find valid initialization. Try different data or parameters.")
-                        progress_window.destroy()
-                        self.progress_bar.stop()
-                        messagebox.showerror("MCMC Error",
-                                        "Cannot initialize MCMC. Try:\n"
-                                        "1. Use fewer isotope systems\n"
-                                        "2. Increase number of walkers\n"
-                                        "3. Check if data has sufficient variation")
-                        return
 
-            sampler.reset()
+            def make_sampler(n_params, log_prob_fn, sampler_moves=None):
+                return emcee.EnsembleSampler(n_walkers, n_params, log_prob_fn,
+                                             moves=sampler_moves, vectorize=True)
+
+            def advance(sampler, state, steps, label, on_step=None):
+                """Run steps; Cancel and progress are handled between steps."""
+                if steps <= 0:
+                    coords = getattr(state, 'coords', state)
+                    return emcee.State(coords, log_prob=sampler.compute_log_prob(coords)[0])
+                for i, state in enumerate(sampler.sample(state, iterations=steps,
+                                                         store=False, progress=False)):
+                    if cancel_var.get():
+                        raise MCMCCancelled()
+                    if on_step is not None:
+                        on_step(i, state)
+                    if (i + 1) % 100 == 0:
+                        progress = (i + 1) / steps * 100
+                        self.stats_label.config(text=f"MCMC: {label} {progress:.1f}%")
+                        self.window.update()
+                return state
+
+            if resume:
+                done, coords, log_prob = resume
+                state = emcee.State(coords, log_prob=log_prob)
+                self._log_result(f"   Resuming production run at step {done:,}")
+            else:
+                done = 0
+                state = self._mcmc_burn_in(data_matrix, uncertainties, n_walkers, n_burnin,
+                                           log_probability, moves, make_sampler, advance,
+                                           data_min, data_max, data_mean, data_std)
+                if state is None:
+                    progress_window.destroy()
+                    self.progress_bar.stop()
+                    messagebox.showerror("MCMC Error",
+                                    "Cannot initialize MCMC. Try:\n"
+                                    "1. Use fewer isotope systems\n"
+                                    "2. Increase number of walkers\n"
+                                    "3. Check if data has sufficient variation")
+                    return
+                checkpoint.start()
+                checkpoint.save(0, state.coords, state.log_prob)
 
-            # Production run with progress
+            # Production run with progress; the chain goes straight to the checkpoint file
             self._log_result(f"   Production run ({n_steps} steps)...")
             self.stats_label.config(text=f"MCMC: Production (0/{n_steps})")
 
-            for i, sample in enumerate(sampler.sample(pos, iterations=n_steps, progress=False)):
-                # Check if cancelled
-                if cancel_var.get():
-                    progress_window.destroy()
-                    self.progress_bar.stop()
-                    self._log_result("❌ MCMC cancelled during production")
-                    self.stats_label.config(text="Cancelled")
-                    return
+            chain = checkpoint.chain
+            last = {'step': done, 'state': state}
 
-                # Update progress every 100 steps
-                if (i + 1) % 100 == 0:
-                    progress = (i + 1) / n_steps * 100
-                    self.stats_label.config(text=f"MCMC: Production {progress:.1f}%")
-                    self.window.update()
+            def record(i, step_state):
+                step = done + i + 1
+                chain[step - 1] = step_state.coords
+                last['step'], last['state'] = step, step_state
+                if step % MCMC_CHECKPOINT_EVERY == 0:
+                    checkpoint.save(step, step_state.coords, step_state.log_prob)
+
+            sampler = make_sampler(ndim, log_probability, moves)
+            try:
+                advance(sampler, state, n_steps - done, "Production", on_step=record)
+            except MCMCCancelled:
+                checkpoint.save(last['step'], last['state'].coords, last['state'].log_prob)
+                self._log_result(f"   Chain saved at step {last['step']:,} - run again to resume")
+                raise
 
             # Close progress window
             progress_window.destroy()
             self.stats_label.config(text="Processing results...")
 
-            # Extract samples
-            samples = sampler.get_chain(flat=True, discard=0)
+            # Extract samples (the finished chain no longer needs its checkpoint)
+            trace = np.array(chain)
+            checkpoint.discard()
+            samples = trace.reshape(-1, ndim)
 
             # Check if we got valid samples
             if len(samples) == 0:
@@ -2234,7 +2423,7 @@ class IsotopeMixingModelsPlugin:
 
             # Store results
             self.mcmc_results = {
-                'sampler': sampler,
+                'chain': trace,
                 'samples': samples,
                 'isotopes': isotope_names,
                 'em1': em1_median,
@@ -2276,7 +2465,6 @@ class IsotopeMixingModelsPlugin:
             self.mcmc_corner_ax.clear()
 
             # Trace plot for first parameter
-            trace = sampler.get_chain()
             self.mcmc_trace_ax.plot(trace[:, :, 0], alpha=0.5, linewidth=0.5)
             self.mcmc_trace_ax.set_xlabel('Step')
             self.mcmc_trace_ax.set_ylabel(f'{isotope_names[0]} (EM1)')
@@ -2299,10 +2487,12 @@ class IsotopeMixingModelsPlugin:
             self._log_result(f"\n📊 BAYESIAN MCMC INVERSION COMPLETE")
             self._log_result(f"   Walkers: {n_walkers}, Steps: {n_steps}, Burn-in: {n_burnin}")
             self._log_result(f"   Total samples: {samples.shape[0]:,}")
-            self._log_result(f"   Acceptance fraction: {np.mean(sampler.acceptance_fraction):.2f}")
+            # A walker's proposal was accepted when its position changed
+            accepted = np.any(trace[1:] != trace[:-1], axis=2)
+            self._log_result(f"   Acceptance fraction: {np.mean(accepted) if accepted.size else 0:.2f}")
 
             try:
-                tau = sampler.get_autocorr_time(tol=0)
+                tau = emcee.autocorr.integrated_time(trace, tol=0)
                 self._log_result(f"   Autocorrelation time: {tau}")
             except:
                 self._log_result(f"   Autocorrelation time: Could not compute")
@@ -2311,6 +2501,13 @@ class IsotopeMixingModelsPlugin:
             self.stats_label.config(text="Ready")
             self.notebook.select(4)  # Show MCMC diagnostics tab
 
+        except MCMCCancelled:
+            if progress_window is not None and progress_window.winfo_exists():
+                progress_window.destroy()
+            self.progress_bar.stop()
+            self._log_result("❌ MCMC cancelled")
+            self.stats_label.config(text="Cancelled")
+
         except Exception as e:
             messagebox.showerror("MCMC Error", str(e))
             traceback.print_exc()
@@ -2318,6 +2515,116 @@ class IsotopeMixingModelsPlugin:
                 self.progress_bar.stop()
             self.stats_label.config(text="Error")
 
+        finally:
+            if walker_pool is not None:
+                walker_pool.close()
+            if checkpoint is not None:
+                checkpoint.chain = None     # release the memory map
+
+    def _mcmc_burn_in(self, data_matrix, uncertainties, n_walkers, n_burnin,
+                      log_probability, moves, make_sampler, advance,
+                      data_min, data_max, data_mean, data_std):
+        """
+        Initialize the walkers and run the burn-in, falling back to a burn-in
+        with fixed proportions and then to a wide random start. Returns the
+        final emcee State, or None when no valid start was found.
+        """
+        n_samples, n_isotopes = data_matrix.shape
+        ndim = 2 * n_isotopes + n_samples
+
+        # Use a simpler initialization strategy
+        # Instead of trying to create perfectly spaced walkers,
+        # we'll create them with random perturbations around reasonable starting points
+
+        # Starting points: use the 10th, 50th, and 90th percentiles
+        p10 = np.percentile(data_matrix, 10, axis=0)
+        p50 = np.percentile(data_matrix, 50, axis=0)
+        p90 = np.percentile(data_matrix, 90, axis=0)
+
+        # For proportions, start with a reasonable distribution
+        props_init = np.random.uniform(0.3, 0.7, n_samples)
+
+        # Scale for perturbations - use a fraction of the data range
+        scale = (data_max - data_min) * 0.2
+
+        # Randomly choose which end-member combination each walker starts from:
+        # EM1 low / EM2 high, both around the median with an offset, or
+        # EM1 moderate / EM2 very high
+        em1_bases = np.array([p10, p50 - scale * 0.5, p50])
+        em2_bases = np.array([p90, p50 + scale * 0.5, p90 + scale * 0.3])
+        choice = np.random.randint(0, 3, n_walkers)
+
+        # Add random noise to each base, within reasonable bounds
+        em1 = em1_bases[choice] + np.random.normal(0, 1, (n_walkers, n_isotopes)) * scale * 0.1
+        em2 = em2_bases[choice] + np.random.normal(0, 1, (n_walkers, n_isotopes)) * scale * 0.1
+        em1 = np.clip(em1, data_min - scale, data_max + scale)
+        em2 = np.clip(em2, data_min - scale, data_max + scale)
+
+        # Proportions with random variation
+        props = np.clip(props_init + np.random.normal(0, 0.15, (n_walkers, n_samples)), 0.05, 0.95)
+
+        # Add significant jitter to ensure linear independence
+        pos = np.hstack([em1, em2, props])
+        pos += np.random.normal(0, 1e-4, pos.shape)
+
+        self._log_result(f"   Burn-in phase ({n_burnin} steps)...")
+        self.stats_label.config(text=f"MCMC: Burn-in (0/{n_burnin})")
+
+        try:
+            state = advance(make_sampler(ndim, log_probability, moves), pos, n_burnin, "Burn-in")
+
+            # Check if we had any successes
+            if not np.isfinite(state.log_prob).any():
+                raise ValueError("All walkers have invalid log probabilities")
+            return state
+
+        except MCMCCancelled:
+            raise
+        except Exception as e:
+            self._log_result(f"   Initial burn-in failed: {str(e)[:100]}")
+            self._log_result(f"   Trying alternative initialization...")
+
+        # Alternative: reduce the problem by fixing proportions for burn-in,
+        # only the end-members vary
+        self._log_result(f"   Attempting burn-in with fixed proportions...")
+        ndim_reduced = 2 * n_isotopes
+        log_probability_reduced = MixingPosterior(data_matrix, uncertainties,
+                                                  data_min - 2 * scale, data_max + 2 * scale,
+                                                  fixed_props=props_init)
+        try:
+            state_reduced = advance(make_sampler(ndim_reduced, log_probability_reduced),
+                                    pos[:, :ndim_reduced], n_burnin // 2, "Burn-in")
+
+            # Now expand back to full space by adding proportions, with some noise
+            pos = np.hstack([state_reduced.coords, np.tile(props_init, (n_walkers, 1))])
+            pos[:, ndim_reduced:] += np.random.normal(0, 0.05, (n_walkers, n_samples))
+            pos[:, ndim_reduced:] = np.clip(pos[:, ndim_reduced:], 0.05, 0.95)
+
+            # Run a short burn-in with full parameters
+            self._log_result(f"   Final burn-in with full parameters...")
+            return advance(make_sampler(ndim, log_probability, moves), pos, n_burnin // 2, "Burn-in")
+
+        except MCMCCancelled:
+            raise
+        except Exception as e2:
+            self._log_result(f"   Reduced burn-in also failed: {str(e2)[:100]}")
+            self._log_result(f"   Using simple random initialization with very large spread")
+
+        # Last resort: huge random spread
+        em1 = data_mean + np.random.normal(0, 1, (n_walkers, n_isotopes)) * data_std * 3
+        em2 = data_mean + np.random.normal(0, 1, (n_walkers, n_isotopes)) * data_std * 3
+        props = np.random.uniform(0.1, 0.9, (n_walkers, n_samples))
+        pos = np.hstack([em1, em2, props])
+
+        # Try one more time
+        try:
+            return advance(make_sampler(ndim, log_probability, moves), pos, n_burnin, "Burn-in")
+        except MCMCCancelled:
+            raise
+        except Exception:
+            self._log_result(f"❌ Cannot find valid initialization. Try different data or parameters.")
+            return None
+
     def _ree_pattern_inversion(self):
         """
         REE pattern inversion to estimate source mineralogy and melt fraction
@@ -1,6 +1,7 @@
 """
 Spatial Interpolation & Density Estimation Plugin
 Professional geostatistical interpolation with optimized performance + KDE contouring
+Batched kriging / IDW: one neighbour query and one stacked solve per tile of grid cells
 """
 
 PLUGIN_INFO = {
@@ -10,7 +11,7 @@ PLUGIN_INFO = {
     "name": "Spatial Kriging & Density",
     "description": "Industry-standard spatial interpolation with variogram analysis + KDE contouring",
     "icon": "🗺️",
-    "version": "3.2",
+    "version": "3.3",
     "requires": ["numpy", "scipy", "matplotlib"],
     "author": "Sefy Levy & DeepSeek",
 
@@ -33,8 +34,13 @@ import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog
 import pandas as pd
 import numpy as np
+import os
+import pickle
+import hashlib
 import threading
+import multiprocessing
 import time
+from collections import OrderedDict
 from datetime import datetime
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
@@ -42,11 +48,227 @@ from scipy.stats import gaussian_kde
 from scipy.ndimage import gaussian_filter
 from scipy.spatial.distance import pdist
 from scipy.optimize import curve_fit
-from scipy.linalg import solve
 from scipy.spatial import cKDTree
 import warnings
 warnings.filterwarnings('ignore')
 
+from plugins.plugin_workers import fork_available, publish_module
+
+# ============ BATCHED INTERPOLATION ENGINE ============
+# Neighbours used per grid cell
+MAX_NEIGHBORS = 15
+# Grid cells per tile: one KD-tree query and one stacked solve per tile
+TILE_CELLS = 16384
+# Grids with at least this many cells may be split across worker processes
+PARALLEL_MIN_CELLS = 100_000
+# The experimental variogram uses a random subset of this many samples at most
+VARIOGRAM_MAX_POINTS = 4000
+VARIOGRAM_BINS = 15
+
+
+def spherical_variogram(h, nugget, sill, range_val):
+    """γ(h) = n + s * (1.5*(h/a) - 0.5*(h/a)³) for h ≤ a, else n + s (array h)."""
+    scaled = h / range_val
+    return np.where(scaled <= 1, nugget + sill * (1.5 * scaled - 0.5 * scaled**3), nugget + sill)
+
+
+def experimental_variogram(x, y, z, n_bins=VARIOGRAM_BINS, max_points=VARIOGRAM_MAX_POINTS, seed=0):
+    """
+    Binned semivariance 0.5*(z_i - z_j)² against pair distance, (h, gamma)
+    for the non-empty bins. Above max_points samples a fixed random subset
+    is used (the number of pairs grows with the square of the samples).
+    """
+    coords = np.column_stack([x, y])
+    z = np.asarray(z, dtype=float)
+    if len(z) > max_points:
+        pick = np.random.default_rng(seed).choice(len(z), max_points, replace=False)
+        coords, z = coords[pick], z[pick]
+
+    distances = pdist(coords)
+    semivariance = 0.5 * pdist(z[:, None], 'sqeuclidean')
+
+    # Bin i holds edges[i] <= d < edges[i + 1]
+    edges = np.linspace(0, np.max(distances), n_bins + 1)
+    bins = np.searchsorted(edges, distances, side='right') - 1
+    inside = bins < n_bins
+    bins = bins[inside]
+    counts = np.bincount(bins, minlength=n_bins)
+    h_sum = np.bincount(bins, weights=distances[inside], minlength=n_bins)
+    gamma_sum = np.bincount(bins, weights=semivariance[inside], minlength=n_bins)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        exp_h = np.where(counts > 0, h_sum / counts, 0.0)
+        exp_gamma = np.where(counts > 0, gamma_sum / counts, 0.0)
+
+    # Remove empty bins
+    valid = exp_h > 0
+    return exp_h[valid], exp_gamma[valid]
+
+
+class VariogramCache:
+    """
+    Experimental variograms and fits for recently used datasets, keyed by a
+    hash of the samples, so re-running on the same data (another grid size,
+    colour map, method) does not recompute them.
+    """
+
+    def __init__(self, size=8):
+        self.size = size
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def data_key(x, y, z):
+        digest = hashlib.sha1()
+        for values in (x, y, z):
+            digest.update(np.ascontiguousarray(values, dtype=float).tobytes())
+        return digest.hexdigest()
+
+    def get(self, key, compute):
+        """Cached value for key, computing (and storing) it when missing."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        value = compute()
+        self._entries[key] = value
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+        return value
+
+
+def query_neighbors(tree, points, n_samples, radius, workers=-1):
+    """(distances, indices), each (cells, k): one KD-tree query for all points."""
+    k = min(MAX_NEIGHBORS, n_samples)
+    distances, indices = tree.query(points, k=k, distance_upper_bound=radius, workers=workers)
+    return distances.reshape(len(points), k), indices.reshape(len(points), k)
+
+
+def _idw_weighted(z, distances, indices, valid, power):
+    weights = np.where(valid, 1.0 / (np.where(valid, distances, 1.0)**power + 1e-10), 0.0)
+    values = z[np.where(valid, indices, 0)]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (weights * values).sum(axis=1) / weights.sum(axis=1)
+
+
+def idw_cells(points, tree, z, power, min_neighbors, radius, workers=-1):
+    """Inverse distance weighting at every point (NaN with too few neighbours)."""
+    distances, indices = query_neighbors(tree, points, len(z), radius, workers)
+    valid = np.isfinite(distances)
+    out = np.full(len(points), np.nan)
+    ok = valid.sum(axis=1) >= min_neighbors
+    out[ok] = _idw_weighted(z, distances[ok], indices[ok], valid[ok], power)
+    return out
+
+
+def kriging_cells(points, tree, x, y, z, nugget, sill, range_val, min_neighbors, radius, workers=-1):
+    """
+    Ordinary kriging at every point with a spherical variogram. Each cell's
+    (k+1)x(k+1) system is stacked and all are inverted in one call; cells
+    with fewer than k neighbours are padded with decoupled unit rows, which
+    gives the same weights as the smaller system. Singular systems fall back
+    to IDW (power 2), as before.
+    """
+    distances, indices = query_neighbors(tree, points, len(z), radius, workers)
+    valid = np.isfinite(distances)
+    out = np.full(len(points), np.nan)
+    cells = np.flatnonzero(valid.sum(axis=1) >= min_neighbors)
+    if not len(cells):
+        return out
+
+    d, valid = distances[cells], valid[cells]
+    n, k = d.shape
+    near = np.where(valid, indices[cells], 0)
+    x_near, y_near, z_near = x[near], y[near], z[near]
+
+    # Kriging matrices: variogram between neighbours, Lagrange row/column
+    pair = np.hypot(x_near[:, :, None] - x_near[:, None, :], y_near[:, :, None] - y_near[:, None, :])
+    C = np.zeros((n, k + 1, k + 1))
+    C[:, :k, :k] = np.where(valid[:, :, None] & valid[:, None, :],
+                            spherical_variogram(pair, nugget, sill, range_val), 0.0)
+    diagonal = np.arange(k)
+    C[:, diagonal, diagonal] = np.where(valid, C[:, diagonal, diagonal], 1.0)
+    C[:, :k, k] = valid
+    C[:, k, :k] = valid
+
+    # Right-hand side
+    b = np.zeros((n, k + 1))
+    b[:, :k] = np.where(valid, spherical_variogram(np.where(valid, d, 0.0), nugget, sill, range_val), 0.0)
+    b[:, k] = 1
+
+    # Singular or numerically singular systems (reciprocal condition number
+    # below machine epsilon, e.g. duplicate sample locations) are not solved
+    estimate = np.empty(n)
+    sign, _ = np.linalg.slogdet(C)
+    solvable = np.flatnonzero(sign != 0)
+    if len(solvable):
+        inverse = np.linalg.inv(C[solvable])
+        norm = np.abs(C[solvable]).sum(axis=1).max(axis=1)
+        inverse_norm = np.abs(inverse).sum(axis=1).max(axis=1)
+        solvable_ok = 1.0 / (norm * inverse_norm) >= np.finfo(float).eps
+        solvable, inverse = solvable[solvable_ok], inverse[solvable_ok]
+        weights = np.einsum('nij,nj->ni', inverse[:, :k, :], b[solvable])
+        estimate[solvable] = (weights * z_near[solvable]).sum(axis=1)
+    solvable = np.isin(np.arange(n), solvable)
+    if not solvable.all():
+        fallback = ~solvable
+        estimate[fallback] = _idw_weighted(z, d[fallback], near[fallback], valid[fallback], 2)
+    out[cells] = estimate
+    return out
+
+
+_TILE_JOB = None
+
+
+def _init_tile_worker(job):
+    global _TILE_JOB
+    _TILE_JOB = job
+
+
+def _run_tile(bounds):
+    func, points, kwargs = _TILE_JOB
+    start, stop = bounds
+    return func(points[start:stop], **kwargs)
+
+
+def interpolate_tiles(func, points, parallel=False, progress=None, cancelled=None, **kwargs):
+    """
+    func(points, **kwargs) over tiles of TILE_CELLS grid points. With
+    parallel (and a large enough grid) tiles go to forked worker processes
+    that inherit the samples and KD-tree; otherwise they run here with the
+    KD-tree query threaded. progress(done, total) after each tile;
+    cancelled() returning True stops the run (returns None).
+    """
+    n = len(points)
+    tiles = [(start, min(start + TILE_CELLS, n)) for start in range(0, n, TILE_CELLS)]
+    out = np.empty(n)
+    workers = os.cpu_count() or 1
+
+    if (parallel and workers > 1 and n >= PARALLEL_MIN_CELLS and
+            fork_available()):
+        try:
+            publish_module(globals())
+            job = (func, points, dict(kwargs, workers=1))
+            with multiprocessing.get_context('fork').Pool(
+                    workers, initializer=_init_tile_worker, initargs=(job,)) as pool:
+                for done, ((start, stop), values) in enumerate(zip(tiles, pool.imap(_run_tile, tiles)), 1):
+                    if cancelled is not None and cancelled():
+                        pool.terminate()
+                        return None
+                    out[start:stop] = values
+                    if progress is not None:
+                        progress(done, len(tiles))
+            return out
+        except (OSError, pickle.PicklingError) as e:
+            print(f"⚠️ Process pool unavailable ({e}) - interpolating tiles in this process")
+
+    for done, (start, stop) in enumerate(tiles, 1):
+        if cancelled is not None and cancelled():
+            return None
+        out[start:stop] = func(points[start:stop], **kwargs)
+        if progress is not None:
+            progress(done, len(tiles))
+    return out
+
+
 class SpatialKrigingPlugin:
     def __init__(self, main_app):
         self.app = main_app
@@ -114,6 +336,8 @@ class SpatialKrigingPlugin:
         self.preserve_aspect_var = tk.BooleanVar(value=True)
         self.show_samples_var = tk.BooleanVar(value=True)
         self.auto_fit_var = tk.BooleanVar(value=True)
+        self.parallel_var = tk.BooleanVar(value=False)
+        self.variogram_cache = VariogramCache()
 
         # Kriging specific
         self.variogram_var = tk.StringVar(value="Spherical")
@@ -366,7 +590,7 @@ class SpatialKrigingPlugin:
         tk.Label(inner, text="Cells:", bg="#ecf0f1", font=("Arial", 8)).grid(row=0, column=0, sticky=tk.W, pady=1)
         # REMOVE - already set
         # self.grid_size_var = tk.IntVar(value=80)
-        tk.Spinbox(inner, from_=30, to=200, textvariable=self.grid_size_var,
+        tk.Spinbox(inner, from_=30, to=500, textvariable=self.grid_size_var,
                 width=6, font=("Arial", 8)).grid(row=0, column=1, padx=2, pady=1, sticky="w")
 
         tk.Label(inner, text="Cmap:", bg="#ecf0f1", font=("Arial", 8)).grid(row=1, column=0, sticky=tk.W, pady=1)
@@ -392,6 +616,9 @@ class SpatialKrigingPlugin:
         tk.Checkbutton(check_frame, text="Auto-fit", variable=self.auto_fit_var,
                     bg="#ecf0f1", font=("Arial", 7)).pack(side=tk.LEFT, padx=1)
 
+        tk.Checkbutton(check_frame, text="Parallel", variable=self.parallel_var,
+                    bg="#ecf0f1", font=("Arial", 7)).pack(side=tk.LEFT, padx=1)
+
     def _setup_density_controls(self, parent):
         """Setup density/contour controls - compact version"""
         # Axis selection
@@ -642,27 +869,6 @@ class SpatialKrigingPlugin:
             messagebox.showerror("Input Error", error)
             return
 
-        # Performance warning for large datasets
-        sample_count = len(self.df)
-        grid_size = self.grid_size_var.get()
-
-        if sample_count > 300 and "Kriging" in self.method_var.get():
-            est_time = (sample_count * grid_size**2) / 50000
-            warning = (
-                f"Performance Warning\n\n"
-                f"Samples: {sample_count}\n"
-                f"Grid: {grid_size}×{grid_size}\n"
-                f"Estimated time: {est_time:.1f} minutes\n\n"
-                f"Consider:\n"
-                f"• Reduce grid size (current: {grid_size})\n"
-                f"• Use IDW method (faster)\n"
-                f"• Use fewer samples\n\n"
-                f"Continue with kriging?"
-            )
-
-            if not messagebox.askyesno("Warning", warning):
-                return
-
         self.is_processing = True
         self.cancelled = False
         self.interpolate_btn.config(state=tk.DISABLED, text="Running...")
@@ -898,39 +1104,18 @@ class SpatialKrigingPlugin:
 
         self._update_progress(50, "Performing IDW interpolation...")
 
-        # Initialize grid
-        grid_y, grid_x = X_grid.shape
-        ZI = np.full((grid_y, grid_x), np.nan)
-
-        # Process grid points
-        total_points = grid_x * grid_y
-        processed = 0
-
-        for i in range(grid_y):
-            for j in range(grid_x):
-                if self.cancelled:
-                    return None
-
-                # Find nearest neighbors
-                point = np.array([[X_grid[i, j], Y_grid[i, j]]])
-                distances, indices = tree.query(point,
-                                               k=min(15, len(x)),
-                                               distance_upper_bound=search_radius)
-
-                # Get valid neighbors
-                valid = distances[0] < np.inf
-                if np.sum(valid) >= min_neighbors:
-                    z_near = z[indices[0][valid]]
-                    d_near = distances[0][valid]
-
-                    # IDW weights
-                    weights = 1.0 / (d_near**power + 1e-10)
-                    ZI[i, j] = np.sum(weights * z_near) / np.sum(weights)
-
-                processed += 1
-                if processed % 100 == 0:
-                    progress = 50 + 45 * (processed / total_points)
-                    self._update_progress(int(progress), f"Processed {processed}/{total_points}")
+        # One neighbour query and weighted average per tile of grid cells
+        points = np.column_stack([X_grid.ravel(), Y_grid.ravel()])
+        ZI = interpolate_tiles(
+            idw_cells, points,
+            parallel=self.parallel_var.get(),
+            progress=lambda done, total: self._update_progress(
+                int(50 + 45 * done / total), f"Processed tile {done}/{total}"),
+            cancelled=lambda: self.cancelled,
+            tree=tree, z=z, power=power, min_neighbors=min_neighbors, radius=search_radius)
+        if ZI is None:
+            return None
+        ZI = ZI.reshape(X_grid.shape)
 
         self._update_progress(95, "Finalizing...")
 
@@ -946,29 +1131,10 @@ class SpatialKrigingPlugin:
         """Optimized Ordinary Kriging implementation"""
         self._update_progress(10, "Calculating variogram...")
 
-        # Calculate experimental variogram
-        coords = np.column_stack([x, y])
-        distances = pdist(coords)
-        z_diff = pdist(z[:, None], metric=lambda u, v: 0.5 * (u - v)**2)
-
-        # Bin distances
-        max_dist = np.max(distances)
-        n_bins = 15
-        bin_edges = np.linspace(0, max_dist, n_bins + 1)
-
-        exp_gamma = np.zeros(n_bins)
-        exp_h = np.zeros(n_bins)
-
-        for i in range(n_bins):
-            mask = (distances >= bin_edges[i]) & (distances < bin_edges[i + 1])
-            if np.sum(mask) > 0:
-                exp_gamma[i] = np.mean(z_diff[mask])
-                exp_h[i] = np.mean(distances[mask])
-
-        # Remove empty bins
-        valid = exp_h > 0
-        exp_h = exp_h[valid]
-        exp_gamma = exp_gamma[valid]
+        # Calculate experimental variogram (cached per dataset)
+        data_key = VariogramCache.data_key(x, y, z)
+        exp_h, exp_gamma = self.variogram_cache.get(
+            (data_key, 'experimental'), lambda: experimental_variogram(x, y, z))
 
         if self.cancelled:
             return None
@@ -978,7 +1144,9 @@ class SpatialKrigingPlugin:
         # Fit variogram if auto-fit enabled
         if self.auto_fit_var.get() and len(exp_h) > 3:
             try:
-                nugget_fit, sill_fit, range_fit = self._fit_variogram(exp_h, exp_gamma)
+                nugget_fit, sill_fit, range_fit = self.variogram_cache.get(
+                    (data_key, 'fit', self.variogram_var.get()),
+                    lambda: self._fit_variogram(exp_h, exp_gamma))
                 self.nugget_var.set(round(nugget_fit, 3))
                 self.sill_var.set(round(sill_fit, 3))
                 self.range_var.set(round(range_fit, 2))
@@ -1002,8 +1170,8 @@ class SpatialKrigingPlugin:
             grid_y = int(grid_x / self.aspect_ratio)
             if grid_y < 20:  # Minimum grid size
                 grid_y = 20
-            elif grid_y > 200:  # Maximum grid size
-                grid_y = 200
+            elif grid_y > 500:  # Maximum grid size
+                grid_y = 500
         else:
             grid_y = grid_x
 
@@ -1029,59 +1197,19 @@ class SpatialKrigingPlugin:
 
         self._update_progress(70, "Performing kriging...")
 
-        # Process in blocks for optimization
-        ZI = np.full((grid_y, grid_x), np.nan)
-        block_size = 20
-
-        for i in range(0, grid_y, block_size):
-            for j in range(0, grid_x, block_size):
-                if self.cancelled:
-                    return None
-
-                # Get block bounds
-                i_end = min(i + block_size, grid_y)
-                j_end = min(j + block_size, grid_x)
-
-                # Get all grid points in block
-                block_points = []
-                for ii in range(i, i_end):
-                    for jj in range(j, j_end):
-                        block_points.append([XI[ii, jj], YI[ii, jj]])
-
-                if not block_points:
-                    continue
-
-                block_points = np.array(block_points)
-
-                # Find neighbors for all points in block
-                distances, indices = tree.query(block_points,
-                                               k=min(15, len(x)),
-                                               distance_upper_bound=search_radius)
-
-                # Process each point in block
-                point_idx = 0
-                for ii in range(i, i_end):
-                    for jj in range(j, j_end):
-                        dist = distances[point_idx]
-                        idx = indices[point_idx]
-                        valid = dist < np.inf
-
-                        if np.sum(valid) >= min_neighbors:
-                            # Get valid neighbors
-                            x_near = x[idx[valid]]
-                            y_near = y[idx[valid]]
-                            z_near = z[idx[valid]]
-                            d_near = dist[valid]
-
-                            # Kriging interpolation
-                            ZI[ii, jj] = self._kriging_point(x_near, y_near, z_near, d_near,
-                                                            nugget_fit, sill_fit, range_fit)
-
-                        point_idx += 1
-
-                # Update progress
-                progress = 70 + 25 * ((i * grid_x + j) / (grid_y * grid_x))
-                self._update_progress(int(progress), f"Processing block {i//block_size + 1}/{grid_y//block_size + 1}")
+        # Stacked kriging systems, solved a tile of grid cells at a time
+        points = np.column_stack([XI.ravel(), YI.ravel()])
+        ZI = interpolate_tiles(
+            kriging_cells, points,
+            parallel=self.parallel_var.get(),
+            progress=lambda done, total: self._update_progress(
+                int(70 + 25 * done / total), f"Processing tile {done}/{total}"),
+            cancelled=lambda: self.cancelled,
+            tree=tree, x=x, y=y, z=z, nugget=nugget_fit, sill=sill_fit, range_val=range_fit,
+            min_neighbors=min_neighbors, radius=search_radius)
+        if ZI is None:
+            return None
+        ZI = ZI.reshape(XI.shape)
 
         self._update_progress(95, "Finalizing...")
 
@@ -1128,43 +1256,6 @@ class SpatialKrigingPlugin:
         except:
             return p0
 
-    def _kriging_point(self, x_near, y_near, z_near, d_near, nugget, sill, range_val):
-        """Kriging interpolation for a single point"""
-        n = len(x_near)
-
-        # Create kriging matrix
-        C = np.zeros((n + 1, n + 1))
-
-        # Calculate distances between samples
-        for k in range(n):
-            for l in range(n):
-                dist = np.sqrt((x_near[k] - x_near[l])**2 + (y_near[k] - y_near[l])**2)
-                h = dist / range_val
-                if h <= 1:
-                    C[k, l] = nugget + sill * (1.5 * h - 0.5 * h**3)
-                else:
-                    C[k, l] = nugget + sill
-
-        # Lagrange multiplier
-        C[:n, n] = 1
-        C[n, :n] = 1
-
-        # Right-hand side
-        b = np.zeros(n + 1)
-        h_near = d_near / range_val
-        mask = h_near <= 1
-        b[:n][mask] = nugget + sill * (1.5 * h_near[mask] - 0.5 * h_near[mask]**3)
-        b[:n][~mask] = nugget + sill
-        b[n] = 1
-
-        try:
-            weights = solve(C, b)
-            return np.sum(weights[:n] * z_near)
-        except:
-            # Fallback to IDW
-            weights = 1.0 / (d_near**2 + 1e-10)
-            return np.sum(weights * z_near) / np.sum(weights)
-
     def _update_progress(self, value, message):
         """Update progress bar and label"""
         if not self.cancelled:
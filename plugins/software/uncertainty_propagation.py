@@ -1,16 +1,18 @@
 """
 Archaeological Isotope Uncertainty Propagation Plugin
-v3.0 - TDF-Integrated Monte Carlo with Full Mixing Propagation
+v3.1 - TDF-Integrated Monte Carlo with Full Mixing Propagation
 
 - Receives isotope data with end-members and TDFs
 - Propagates ALL uncertainties: measurements + TDFs
 - Calculates confidence intervals on mixing proportions
 - Uses TDF database from config folder
 - Writes back proportion CIs to main table
+- Vectorized Monte Carlo: all iterations drawn at once, optional seed
+- Three-source (two-isotope) mixing solved exactly for every draw
 
 Author: Sefy Levy (boosted by AI)
 License: CC BY-NC-SA 4.0
-Version: 3.0.0
+Version: 3.1.0
 """
 
 PLUGIN_INFO = {
@@ -20,7 +22,7 @@ PLUGIN_INFO = {
     "name": "Uncertainty Propagation Pro",
     "icon": "📊",
     "description": "TDF-integrated Monte Carlo for mixing models with full uncertainty propagation",
-    "version": "3.0.0",
+    "version": "3.1.0",
     "requires": ["numpy", "scipy", "matplotlib"],
     "author": "Sefy Levy"
 }
@@ -36,7 +38,7 @@ import os
 
 # ============ OPTIONAL DEPENDENCIES ============
 try:
-    from scipy.stats import chi2, norm
+    from scipy.stats import norm
     HAS_SCIPY = True
 except ImportError:
     HAS_SCIPY = False
@@ -50,6 +52,248 @@ except ImportError:
     HAS_MATPLOTLIB = False
 
 
+# ============ VECTORIZED MONTE CARLO ENGINE ============
+# Draws are made for blocks of samples x all iterations at once; this caps
+# the memory one block may use (draws, TDFs, proportions and temporaries).
+MC_CHUNK_BYTES = 64 * 1024 * 1024
+_MC_BYTES_PER_DRAW = 96
+_MC_BYTES_PER_EXTRA_PROPORTION = 48
+
+
+def binary_mixing_vec(target_13C, target_15N, em1_13C, em1_15N, em2_13C, em2_15N, tdf_13C, tdf_15N):
+    """
+    Proportion of EM2 for arrays of consumer values (any broadcastable shapes).
+    TDF-corrected to dietary equivalents, solved on each isotope; the mean of
+    the in-range solutions, or of both when neither is within [0, 1].
+    """
+    diet_13C = np.asarray(target_13C, dtype=float) - tdf_13C
+    diet_15N = np.asarray(target_15N, dtype=float) - tdf_15N
+    with np.errstate(divide='ignore', invalid='ignore'):
+        span_13C = np.asarray(em2_13C, dtype=float) - em1_13C
+        span_15N = np.asarray(em2_15N, dtype=float) - em1_15N
+        f_13C = np.where(span_13C != 0, (diet_13C - em1_13C) / span_13C, np.nan)
+        f_15N = np.where(span_15N != 0, (diet_15N - em1_15N) / span_15N, np.nan)
+
+    ok_13C = (f_13C >= 0) & (f_13C <= 1)
+    ok_15N = (f_15N >= 0) & (f_15N <= 1)
+    both = np.where(np.isnan(f_13C), f_15N, np.where(np.isnan(f_15N), f_13C, (f_13C + f_15N) / 2))
+    return np.where(ok_13C & ok_15N, (f_13C + f_15N) / 2,
+                    np.where(ok_13C, f_13C, np.where(ok_15N, f_15N, both)))
+
+
+def three_source_mixing_vec(target_13C, target_15N, em1_13C, em1_15N, em2_13C, em2_15N,
+                            em3_13C, em3_15N, tdf_13C, tdf_15N):
+    """
+    Proportions of EM1, EM2 and EM3 (trailing axis of 3) for arrays of
+    consumer values. TDF-corrected to dietary equivalents and solved exactly
+    from δ13C, δ15N and f1 + f2 + f3 = 1. Each end-member set is inverted once
+    and applied to every draw; collinear or incomplete end-members give NaN.
+    Consumers outside the end-member triangle get proportions outside [0, 1].
+    """
+    diet_13C = np.asarray(target_13C, dtype=float) - tdf_13C
+    diet_15N = np.asarray(target_15N, dtype=float) - tdf_15N
+    diet = np.stack(np.broadcast_arrays(diet_13C, diet_15N, np.ones_like(diet_13C)), axis=-1)
+
+    rows_13C = np.stack(np.broadcast_arrays(em1_13C, em2_13C, em3_13C), axis=-1).astype(float)
+    rows_15N = np.stack(np.broadcast_arrays(em1_15N, em2_15N, em3_15N), axis=-1).astype(float)
+    A = np.stack([rows_13C, rows_15N, np.ones_like(rows_13C)], axis=-2)
+
+    with np.errstate(invalid='ignore'):
+        solvable = np.abs(np.linalg.det(np.nan_to_num(A))) > 1e-12
+        solvable &= ~np.isnan(A).any(axis=(-2, -1))
+    inverse = np.linalg.inv(np.where(solvable[..., None, None], A, np.eye(3)))
+    f = np.matmul(inverse, diet[..., None])[..., 0]
+    return np.where(solvable[..., None], f, np.nan)
+
+
+def _as_float(value):
+    """float(value), NaN when missing or not a number."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def confidence_ellipse(points, confidence):
+    """Ellipse (center, covariance, axes, angle) holding `confidence` of 2-D points."""
+    center = points.mean(axis=0)
+    cov = np.cov(points, rowvar=False)
+
+    # Handle singular covariance
+    if np.linalg.det(cov) < 1e-10:
+        cov = cov + np.eye(2) * 1e-6
+
+    # chi-square quantile for 2 degrees of freedom, in closed form
+    chi2_val = -2.0 * np.log(1.0 - confidence)
+    eigenvalues, eigenvectors = np.linalg.eigh(cov)
+    order = eigenvalues.argsort()[::-1]
+    eigenvalues = eigenvalues[order]
+    eigenvectors = eigenvectors[:, order]
+
+    return {
+        'center': center,
+        'cov': cov,
+        'width': 2 * np.sqrt(chi2_val * eigenvalues[0]),
+        'height': 2 * np.sqrt(chi2_val * eigenvalues[1]),
+        'angle': np.degrees(np.arctan2(eigenvectors[1, 0], eigenvectors[0, 0])),
+    }
+
+
+class MonteCarloEngine:
+    """
+    Batched Monte Carlo for one group of samples.
+
+    Every iteration x sample perturbation is drawn as one (n_iter, block, 2)
+    array from a numpy Generator, TDFs likewise, and the mixing model is
+    evaluated on the whole array - binary_mixing_vec for one proportion per
+    draw, three_source_mixing_vec for one per end-member. Samples are
+    processed in blocks sized by
+    chunk_bytes; group means are accumulated across blocks, per-sample
+    percentiles are taken per block, so results are exact at any chunk size.
+    A given seed (and chunk size) reproduces a run.
+    """
+
+    def __init__(self, n_iter, confidence=0.95, seed=None, chunk_bytes=MC_CHUNK_BYTES):
+        self.n_iter = int(n_iter)
+        self.confidence = confidence
+        self.rng = np.random.default_rng(seed)
+        self.chunk_bytes = chunk_bytes
+
+    def block_size(self, n_samples, n_proportions=1):
+        per_draw = _MC_BYTES_PER_DRAW + (n_proportions - 1) * _MC_BYTES_PER_EXTRA_PROPORTION
+        return max(1, min(n_samples, self.chunk_bytes // (self.n_iter * per_draw)))
+
+    def draw(self, x, y, x_err, y_err, correlation=0.0):
+        """(n_iter, n, 2) perturbed (x, y) for arrays of n values and errors."""
+        z = self.rng.standard_normal((self.n_iter, len(x), 2))
+        dx = z[..., 0] * x_err
+        if correlation and -1 <= correlation <= 1:
+            # Cholesky factor of [[1, r], [r, 1]]
+            dy = (correlation * z[..., 0] + np.sqrt(1 - correlation ** 2) * z[..., 1]) * y_err
+        else:
+            dy = z[..., 1] * y_err
+        z[..., 0] = x + dx
+        z[..., 1] = y + dy
+        return z
+
+    def run_group(self, x, y, x_err, y_err, correlation=0.0, mixing=None, end_members=None,
+                  tdf=None, perturb_tdf=False, progress=None):
+        """
+        x, y, x_err, y_err: length-n arrays. end_members: (n, 2k) array of
+        EM1 13C, EM1 15N, ..., EMk 13C, EMk 15N for a k-source mixing model
+        (rows with a NaN δ13C get no proportion).
+        tdf: (Δ13C mean, Δ13C sd, Δ15N mean, Δ15N sd). progress(done, n).
+
+        Returns the group ellipse (from per-iteration group means), per-sample
+        (n, 2, 2) CI bounds [[x lo, x hi], [y lo, y hi]], and - with mixing -
+        per-sample proportion statistics and the group mean proportion spread.
+        Models returning one proportion per end-member give, per sample,
+        {'sources': [stats for EM1, EM2, ...]} and per-source group arrays.
+        """
+        x, y, x_err, y_err = (np.asarray(a, dtype=float) for a in (x, y, x_err, y_err))
+        n = len(x)
+        lo_q = (1 - self.confidence) * 100 / 2
+        quantiles = [lo_q, 100 - lo_q]
+
+        sums = np.zeros((self.n_iter, 2))
+        ci = np.empty((n, 2, 2))
+        prop_sums = prop_counts = None
+        props = {}
+        use_mixing = mixing is not None and end_members is not None
+        n_proportions = 1
+        if use_mixing:
+            end_members = np.asarray(end_members, dtype=float)
+            mixable = ~np.isnan(end_members[:, 0::2]).any(axis=1)
+            n_sources = end_members.shape[1] // 2
+            if n_sources > 2:
+                n_proportions = n_sources
+        tdf_mean = (tdf[0], tdf[2]) if tdf else (0.0, 0.0)
+
+        step = self.block_size(n, n_proportions)
+        for start in range(0, n, step):
+            block = slice(start, min(start + step, n))
+            draws = self.draw(x[block], y[block], x_err[block], y_err[block], correlation)
+            sums += draws.sum(axis=1)
+            ci[block] = np.percentile(draws, quantiles, axis=0).transpose(1, 2, 0)
+
+            if use_mixing and mixable[block].any():
+                rows = np.flatnonzero(mixable[block])
+                em = end_members[block][rows]
+                shape = (self.n_iter, len(rows))
+                if perturb_tdf and tdf:
+                    tdf_13C = self.rng.normal(tdf[0], tdf[1], shape)
+                    tdf_15N = self.rng.normal(tdf[2], tdf[3], shape)
+                else:
+                    tdf_13C, tdf_15N = tdf_mean
+                sources = {}
+                for k in range(n_sources):
+                    sources[f'em{k + 1}_13C'] = em[:, 2 * k]
+                    sources[f'em{k + 1}_15N'] = em[:, 2 * k + 1]
+                f = mixing(target_13C=draws[:, rows, 0], target_15N=draws[:, rows, 1],
+                           tdf_13C=tdf_13C, tdf_15N=tdf_15N, **sources)
+                valid = ~np.isnan(f)
+                block_sums = np.where(valid, f, 0.0).sum(axis=1)
+                if prop_sums is None:
+                    prop_sums = np.zeros_like(block_sums)
+                    prop_counts = np.zeros_like(block_sums)
+                prop_sums += block_sums
+                prop_counts += valid.sum(axis=1)
+                if f.ndim == 2:
+                    props.update(self._proportion_stats(f, valid, start + rows, quantiles))
+                else:
+                    per_source = [self._proportion_stats(f[..., k], valid[..., k], start + rows, quantiles)
+                                  for k in range(f.shape[2])]
+                    for row in set().union(*per_source):
+                        props[row] = {'sources': [stats.get(row) for stats in per_source]}
+
+            if progress is not None:
+                progress(block.stop, n)
+
+        result = confidence_ellipse(sums / n, self.confidence)
+        result['sample_ci'] = ci
+        result['proportions'] = props
+        group_props = []
+        if prop_sums is not None:
+            iterations = (prop_counts > 0).reshape(self.n_iter, -1).all(axis=1)
+            group_props = prop_sums[iterations] / prop_counts[iterations]
+        result['prop_mean'] = group_props.mean(axis=0) if len(group_props) else None
+        result['prop_std'] = group_props.std(axis=0) if len(group_props) else None
+        return result
+
+    @staticmethod
+    def _proportion_stats(f, valid, sample_rows, quantiles):
+        """{sample row: mean/std/CI/median} over each column's non-NaN proportions."""
+        counts = valid.sum(axis=0)
+        used = counts > 0
+        if not used.any():
+            return {}
+        safe = np.where(valid, f, 0.0)
+        means = np.zeros(f.shape[1])
+        means[used] = safe[:, used].sum(axis=0) / counts[used]
+        spread = np.where(valid, f - means, 0.0)
+        stds = np.sqrt((spread ** 2).sum(axis=0) / np.maximum(counts, 1))
+
+        # Percentiles in one call for fully valid columns, per column otherwise
+        levels = [quantiles[0], 50, quantiles[1]]
+        bounds = np.full((3, f.shape[1]), np.nan)
+        full = counts == len(f)
+        if full.any():
+            bounds[:, full] = np.percentile(f[:, full], levels, axis=0)
+        for col in np.flatnonzero(used & ~full):
+            bounds[:, col] = np.percentile(f[valid[:, col], col], levels)
+
+        return {
+            int(sample_rows[col]): {
+                'mean': means[col],
+                'std': stds[col],
+                'ci_lower': bounds[0, col],
+                'ci_upper': bounds[2, col],
+                'median': bounds[1, col],
+            }
+            for col in np.flatnonzero(used)
+        }
+
+
 class IsotopeUncertaintyPro:
     """
     ============================================================================
@@ -92,6 +336,7 @@ class IsotopeUncertaintyPro:
         self.sample_results = {}          # sample ID -> distributions
         self.proportion_results = {}      # sample ID -> mixing proportion CIs
         self.mixing_model_func = None     # Stores the mixing equation
+        self.mixing_sources = 2           # End-members the mixing equation takes
 
         # UI state
         self.status_indicator = None
@@ -107,6 +352,7 @@ class IsotopeUncertaintyPro:
         self.iterations_var = tk.StringVar(value="10000")
         self.fast_mode_var = tk.BooleanVar(value=False)
         self.confidence_level_var = tk.StringVar(value="95")
+        self.seed_var = tk.StringVar(value="")      # empty = new random draws each run
 
         # NEW: TDF-specific controls
         self.include_tdf_uncertainty = tk.BooleanVar(value=True)
@@ -277,39 +523,19 @@ class IsotopeUncertaintyPro:
         model_type = context.get('model', 'binary').lower()
 
         if model_type == 'binary':
-            # Standard binary mixing: f = (δ_target - δ_EM1) / (δ_EM2 - δ_EM1)
-            def binary_mixing(target_13C, target_15N, em1_13C, em1_15N, em2_13C, em2_15N, tdf_13C, tdf_15N):
-                """
-                Calculate proportion of EM2 in mixture
-                With TDF correction: consumer = diet + TDF
-                So for consumer values, we subtract TDF to get dietary equivalent
-                """
-                # Correct consumer values to dietary equivalents
-                diet_13C = target_13C - tdf_13C
-                diet_15N = target_15N - tdf_15N
-
-                # Solve for f using both isotopes (weighted average if both available)
-                f_13C = (diet_13C - em1_13C) / (em2_13C - em1_13C) if em2_13C != em1_13C else np.nan
-                f_15N = (diet_15N - em1_15N) / (em2_15N - em1_15N) if em2_15N != em1_15N else np.nan
-
-                # Average if both valid, otherwise use the valid one
-                valid_fs = [f for f in [f_13C, f_15N] if not np.isnan(f) and 0 <= f <= 1]
-                if valid_fs:
-                    return np.mean(valid_fs)
-                else:
-                    # If outside bounds, still return but flag
-                    f = np.nanmean([f_13C, f_15N])
-                    return f
-
-            self.mixing_model_func = binary_mixing
+            # Standard binary mixing: f = (δ_target - δ_EM1) / (δ_EM2 - δ_EM1),
+            # evaluated on whole arrays of Monte Carlo draws
+            self.mixing_model_func = binary_mixing_vec
+            self.mixing_sources = 2
             return True
 
         elif model_type == 'three_source':
-            # For future expansion
-            def three_source_mixing(*args):
-                # Placeholder for three-isotope mixing
-                return args[0]  # Just pass through for now
-            self.mixing_model_func = three_source_mixing
+            # Three end-members from two isotopes: f1 + f2 + f3 = 1 closes the
+            # system, solved exactly for every draw
+            self.mixing_model_func = three_source_mixing_vec
+            self.mixing_sources = 3
+            if self.proportion_col_name.get() == "Mixing_Proportion_EM2":
+                self.proportion_col_name.set("Mixing_Proportion")   # one column set per EM
             return True
 
         else:
@@ -582,6 +808,16 @@ class IsotopeUncertaintyPro:
         tk.Label(conf_row, text="% CI", font=("Arial", 8),
                 bg="#ecf0f1").pack(side=tk.LEFT)
 
+        # Seed (reproducible runs)
+        seed_row = tk.Frame(mc_frame, bg="#ecf0f1")
+        seed_row.pack(fill=tk.X, pady=4)
+        tk.Label(seed_row, text="Seed:", font=("Arial", 8, "bold"),
+                bg="#ecf0f1").pack(side=tk.LEFT, padx=2)
+        tk.Entry(seed_row, textvariable=self.seed_var, width=10,
+                font=("Arial", 8)).pack(side=tk.LEFT, padx=5)
+        tk.Label(seed_row, text="(empty = random)", font=("Arial", 7, "italic"),
+                bg="#ecf0f1", fg="#7f8c8d").pack(side=tk.LEFT)
+
         # ---------- CORRELATED ERRORS (for Pb) ----------
         corr_frame = tk.LabelFrame(left_panel, text="🔗 CORRELATED ERRORS",
                                    font=("Arial", 9, "bold"),
@@ -883,7 +1119,12 @@ class IsotopeUncertaintyPro:
             mode_text = f"{n_iter:,} iterations"
 
         confidence = float(self.confidence_level_var.get()) / 100
-        alpha = 1 - confidence
+
+        seed_text = self.seed_var.get().strip()
+        if seed_text and not seed_text.isdigit():
+            messagebox.showwarning("Invalid Seed", "Seed must be a whole number (or empty for random).")
+            return
+        seed = int(seed_text) if seed_text else None
 
         # Check if we have mixing model
         has_mixing = self.mixing_model_func is not None
@@ -935,6 +1176,18 @@ class IsotopeUncertaintyPro:
         self.sample_results = {}
         self.proportion_results = {}
 
+        # One seeded generator for the whole run (all groups)
+        engine = MonteCarloEngine(n_iter, confidence, seed=seed)
+        correlation = 0.0
+        if self.use_correlated_errors.get() and self.correlation_value.get() > 0:
+            correlation = self.correlation_value.get()
+        tdf_info = getattr(self, 'tdf_info', None)
+        tdf = None
+        if tdf_info:
+            tdf = (tdf_info['Δ13C_mean'], tdf_info['Δ13C_sd'],
+                   tdf_info['Δ15N_mean'], tdf_info['Δ15N_sd'])
+        em_keys = [f'em{k + 1}_{iso}' for k in range(self.mixing_sources) for iso in ('13C', '15N')]
+
         # ============ MAIN LOOP ============
         try:
             for g_idx, (group_name, group_samples) in enumerate(valid_groups.items()):
@@ -949,43 +1202,31 @@ class IsotopeUncertaintyPro:
                         x_err = self._get_error(sample, x_col, x_val)
                         y_err = self._get_error(sample, y_col, y_val)
 
-                        # Get end-member data if mixing
-                        em1_13C = None
-                        em1_15N = None
-                        em2_13C = None
-                        em2_15N = None
+                        # Get end-member data if mixing (EM1 ... EMk)
+                        em_values = {key: None for key in em_keys}
 
                         if has_mixing and self.external_context:
                             # Extract from context or sample
                             if 'end_members' in self.external_context:
                                 ems = self.external_context['end_members']
-                                if len(ems) >= 2:
-                                    em1_13C = ems[0].get('δ13C', ems[0].get(x_col))
-                                    em1_15N = ems[0].get('δ15N', ems[0].get(y_col))
-                                    em2_13C = ems[1].get('δ13C', ems[1].get(x_col))
-                                    em2_15N = ems[1].get('δ15N', ems[1].get(y_col))
+                                if len(ems) >= self.mixing_sources:
+                                    for k in range(self.mixing_sources):
+                                        em_values[f'em{k + 1}_13C'] = ems[k].get('δ13C', ems[k].get(x_col))
+                                        em_values[f'em{k + 1}_15N'] = ems[k].get('δ15N', ems[k].get(y_col))
 
                             # Also check sample itself for end-member override
-                            if 'EM1_δ13C' in sample:
-                                em1_13C = float(sample['EM1_δ13C'])
-                            if 'EM1_δ15N' in sample:
-                                em1_15N = float(sample['EM1_δ15N'])
-                            if 'EM2_δ13C' in sample:
-                                em2_13C = float(sample['EM2_δ13C'])
-                            if 'EM2_δ15N' in sample:
-                                em2_15N = float(sample['EM2_δ15N'])
-
-                        sample_data.append({
+                            for k in range(self.mixing_sources):
+                                for iso in ('13C', '15N'):
+                                    if f'EM{k + 1}_δ{iso}' in sample:
+                                        em_values[f'em{k + 1}_{iso}'] = float(sample[f'EM{k + 1}_δ{iso}'])
+
+                        sample_data.append(dict({
                             'sample': sample,
                             'x': x_val,
                             'y': y_val,
                             'x_err': x_err,
                             'y_err': y_err,
-                            'em1_13C': em1_13C,
-                            'em1_15N': em1_15N,
-                            'em2_13C': em2_13C,
-                            'em2_15N': em2_15N
-                        })
+                        }, **em_values))
                     except (ValueError, TypeError):
                         continue
 
@@ -993,123 +1234,44 @@ class IsotopeUncertaintyPro:
                     continue
 
                 # ============ MONTE CARLO FOR THIS GROUP ============
-                group_x_means = []
-                group_y_means = []
-                group_proportions = []  # Store mixing proportions
-
-                # Per-sample storage
-                per_sample_x = [[] for _ in range(len(sample_data))]
-                per_sample_y = [[] for _ in range(len(sample_data))]
-                per_sample_prop = [[] for _ in range(len(sample_data))]
-
-                for it in range(n_iter):
-                    # Perturb all samples in group
-                    x_perturbed = []
-                    y_perturbed = []
-
-                    for i, s in enumerate(sample_data):
-                        # Handle correlated errors if requested
-                        if self.use_correlated_errors.get() and self.correlation_value.get() > 0:
-                            # Multivariate normal with correlation
-                            r = self.correlation_value.get()
-                            cov = np.array([
-                                [s['x_err']**2, r * s['x_err'] * s['y_err']],
-                                [r * s['x_err'] * s['y_err'], s['y_err']**2]
-                            ])
-                            try:
-                                xy_pert = np.random.multivariate_normal([s['x'], s['y']], cov)
-                                x_pert = xy_pert[0]
-                                y_pert = xy_pert[1]
-                            except:
-                                # Fallback to independent
-                                x_pert = np.random.normal(s['x'], s['x_err'])
-                                y_pert = np.random.normal(s['y'], s['y_err'])
-                        else:
-                            # Independent normal
-                            x_pert = np.random.normal(s['x'], s['x_err'])
-                            y_pert = np.random.normal(s['y'], s['y_err'])
-
-                        x_perturbed.append(x_pert)
-                        y_perturbed.append(y_pert)
-                        per_sample_x[i].append(x_pert)
-                        per_sample_y[i].append(y_pert)
-
-                        # Calculate mixing proportion if we have all data
-                        if has_mixing and s['em1_13C'] is not None and s['em2_13C'] is not None:
-                            # Perturb TDFs if included
-                            if include_tdf:
-                                tdf_13C = np.random.normal(self.tdf_info['Δ13C_mean'],
-                                                          self.tdf_info['Δ13C_sd'])
-                                tdf_15N = np.random.normal(self.tdf_info['Δ15N_mean'],
-                                                          self.tdf_info['Δ15N_sd'])
-                            else:
-                                tdf_13C = self.tdf_info['Δ13C_mean'] if self.tdf_info else 0
-                                tdf_15N = self.tdf_info['Δ15N_mean'] if self.tdf_info else 0
-
-                            # Calculate proportion
-                            prop = self.mixing_model_func(
-                                target_13C=x_pert,
-                                target_15N=y_pert,
-                                em1_13C=s['em1_13C'],
-                                em1_15N=s['em1_15N'],
-                                em2_13C=s['em2_13C'],
-                                em2_15N=s['em2_15N'],
-                                tdf_13C=tdf_13C,
-                                tdf_15N=tdf_15N
-                            )
-
-                            per_sample_prop[i].append(prop)
-
-                    # Group means (for ellipse)
-                    group_x_means.append(np.mean(x_perturbed))
-                    group_y_means.append(np.mean(y_perturbed))
-
-                    # Group mean proportion (if mixing)
-                    if has_mixing and any(len(p) > 0 for p in per_sample_prop):
-                        valid_props = [p[-1] for p in per_sample_prop if p and not np.isnan(p[-1])]
-                        if valid_props:
-                            group_proportions.append(np.mean(valid_props))
-
-                    # Update progress every 100 iterations
-                    if (it + 1) % 100 == 0:
-                        overall_iter = g_idx * n_iter + it + 1
-                        total_iters = len(valid_groups) * n_iter
-                        self._update_progress(overall_iter, total_iters)
-
-                # ============ COMPUTE ELLIPSE PARAMETERS ============
-                points = np.column_stack([group_x_means, group_y_means])
-                center = np.mean(points, axis=0)
-                cov = np.cov(points, rowvar=False)
-
-                # Handle singular covariance
-                if np.linalg.det(cov) < 1e-10:
-                    cov = cov + np.eye(2) * 1e-6
-
-                chi2_val = chi2.ppf(confidence, df=2)
-                eigenvalues, eigenvectors = np.linalg.eigh(cov)
-                order = eigenvalues.argsort()[::-1]
-                eigenvalues = eigenvalues[order]
-                eigenvectors = eigenvectors[:, order]
-
-                width = 2 * np.sqrt(chi2_val * eigenvalues[0])
-                height = 2 * np.sqrt(chi2_val * eigenvalues[1])
-                angle = np.degrees(np.arctan2(eigenvectors[1, 0], eigenvectors[0, 0]))
+                def column(key):
+                    return np.array([_as_float(s[key]) for s in sample_data])
+
+                end_members = None
+                if has_mixing:
+                    end_members = np.column_stack([column(key) for key in em_keys])
+
+                def progress(done, total, g_idx=g_idx):
+                    self._update_progress(int((g_idx + done / total) * n_iter),
+                                          len(valid_groups) * n_iter)
+
+                result = engine.run_group(
+                    column('x'), column('y'), column('x_err'), column('y_err'),
+                    correlation=correlation,
+                    mixing=self.mixing_model_func if has_mixing else None,
+                    end_members=end_members,
+                    tdf=tdf,
+                    perturb_tdf=include_tdf,
+                    progress=progress
+                )
 
                 # Store group results
+                center = result['center']
+                cov = result['cov']
                 self.group_results[group_name] = {
                     'center': center,
                     'cov': cov,
-                    'width': width,
-                    'height': height,
-                    'angle': angle,
+                    'width': result['width'],
+                    'height': result['height'],
+                    'angle': result['angle'],
                     'n_samples': len(sample_data),
                     'x_mean': center[0],
                     'y_mean': center[1],
                     'x_std': np.sqrt(cov[0,0]),
                     'y_std': np.sqrt(cov[1,1]),
                     'correlation': cov[0,1] / (np.sqrt(cov[0,0]*cov[1,1])) if cov[0,0]*cov[1,1] > 0 else 0,
-                    'prop_mean': np.mean(group_proportions) if group_proportions else None,
-                    'prop_std': np.std(group_proportions) if group_proportions else None
+                    'prop_mean': result['prop_mean'],
+                    'prop_std': result['prop_std']
                 }
 
                 # Store per-sample results
@@ -1119,30 +1281,21 @@ class IsotopeUncertaintyPro:
                                s['sample'].get('id',
                                f"{group_name}_{i}"))
 
+                    (x_lo, x_hi), (y_lo, y_hi) = result['sample_ci'][i]
                     self.sample_results[sample_id] = {
                         'x_mean': s['x'],
                         'x_err': s['x_err'],
                         'y_mean': s['y'],
                         'y_err': s['y_err'],
-                        'x_ci': (np.percentile(per_sample_x[i], alpha*100/2),
-                                np.percentile(per_sample_x[i], 100 - alpha*100/2)),
-                        'y_ci': (np.percentile(per_sample_y[i], alpha*100/2),
-                                np.percentile(per_sample_y[i], 100 - alpha*100/2)),
+                        'x_ci': (x_lo, x_hi),
+                        'y_ci': (y_lo, y_hi),
                         'group': group_name
                     }
 
                     # Store proportion results if available
-                    if per_sample_prop[i]:
-                        props = [p for p in per_sample_prop[i] if not np.isnan(p)]
-                        if props:
-                            self.proportion_results[sample_id] = {
-                                'mean': np.mean(props),
-                                'std': np.std(props),
-                                'ci_lower': np.percentile(props, alpha*100/2),
-                                'ci_upper': np.percentile(props, 100 - alpha*100/2),
-                                'median': np.median(props),
-                                'group': group_name
-                            }
+                    stats = result['proportions'].get(i)
+                    if stats:
+                        self.proportion_results[sample_id] = dict(stats, group=group_name)
 
             # ============ FINISH ============
             self._close_progress()
@@ -1255,7 +1408,7 @@ class IsotopeUncertaintyPro:
 
                 # Add proportion text if available
                 if ellipse.get('prop_mean') is not None:
-                    ax.annotate(f"f={ellipse['prop_mean']:.2f}±{ellipse['prop_std']:.2f}",
+                    ax.annotate(self._group_proportion_text(ellipse),
                                xy=ellipse['center'], xytext=(5, 5),
                                textcoords='offset points', fontsize=8,
                                bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.8))
@@ -1326,8 +1479,8 @@ class IsotopeUncertaintyPro:
             self.results_text.insert(tk.END, f"  Ellipse: {ellipse['width']:.2f}‰ × {ellipse['height']:.2f}‰, "
                                             f"{ellipse['angle']:.1f}°\n")
             if ellipse.get('prop_mean') is not None:
-                self.results_text.insert(tk.END, f"  Mixing proportion: f={ellipse['prop_mean']:.3f} "
-                                                f"± {ellipse['prop_std']:.3f}\n")
+                self.results_text.insert(tk.END, f"  Mixing proportion: "
+                                                f"{self._group_proportion_text(ellipse, 3, ' ± ')}\n")
             self.results_text.insert(tk.END, "\n")
 
         self.results_text.config(state=tk.DISABLED)
@@ -1347,13 +1500,16 @@ class IsotopeUncertaintyPro:
             self.proportion_text.insert(tk.END, "No mixing proportion data available.\n")
             self.proportion_text.insert(tk.END, "Make sure:\n")
             self.proportion_text.insert(tk.END, "• Data was sent with end-member values\n")
-            self.proportion_text.insert(tk.END, "• Mixing model is binary\n")
+            self.proportion_text.insert(tk.END, "• Mixing model is binary or three_source\n")
             self.proportion_text.insert(tk.END, "• TDF data is available\n")
             self.proportion_text.config(state=tk.DISABLED)
             return
 
         conf = self.confidence_level_var.get()
-        self.proportion_text.insert(tk.END, f"f = proportion of EM2 in mixture ({conf}% CI)\n\n")
+        if self.mixing_sources > 2:
+            self.proportion_text.insert(tk.END, f"f1, f2, f3 = proportions of EM1, EM2, EM3 in mixture ({conf}% CI)\n\n")
+        else:
+            self.proportion_text.insert(tk.END, f"f = proportion of EM2 in mixture ({conf}% CI)\n\n")
 
         # Group by group
         by_group = {}
@@ -1368,13 +1524,40 @@ class IsotopeUncertaintyPro:
             # Sort by sample ID
             samples.sort()
             for sample_id, prop in samples:
-                line = (f"  {sample_id[:20]:<20} f = {prop['mean']:.3f} "
-                       f"[{prop['ci_lower']:.3f}, {prop['ci_upper']:.3f}]  "
-                       f"±{prop['std']:.3f}\n")
-                self.proportion_text.insert(tk.END, line)
+                label = sample_id[:20]
+                for source, stats in self._proportion_parts(prop):
+                    name = f"f{source[2:]}" if source else "f"
+                    line = (f"  {label:<20} {name} = {stats['mean']:.3f} "
+                           f"[{stats['ci_lower']:.3f}, {stats['ci_upper']:.3f}]  "
+                           f"±{stats['std']:.3f}\n")
+                    self.proportion_text.insert(tk.END, line)
+                    label = ""
 
         self.proportion_text.config(state=tk.DISABLED)
 
+    @staticmethod
+    def _proportion_parts(prop):
+        """(end-member label, stats) per proportion of one sample; one unlabelled part for binary."""
+        if 'sources' in prop:
+            return [(f"EM{k + 1}", stats) for k, stats in enumerate(prop['sources']) if stats]
+        return [("", prop)]
+
+    @staticmethod
+    def _group_proportion_text(ellipse, digits=2, pm="±"):
+        """Group mean proportion(s) as f=m±s, or f1=..., f2=..., f3=... per end-member."""
+        mean, std = ellipse['prop_mean'], ellipse['prop_std']
+        if np.ndim(mean):
+            return ", ".join(f"f{k + 1}={m:.{digits}f}{pm}{sd:.{digits}f}"
+                             for k, (m, sd) in enumerate(zip(mean, std)))
+        return f"f={mean:.{digits}f}{pm}{std:.{digits}f}"
+
+    @staticmethod
+    def _csv_proportion(value):
+        """A group proportion for CSV; per-end-member values joined with ';'."""
+        if value is not None and np.ndim(value):
+            return ";".join(f"{v:.4f}" for v in value)
+        return f"{value}"
+
     # ============ EXPORT FUNCTIONS ============
 
     def _export_ellipses(self):
@@ -1418,8 +1601,8 @@ class IsotopeUncertaintyPro:
                         f"{ell['width']:.4f}",
                         f"{ell['height']:.4f}",
                         f"{ell['angle']:.2f}",
-                        f"{ell.get('prop_mean', '')}",
-                        f"{ell.get('prop_std', '')}",
+                        self._csv_proportion(ell.get('prop_mean', '')),
+                        self._csv_proportion(ell.get('prop_std', '')),
                         conf,
                         tdf_source,
                         tdf_included
@@ -1489,20 +1672,23 @@ class IsotopeUncertaintyPro:
             with open(filename, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
                 writer.writerow(['Sample_ID', 'Group', 'Proportion_Mean', 'Proportion_Std',
-                               'Proportion_Median', 'CI_Lower', 'CI_Upper', 'CI_Percent'])
+                               'Proportion_Median', 'CI_Lower', 'CI_Upper', 'CI_Percent',
+                               'End_Member'])
 
                 conf = self.confidence_level_var.get()
-                for sid, vals in self.proportion_results.items():
-                    writer.writerow([
-                        sid,
-                        vals.get('group', ''),
-                        f"{vals['mean']:.4f}",
-                        f"{vals['std']:.4f}",
-                        f"{vals['median']:.4f}",
-                        f"{vals['ci_lower']:.4f}",
-                        f"{vals['ci_upper']:.4f}",
-                        conf
-                    ])
+                for sid, prop in self.proportion_results.items():
+                    for source, vals in self._proportion_parts(prop):
+                        writer.writerow([
+                            sid,
+                            prop.get('group', ''),
+                            f"{vals['mean']:.4f}",
+                            f"{vals['std']:.4f}",
+                            f"{vals['median']:.4f}",
+                            f"{vals['ci_lower']:.4f}",
+                            f"{vals['ci_upper']:.4f}",
+                            conf,
+                            source or "EM2"
+                        ])
             messagebox.showinfo("Export Complete", f"Exported {len(self.proportion_results)} samples.")
         except Exception as e:
             messagebox.showerror("Export Error", str(e))
@@ -1522,11 +1708,14 @@ class IsotopeUncertaintyPro:
                f"• {self.y_var.get()}_CI_lower, {self.y_var.get()}_CI_upper\n\n")
 
         if self.proportion_results:
+            col_base = self.proportion_col_name.get()
+            if self.mixing_sources > 2:
+                col_base += "_EM1..EM" + str(self.mixing_sources)
             msg += "Mixing Proportions:\n"
-            msg += f"• {self.proportion_col_name.get()}_mean\n"
-            msg += f"• {self.proportion_col_name.get()}_std\n"
-            msg += f"• {self.proportion_col_name.get()}_CI_lower\n"
-            msg += f"• {self.proportion_col_name.get()}_CI_upper\n\n"
+            msg += f"• {col_base}_mean\n"
+            msg += f"• {col_base}_std\n"
+            msg += f"• {col_base}_CI_lower\n"
+            msg += f"• {col_base}_CI_upper\n\n"
 
         if self.group_results:
             msg += "Group Ellipses:\n"
@@ -1581,12 +1770,14 @@ class IsotopeUncertaintyPro:
 
             # Add proportion results if available
             if matched and sample_id in self.proportion_results:
-                prop = self.proportion_results[sample_id]
-                col_base = self.proportion_col_name.get()
-                sample[f'{col_base}_mean'] = prop['mean']
-                sample[f'{col_base}_std'] = prop['std']
-                sample[f'{col_base}_CI_lower'] = prop['ci_lower']
-                sample[f'{col_base}_CI_upper'] = prop['ci_upper']
+                for source, prop in self._proportion_parts(self.proportion_results[sample_id]):
+                    col_base = self.proportion_col_name.get()
+                    if source:
+                        col_base = f'{col_base}_{source}'
+                    sample[f'{col_base}_mean'] = prop['mean']
+                    sample[f'{col_base}_std'] = prop['std']
+                    sample[f'{col_base}_CI_lower'] = prop['ci_lower']
+                    sample[f'{col_base}_CI_upper'] = prop['ci_upper']
                 prop_count += 1
 
         # Add group ellipse parameters to all samples (based on group name)
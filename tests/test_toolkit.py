@@ -338,6 +338,149 @@ def test_data_hub(report: TestReport):
         report.add_result("Clear all", False, error=str(e))
 
 
+def test_columnar_backend(report: TestReport):
+    """Test the columnar DataHub backend against the dict backend"""
+
+    if not TOOLKIT_AVAILABLE:
+        report.add_result("Columnar Import", False, error="Toolkit modules not available")
+        return
+
+    try:
+        import numpy as np
+    except ImportError:
+        report.add_result("Columnar backend", False, error="numpy not available")
+        return
+
+    samples = [
+        {'Sample_ID': 'COL001', 'Zr_ppm': 150.0, 'Nb_ppm': 15.0, 'Notes': 'first'},
+        {'Sample_ID': 'COL002', 'Zr_ppm': 200.0, 'Notes': 'second'},
+        {'Sample_ID': 'COL003', 'Zr_ppm': 90.0, 'Nb_ppm': 9.0},
+    ]
+    dict_hub = DataHub()
+    hub = DataHub(backend='columnar')
+    dict_hub.add_samples([dict(s) for s in samples])
+    hub.add_samples([dict(s) for s in samples])
+
+    # Test 1: Rows read back identically
+    try:
+        same = [dict(r) for r in hub.get_all()] == [dict(r) for r in dict_hub.get_all()]
+        report.add_result(
+            "Rows match dict backend",
+            same and hub.row_count() == 3,
+            details=f"{hub.row_count()} rows"
+        )
+    except Exception as e:
+        report.add_result("Rows match dict backend", False, error=str(e))
+
+    # Test 2: Missing cells stay missing
+    try:
+        row = hub.get_by_id('COL002')
+        report.add_result(
+            "Missing cell semantics",
+            'Nb_ppm' not in row and row.get('Nb_ppm') is None and row['Zr_ppm'] == 200.0,
+            details=f"Row keys: {list(row.keys())}"
+        )
+    except Exception as e:
+        report.add_result("Missing cell semantics", False, error=str(e))
+
+    # Test 3: Numeric column is a contiguous float64 array
+    try:
+        values, present = hub.get_column('Nb_ppm')
+        numeric = hub.get_numeric_column('Nb_ppm')
+        report.add_result(
+            "Numeric column access",
+            values.dtype == np.float64 and present.tolist() == [True, False, True]
+            and np.isnan(numeric[1]) and numeric[2] == 9.0,
+            details=f"dtype={values.dtype}, present={present.tolist()}"
+        )
+    except Exception as e:
+        report.add_result("Numeric column access", False, error=str(e))
+
+    # Test 3b: Ints read back as ints, as with the dict backend
+    try:
+        rows = [{'Sample_ID': 'INT1', 'Year': 2020}, {'Sample_ID': 'INT2', 'Year': 2021.5}]
+        int_hub = DataHub(backend='columnar')
+        int_hub.add_samples([dict(r) for r in rows])
+        int_hub.update_row(0, {'Count': 3})
+        columns = {'Sample_ID': (np.array(['INT3'], dtype=object), np.ones(1, dtype=bool)),
+                   'Year': (np.array([1999], dtype=object), np.ones(1, dtype=bool))}
+        int_hub.add_columns(columns, 1)
+        got = [dict(r) for r in int_hub.get_all()]
+        report.add_result(
+            "Integer values keep their type",
+            got == [{'Sample_ID': 'INT1', 'Year': 2020, 'Count': 3},
+                    {'Sample_ID': 'INT2', 'Year': 2021.5}, {'Sample_ID': 'INT3', 'Year': 1999}]
+            and type(got[0]['Year']) is int and type(got[0]['Count']) is int
+            and type(got[2]['Year']) is int,
+            details=f"{got}"
+        )
+    except Exception as e:
+        report.add_result("Integer values keep their type", False, error=str(e))
+
+    # Test 4: Text value demotes a numeric column without losing data
+    try:
+        hub.update_row(0, {'Zr_ppm': '<LOD'})
+        report.add_result(
+            "Numeric column demotion",
+            hub.get_all()[0]['Zr_ppm'] == '<LOD' and hub.get_all()[1]['Zr_ppm'] == 200.0,
+            details=f"Zr_ppm: {[r.get('Zr_ppm') for r in hub.get_all()]}"
+        )
+    except Exception as e:
+        report.add_result("Numeric column demotion", False, error=str(e))
+
+    # Test 5: Row views write through to the columns
+    try:
+        hub.get_all()[2]['Notes'] = 'edited'
+        report.add_result(
+            "Row view write-through",
+            hub.get_column('Notes')[0][2] == 'edited',
+            details="Notes written via row view"
+        )
+    except Exception as e:
+        report.add_result("Row view write-through", False, error=str(e))
+
+    # Test 6: Delete compacts rows, index and columns
+    try:
+        hub.delete_rows([0])
+        report.add_result(
+            "Delete rows (columnar)",
+            hub.row_count() == 2 and hub.id_to_index == {'COL002': 0, 'COL003': 1}
+            and hub.get_page(0, page_size=1)[0]['Sample_ID'] == 'COL002',
+            details=f"Index: {hub.id_to_index}"
+        )
+    except Exception as e:
+        report.add_result("Delete rows (columnar)", False, error=str(e))
+
+    # Test 7: Export to plain dicts and clear
+    try:
+        records = hub.to_records()
+        json.dumps(records)
+        hub.clear_all()
+        report.add_result(
+            "Records export and clear",
+            len(records) == 2 and all(type(r) is dict for r in records) and hub.row_count() == 0,
+            details=f"{len(records)} records exported"
+        )
+    except Exception as e:
+        report.add_result("Records export and clear", False, error=str(e))
+
+    # Test 8: Classification engine accepts row views
+    try:
+        engine = ClassificationEngine()
+        bone_hub = DataHub(backend='columnar')
+        bone_hub.add_samples([{'Sample_ID': 'BONE001', 'C_N_Ratio': 3.2}])
+        bone_id = next((s['id'] for s in engine.get_available_schemes()
+                        if 'Bone Collagen' in s['name']), None)
+        name, _, _, _ = engine.classify_sample(bone_hub.get_all()[0], bone_id)
+        report.add_result(
+            "Classify columnar row",
+            "PRESERVED" in name,
+            details=f"Result: {name}"
+        )
+    except Exception as e:
+        report.add_result("Classify columnar row", False, error=str(e))
+
+
 def test_classification_engine(report: TestReport):
     """Test ClassificationEngine functionality"""
 
@@ -709,6 +852,161 @@ def test_file_import(report: TestReport):
         except Exception as e:
             report.add_result("Parse CSV with pandas", False, error=str(e))
 
+        # Streaming chunked import (LeftPanel's CSV path)
+        try:
+            from features.csv_import import CsvStreamReader
+            mappings = {'zr (ppm)': 'Zr_ppm', 'zr': 'Zr_ppm', 'sample id': 'Sample_ID'}
+            stream_csv = Path(temp_dir) / "stream.csv"
+            with open(stream_csv, 'w', encoding='utf-8') as f:
+                f.write("# exported by instrument\n")
+                f.write("Sample ID;Zr (ppm);Zr;Notes; \n")
+                f.write("# calibration block\n")
+                for i in range(25):
+                    f.write(f"S{i};{i},000;9;note {i};x\n")
+                f.write("\n;12;;core\n")
+
+            reader = CsvStreamReader(stream_csv, mappings, encoding='ascii', chunk_rows=10)
+            chunks = list(reader.chunks())
+            rows = [row for chunk in chunks for row in chunk]
+            expected_first = {'Sample_ID': 'S1', 'Zr_ppm': 1000.0, 'Notes': 'note 1'}
+            report.add_result(
+                "Streaming CSV import",
+                [len(c) for c in chunks] == [10, 10, 6] and reader.delimiter == ';'
+                and rows[1] == expected_first
+                and rows[-1] == {'Zr_ppm': 12.0, 'Notes': 'core', 'Sample_ID': 'IMP_0026'}
+                and reader.bytes_read == reader.total_bytes,
+                details=f"{len(rows)} rows in {len(chunks)} chunks"
+            )
+
+            hub = DataHub()
+            for chunk in CsvStreamReader(stream_csv, mappings, chunk_rows=4).chunks():
+                hub.add_samples(chunk)
+            report.add_result(
+                "Chunks pushed into DataHub",
+                hub.get_all() == rows,
+                details=f"{hub.row_count()} rows"
+            )
+        except Exception as e:
+            report.add_result("Streaming CSV import", False, error=str(e))
+
+        # Workbook sheets converted column-wise == the same table through the CSV path
+        try:
+            import pandas as pd
+            from features.csv_import import CsvStreamReader
+            from features.sheet_import import frame_columns
+            mappings = {'zr (ppm)': 'Zr_ppm', 'zr': 'Zr_ppm', 'sample id': 'Sample_ID'}
+            frame = pd.DataFrame({
+                'Sample ID': ['A1', None, ' C3 ', 'D4'],
+                'Zr (ppm)': [165, None, 50, 12],
+                'Zr': ['9', '8', None, '1,200'],
+                'Notes': ['core', '  ', None, 'n/a'],
+                'Mixed': ['1', 'bdl', '2,500', None],
+            })
+            sheet_csv = Path(temp_dir) / "sheet.csv"
+            frame.to_csv(sheet_csv, index=False)
+            expected = CsvStreamReader(sheet_csv, mappings).read_all()
+
+            same = True
+            for backend in ('dict', 'columnar'):
+                hub = DataHub(backend)
+                count, columns = frame_columns(frame, mappings)
+                hub.add_columns(columns, count)
+                same &= [dict(row) for row in hub.get_all()] == expected
+            report.add_result(
+                "Excel/ODS sheet to columns",
+                same and expected[1]['Sample_ID'] == 'IMP_0002' and expected[1]['Zr_ppm'] == 8.0
+                and expected[2]['Mixed'] == 2500.0 and expected[1]['Mixed'] == 'bdl',
+                details=str(expected[1])
+            )
+        except ImportError:
+            report.add_result("Excel/ODS sheet to columns", True, details="pandas not installed - skipped")
+        except Exception as e:
+            report.add_result("Excel/ODS sheet to columns", False, error=str(e))
+
+        # Only large multi-sheet workbooks start worker processes
+        try:
+            from features.sheet_import import sheet_workers
+            small = Path(temp_dir) / "small.xlsx"
+            small.write_bytes(b"\0" * 1000)
+            report.add_result(
+                "Small workbooks parsed in process",
+                sheet_workers(small, 5, max_workers=4) == 1
+                and sheet_workers(small, 5, max_workers=4, min_bytes=500) == 4
+                and sheet_workers(small, 1, max_workers=4, min_bytes=500) == 1,
+            )
+        except Exception as e:
+            report.add_result("Small workbooks parsed in process", False, error=str(e))
+
+        # Batch import: parallel read, Sample_ID dedupe, one notification, mtime memory
+        try:
+            from features.batch_import import BatchImporter
+            batch_dir = Path(temp_dir) / "batch"
+            batch_dir.mkdir()
+            (batch_dir / "a.csv").write_text("Sample_ID,Zr (ppm)\nA1,100\nA2,200\n", encoding='utf-8')
+            (batch_dir / "b.csv").write_text("Sample_ID,Zr (ppm)\nA2,999\nB1,50\n,7\n", encoding='utf-8')
+            (batch_dir / "c.csv").write_text("Zr;Notes\n1;x\n2;y\n", encoding='utf-8')
+            mappings = {'zr (ppm)': 'Zr_ppm', 'zr': 'Zr_ppm'}
+            state = Path(temp_dir) / "batch_state.json"
+
+            hub = DataHub()
+            hub.add_samples([{'Sample_ID': 'B1', 'Zr_ppm': 1.0}])
+            events = []
+
+            class Recorder:
+                def on_data_changed(self, event, *args):
+                    events.append(event)
+
+            hub.register_observer(Recorder())
+            importer = BatchImporter(mappings, state_file=state, max_workers=2)
+            files, unchanged = importer.scan(batch_dir)
+            batch = importer.collect(importer.read(files), set(hub.id_to_index))
+            added, _ = importer.commit(hub, batch)
+            ids = [row['Sample_ID'] for row in hub.get_all()]
+
+            rescan = BatchImporter(mappings, state_file=state)
+            nothing, skipped = rescan.scan(batch_dir)
+            (batch_dir / "c.csv").write_text("Zr;Notes\n1;x\n2;w\n3;z\n", encoding='utf-8')
+            changed, _ = rescan.scan(batch_dir)
+            again = rescan.collect(rescan.read(changed), set(hub.id_to_index))
+            first_events, events[:] = list(events), []
+            readded, updated = rescan.commit(hub, again)
+
+            report.add_result(
+                "Batch import",
+                added == 5 and first_events == ['samples_added'] and batch['duplicates'] == 2
+                and ids == ['B1', 'A1', 'A2', 'IMP_b_0003', 'IMP_c_0001', 'IMP_c_0002']
+                and hub.get_all()[2]['Zr_ppm'] == 200.0
+                and not nothing and skipped == 3 and [p.name for p in changed] == ['c.csv']
+                and [row['Sample_ID'] for row in again['rows']] == ['IMP_c_0003']
+                and readded == 1 and updated == 2 and again['duplicates'] == 0
+                and hub.get_by_id('IMP_c_0002')['Notes'] == 'w'
+                and events == ['samples_added', 'samples_updated'],
+                details=f"added {added} via {importer.mode}, ids {ids}, re-read {readded} added / {updated} updated"
+            )
+        except Exception as e:
+            report.add_result("Batch import", False, error=str(e))
+
+        # A forced rescan re-reads one directory and saves nothing until commit
+        try:
+            other_dir = Path(temp_dir) / "other"
+            other_dir.mkdir()
+            (other_dir / "d.csv").write_text("Sample_ID,Zr (ppm)\nD1,1\n", encoding='utf-8')
+            importer = BatchImporter(mappings, state_file=state)
+            importer.commit(DataHub(), importer.collect(importer.read(importer.scan(other_dir)[0]), set()))
+            saved = state.read_text(encoding='utf-8')
+
+            forced = BatchImporter(mappings, state_file=state)
+            files, unchanged = forced.scan(batch_dir, force=True)
+            untouched = state.read_text(encoding='utf-8') == saved
+            _, other_skipped = BatchImporter(mappings, state_file=state).scan(other_dir)
+            report.add_result(
+                "Forced rescan is scoped to its directory",
+                [p.name for p in files] == ['a.csv', 'b.csv', 'c.csv'] and unchanged == 0
+                and untouched and other_skipped == 1
+            )
+        except Exception as e:
+            report.add_result("Forced rescan is scoped to its directory", False, error=str(e))
+
     finally:
         # Clean up
         import shutil
@@ -896,6 +1194,84 @@ def test_derived_fields_calculations(report: TestReport):
         report.add_result("Derived field calculations", False, error=str(e))
 
 
+def test_compiled_formulas(report: TestReport):
+    """Test compiled/cached formula evaluation and its vectorized mode"""
+
+    if not TOOLKIT_AVAILABLE:
+        report.add_result("Formula Import", False, error="Toolkit modules not available")
+        return
+
+    from engines.classification_engine import SafeFormulaEvaluator
+
+    # Test 1: Compilation is cached per formula string
+    try:
+        first = SafeFormulaEvaluator.compile("Zr_ppm / Nb_ppm")
+        second = SafeFormulaEvaluator.compile("Zr_ppm / Nb_ppm")
+        report.add_result(
+            "Compiled formula cache",
+            first is second and first.variables == {'Zr_ppm', 'Nb_ppm'},
+            details=f"Variables: {sorted(first.variables)}"
+        )
+    except Exception as e:
+        report.add_result("Compiled formula cache", False, error=str(e))
+
+    # Test 2: Scalar results unchanged (precedence, right-assoc power, functions)
+    try:
+        cases = [("2**3**2", {}, 512.0), ("a + b * c", {'a': 1, 'b': 2, 'c': 3}, 7.0),
+                 ("sqrt(a) / b", {'a': 16, 'b': 2}, 2.0), ("(a - b) / 2", {'a': 9, 'b': 1}, 4.0)]
+        results = [SafeFormulaEvaluator.evaluate(f, v) for f, v, _ in cases]
+        report.add_result(
+            "Compiled scalar evaluation",
+            all(abs(r - exp) < 1e-12 for r, (_, _, exp) in zip(results, cases)),
+            details=f"Results: {results}"
+        )
+    except Exception as e:
+        report.add_result("Compiled scalar evaluation", False, error=str(e))
+
+    # Test 3: Whitelist still rejects unsafe input
+    rejected = 0
+    for bad in ["__import__('os')", "a;b", "a.b", "open(a)"]:
+        try:
+            SafeFormulaEvaluator.evaluate(bad, {'a': 1.0, 'b': 1.0})
+        except ValueError:
+            rejected += 1
+        except Exception:
+            pass
+    report.add_result(
+        "Unsafe formulas rejected",
+        rejected == 4,
+        details=f"{rejected}/4 rejected with ValueError"
+    )
+
+    # Test 4: Vectorized mode matches scalar mode; scalar errors become NaN
+    try:
+        import numpy as np
+        compiled = SafeFormulaEvaluator.compile("100 * MgO_wt / (MgO_wt + (Fe2O3_T_wt * 0.9))")
+        mgo = np.array([8.0, 0.0, 12.5])
+        fe = np.array([10.0, 0.0, 7.0])
+        vec = compiled.evaluate_array({'MgO_wt': mgo, 'Fe2O3_T_wt': fe})
+        scalar = compiled.evaluate({'MgO_wt': 8.0, 'Fe2O3_T_wt': 10.0})
+        report.add_result(
+            "Vectorized evaluation",
+            abs(vec[0] - scalar) < 1e-12 and np.isnan(vec[1]) and abs(vec[2] - compiled.evaluate({'MgO_wt': 12.5, 'Fe2O3_T_wt': 7.0})) < 1e-12,
+            details=f"Vector: {vec.tolist()}"
+        )
+    except Exception as e:
+        report.add_result("Vectorized evaluation", False, error=str(e))
+
+    # Test 5: Engine compiles every derived field once at load
+    try:
+        engine = ClassificationEngine()
+        fields = engine.derived_fields.get('fields', [])
+        report.add_result(
+            "Derived fields pre-compiled",
+            len(engine._compiled_formulas) == len(fields) and len(fields) > 0,
+            details=f"{len(engine._compiled_formulas)} compiled / {len(fields)} fields"
+        )
+    except Exception as e:
+        report.add_result("Derived fields pre-compiled", False, error=str(e))
+
+
 def test_scientific_classifications(report: TestReport):
     """Test specific scientific classification schemes - FIXED to find actual scheme IDs"""
 
@@ -1056,77 +1432,1323 @@ def test_scientific_classifications(report: TestReport):
         report.add_result("USDA Soil Texture scheme", False, details="Scheme not found")
 
 
-def test_batch_processing(report: TestReport):
-    """Test batch processing capabilities"""
+def _parity_samples(engine, scheme, count, seed):
+    """Synthetic samples probing a scheme's thresholds, gaps and odd values"""
+    import random
+    rng = random.Random(seed)
+
+    thresholds = {}
+    for classification in scheme.get('classifications') or scheme.get('rules') or []:
+        for rule in classification.get('rules', []):
+            values = thresholds.setdefault(rule.get('field', ''), [])
+            for key in ('value', 'min', 'max'):
+                v = rule.get(key)
+                items = v if isinstance(v, list) else [v]
+                values.extend(float(x) for x in items
+                              if isinstance(x, (int, float)) and not isinstance(x, bool))
+
+    fields = set(thresholds)
+    for field_def in engine.derived_fields.get('fields', []):
+        fields.update(field_def.get('requires', []))
+
+    samples = []
+    for i in range(count):
+        sample = {'Sample_ID': f'PAR{i:04d}'}
+        for field in sorted(fields):
+            points = thresholds.get(field) or [1.0]
+            r = rng.random()
+            if r < 0.15:
+                continue                                   # missing
+            elif r < 0.20:
+                sample[field] = None
+            elif r < 0.23:
+                sample[field] = 'n.d.'
+            elif r < 0.26:
+                sample[field] = str(rng.choice(points))    # numeric text
+            elif r < 0.28:
+                sample[field] = float('nan')
+            elif r < 0.31:
+                sample[field] = 0.0
+            elif r < 0.33:
+                sample[field] = -abs(rng.choice(points))
+            elif r < 0.45:
+                sample[field] = rng.choice(points)         # exactly on a boundary
+            else:
+                sample[field] = rng.choice(points) * (1 + rng.uniform(-0.3, 0.3)) + rng.uniform(-1, 1)
+        samples.append(sample)
+    return samples
+
+
+def _same_derived(a, b):
+    """Compare derived-field dicts, treating NaN == NaN and allowing 1 ulp-ish drift"""
+    import math
+    if list(a) != list(b):
+        return False
+    for key in a:
+        x, y = a[key], b[key]
+        if x is None or y is None or isinstance(x, complex) or isinstance(y, complex):
+            if type(x) is not type(y):
+                return False
+            continue
+        if math.isnan(x) or math.isnan(y):
+            if not (math.isnan(x) and math.isnan(y)):
+                return False
+        elif x != y and abs(x - y) > 1e-12 * max(1.0, abs(x)):
+            return False
+    return True
+
+
+def test_batch_parity(report: TestReport):
+    """Vectorized classify_all_samples must match the scalar path for every scheme"""
 
     if not TOOLKIT_AVAILABLE:
-        report.add_result("Batch processing", False, error="Toolkit modules not available")
+        report.add_result("Batch parity", False, error="Toolkit modules not available")
         return
 
+    import io
+    import contextlib
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ClassificationEngine()
+
+    for scheme_id, scheme in sorted(engine.schemes.items()):
+        try:
+            samples = _parity_samples(engine, scheme, 300, seed=len(scheme_id))
+            with contextlib.redirect_stdout(io.StringIO()):
+                scalar = engine._classify_scalar(samples, scheme_id)
+                batch = engine._classify_batch(samples, scheme_id)
+
+            mismatches = 0
+            for a, b in zip(scalar, batch):
+                keys = ('classification', 'confidence', 'color', 'flag_for_review')
+                if any(a[k] != b[k] for k in keys) or not _same_derived(a['derived_fields'], b['derived_fields']):
+                    mismatches += 1
+
+            classified = sum(1 for r in batch if r['classification'] != 'UNCLASSIFIED')
+            report.add_result(
+                f"Parity: {scheme_id}",
+                len(scalar) == len(batch) and mismatches == 0,
+                details=f"{mismatches} mismatches, {classified}/{len(batch)} classified"
+            )
+        except Exception as e:
+            report.add_result(f"Parity: {scheme_id}", False, error=str(e))
+
+    # Columnar DataHub rows go through the direct column path
     try:
         from data_hub import DataHub
-        from engines.classification_engine import ClassificationEngine
+        scheme_id = next(iter(sorted(engine.schemes)))
+        samples = _parity_samples(engine, engine.schemes[scheme_id], 200, seed=99)
+        hub = DataHub(backend='columnar')
+        hub.add_samples([dict(s) for s in samples])
+        with contextlib.redirect_stdout(io.StringIO()):
+            scalar = engine._classify_scalar(samples, scheme_id)
+            columnar = engine._classify_batch(hub.get_all(), scheme_id)
+        same = all(a['classification'] == b['classification'] for a, b in zip(scalar, columnar))
+        report.add_result(
+            "Parity: columnar DataHub source",
+            same and len(columnar) == len(samples),
+            details=f"{len(columnar)} samples via column arrays"
+        )
+    except Exception as e:
+        report.add_result("Parity: columnar DataHub source", False, error=str(e))
 
-        hub = DataHub()
+
+def test_lazy_derived_fields(report: TestReport):
+    """Per-scheme derived fields, derived-on-derived dependencies and the run-all memo"""
+
+    if not TOOLKIT_AVAILABLE:
+        report.add_result("Lazy derived fields", False, error="Toolkit modules not available")
+        return
+
+    import io
+    import contextlib
+    import tempfile
+
+    with contextlib.redirect_stdout(io.StringIO()):
         engine = ClassificationEngine()
 
-        # Create test dataset
+    # Only the derived fields a scheme references are computed
+    try:
+        checked = 0
+        for scheme_id in engine.schemes:
+            needed = engine.get_scheme_derived_fields(scheme_id)
+            _, _, _, derived = engine.classify_sample({'SiO2_wt': 50.0}, scheme_id)
+            assert list(derived) == needed, scheme_id
+            checked += 1
+        all_fields = len(engine.derived_fields.get('fields', []))
+        largest = max(len(engine.get_scheme_derived_fields(s)) for s in engine.schemes)
+        report.add_result(
+            "Scheme-scoped derived fields",
+            checked == len(engine.schemes) and largest < all_fields,
+            details=f"{checked} schemes, at most {largest}/{all_fields} derived fields each"
+        )
+    except Exception as e:
+        report.add_result("Scheme-scoped derived fields", False, error=str(e))
+
+    # Derived fields that depend on other derived fields, plus a cycle
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            with open(tmp / "derived.json", 'w') as f:
+                json.dump({"fields": [
+                    {"name": "Doubled_Ratio", "requires": ["Ratio"], "formula": "Ratio * 2"},
+                    {"name": "Ratio", "requires": ["A_ppm", "B_ppm"], "formula": "A_ppm / B_ppm"},
+                    {"name": "Loop_A", "requires": ["Loop_B"], "formula": "Loop_B + 1"},
+                    {"name": "Loop_B", "requires": ["Loop_A"], "formula": "Loop_A + 1"},
+                ]}, f)
+            with open(tmp / "chain.json", 'w') as f:
+                json.dump({
+                    "scheme_name": "Chain", "version": "1.0", "requires_fields": ["A_ppm", "B_ppm"],
+                    "classifications": [
+                        {"name": "HIGH", "logic": "AND",
+                         "rules": [{"field": "Doubled_Ratio", "operator": ">", "value": 10}]},
+                        {"name": "LOW", "logic": "DEFAULT", "rules": []},
+                    ]
+                }, f)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                chained = ClassificationEngine(schemes_dir=str(tmp))
+                chained.derived_fields_path = tmp / "derived.json"
+                chained.derived_fields = chained._load_derived_fields()
+                chained.load_all_schemes()
+
+            order = chained.get_scheme_derived_fields('chain')
+            samples = [{'A_ppm': 30, 'B_ppm': 2}, {'A_ppm': 3, 'B_ppm': 2},
+                       {'A_ppm': 3}, {'A_ppm': 3, 'B_ppm': 0}, {'Ratio': 9}]
+            with contextlib.redirect_stdout(io.StringIO()):
+                scalar = chained._classify_scalar(samples, 'chain')
+                batch = chained._classify_batch(samples, 'chain')
+
+            report.add_result(
+                "Derived dependency order",
+                order == ['Ratio', 'Doubled_Ratio'],
+                details=f"{order}"
+            )
+            report.add_result(
+                "Circular derived fields skipped",
+                'Loop_A' not in chained._derived_defs and 'Loop_B' not in chained._derived_defs
+            )
+            expected = ['HIGH', 'LOW', 'LOW', 'LOW', 'HIGH']
+            report.add_result(
+                "Chained derived classification",
+                [r['classification'] for r in scalar] == expected
+                and [r['classification'] for r in batch] == expected
+                and scalar[0]['derived_fields'] == {'Ratio': 15.0, 'Doubled_Ratio': 30.0}
+                and all(_same_derived(a['derived_fields'], b['derived_fields'])
+                        for a, b in zip(scalar, batch)),
+                details=f"{[r['derived_fields'] for r in batch]}"
+            )
+    except Exception as e:
+        report.add_result("Chained derived classification", False, error=str(e))
+
+    # Run-all memo: same samples + version reuse columns; a new version does not
+    try:
+        scheme_ids = sorted(engine.schemes)[:5]
         samples = []
-        for i in range(20):
-            samples.append({
-                'Sample_ID': f'BATCH{i:03d}',
-                'Zr_ppm': 150 + (i * 5),
-                'Nb_ppm': 10 + (i * 2),
-                'C_N_Ratio': 3.2 if i < 10 else 4.5,
-                'Notes': f'Test sample {i}'
-            })
+        for scheme_id in scheme_ids:
+            samples.extend(_parity_samples(engine, engine.schemes[scheme_id], 40, seed=7))
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.classify_all_samples(samples, scheme_ids[0], version=1)
+            memo = engine._derived_memo
+            first = dict(memo.columns)
+            for scheme_id in scheme_ids[1:]:
+                engine.classify_all_samples(samples, scheme_id, version=1)
+            reused = engine._derived_memo is memo and all(memo.columns[k] is v for k, v in first.items())
+            engine.classify_all_samples(samples, scheme_ids[0], version=2)
+            refreshed = engine._derived_memo is not memo
+            engine.classify_all_samples(samples, scheme_ids[0])
+            unversioned = engine._derived_memo is None
+        report.add_result(
+            "Derived memo across schemes",
+            reused and refreshed and unversioned,
+            details=f"{len(memo.columns)} derived columns shared by {len(scheme_ids)} schemes"
+        )
+    except Exception as e:
+        report.add_result("Derived memo across schemes", False, error=str(e))
 
-        count = hub.add_samples(samples)
+    # DataHub exposes a version that changes with every notified edit
+    try:
+        from data_hub import DataHub
+        hub = DataHub()
+        before = hub.version
+        hub.add_samples([{'Sample_ID': 'V1', 'Zr_ppm': 1}])
+        after_add = hub.version
+        hub.update_row(0, {'Zr_ppm': 2})
         report.add_result(
-            "Add batch samples",
-            count == 20,
-            details=f"Added {count} samples to DataHub"
+            "DataHub version",
+            before < after_add < hub.version,
+            details=f"{before} -> {after_add} -> {hub.version}"
         )
+    except Exception as e:
+        report.add_result("DataHub version", False, error=str(e))
 
-        # Test batch classification
-        schemes = engine.get_available_schemes()
-        if schemes:
-            scheme_id = schemes[0]['id']
+    # In-place RowView edits skip notify but still invalidate the memo
+    try:
+        from data_hub import DataHub
+        hub = DataHub(backend='columnar')
+        scheme_id = sorted(engine.schemes)[0]
+        hub.add_samples(_parity_samples(engine, engine.schemes[scheme_id], 20, seed=3))
+        samples = hub.get_all()
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.classify_all_samples(samples, scheme_id, version=hub.version)
+            memo = engine._derived_memo
+            before = hub.version
+            samples[0]['Zr_ppm'] = 123.0
+            engine.classify_all_samples(samples, scheme_id, version=before)
+        report.add_result(
+            "Derived memo after silent edit",
+            hub.version != before and engine._derived_memo is not memo,
+            details=f"{before} -> {hub.version}"
+        )
+    except Exception as e:
+        report.add_result("Derived memo after silent edit", False, error=str(e))
 
-            try:
-                results = engine.classify_all_samples(samples, scheme_id)
-                report.add_result(
-                    f"Batch classify with {schemes[0]['name']}",
-                    len(results) == len(samples),
-                    details=f"Classified {len(results)} samples"
-                )
 
-                # Count classifications
-                classified = sum(1 for r in results if r['classification'] not in ['UNCLASSIFIED', 'INVALID_SAMPLE'])
-                report.add_result(
-                    "Batch classification rate",
-                    True,
-                    details=f"{classified}/{len(samples)} samples classified"
-                )
-            except Exception as e:
-                report.add_result("Batch classification", False, error=str(e))
+def test_run_all_scheduler(report: TestReport):
+    """Run-all scheduler: one pass over all schemes, streamed shards, cancel"""
 
-        # Test get_page
+    if not TOOLKIT_AVAILABLE:
+        report.add_result("Run-all scheduler", False, error="Toolkit modules not available")
+        return
+
+    import io
+    import contextlib
+    from engines import classification_scheduler as scheduler
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ClassificationEngine()
+
+    scheme_ids = sorted(engine.schemes)
+    samples = []
+    for i, scheme_id in enumerate(scheme_ids[:10]):
+        samples.extend(_parity_samples(engine, engine.schemes[scheme_id], 120, seed=i))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = {sid: engine.classify_all_samples(samples, sid) for sid in scheme_ids}
+
+    def collect(job):
+        got = {}
+        shard_count = 0
+        while not job.finished:
+            for start, results in job.drain():
+                shard_count += 1
+                for sid, (classes, confidences, derived) in results.items():
+                    for offset, cls in enumerate(classes):
+                        got.setdefault(sid, {})[start + offset] = (cls, confidences[offset], derived[offset])
+            time.sleep(0.01)
+        return got, shard_count
+
+    def same(got):
+        for sid, results in expected.items():
+            rows = got.get(sid, {})
+            if len(rows) != len(results):
+                return False
+            for i, r in enumerate(results):
+                cls, conf, derived = rows[i]
+                if cls != r['classification'] or conf != r['confidence'] \
+                        or not _same_derived(derived, r['derived_fields']):
+                    return False
+        return True
+
+    # classify_many shares one derived-field pass across schemes
+    try:
+        many = engine.classify_many(samples, scheme_ids)
+        report.add_result(
+            "classify_many matches classify_all_samples",
+            all([r['classification'] for r in many[sid]] == [r['classification'] for r in expected[sid]]
+                for sid in scheme_ids),
+            details=f"{len(scheme_ids)} schemes x {len(samples)} samples"
+        )
+    except Exception as e:
+        report.add_result("classify_many matches classify_all_samples", False, error=str(e))
+
+    saved = (scheduler.PARALLEL_MIN_SAMPLES, scheduler.MIN_SHARD_SIZE)
+    try:
+        scheduler.MIN_SHARD_SIZE = 200
+
+        # Background thread
+        job = scheduler.RunAllScheduler(engine, samples, scheme_ids, max_workers=1).start()
+        got, shard_count = collect(job)
+        report.add_result(
+            "Scheduler (thread) streams shards",
+            job.mode == 'thread' and shard_count > 1 and same(got) and job.completed == len(samples),
+            details=f"{shard_count} shards, {job.completed}/{job.total} samples"
+        )
+
+        # Process pool
+        scheduler.PARALLEL_MIN_SAMPLES = 0
+        job = scheduler.RunAllScheduler(engine, samples, scheme_ids, max_workers=2).start()
+        got, shard_count = collect(job)
+        report.add_result(
+            "Scheduler (process pool) matches",
+            job.error is None and same(got) and job.completed == len(samples),
+            details=f"mode={job.mode}, {shard_count} shards"
+        )
+
+        # Columnar hub: arrays are snapshotted, later edits don't leak in
+        hub = DataHub('columnar')
+        hub.add_samples([dict(s) for s in samples])
+        job = scheduler.RunAllScheduler(engine, hub.get_all(), scheme_ids, max_workers=2)
+        hub.clear_all()
+        job.start()
+        got, shard_count = collect(job)
+        report.add_result(
+            "Scheduler snapshots a columnar hub",
+            job.error is None and same(got) and job.completed == len(samples)
+            and job.mode == ('process' if scheduler.fork_available() else 'thread'),
+            details=f"mode={job.mode}, {shard_count} shards"
+        )
+
+        # Cancel before any shard runs
+        scheduler.PARALLEL_MIN_SAMPLES = saved[0]
+        job = scheduler.RunAllScheduler(engine, samples, scheme_ids, max_workers=1)
+        job.cancel()
+        job.start()
+        got, shard_count = collect(job)
+        report.add_result(
+            "Scheduler cancel",
+            job.cancelled and shard_count == 0 and job.completed == 0,
+            details=f"{job.completed}/{job.total} samples after cancel"
+        )
+    except Exception as e:
+        report.add_result("Run-all scheduler", False, error=str(e))
+    finally:
+        scheduler.PARALLEL_MIN_SAMPLES, scheduler.MIN_SHARD_SIZE = saved
+
+
+def test_scheme_cache(report: TestReport):
+    """On-disk scheme index, lazy scheme loading and the shared engine"""
+
+    if not TOOLKIT_AVAILABLE:
+        report.add_result("Scheme cache", False, error="Toolkit modules not available")
+        return
+
+    import io
+    import shutil
+    import contextlib
+    import tempfile
+    from engines import scheme_cache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache_file = tmp / "scheme_cache.json"
+
+        # Cold start builds the index; no scheme is parsed until it is used
         try:
-            page = hub.get_page(0, page_size=5)
+            with contextlib.redirect_stdout(io.StringIO()):
+                engine = ClassificationEngine(cache_file=str(cache_file))
+            with open(cache_file) as f:
+                index = json.load(f)
+            listed = engine.get_available_schemes()
+            loaded = [sid for sid in engine.schemes if engine.schemes.is_loaded(sid)]
             report.add_result(
-                "Get page from DataHub",
-                len(page) == 5,
-                details=f"Page 0: {len(page)} samples"
+                "Index written on cold start",
+                len(index['entries']['scheme']) == len(engine.schemes) > 0,
+                details=f"{len(index['entries']['scheme'])} entries for {len(engine.schemes)} schemes"
+            )
+            report.add_result(
+                "Schemes load lazily",
+                not loaded and len(listed) == len(engine.schemes),
+                details=f"{len(listed)} listed, {len(loaded)} parsed"
+            )
+            scheme_id = sorted(engine.schemes)[0]
+            engine.classify_sample({'SiO2_wt': 50.0}, scheme_id)
+            report.add_result(
+                "Scheme parsed on first use",
+                engine.schemes.is_loaded(scheme_id)
+                and sum(engine.schemes.is_loaded(sid) for sid in engine.schemes) == 1
             )
         except Exception as e:
-            report.add_result("Get page", False, error=str(e))
+            report.add_result("Index written on cold start", False, error=str(e))
 
-        # Test get_selected
+        # Warm start: nothing is re-summarized; touched files only re-hash
         try:
-            selected = hub.get_selected([0, 2, 4])
+            schemes_dir = tmp / "schemes"
+            shutil.copytree(Path(engine.schemes_dir), schemes_dir)
+            calls = []
+
+            def summarize(data):
+                calls.append(1)
+                return {'name': data.get('scheme_name')}
+
+            scheme_cache.SchemeCache(tmp / "index.json").scan(schemes_dir, 'scheme', summarize)
+            cold = len(calls)
+            calls.clear()
+            scheme_cache.SchemeCache(tmp / "index.json").scan(schemes_dir, 'scheme', summarize)
+            warm = len(calls)
+
+            first = sorted(schemes_dir.glob("*.json"))[-1]
+            stat = first.stat()
+            os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            scheme_cache.SchemeCache(tmp / "index.json").scan(schemes_dir, 'scheme', summarize)
+            touched = len(calls)
+
+            data = json.loads(first.read_text(encoding='utf-8'))
+            data['scheme_name'] = "Renamed scheme"
+            first.write_text(json.dumps(data), encoding='utf-8')
+            entries = scheme_cache.SchemeCache(tmp / "index.json").scan(schemes_dir, 'scheme', summarize)
             report.add_result(
-                "Get selected samples",
+                "Warm start skips parsing",
+                cold > 0 and warm == 0 and touched == 0,
+                details=f"cold={cold} warm={warm} touched={touched}"
+            )
+            report.add_result(
+                "Changed file re-indexed",
+                len(calls) == 1 and entries[first.stem]['summary']['name'] == "Renamed scheme"
+            )
+        except Exception as e:
+            report.add_result("Warm start skips parsing", False, error=str(e))
+
+        # A scheme file that breaks after the scan
+        try:
+            schemes_dir = tmp / "broken"
+            shutil.copytree(Path(engine.schemes_dir), schemes_dir)
+            with contextlib.redirect_stdout(io.StringIO()):
+                cold = ClassificationEngine(str(schemes_dir), cache_file=str(tmp / "cold.json"))
+                # A later session: same index, nothing parsed during its scan
+                shutil.copy(tmp / "cold.json", tmp / "warm.json")
+                warm = ClassificationEngine(str(schemes_dir), cache_file=str(tmp / "warm.json"))
+            scheme_id = sorted(cold.schemes)[0]
+            (schemes_dir / f"{scheme_id}.json").write_text("{ not json", encoding='utf-8')
+            with contextlib.redirect_stdout(io.StringIO()):
+                stale = cold.schemes[scheme_id]
+            try:
+                warm.schemes[scheme_id]
+                message = ''
+            except KeyError as e:
+                message = str(e)
+            report.add_result(
+                "Broken scheme file after scan",
+                stale['scheme_name'] and scheme_id in warm.schemes
+                and message.startswith(f"Scheme '{scheme_id}' is listed but"),
+                details=message
+            )
+        except Exception as e:
+            report.add_result("Broken scheme file after scan", False, error=str(e))
+
+    # Engines, diagrams and GeoPlot Pro share one cache module
+    try:
+        import engines.scheme_cache
+        from engines import classification_engine, diagram_engine
+        report.add_result(
+            "One shared cache instance",
+            classification_engine.get_scheme_cache() is engines.scheme_cache.get_scheme_cache()
+            and diagram_engine.get_scheme_cache() is engines.scheme_cache.get_scheme_cache()
+            and 'scheme_cache' not in sys.modules
+        )
+    except Exception as e:
+        report.add_result("One shared cache instance", False, error=str(e))
+
+    # ProtocolEngine reuses the engine it is given
+    try:
+        from engines.protocol_engine import ProtocolEngine
+        with contextlib.redirect_stdout(io.StringIO()):
+            protocol = ProtocolEngine(classification_engine=engine)
+        report.add_result(
+            "Shared classification engine",
+            protocol.classification_engine is engine
+        )
+    except Exception as e:
+        report.add_result("Shared classification engine", False, error=str(e))
+
+
+def _point_in_polygon(x, y, polygon):
+    """Scalar even-odd reference for the vectorized diagram engine."""
+    inside = False
+    x1, y1 = polygon[-1]
+    for x2, y2 in polygon:
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+def test_diagram_engine(report: TestReport):
+    """Diagram engine: indexed, vectorized point-in-polygon vs a scalar reference"""
+
+    if not TOOLKIT_AVAILABLE:
+        report.add_result("Diagram engine", False, error="Toolkit modules not available")
+        return
+
+    import io
+    import math
+    import random
+    import contextlib
+    import numpy as np
+    from engines.diagram_engine import DiagramEngine
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine = DiagramEngine()
+            diagrams = {did: engine.get_compiled_diagram(did) for did in engine.schemes}
+        empty = [did for did, d in diagrams.items() if not d.regions]
+        report.add_result(
+            "Diagrams compile",
+            len(diagrams) > 0 and not empty,
+            details=f"{len(diagrams)} diagrams, {sum(len(d.regions) for d in diagrams.values())} regions"
+        )
+    except Exception as e:
+        report.add_result("Diagrams compile", False, error=str(e))
+        return
+
+    # Random points over each diagram's region extent, fed in as axis values
+    try:
+        rng = random.Random(7)
+        mismatches = []
+        hits = 0
+        for did, diagram in diagrams.items():
+            x0, y0, width, height = diagram.extent
+            samples, points = [], []
+            while len(samples) < 300:
+                x = x0 + rng.uniform(-0.1, 1.1) * width
+                y = y0 + rng.uniform(-0.1, 1.1) * height
+                if diagram.ternary:
+                    c = y / (math.sqrt(3) / 2)
+                    b = x - c / 2
+                    a = 1 - b - c
+                    if min(a, b, c) < 0:
+                        continue
+                    values = (a * 100, b * 100, c * 100)
+                else:
+                    values = tuple(10 ** v if log else v for v, log in zip((x, y), diagram.log_axes))
+                    if any(v <= 0 for v, log in zip(values, diagram.log_axes) if not log):
+                        continue
+                samples.append(dict(zip(diagram.axis_fields, values)))
+                points.append((x, y))
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = engine.classify_many(samples, [did])[did]
+            for (x, y), result in zip(points, results):
+                expected = next((r[0] for r in diagram.regions if _point_in_polygon(x, y, r[3])),
+                                "UNCLASSIFIED")
+                hits += expected != "UNCLASSIFIED"
+                if result['classification'] != expected:
+                    mismatches.append((did, x, y, result['classification'], expected))
+        report.add_result(
+            "Vectorized matches scalar point-in-polygon",
+            not mismatches and hits > 0,
+            details=f"{hits} points inside regions across {len(diagrams)} diagrams",
+            error=str(mismatches[:3]) if mismatches else None
+        )
+    except Exception as e:
+        report.add_result("Vectorized matches scalar point-in-polygon", False, error=str(e))
+
+    # Log axes and derived axis fields: Zr/Y = 5, Nb/Y = 0.8 plots in WPA
+    try:
+        sample = {'Zr_ppm': 100.0, 'Y_ppm': 20.0, 'Nb_ppm': 16.0}
+        with contextlib.redirect_stdout(io.StringIO()):
+            name, _, _, axis_values = engine.classify_sample(sample, 'meschede_zr_y_nb_y_1986')
+            zero = engine.classify_sample({'Zr_ppm': 0.0, 'Y_ppm': 20.0, 'Nb_ppm': 16.0},
+                                          'meschede_zr_y_nb_y_1986')[0]
+        report.add_result(
+            "Log-axis diagram with derived axes",
+            name == "WPA" and abs(axis_values['Zr_Y'] - 5.0) < 1e-12 and zero == "INSUFFICIENT_DATA",
+            details=f"{name}, Zr/Y=0 -> {zero}"
+        )
+    except Exception as e:
+        report.add_result("Log-axis diagram with derived axes", False, error=str(e))
+
+    # Ternary values are closed to 100%: a scaled composition plots at the same place
+    try:
+        did = 'cabanis_la_th_sc_1989'
+        region = diagrams[did].diagram['fields'][0]
+        centroid = [sum(p[i] for p in region['points']) / len(region['points']) for i in range(3)]
+        sample = dict(zip(diagrams[did].axis_fields, [v * 3.7 for v in centroid]))
+        with contextlib.redirect_stdout(io.StringIO()):
+            name = engine.classify_sample(sample, did)[0]
+        report.add_result("Ternary closure", name == region['name'], details=name)
+    except Exception as e:
+        report.add_result("Ternary closure", False, error=str(e))
+
+    # Columnar DataHub rows give the same codes as plain dicts
+    try:
+        rng = random.Random(11)
+        fields = set().union(*(d.sample_fields for d in diagrams.values()))
+        samples = [{f: 10 ** rng.uniform(-1, 4) for f in fields if rng.random() < 0.8}
+                   for _ in range(2000)]
+        hub = DataHub('columnar')
+        hub.add_samples(samples)
+        with contextlib.redirect_stdout(io.StringIO()):
+            from_dicts = engine.locate_many(samples, list(diagrams))
+            from_columns = engine.locate_many(hub.get_all(), list(diagrams))
+        report.add_result(
+            "Columnar rows match dict rows",
+            all(np.array_equal(from_dicts[d], from_columns[d]) for d in diagrams),
+            details=f"{len(samples)} samples x {len(diagrams)} diagrams"
+        )
+    except Exception as e:
+        report.add_result("Columnar rows match dict rows", False, error=str(e))
+
+
+def test_table_view(report: TestReport):
+    """Incremental table view: patched by DataHub row events vs a full rebuild"""
+
+    if not TOOLKIT_AVAILABLE:
+        report.add_result("Table view", False, error="Toolkit modules not available")
+        return
+
+    import random
+    from ui.table_view import TableView
+
+    rng = random.Random(3)
+    classes = ['Basalt', 'Andesite', 'Rhyolite']
+
+    def make(i):
+        return {'Sample_ID': f"S{i:05d}", 'Zr_ppm': rng.randint(50, 400),
+                'Notes': rng.choice(['core', 'outcrop', 'float']),
+                'Classification': rng.choice(classes)}
+
+    # Row events carry the rows they touched
+    try:
+        hub = DataHub()
+        events = []
+
+        class Recorder:
+            def on_data_changed(self, event, *args):
+                events.append((event,) + args)
+
+        hub.register_observer(Recorder())
+        hub.add_samples([make(i) for i in range(10)])
+        hub.update_row(4, {'Zr_ppm': 1})
+        hub.update_rows([dict(s) for s in hub.get_all()[:3]])
+        hub.delete_rows([7, 2, 99])
+        report.add_result(
+            "DataHub events carry row indices",
+            events == [('samples_added', 0, 10), ('update', 4), ('samples_updated', [0, 1, 2]),
+                       ('samples_deleted', 3, [2, 7])],
+            details=str(events)
+        )
+    except Exception as e:
+        report.add_result("DataHub events carry row indices", False, error=str(e))
+
+    # Random edits / appends / deletions, patched in place, against a fresh rebuild
+    for backend in ('dict', 'columnar'):
+        try:
+            hub = DataHub(backend)
+            hub.add_samples([make(i) for i in range(400)])
+            order = sorted(range(400), key=lambda i: hub.get_all()[i]['Zr_ppm'])
+            view = TableView()
+            view.rebuild(hub.get_all(), [], search="core", order=order)
+
+            class Patcher:
+                def on_data_changed(self, event, *args):
+                    samples = hub.get_all()
+                    if event == 'update':
+                        view.row_updated(args[0], samples[args[0]], [])
+                    elif event == 'samples_added':
+                        view.rows_added(args[0], [samples[i] for i in range(args[0], args[0] + args[1])], [])
+                    elif event == 'samples_deleted':
+                        view.rows_deleted(args[1])
+
+            hub.register_observer(Patcher())
+            for step in range(300):
+                action = rng.random()
+                count = hub.row_count()
+                if action < 0.6:
+                    hub.update_row(rng.randrange(count), {'Notes': rng.choice(['core', 'float', 'hardcore'])})
+                elif action < 0.8:
+                    hub.add_samples([make(count + i) for i in range(rng.randint(1, 5))])
+                else:
+                    hub.delete_rows(rng.sample(range(count), rng.randint(1, 4)))
+
+            fresh = TableView()
+            fresh.rebuild(hub.get_all(), [], search="core", order=list(order))
+            expected = [i for i in order if "core" in str(hub.get_all()[i]['Notes'])]
+            report.add_result(
+                f"Patched view matches rebuild ({backend})",
+                view.indices == fresh.indices == expected and len(order) == hub.row_count(),
+                details=f"{len(view)} of {hub.row_count()} rows visible"
+            )
+        except Exception as e:
+            report.add_result(f"Patched view matches rebuild ({backend})", False, error=str(e))
+
+    # Classification filter prefers engine results over the sample's own label
+    try:
+        samples = [make(i) for i in range(50)]
+        results = [{'classification': 'Basalt'} if i % 2 else None for i in range(50)]
+        view = TableView()
+        view.rebuild(samples, results, filter_class='Basalt')
+        expected = [i for i in range(50) if i % 2 or samples[i]['Classification'] == 'Basalt']
+        report.add_result(
+            "Classification filter",
+            view.indices == expected and view.page(1, 10) == expected[10:20]
+            and view.position(expected[3]) == 3,
+            details=f"{len(view)} rows"
+        )
+    except Exception as e:
+        report.add_result("Classification filter", False, error=str(e))
+
+    # Published view model: subscribers get the page; page_changes() patches a widget
+    try:
+        from ui.view_model import ViewModel, page_changes, column_widths
+        import random
+        rng = random.Random(16)
+
+        model = ViewModel()
+        seen = []
+        model.subscribe(lambda m: seen.append(m.page_indices()))
+        samples = [make(i) for i in range(50)]
+        view = TableView()
+        view.rebuild(samples, [], filter_class='Basalt')
+        model.publish(view, 1, 5)
+        published = seen == [view.indices[5:10]] and model.total == len(view)
+
+        def apply(shown, new):
+            # What the HUD does to its Treeview, on a plain list of (key, row)
+            removed, inserted, updated, reorder = page_changes(shown, new)
+            rows = dict(shown)
+            keys = [k for k, _ in shown if k not in set(removed)]
+            for pos, (key, row) in enumerate(new):
+                if key in inserted or reorder:
+                    if key in keys:
+                        keys.remove(key)
+                    keys.insert(pos, key)
+                rows[key] = updated.get(key, row if key in inserted else rows[key])
+            touched = len(removed) + len(inserted) + len(updated)
+            return [(k, rows[k]) for k in keys], touched
+
+        patched_ok = True
+        for _ in range(200):
+            old = [(k, rng.choice('ab')) for k in rng.sample(range(30), rng.randint(0, 12))]
+            new = [(k, rng.choice('ab')) for k in rng.sample(range(30), rng.randint(0, 12))]
+            if rng.random() < 0.5:
+                new = sorted(old)
+            patched, _ = apply(old, new)
+            patched_ok &= patched == new
+        same, touched = apply(old, list(old))
+        widths = column_widths([("S1", "Basalt", "0.95", ""), ("LONGER_ID", "x" * 40, "", "")], 4)
+        report.add_result(
+            "View model publish and minimal page patches",
+            published and patched_ok and touched == 0 and same == old
+            and widths == [72, 200, 50, 50]
+        )
+    except Exception as e:
+        report.add_result("View model publish and minimal page patches", False, error=str(e))
+
+
+def test_search_index(report: TestReport):
+    """Search index: query syntax, index masks vs row-by-row matching, incremental upkeep"""
+
+    if not TOOLKIT_AVAILABLE:
+        report.add_result("Search index", False, error="Toolkit modules not available")
+        return
+
+    import random
+    from ui.search_index import SearchIndex, SearchQuery
+    from ui.table_view import TableView
+
+    rng = random.Random(9)
+    notes = ['Basalt flow', 'andesite', 'core B', 'trachy-basalt', 'Iceland', None]
+    queries = ['basalt', 'bas*', 'notes:core', 'zr_ppm>200', 'Zr_ppm >= 150', 'zr_ppm!=150',
+               'classification=basalt', 'classification!=basalt', '150', 's00*  zr_ppm<100',
+               'trachy-basalt', 'dac* notes:core', 'missing:x', '15', '15*', 'zr_ppm:0.0',
+               '2* notes:core', 'zr_ppm=150.0']
+
+    def make(i):
+        sample = {'Sample_ID': f"S{i:04d}", 'Zr_ppm': rng.choice([None, rng.randint(0, 400), 150.0]),
+                  'Notes': rng.choice(notes)}
+        if rng.random() < 0.4:
+            sample['Classification'] = rng.choice(['Basalt', 'Andesite', 'basalt flow'])
+        return {k: v for k, v in sample.items() if v is not None}
+
+    # Query syntax
+    try:
+        sample = {'Sample_ID': 'S1', 'Zr_ppm': 250.0, 'Notes': 'Core B', 'Classification': 'Basalt'}
+        checks = {
+            'core b': True,           # plain text: the whole string is one substring
+            'core s1': False,
+            'zr_ppm>200': True,
+            'zr_ppm > 300': False,
+            'notes:core classification=basalt': True,
+            'classification=bas': False,
+            'cor* zr_ppm<=250': True,
+            '250': True,              # numeric cells match by value ...
+            '250.00': True,
+            '25': True,               # ... and as text, like any other cell
+            '50.0': True,
+            '25*': True,
+            '250.00*': False,
+            '50*': False,
+            'zr_ppm=25': False,
+            'zr_ppm!=250.0': False,
+        }
+        got = {q: SearchQuery(q).match_row(sample) for q in checks}
+        # Substring and prefix terms find numbers as the old str() search did
+        numeric = {'15': True, '15*': True, '150.0': True, '1500*': False, '5*': False}
+        got_numeric = {q: SearchQuery(q).match_row({'Sample_ID': 'S2', 'Zr_ppm': 150})
+                       for q in numeric}
+        report.add_result("Query syntax", got == checks and got_numeric == numeric,
+                          details=f"{got} {got_numeric}")
+    except Exception as e:
+        report.add_result("Query syntax", False, error=str(e))
+
+    # A prefix that is not a column stays plain text
+    try:
+        columns = ['Sample_ID', 'Zr_ppm', 'Notes']
+        row = {'Sample_ID': 'S3', 'Zr_ppm': 250.0, 'Notes': 'see http://x.org, note: core'}
+        plain = {'http://x.org': True, 'note: core': True, 'note:core': False,
+                 'notes:core zr_ppm > 200': True, 'Notes : core': True, 'ZR_PPM>300': False}
+        got = {q: SearchQuery(q, columns).match_row(row) for q in plain}
+        report.add_result(
+            "Unknown column prefixes are plain text",
+            got == plain and not SearchQuery('http://x.org', columns).terms[0].column,
+            details=f"{got}"
+        )
+    except Exception as e:
+        report.add_result("Unknown column prefixes are plain text", False, error=str(e))
+
+    for backend in ('dict', 'columnar'):
+        try:
+            hub = DataHub(backend)
+            hub.add_samples([make(i) for i in range(400)])
+            index = SearchIndex()
+
+            def mismatches():
+                samples = hub.get_all()
+                bad = []
+                for q in queries:
+                    query = SearchQuery(q)
+                    mask = index.mask(query, samples, hub.get_column_names())
+                    if mask.tolist() != [query.match_row(samples[i]) for i in range(len(samples))]:
+                        bad.append(q)
+                return bad
+
+            built = mismatches()
+
+            class Maintainer:
+                def on_data_changed(self, event, *args):
+                    samples = hub.get_all()
+                    if event == 'update':
+                        index.row_updated(args[0], samples[args[0]])
+                    elif event == 'samples_added':
+                        index.rows_added(args[0], [samples[i] for i in range(args[0], args[0] + args[1])])
+                    elif event == 'samples_deleted':
+                        index.rows_deleted(args[1])
+
+            hub.register_observer(Maintainer())
+            for step in range(150):
+                action = rng.random()
+                count = hub.row_count()
+                if action < 0.6:
+                    hub.update_row(rng.randrange(count), {'Notes': rng.choice(notes[:-1]),
+                                                          'Zr_ppm': rng.randint(0, 400)})
+                elif action < 0.8:
+                    hub.add_samples([make(count + i) for i in range(rng.randint(1, 5))])
+                else:
+                    hub.delete_rows(rng.sample(range(count), rng.randint(1, 4)))
+            maintained = index.ready
+            patched = mismatches()
+            report.add_result(
+                f"Index masks match row matching ({backend})",
+                not built and not patched and maintained,
+                details=f"built: {built}, after edits: {patched}, kept current: {maintained}"
+            )
+        except Exception as e:
+            report.add_result(f"Index masks match row matching ({backend})", False, error=str(e))
+
+    # Table view rebuilt through the index == rebuilt row by row
+    try:
+        samples = [make(i) for i in range(300)]
+        results = [{'classification': 'Basalt'} if i % 3 == 0 else None for i in range(300)]
+        order = sorted(range(300), key=lambda i: samples[i]['Sample_ID'], reverse=True)
+        index = SearchIndex()
+        same = True
+        for q in queries:
+            with_index, by_row = TableView(), TableView()
+            with_index.rebuild(samples, results, q, 'Basalt', list(order), index=index)
+            by_row.rebuild(samples, results, q, 'Basalt', list(order))
+            same &= with_index.indices == by_row.indices
+        report.add_result("Table view with index", same)
+    except Exception as e:
+        report.add_result("Table view with index", False, error=str(e))
+
+
+def test_sort_index(report: TestReport):
+    """Cached sort orders: typed keys, stable reverse and multi-column sorts, invalidation"""
+
+    if not TOOLKIT_AVAILABLE:
+        report.add_result("Sort index", False, error="Toolkit modules not available")
+        return
+
+    import random
+    from ui.sort_index import SortIndex, sort_value, order_by_keys
+
+    rng = random.Random(10)
+
+    def make(i):
+        sample = {'Sample_ID': f"S{rng.randint(0, 60)}",
+                  'Zr_ppm': rng.choice([None, rng.randint(0, 40), '12', '', 1.5, 'bdl', 'BDL']),
+                  'SiO2': rng.choice([None, float(rng.randint(45, 55))])}
+        return {k: v for k, v in sample.items() if v is not None}
+
+    def python_sort(samples, keys):
+        order = list(range(len(samples)))
+        for column, reverse in reversed(keys):
+            order.sort(key=lambda i: sort_value(samples[i].get(column)), reverse=reverse)
+        return order
+
+    sorts = [[('Zr_ppm', False)], [('Zr_ppm', True)], [('SiO2', True)],
+             [('Sample_ID', False), ('Zr_ppm', True)],
+             [('SiO2', True), ('Sample_ID', False), ('Zr_ppm', False)]]
+    rows = [make(i) for i in range(1500)]
+
+    for backend in ('dict', 'columnar'):
+        try:
+            hub = DataHub(backend)
+            hub.add_samples([dict(r) for r in rows])
+            index = SortIndex()
+            wrong = [keys for keys in sorts
+                     if index.order(hub.get_all(), keys) != python_sort(hub.get_all(), keys)]
+            again = all(index.order(hub.get_all(), keys) == python_sort(hub.get_all(), keys)
+                        for keys in sorts)
+            report.add_result(
+                f"Typed, stable sorts match list.sort ({backend})",
+                not wrong and again,
+                details=f"mismatched: {wrong}"
+            )
+        except Exception as e:
+            report.add_result(f"Typed, stable sorts match list.sort ({backend})", False, error=str(e))
+
+    # Cached orders are dropped on invalidate()
+    try:
+        hub = DataHub()
+        hub.add_samples([dict(r) for r in rows[:100]])
+        index = SortIndex()
+        before = index.order(hub.get_all(), [('Zr_ppm', False)])
+        hub.update_row(before[0], {'Zr_ppm': 'zzz'})
+        stale = index.order(hub.get_all(), [('Zr_ppm', False)])
+        index.invalidate()
+        fresh = index.order(hub.get_all(), [('Zr_ppm', False)])
+        report.add_result(
+            "Invalidation",
+            stale == before and fresh == python_sort(hub.get_all(), [('Zr_ppm', False)])
+            and fresh[-1] == before[0]
+        )
+    except Exception as e:
+        report.add_result("Invalidation", False, error=str(e))
+
+    # An edited row moves to its new slot in the view's sort order
+    try:
+        from ui.table_view import TableView
+        hub = DataHub()
+        hub.add_samples([dict(r) for r in rows[:300]])
+        samples = hub.get_all()
+        keys = [('Zr_ppm', True), ('Sample_ID', False)]
+        view = TableView()
+        view.rebuild(samples, [], order=SortIndex().order(samples, keys))
+        edits = [(view.indices[0], 'zzz'), (view.indices[-1], 99), (view.indices[150], '')]
+        for idx, value in edits:
+            hub.update_row(idx, {'Zr_ppm': value})
+            view.row_resorted(idx, samples, keys)
+            view.row_updated(idx, samples[idx], [])
+        expected = python_sort(samples, keys)
+        report.add_result(
+            "Edited rows re-sorted in place",
+            view.indices == expected and view.order == expected
+            and [view.position(i) for i in expected] == list(range(len(expected)))
+        )
+    except Exception as e:
+        report.add_result("Edited rows re-sorted in place", False, error=str(e))
+
+    try:
+        keys = [rng.choice(['Basalt', 'Andesite', 'UNCLASSIFIED']) for _ in range(200)]
+        confs = [rng.choice([0.0, 0.5, 0.9]) for _ in range(200)]
+        ok = all(order_by_keys(k, rev) == sorted(range(200), key=k.__getitem__, reverse=rev)
+                 for k in (keys, confs) for rev in (False, True))
+        report.add_result("Precomputed key sorts (HUD)", ok)
+    except Exception as e:
+        report.add_result("Precomputed key sorts (HUD)", False, error=str(e))
+
+
+def test_project_format(report: TestReport):
+    """Binary .stproj container: round trip, lazy columns, checksums, JSON detection"""
+
+    if not TOOLKIT_AVAILABLE:
+        report.add_result("Project format", False, error="Toolkit modules not available")
+        return
+
+    import random
+    import tempfile
+    import numpy as np
+    from features.project_format import (ProjectFormatError, ProjectReader, hub_columns,
+                                         is_binary_project, write_project)
+
+    rng = random.Random(14)
+    rows = []
+    for i in range(2000):
+        sample = {'Sample_ID': f"S{i:05d}",
+                  'Zr_ppm': rng.choice([None, rng.random() * 300, float('nan')]),
+                  'Count': rng.choice([None, rng.randint(-5, 10 ** 12)]),
+                  'Notes': rng.choice([None, 'core', 'Ünïcode', '', 'x' * 40]),
+                  'Mixed': rng.choice([None, 1.5, 'bdl', 3, True])}
+        rows.append({k: v for k, v in sample.items() if v is not None})
+    state = {'metadata': {'version': '2.0'}, 'data': {'column_order': ['Sample_ID', 'Zr_ppm']},
+             'ui_state': {'center': {'search_text': 'Zr_ppm>10'}}, 'settings': {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "project.stproj"
+        for backend in ('dict', 'columnar'):
+            try:
+                hub = DataHub(backend)
+                hub.add_samples([dict(r) for r in rows])
+                count, columns = hub_columns(hub)
+                write_project(path, state, columns, count)
+                reader = ProjectReader(path)
+                reader.verify()
+                restored = DataHub(backend)
+                restored.add_columns(reader.columns(), reader.count)
+                expected = json.dumps(hub.to_records(), sort_keys=True)
+                report.add_result(
+                    f"Round trip matches the JSON records ({backend})",
+                    json.dumps(restored.to_records(), sort_keys=True) == expected
+                    and json.dumps(reader.records(), sort_keys=True) == expected
+                    and reader.to_json_dict()['ui_state'] == state['ui_state']
+                )
+            except Exception as e:
+                report.add_result(f"Round trip matches the JSON records ({backend})", False, error=str(e))
+
+        try:
+            values, present = ProjectReader(path).column('Zr_ppm')
+            report.add_result(
+                "Numeric columns are memory-mapped",
+                isinstance(values, np.memmap) and not values.flags.writeable
+                and int(present.sum()) == sum('Zr_ppm' in r for r in rows)
+            )
+        except Exception as e:
+            report.add_result("Numeric columns are memory-mapped", False, error=str(e))
+
+        # The columnar hub keeps the maps as storage; edits never reach the file
+        try:
+            saved = path.read_bytes()
+            reader = ProjectReader(path)
+            hub = DataHub('columnar')
+            hub.add_columns(reader.columns(private=True), reader.count)
+            mapped = isinstance(hub._store._numeric['Zr_ppm'], np.memmap)
+            hub.update_row(0, {'Zr_ppm': -1.0})
+            hub.add_samples([{'Sample_ID': 'NEW', 'Zr_ppm': 2.0}])
+            hub.detach_mapped_columns()
+            report.add_result(
+                "Columnar load keeps mapped columns",
+                mapped and path.read_bytes() == saved
+                and hub.get_all()[0]['Zr_ppm'] == -1.0 and hub.get_by_id('NEW')['Zr_ppm'] == 2.0
+                and not isinstance(hub._store._numeric['Zr_ppm'], np.memmap)
+            )
+        except Exception as e:
+            report.add_result("Columnar load keeps mapped columns", False, error=str(e))
+
+        try:
+            data = bytearray(path.read_bytes())
+            data[-3] ^= 0xFF
+            damaged = Path(tmp) / "damaged.stproj"
+            damaged.write_bytes(bytes(data))
+            try:
+                ProjectReader(damaged).verify()
+                caught = False
+            except ProjectFormatError:
+                caught = True
+            truncated = Path(tmp) / "truncated.stproj"
+            truncated.write_bytes(bytes(data[:len(data) // 2]))
+            try:
+                ProjectReader(truncated)
+                cut = False
+            except ProjectFormatError:
+                cut = True
+            legacy = Path(tmp) / "legacy.stproj"
+            legacy.write_text(json.dumps({'metadata': {}, 'data': {'samples': rows[:3]}}))
+            report.add_result(
+                "Damage, truncation and JSON projects are detected",
+                caught and cut and is_binary_project(path) and not is_binary_project(legacy)
+            )
+        except Exception as e:
+            report.add_result("Damage, truncation and JSON projects are detected", False, error=str(e))
+
+
+def test_change_journal(report: TestReport):
+    """Auto-save journal: replay parity, size per edit, compaction, torn writes"""
+
+    if not TOOLKIT_AVAILABLE:
+        report.add_result("Change journal", False, error="Toolkit modules not available")
+        return
+
+    import random
+    import tempfile
+    from features.change_journal import ChangeJournal
+
+    rng = random.Random(15)
+    rows = [{'Sample_ID': f"S{i:04d}", 'Zr_ppm': rng.random() * 300,
+             'Notes': rng.choice(['core', 'rim', 'Ünïcode'])} for i in range(3000)]
+
+    def restore_into(hub):
+        def restore(state, columns):
+            hub.clear_all()
+            count, arrays = columns
+            if count:
+                hub.add_columns(arrays, count)
+        return restore
+
+    def edit(hub):
+        hub.update_row(5, {'Zr_ppm': 'bdl', 'New': 1})
+        hub.add_samples([{'Sample_ID': 'X1', 'Zr_ppm': 2.0}, {'Notes': 'no id'}])
+        hub.delete_rows([0, 7, 2999])
+        changed = [dict(r) for r in hub.get_all()[:3]]
+        changed[1] = {'Sample_ID': 'REPLACED'}
+        hub.update_rows(changed)
+
+    for backend in ('dict', 'columnar'):
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                hub = DataHub(backend)
+                journal = ChangeJournal(tmp)
+                hub.register_observer(type('Obs', (), {'on_data_changed': lambda self, e, *a:
+                                                       journal.record(e, a, hub.samples)})())
+                hub.add_samples([dict(r) for r in rows])
+                size = journal.compact(journal.capture(hub, {'metadata': {}}))
+                edit(hub)
+                written = journal.flush()
+
+                recovered = DataHub(backend)
+                again = ChangeJournal(tmp)
+                replayed = again.recover(recovered, restore_into(recovered))
+                same = (json.dumps(recovered.to_records(), sort_keys=True) ==
+                        json.dumps(hub.to_records(), sort_keys=True))
+                report.add_result(
+                    f"Snapshot + journal replay matches ({backend})",
+                    same and replayed == 4 and 0 < written < size / 20
+                    and not journal.needs_compaction(),
+                    details=f"replayed {replayed}, journal {written} B, snapshot {size} B"
+                )
+            except Exception as e:
+                report.add_result(f"Snapshot + journal replay matches ({backend})", False, error=str(e))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            hub = DataHub()
+            journal = ChangeJournal(tmp, min_compact_bytes=0, max_entry_rows=100)
+            hub.register_observer(type('Obs', (), {'on_data_changed': lambda self, e, *a:
+                                                   journal.record(e, a, hub.samples)})())
+            first = journal.needs_compaction()
+            hub.add_samples([dict(r) for r in rows[:50]])
+            journal.compact(journal.capture(hub, {}))
+            settled = journal.needs_compaction()
+            hub.add_samples([dict(r) for r in rows[50:500]])      # too large: gap
+            gap = journal.needs_compaction()
+            journal.flush()
+            journal.compact(journal.capture(hub, {}))
+            for i in range(40):
+                hub.update_row(i, {'Zr_ppm': float(i)})
+            journal.flush()
+            grown = journal.needs_compaction()      # journal > half the snapshot
+            seq = journal._seq
+            report.add_result(
+                "Compaction on first save, gaps and journal growth",
+                first and not settled and gap and grown and ChangeJournal(tmp)._seq == seq
+            )
+
+            # A torn last line is ignored
+            with open(journal.journal_path, 'a', encoding='utf-8') as f:
+                f.write('{"seq": 999999, "op": "de')
+            recovered = DataHub()
+            ChangeJournal(tmp).recover(recovered, restore_into(recovered))
+            report.add_result(
+                "Torn journal write is skipped",
+                json.dumps(recovered.to_records(), sort_keys=True) ==
+                json.dumps(hub.to_records(), sort_keys=True)
+            )
+        except Exception as e:
+            report.add_result("Compaction on first save, gaps and journal growth", False, error=str(e))
+
+    # Chunked adds waiting for the first snapshot can't get around max_entry_rows
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            hub = DataHub()
+            journal = ChangeJournal(tmp, max_entry_rows=100)
+            hub.register_observer(type('Obs', (), {'on_data_changed': lambda self, e, *a:
+                                                   journal.record(e, a, hub.samples)})())
+            held = []
+            for start in range(0, 300, 30):
+                hub.add_samples([dict(r) for r in rows[start:start + 30]])
+                held.append(journal._pending_rows)
+            ops = [entry['op'] for entry in journal._pending]
+            report.add_result(
+                "Chunked adds coalesce into a gap",
+                max(held) <= 100 and ops == ['gap', 'add', 'add'] and journal.needs_compaction(),
+                details=f"rows held {held}, pending {ops}"
+            )
+        except Exception as e:
+            report.add_result("Chunked adds coalesce into a gap", False, error=str(e))
+
+
+def test_batch_processing(report: TestReport):
+    """Test batch processing capabilities"""
+
+    if not TOOLKIT_AVAILABLE:
+        report.add_result("Batch processing", False, error="Toolkit modules not available")
+        return
+
+    try:
+        from data_hub import DataHub
+        from engines.classification_engine import ClassificationEngine
+
+        hub = DataHub()
+        engine = ClassificationEngine()
+
+        # Create test dataset
+        samples = []
+        for i in range(20):
+            samples.append({
+                'Sample_ID': f'BATCH{i:03d}',
+                'Zr_ppm': 150 + (i * 5),
+                'Nb_ppm': 10 + (i * 2),
+                'C_N_Ratio': 3.2 if i < 10 else 4.5,
+                'Notes': f'Test sample {i}'
+            })
+
+        count = hub.add_samples(samples)
+        report.add_result(
+            "Add batch samples",
+            count == 20,
+            details=f"Added {count} samples to DataHub"
+        )
+
+        # Test batch classification
+        schemes = engine.get_available_schemes()
+        if schemes:
+            scheme_id = schemes[0]['id']
+
+            try:
+                results = engine.classify_all_samples(samples, scheme_id)
+                report.add_result(
+                    f"Batch classify with {schemes[0]['name']}",
+                    len(results) == len(samples),
+                    details=f"Classified {len(results)} samples"
+                )
+
+                # Count classifications
+                classified = sum(1 for r in results if r['classification'] not in ['UNCLASSIFIED', 'INVALID_SAMPLE'])
+                report.add_result(
+                    "Batch classification rate",
+                    True,
+                    details=f"{classified}/{len(samples)} samples classified"
+                )
+            except Exception as e:
+                report.add_result("Batch classification", False, error=str(e))
+
+        # Test get_page
+        try:
+            page = hub.get_page(0, page_size=5)
+            report.add_result(
+                "Get page from DataHub",
+                len(page) == 5,
+                details=f"Page 0: {len(page)} samples"
+            )
+        except Exception as e:
+            report.add_result("Get page", False, error=str(e))
+
+        # Test get_selected
+        try:
+            selected = hub.get_selected([0, 2, 4])
+            report.add_result(
+                "Get selected samples",
                 len(selected) == 3,
                 details=f"Retrieved {len(selected)} selected samples"
             )
@@ -1137,6 +2759,1044 @@ def test_batch_processing(report: TestReport):
         report.add_result("Batch processing setup", False, error=str(e))
 
 
+# ============================================================================
+# PLUGIN NUMERICS
+# ============================================================================
+
+def _load_plugin(name: str, folder: str = "software"):
+    """
+    Import a plugin file by path; raises ImportError if it needs a missing
+    package. matplotlib is switched to Agg and the plugin's own
+    matplotlib.use() calls (e.g. "TkAgg") are ignored, so plugins load
+    headless whatever another test already imported.
+    """
+    path = Path("plugins") / folder / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        import matplotlib
+    except ImportError:
+        spec.loader.exec_module(module)
+        return module
+    matplotlib.use("Agg")
+    use, matplotlib.use = matplotlib.use, lambda *args, **kwargs: None
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        matplotlib.use = use
+    return module
+
+
+def _import_failed(report: TestReport, test_name: str, error: ImportError):
+    """
+    Record a plugin that would not import: skipped (passed) when an optional
+    package is not installed, failed for any other import error.
+    """
+    package = (error.name or "").split(".")[0]
+    if package and importlib.util.find_spec(package) is None:
+        report.add_result(test_name, True, details=f"{package} not installed - skipped")
+    else:
+        report.add_result(test_name, False, error=f"Import failed: {error}")
+
+
+def _binary_mixing_scalar(target_13C, target_15N, em1_13C, em1_15N, em2_13C, em2_15N, tdf_13C, tdf_15N):
+    """The per-draw binary mixing equation the Monte Carlo loop used to call."""
+    import numpy as np
+    diet_13C = target_13C - tdf_13C
+    diet_15N = target_15N - tdf_15N
+    f_13C = (diet_13C - em1_13C) / (em2_13C - em1_13C) if em2_13C != em1_13C else np.nan
+    f_15N = (diet_15N - em1_15N) / (em2_15N - em1_15N) if em2_15N != em1_15N else np.nan
+    valid_fs = [f for f in [f_13C, f_15N] if not np.isnan(f) and 0 <= f <= 1]
+    if valid_fs:
+        return np.mean(valid_fs)
+    return np.nanmean([f_13C, f_15N])
+
+
+def test_monte_carlo(report: TestReport):
+    """Uncertainty propagation: vectorized Monte Carlo vs the per-iteration loop"""
+
+    try:
+        import numpy as np
+        mc = _load_plugin("uncertainty_propagation")
+    except ImportError as e:
+        _import_failed(report, "Monte Carlo engine", e)
+        return
+
+    rng = np.random.default_rng(17)
+    tol = 1e-12
+
+    # Binary mixing on arrays vs the scalar equation, in and out of range
+    try:
+        n = 500
+        args = [rng.normal(-18, 4, n), rng.normal(9, 3, n),
+                np.full(n, -21.0), np.full(n, 6.0), rng.choice([-12.0, -21.0], n), np.full(n, 12.0),
+                rng.normal(1, 0.5, n), rng.normal(3.4, 0.5, n)]
+        vec = mc.binary_mixing_vec(*args)
+        scalar = np.array([_binary_mixing_scalar(*(a[i] for a in args)) for i in range(n)])
+        report.add_result("Binary mixing vs scalar",
+                          np.allclose(vec, scalar, rtol=0, atol=tol, equal_nan=True),
+                          details=f"{n} draws, {np.isnan(scalar).sum()} NaN")
+    except Exception as e:
+        report.add_result("Binary mixing vs scalar", False, error=str(e))
+
+    def scalar_run(seed, n_iter, x, y, x_err, y_err, end_members, tdf, correlation, mixing):
+        """The old loop over iterations and samples, fed the engine's random stream."""
+        stream = np.random.default_rng(seed)
+        z = stream.standard_normal((n_iter, len(x), 2))
+        rows = np.flatnonzero(~np.isnan(end_members[:, 0::2]).any(axis=1))
+        tdf_13C = stream.normal(tdf[0], tdf[1], (n_iter, len(rows)))
+        tdf_15N = stream.normal(tdf[2], tdf[3], (n_iter, len(rows)))
+        col = {row: j for j, row in enumerate(rows)}
+        means, per_x, per_y = [], [[] for _ in x], [[] for _ in x]
+        per_f = [[] for _ in x]
+        for it in range(n_iter):
+            xs, ys = [], []
+            for i in range(len(x)):
+                x_pert = x[i] + z[it, i, 0] * x_err[i]
+                y_pert = y[i] + (correlation * z[it, i, 0]
+                                 + np.sqrt(1 - correlation ** 2) * z[it, i, 1]) * y_err[i]
+                xs.append(x_pert)
+                ys.append(y_pert)
+                per_x[i].append(x_pert)
+                per_y[i].append(y_pert)
+                if i in col:
+                    em = end_members[i]
+                    per_f[i].append(mixing(x_pert, y_pert, *em,
+                                           tdf_13C[it, col[i]], tdf_15N[it, col[i]]))
+            means.append((np.mean(xs), np.mean(ys)))
+        return np.array(means), per_x, per_y, per_f
+
+    n_iter, n = 400, 12
+    x = rng.normal(-18, 2, n)
+    y = rng.normal(9, 2, n)
+    x_err = rng.uniform(0.1, 0.3, n)
+    y_err = rng.uniform(0.1, 0.3, n)
+    tdf = (1.0, 0.4, 3.4, 0.6)
+
+    # Engine vs the per-iteration loop: ellipse, sample CIs, proportion stats
+    try:
+        end_members = np.tile([-21.0, 6.0, -12.0, 12.0], (n, 1))
+        end_members[3] = np.nan
+        engine = mc.MonteCarloEngine(n_iter, 0.95, seed=5)
+        result = engine.run_group(x, y, x_err, y_err, correlation=0.6, mixing=mc.binary_mixing_vec,
+                                  end_members=end_members, tdf=tdf, perturb_tdf=True)
+        means, per_x, per_y, per_f = scalar_run(5, n_iter, x, y, x_err, y_err, end_members, tdf,
+                                                0.6, _binary_mixing_scalar)
+        ellipse = mc.confidence_ellipse(means, 0.95)
+        ci_ok = all(np.allclose(result['sample_ci'][i],
+                                [np.percentile(per_x[i], [2.5, 97.5]), np.percentile(per_y[i], [2.5, 97.5])],
+                                rtol=0, atol=tol) for i in range(n))
+        props_ok = sorted(result['proportions']) == [i for i in range(n) if per_f[i]]
+        for i, stats in result['proportions'].items():
+            f = np.array(per_f[i])
+            f = f[~np.isnan(f)]
+            props_ok &= np.allclose([stats['mean'], stats['std'], stats['median'],
+                                     stats['ci_lower'], stats['ci_upper']],
+                                    [f.mean(), f.std(), np.median(f), *np.percentile(f, [2.5, 97.5])],
+                                    rtol=0, atol=tol)
+        group = np.array([np.nanmean([p[it] for p in per_f if p]) for it in range(n_iter)])
+        report.add_result("Engine vs per-iteration loop",
+                          np.allclose(result['center'], ellipse['center'], rtol=0, atol=tol)
+                          and np.allclose(result['cov'], ellipse['cov'], rtol=0, atol=tol)
+                          and ci_ok and props_ok
+                          and abs(result['prop_mean'] - group.mean()) < tol
+                          and abs(result['prop_std'] - group.std()) < tol,
+                          details=f"{n_iter} iterations x {n} samples, seed 5")
+    except Exception as e:
+        report.add_result("Engine vs per-iteration loop", False, error=str(e))
+
+    # Same seed, same run
+    try:
+        first = mc.MonteCarloEngine(n_iter, seed=11).run_group(x, y, x_err, y_err)
+        again = mc.MonteCarloEngine(n_iter, seed=11).run_group(x, y, x_err, y_err)
+        report.add_result("Seeded runs repeat",
+                          np.array_equal(first['sample_ci'], again['sample_ci'])
+                          and np.array_equal(first['cov'], again['cov']),
+                          details="seed 11")
+    except Exception as e:
+        report.add_result("Seeded runs repeat", False, error=str(e))
+
+    # Three-source mixing: exact solve per draw, collinear end-members rejected
+    try:
+        ems = np.array([[-26.0, 4.0, -12.0, 8.0, -18.0, 15.0]] * 50)
+        ems[7] = [-26.0, 4.0, -18.0, 8.0, -10.0, 12.0]           # collinear
+        t13, t15 = rng.normal(-17, 3, (3, 50)), rng.normal(9, 3, (3, 50))
+        f = mc.three_source_mixing_vec(t13, t15, *ems.T, tdf_13C=1.0, tdf_15N=3.4)
+        expected = np.empty((3, 50, 3))
+        for it in range(3):
+            for i in range(50):
+                A = np.array([ems[i, 0::2], ems[i, 1::2], np.ones(3)])
+                try:
+                    expected[it, i] = np.linalg.solve(A, [t13[it, i] - 1.0, t15[it, i] - 3.4, 1.0])
+                except np.linalg.LinAlgError:
+                    expected[it, i] = np.nan
+        report.add_result("Three-source mixing vs np.linalg.solve",
+                          f.shape == (3, 50, 3)
+                          and np.allclose(f, expected, rtol=0, atol=1e-10, equal_nan=True)
+                          and np.isnan(f[:, 7]).all()
+                          and np.allclose(np.delete(f, 7, axis=1).sum(axis=-1), 1.0),
+                          details="3 x 50 draws, one collinear end-member set")
+    except Exception as e:
+        report.add_result("Three-source mixing vs np.linalg.solve", False, error=str(e))
+
+    try:
+        end_members = np.tile([-26.0, 4.0, -12.0, 8.0, -18.0, 15.0], (n, 1))
+        result = mc.MonteCarloEngine(n_iter, seed=3).run_group(
+            x, y, x_err, y_err, mixing=mc.three_source_mixing_vec, end_members=end_members,
+            tdf=tdf, perturb_tdf=True)
+        _, _, _, per_f = scalar_run(
+            3, n_iter, x, y, x_err, y_err, end_members, tdf, 0.0,
+            lambda *a: mc.three_source_mixing_vec(*a[:2], *a[2:8], tdf_13C=a[8], tdf_15N=a[9]))
+        ok = sorted(result['proportions']) == list(range(n))
+        for i, stats in result['proportions'].items():
+            f = np.array(per_f[i])
+            ok &= all(np.allclose([s['mean'], s['ci_lower'], s['ci_upper']],
+                                  [f[:, k].mean(), *np.percentile(f[:, k], [2.5, 97.5])],
+                                  rtol=0, atol=tol)
+                      for k, s in enumerate(stats['sources']))
+        report.add_result("Three-source engine vs per-iteration loop",
+                          ok and np.shape(result['prop_mean']) == (3,)
+                          and abs(np.sum(result['prop_mean']) - 1) < 1e-9,
+                          details=f"{n_iter} iterations x {n} samples, seed 3")
+    except Exception as e:
+        report.add_result("Three-source engine vs per-iteration loop", False, error=str(e))
+
+
+def test_mixing_models(report: TestReport):
+    """Isotope mixing: vectorized Monte Carlo and ternary solves vs the per-draw loops"""
+
+    try:
+        import numpy as np
+        mix = _load_plugin("isotope_mixing_models")
+    except ImportError as e:
+        _import_failed(report, "Mixing models", e)
+        return
+
+    rng = np.random.default_rng(23)
+    tol = 1e-12
+
+    n_iter, n = 300, 15
+    x = rng.normal(-18, 3, n)
+    y = rng.normal(9, 3, n)
+    em1, em2, x_unc, y_unc = (-24.0, 5.0), (-12.0, 13.0), 0.4, 0.3
+
+    def draw_loop(seed, step):
+        """The old loop over iterations and samples, fed the engine's random stream."""
+        stream = np.random.default_rng(seed)
+        em_draws = np.array([*em1, *em2]) + stream.standard_normal((n_iter, 4)) * [x_unc, y_unc, x_unc, y_unc]
+        dx = np.empty((n_iter, n))
+        dy = np.empty((n_iter, n))
+        for start in range(0, n, step):
+            block = slice(start, min(start + step, n))
+            dx[:, block] = stream.normal(0, x_unc, (n_iter, block.stop - start))
+            dy[:, block] = stream.normal(0, y_unc, (n_iter, block.stop - start))
+        per_sample = np.empty((n_iter, n))
+        for i in range(n_iter):
+            em1_x_pert, em1_y_pert, em2_x_pert, em2_y_pert = em_draws[i]
+            for j in range(n):
+                x_pert = x[j] + dx[i, j]
+                y_pert = y[j] + dy[i, j]
+                vec_x = em2_x_pert - em1_x_pert
+                vec_y = em2_y_pert - em1_y_pert
+                dot_product = (x_pert - em1_x_pert) * vec_x + (y_pert - em1_y_pert) * vec_y
+                norm_sq = vec_x * vec_x + vec_y * vec_y
+                per_sample[i, j] = np.clip(dot_product / norm_sq, 0, 1)
+        return per_sample
+
+    def same_samples(samples, per_sample):
+        return (np.allclose(samples['mean'], per_sample.mean(axis=0), rtol=0, atol=tol)
+                and np.allclose(samples['std'], per_sample.std(axis=0), rtol=0, atol=tol)
+                and np.allclose([samples['ci_lower'], samples['median'], samples['ci_upper']],
+                                np.percentile(per_sample, [2.5, 50, 97.5], axis=0), rtol=0, atol=tol))
+
+    # Binary Monte Carlo vs the old loop over iterations and samples
+    try:
+        result = mix.MixingMonteCarlo(n_iter, seed=8).binary(x, y, em1, em2, x_unc, y_unc)
+        per_sample = draw_loop(8, n)
+        all_proportions = per_sample.ravel()
+        bin_width = 1 / mix.MC_POOLED_BINS
+        pooled_ok = (result['count'] == all_proportions.size
+                     and abs(result['mean'] - all_proportions.mean()) < 1e-9
+                     and abs(result['std'] - all_proportions.std()) < 1e-9
+                     and np.allclose(result['ci'], np.percentile(all_proportions, [2.5, 97.5]),
+                                     rtol=0, atol=2 * bin_width)
+                     and np.allclose(result['distributions'], per_sample, rtol=0, atol=1e-6))
+        report.add_result("Binary Monte Carlo vs per-draw loop",
+                          same_samples(result['samples'], per_sample) and pooled_ok,
+                          details=f"{n_iter} iterations x {n} samples, seed 8")
+    except Exception as e:
+        report.add_result("Binary Monte Carlo vs per-draw loop", False, error=str(e))
+
+    # Blocks of one sample: per-sample statistics still match the loop
+    try:
+        result = mix.MixingMonteCarlo(n_iter, seed=4, chunk_bytes=1).binary(x, y, em1, em2, x_unc, y_unc)
+        report.add_result("Monte Carlo in one-sample blocks",
+                          same_samples(result['samples'], draw_loop(4, 1)),
+                          details="chunk_bytes=1")
+    except Exception as e:
+        report.add_result("Monte Carlo in one-sample blocks", False, error=str(e))
+
+    def solve_loop(points, em_values):
+        """The old per-point solve, clip and renormalize."""
+        em = np.asarray(em_values, dtype=float)
+        A = np.vstack([em.T, np.ones(3)]) if points.shape[1] == 2 else em.T
+        out = []
+        for p in points:
+            b = np.append(p, 1.0) if points.shape[1] == 2 else p
+            try:
+                w = np.clip(np.linalg.solve(A, b), 0, 1)
+                out.append(w / np.sum(w))
+            except np.linalg.LinAlgError:
+                out.append([1 / 3, 1 / 3, 1 / 3])
+        return np.array(out)
+
+    # Ternary proportions, 2-D and 3-D, vs the per-point solve
+    try:
+        em_2d = [(-26.0, 4.0), (-12.0, 8.0), (-18.0, 15.0)]
+        em_3d = [(0.70, 18.5, 15.6), (0.71, 19.2, 15.7), (0.72, 18.9, 15.9)]
+        pts_2d = np.column_stack([rng.normal(-18, 5, 400), rng.normal(9, 4, 400)])
+        pts_3d = np.column_stack([rng.normal(0.71, 0.01, 400), rng.normal(18.9, 0.4, 400),
+                                  rng.normal(15.7, 0.2, 400)])
+        singular = [(0.0, 0.0), (1.0, 1.0), (2.0, 2.0)]
+        report.add_result("Ternary weights vs per-point solve",
+                          np.allclose(mix.ternary_weights(pts_2d, em_2d), solve_loop(pts_2d, em_2d),
+                                      rtol=0, atol=1e-10)
+                          and np.allclose(mix.ternary_weights(pts_3d, em_3d), solve_loop(pts_3d, em_3d),
+                                          rtol=0, atol=1e-10)
+                          and np.allclose(mix.ternary_weights(pts_2d, singular), 1 / 3),
+                          details="400 points in 2-D and 3-D, one singular end-member set")
+        many = np.column_stack([rng.normal(-18, 5, 8000), rng.normal(9, 4, 8000)])
+        split = mix.ternary_weights_parallel(many, em_2d, workers=4, min_samples=0)
+        report.add_result("Ternary weights across workers",
+                          np.array_equal(split, mix.ternary_weights(many, em_2d)),
+                          details=f"4 workers ({'forked' if mix.fork_available() else 'in process'})")
+    except Exception as e:
+        report.add_result("Ternary weights", False, error=str(e))
+
+    def log_probability(params, data_matrix, uncertainties, lower, upper, props_fixed=None):
+        """The old per-walker log-probability (full or end-members-only)."""
+        n_samples, n_isotopes = data_matrix.shape
+        em1 = params[:n_isotopes]
+        em2 = params[n_isotopes:2*n_isotopes]
+        props = params[2*n_isotopes:] if props_fixed is None else props_fixed
+        if np.any(em1 < lower) or np.any(em1 > upper):
+            return -np.inf
+        if np.any(em2 < lower) or np.any(em2 > upper):
+            return -np.inf
+        if np.any(props < 0) or np.any(props > 1):
+            return -np.inf
+        log_like = 0
+        for i in range(n_samples):
+            f = props[i]
+            pred = (1-f)*em1 + f*em2
+            for j in range(n_isotopes):
+                sigma = uncertainties[j]
+                diff = data_matrix[i, j] - pred[j]
+                log_like += -0.5 * (diff / sigma)**2
+        return log_like
+
+    # Vectorized MCMC posterior vs the per-walker function
+    try:
+        data = np.column_stack([rng.normal(-18, 3, 25), rng.normal(9, 2, 25)])
+        sigma = np.array([0.3, 0.2])
+        data_range = data.max(axis=0) - data.min(axis=0)
+        lower, upper = data.min(axis=0) - 0.5 * data_range, data.max(axis=0) + 0.5 * data_range
+        walkers = np.column_stack([rng.normal([-18, 9], [4, 3], (64, 2)), rng.normal([-18, 9], [4, 3], (64, 2)),
+                                   rng.uniform(0, 1, (64, 25))])
+        walkers[::8, 10] = 1.05                                  # proportions out of range
+        expected = np.array([log_probability(w, data, sigma, lower, upper) for w in walkers])
+        got = mix.MixingPosterior(data, sigma, lower, upper)(walkers)
+
+        props_init = rng.uniform(0.3, 0.7, 25)
+        reduced = walkers[:, :4]
+        expected_reduced = np.array([log_probability(w, data, sigma, lower, upper, props_init)
+                                     for w in reduced])
+        posterior_reduced = mix.MixingPosterior(data, sigma, lower, upper, fixed_props=props_init)
+        got_reduced = posterior_reduced(reduced)
+
+        finite = np.isfinite(expected)
+        report.add_result("MCMC posterior vs per-walker function",
+                          np.array_equal(np.isfinite(got), finite)
+                          and np.allclose(got[finite], expected[finite], rtol=1e-12, atol=0)
+                          and np.array_equal(np.isfinite(got_reduced), np.isfinite(expected_reduced))
+                          and np.allclose(got_reduced[np.isfinite(got_reduced)],
+                                          expected_reduced[np.isfinite(expected_reduced)], rtol=1e-12, atol=0)
+                          and posterior_reduced(reduced[0]) == got_reduced[0]
+                          and 0 < finite.sum() < len(walkers),
+                          details=f"64 walkers, {finite.sum()} inside the priors")
+    except Exception as e:
+        report.add_result("MCMC posterior vs per-walker function", False, error=str(e))
+
+    try:
+        if mix.fork_available():
+            pool = mix.WalkerPool(mix.MixingPosterior(data, sigma, lower, upper), processes=2)
+            try:
+                pooled = pool(walkers)
+            finally:
+                pool.close()
+            report.add_result("Walker pool", np.array_equal(pooled, got), details="2 processes")
+        else:
+            report.add_result("Walker pool", True, details="no fork on this platform - skipped")
+    except Exception as e:
+        report.add_result("Walker pool", False, error=str(e))
+
+    # Chain checkpoint: save, resume with the same key, refuse another run's state
+    try:
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            key = mix.ChainCheckpoint.run_key(data, sigma, ['d13C', 'd15N'], 8, 20, 5)
+            first = mix.ChainCheckpoint(tmp, key, 20, 8, 4)
+            first.start()
+            first.chain[:6] = rng.normal(size=(6, 8, 4))
+            coords, log_prob = first.chain[5].copy(), rng.normal(size=8)
+            first.save(6, coords, log_prob)
+            written = np.array(first.chain[:6])
+
+            resumed = mix.ChainCheckpoint(tmp, key, 20, 8, 4)
+            point = resumed.resume_point()
+            round_trip = (point is not None and point[0] == 6
+                          and np.array_equal(point[1], coords) and np.array_equal(point[2], log_prob)
+                          and np.array_equal(resumed.chain[:6], written))
+            other_key = mix.ChainCheckpoint(tmp, key + "x", 20, 8, 4).resume_point()
+            other_shape = mix.ChainCheckpoint(tmp, key, 30, 8, 4).resume_point()
+            resumed.chain = None
+            resumed.discard()
+            report.add_result("Checkpoint save and resume",
+                              round_trip and other_key is None and other_shape is None
+                              and not any(Path(tmp).iterdir()),
+                              details="6 of 20 steps saved, resumed, then discarded")
+    except Exception as e:
+        report.add_result("Checkpoint save and resume", False, error=str(e))
+
+
+def test_kriging(report: TestReport):
+    """Spatial kriging: batched kriging, IDW and variogram vs the per-cell loops"""
+
+    try:
+        import numpy as np
+        from scipy.linalg import solve
+        from scipy.spatial import cKDTree
+        from scipy.spatial.distance import pdist
+        sk = _load_plugin("spatial_kriging")
+    except ImportError as e:
+        _import_failed(report, "Kriging engine", e)
+        return
+
+    rng = np.random.default_rng(31)
+    tol = 1e-12
+    x = rng.uniform(0, 1000, 300)
+    y = rng.uniform(0, 800, 300)
+    z = np.sin(x / 200) + np.cos(y / 150) + rng.normal(0, 0.05, 300)
+    tree = cKDTree(np.column_stack([x, y]))
+    XI, YI = np.meshgrid(np.linspace(-700, 1700, 40), np.linspace(-600, 1400, 30))
+    points = np.column_stack([XI.ravel(), YI.ravel()])
+    nugget, sill, range_val, min_neighbors = 0.01, 1.0, 250.0, 3
+    radius = 2 * range_val
+
+    def kriging_point(x_near, y_near, z_near, d_near):
+        """The old single-cell kriging solve."""
+        n = len(x_near)
+        C = np.zeros((n + 1, n + 1))
+        for k in range(n):
+            for l in range(n):
+                h = np.sqrt((x_near[k] - x_near[l])**2 + (y_near[k] - y_near[l])**2) / range_val
+                C[k, l] = nugget + sill * (1.5 * h - 0.5 * h**3) if h <= 1 else nugget + sill
+        C[:n, n] = 1
+        C[n, :n] = 1
+        b = np.zeros(n + 1)
+        h_near = d_near / range_val
+        mask = h_near <= 1
+        b[:n][mask] = nugget + sill * (1.5 * h_near[mask] - 0.5 * h_near[mask]**3)
+        b[:n][~mask] = nugget + sill
+        b[n] = 1
+        weights = solve(C, b)
+        return np.sum(weights[:n] * z_near)
+
+    def cell_loop(estimate, search_radius):
+        """The old loop: one KD-tree query and one estimate per grid cell."""
+        out = np.full(len(points), np.nan)
+        for i, point in enumerate(points):
+            distances, indices = tree.query(point[None], k=min(15, len(x)),
+                                            distance_upper_bound=search_radius)
+            valid = distances[0] < np.inf
+            if np.sum(valid) >= min_neighbors:
+                near = indices[0][valid]
+                out[i] = estimate(x[near], y[near], z[near], distances[0][valid])
+        return out
+
+    def idw_point(x_near, y_near, z_near, d_near):
+        weights = 1.0 / (d_near**2 + 1e-10)
+        return np.sum(weights * z_near) / np.sum(weights)
+
+    def same(a, b):
+        return np.array_equal(np.isnan(a), np.isnan(b)) and np.allclose(a, b, rtol=0, atol=tol, equal_nan=True)
+
+    try:
+        expected = cell_loop(kriging_point, radius)
+        got = sk.kriging_cells(points, tree, x, y, z, nugget, sill, range_val, min_neighbors, radius)
+        report.add_result("Kriging vs per-cell solve", same(got, expected),
+                          details=f"{len(points)} cells, {np.isnan(expected).sum()} without neighbours, "
+                                  f"max diff {np.nanmax(np.abs(got - expected)):.1e}")
+    except Exception as e:
+        report.add_result("Kriging vs per-cell solve", False, error=str(e))
+
+    try:
+        expected = cell_loop(idw_point, 250.0)
+        got = sk.idw_cells(points, tree, z, 2, min_neighbors, 250.0)
+        report.add_result("IDW vs per-cell loop", same(got, expected),
+                          details=f"{len(points)} cells, search radius 250, "
+                                  f"{np.isnan(expected).sum()} without neighbours")
+    except Exception as e:
+        report.add_result("IDW vs per-cell loop", False, error=str(e))
+
+    try:
+        distances = pdist(np.column_stack([x, y]))
+        z_diff = pdist(z[:, None], metric=lambda u, v: 0.5 * (u[0] - v[0])**2)
+        bin_edges = np.linspace(0, np.max(distances), 16)
+        exp_gamma, exp_h = np.zeros(15), np.zeros(15)
+        for i in range(15):
+            mask = (distances >= bin_edges[i]) & (distances < bin_edges[i + 1])
+            if np.sum(mask) > 0:
+                exp_gamma[i] = np.mean(z_diff[mask])
+                exp_h[i] = np.mean(distances[mask])
+        valid = exp_h > 0
+        h, gamma = sk.experimental_variogram(x, y, z)
+        report.add_result("Experimental variogram vs binning loop",
+                          np.allclose(h, exp_h[valid], rtol=tol, atol=0)
+                          and np.allclose(gamma, exp_gamma[valid], rtol=tol, atol=0),
+                          details=f"{len(h)} bins from {len(distances)} pairs")
+    except Exception as e:
+        report.add_result("Experimental variogram vs binning loop", False, error=str(e))
+
+    # Tiles in worker processes give the same grid as one pass here
+    try:
+        sk.TILE_CELLS, sk.PARALLEL_MIN_CELLS = 256, 0
+        kwargs = dict(tree=tree, x=x, y=y, z=z, nugget=nugget, sill=sill, range_val=range_val,
+                      min_neighbors=min_neighbors, radius=radius)
+        serial = sk.interpolate_tiles(sk.kriging_cells, points, **kwargs)
+        parallel = sk.interpolate_tiles(sk.kriging_cells, points, parallel=True, **kwargs)
+        report.add_result("Kriging tiles across workers",
+                          same(serial, sk.kriging_cells(points, **kwargs)) and np.array_equal(
+                              np.nan_to_num(parallel, nan=-1), np.nan_to_num(serial, nan=-1)),
+                          details=f"{-(-len(points) // 256)} tiles, fork: {sk.fork_available()}")
+    except Exception as e:
+        report.add_result("Kriging tiles across workers", False, error=str(e))
+
+
+def test_seismic_processing(report: TestReport):
+    """Geophysics: vectorized semblance, NMO, AGC and trace batches vs the per-trace loops"""
+
+    try:
+        import numpy as np
+        geo = _load_plugin("geophysics_analysis_suite")
+    except ImportError as e:
+        _import_failed(report, "Seismic processing", e)
+        return
+
+    nt, noff, dt, dx = 300, 24, 0.004, 25.0
+    cdp = geo.synthetic_cdp_gather(nt, noff, dt, dx, seed=3)
+    offsets = np.arange(noff) * dx
+    velocities = np.linspace(1500, 4000, 12)
+
+    def semblance_terms(cdp, velocities):
+        """Numerator and denominator of the old loop, per (t0, velocity)."""
+        t = np.arange(nt) * dt
+        numerator = np.zeros((nt, len(velocities)))
+        denominator = np.zeros((nt, len(velocities)))
+        for iv, v in enumerate(velocities):
+            for it in range(nt):
+                traces_nmo = np.zeros(noff)
+                for ioff, offset in enumerate(offsets):
+                    idx = int(round(np.sqrt(t[it]**2 + (offset/v)**2) / dt))
+                    if 0 <= idx < nt:
+                        traces_nmo[ioff] = cdp[idx, ioff]
+                numerator[it, iv] = np.sum(traces_nmo)**2
+                denominator[it, iv] = noff * np.sum(traces_nmo**2)
+        return numerator, denominator
+
+    def windowed(values, window):
+        half = window // 2
+        return np.array([values[max(0, i - half):i + half + 1].sum(axis=0) for i in range(len(values))])
+
+    def ratio(numerator, denominator):
+        return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+    try:
+        numerator, denominator = semblance_terms(cdp, velocities)
+        ok = np.allclose(geo.semblance_panel(cdp, dt, offsets, velocities),
+                         ratio(numerator, denominator), rtol=1e-12, atol=1e-14)
+        # Windowed semblance: summed directly (short) and by cumsum (long)
+        for window in (5, 2 * geo.DIRECT_WINDOW_MAX + 1):
+            ok &= np.allclose(geo.semblance_panel(cdp, dt, offsets, velocities, window),
+                              ratio(windowed(numerator, window), windowed(denominator, window)),
+                              rtol=1e-9, atol=1e-12)
+        geo.SEMBLANCE_BLOCK_BYTES = 1                         # one velocity per block
+        ok &= np.allclose(geo.semblance_panel(cdp, dt, offsets, velocities),
+                          ratio(numerator, denominator), rtol=1e-12, atol=1e-14)
+        report.add_result("Semblance panel vs per-sample loop", ok,
+                          details=f"{nt} samples x {noff} offsets x {len(velocities)} velocities, "
+                                  f"windows 1, 5, {2 * geo.DIRECT_WINDOW_MAX + 1}")
+    except Exception as e:
+        report.add_result("Semblance panel vs per-sample loop", False, error=str(e))
+
+    try:
+        velocity = np.linspace(1600, 3600, nt)
+        t = np.arange(nt) * dt
+        expected = np.zeros_like(cdp)
+        for it in range(nt):
+            for ioff, offset in enumerate(offsets):
+                idx = int(round(np.sqrt(t[it]**2 + (offset/velocity[it])**2) / dt))
+                if 0 <= idx < nt:
+                    expected[it, ioff] = cdp[idx, ioff]
+        report.add_result("NMO vs per-sample loop",
+                          np.array_equal(geo.SeismicProcessor.nmo(cdp, dt, dx, velocity), expected)
+                          and np.array_equal(geo.SeismicProcessor.nmo(cdp, dt, dx, 2500.0),
+                                             geo.SeismicProcessor.nmo(cdp, dt, dx, np.full(nt, 2500.0))),
+                          details=f"{nt} samples x {noff} offsets, velocity per sample and constant")
+    except Exception as e:
+        report.add_result("NMO vs per-sample loop", False, error=str(e))
+
+    def agc_loop(data, window_len):
+        half = window_len // 2
+        data_agc = np.zeros_like(data)
+        for i in range(len(data)):
+            window = data[max(0, i - half):min(len(data), i + half + 1)]
+            data_agc[i] = data[i] / np.sqrt(np.mean(window ** 2) + 1e-6)
+        return data_agc
+
+    try:
+        trace = cdp[:, 0]
+        ok = True
+        for window_len in (11, 125):
+            ok &= np.allclose(geo.SeismicProcessor.agc(trace, window_len), agc_loop(trace, window_len),
+                              rtol=1e-9, atol=0)
+            gathered = geo.SeismicProcessor.agc(cdp, window_len)
+            ok &= np.allclose(gathered, np.column_stack([agc_loop(cdp[:, j], window_len) for j in range(noff)]),
+                              rtol=1e-9, atol=0)
+            ok &= np.allclose(geo.SeismicProcessor.agc(cdp.T, window_len, axis=-1), gathered.T,
+                              rtol=1e-12, atol=0)
+        report.add_result("AGC vs per-sample loop", ok,
+                          details="windows of 11 (direct sums) and 125 (cumulative sum) samples")
+    except Exception as e:
+        report.add_result("AGC vs per-sample loop", False, error=str(e))
+
+    # Levinson recursion vs a dense solve of the Toeplitz system
+    try:
+        rng = np.random.default_rng(41)
+        series = rng.normal(size=(20, 400))
+        col = geo.autocorrelation(series, 40)
+        col[:, 0] *= 1.01
+        rhs = rng.normal(size=(20, 40))
+        lag = np.abs(np.subtract.outer(np.arange(40), np.arange(40)))
+        expected = np.array([np.linalg.solve(c[lag], r) for c, r in zip(col, rhs)])
+        x, ok = geo.levinson_solve(col, rhs)
+        single, single_ok = geo.levinson_solve(col[0], rhs[0])
+        _, indefinite = geo.levinson_solve([1.0, 2.0, 0.5], [1.0, 0.0, 0.0])
+        report.add_result("Levinson vs np.linalg.solve",
+                          ok.all() and single_ok and not indefinite
+                          and np.allclose(x, expected, rtol=1e-9, atol=1e-12)
+                          and np.allclose(single, expected[0], rtol=1e-9, atol=1e-12),
+                          details=f"20 Toeplitz systems of 40, max diff {np.abs(x - expected).max():.1e}")
+    except Exception as e:
+        report.add_result("Levinson vs np.linalg.solve", False, error=str(e))
+
+    def deconvolution_trace(data, dt, wlen, prewhiten=0.01):
+        """The old single-trace predictive deconvolution."""
+        nsamp = int(wlen / dt)
+        n = len(data)
+        acf = np.correlate(data, data, mode='full')[n-1:n-1+nsamp] / n
+        R = acf[np.abs(np.subtract.outer(np.arange(nsamp), np.arange(nsamp)))]
+        R += prewhiten * R[0, 0] * np.eye(nsamp)
+        r = acf.copy()
+        r[0] = 1.0
+        return geo.signal.lfilter(np.linalg.solve(R, r), [1.0], data)
+
+    def sta_lta_trace(data, dt, sta_len, lta_len):
+        """The old single-trace STA/LTA."""
+        sta_samples, lta_samples = int(sta_len / dt), int(lta_len / dt)
+        energy = data ** 2
+        sta = np.convolve(energy, np.ones(sta_samples)/sta_samples, mode='same')
+        lta = np.convolve(energy, np.ones(lta_samples)/lta_samples, mode='same')
+        return sta / np.maximum(lta, 1e-10)
+
+    traces = cdp.T.copy()
+    try:
+        expected = np.array([deconvolution_trace(trace, dt, 0.1) for trace in traces])
+        got = geo.SeismicProcessor.deconvolution(traces, dt, 0.1, axis=-1)
+        report.add_result("Batched deconvolution vs per-trace",
+                          np.allclose(got, expected, rtol=1e-8, atol=1e-10 * np.abs(expected).max())
+                          and np.allclose(geo.SeismicProcessor.deconvolution(cdp, dt, 0.1, axis=0), got.T,
+                                          rtol=1e-12, atol=0),
+                          details=f"{len(traces)} traces, {int(0.1 / dt)}-sample filter")
+    except Exception as e:
+        report.add_result("Batched deconvolution vs per-trace", False, error=str(e))
+
+    try:
+        expected = np.array([sta_lta_trace(trace, dt, 0.02, 0.2) for trace in traces])
+        got = geo.SeismicProcessor.sta_lta(traces, dt, 0.02, 0.2)
+        report.add_result("Batched STA/LTA vs per-trace", np.allclose(got, expected, rtol=1e-9, atol=0),
+                          details=f"{len(traces)} traces, STA 0.02 s, LTA 0.2 s")
+    except Exception as e:
+        report.add_result("Batched STA/LTA vs per-trace", False, error=str(e))
+
+    # A survey of mixed lengths and intervals, stacked per group
+    try:
+        survey = [traces[i][:250] if i % 3 else traces[i] for i in range(len(traces))]
+        dts = [dt if i % 4 else dt / 2 for i in range(len(traces))]
+        expected = [sta_lta_trace(trace, d, 0.02, 0.2) for trace, d in zip(survey, dts)]
+        inline = geo.TraceBatchProcessor(block=5)
+        got = inline.run('sta_lta', survey, dts, sta=0.02, lta=0.2)
+        geo.PARALLEL_MIN_SAMPLES = 0
+        pooled = geo.TraceBatchProcessor(parallel=True, processes=2, block=5)
+        got_pooled = pooled.run('sta_lta', survey, dts, sta=0.02, lta=0.2)
+        report.add_result("Trace batches vs per-trace",
+                          all(np.allclose(a, b, rtol=1e-9, atol=0) for a, b in zip(got, expected))
+                          and all(np.array_equal(a, b) for a, b in zip(got_pooled, got)),
+                          details=f"{len(geo.TraceBatchProcessor.group(survey, dts))} groups, "
+                                  f"pool mode: {pooled.mode}")
+    except Exception as e:
+        report.add_result("Trace batches vs per-trace", False, error=str(e))
+
+
+def test_gridding(report: TestReport):
+    """Geophysics: tiled RBF gridding, chunked FFT filters and derivatives vs whole-grid results"""
+
+    try:
+        import tempfile
+        import numpy as np
+        from scipy.fft import next_fast_len
+        from scipy.interpolate import RBFInterpolator
+        geo = _load_plugin("geophysics_analysis_suite")
+    except ImportError as e:
+        _import_failed(report, "Gridding", e)
+        return
+
+    rng = np.random.default_rng(24)
+
+    # Tiles: one tile covering the grid is the plain RBF; smaller tiles stay close to it
+    x = rng.uniform(0, 300, 400)
+    y = rng.uniform(0, 200, 400)
+    z = np.sin(x / 60) * np.cos(y / 45) + 0.002 * x
+    grid_x, grid_y = np.arange(0, 301, 5.0), np.arange(0, 201, 5.0)
+    try:
+        single = geo.tiled_rbf_grid(x, y, z, grid_x, grid_y, tile=max(len(grid_x), len(grid_y)))
+        bx, by, bz, _ = geo._block_mean(x, y, z, grid_x, grid_y)
+        X, Y = np.meshgrid(grid_x, grid_y)
+        rbf = RBFInterpolator(np.column_stack([bx, by]), bz, kernel='thin_plate_spline')
+        expected = rbf(np.column_stack([X.ravel(), Y.ravel()])).reshape(X.shape)
+        report.add_result("Single-tile RBF vs one RBF",
+                          np.allclose(single, expected, rtol=1e-10, atol=1e-12),
+                          details=f"{len(bx)} stations on a {X.shape[0]}x{X.shape[1]} grid")
+    except Exception as e:
+        report.add_result("Single-tile RBF vs one RBF", False, error=str(e))
+
+    try:
+        tiled = geo.tiled_rbf_grid(x, y, z, grid_x, grid_y, tile=16, overlap=6)
+        pooled = geo.tiled_rbf_grid(x, y, z, grid_x, grid_y, tile=16, overlap=6, parallel=True)
+        span = single.max() - single.min()
+        worst = np.abs(tiled - single).max()
+        report.add_result("Tiled RBF vs single tile",
+                          worst < 0.03 * span and np.abs(tiled - single).mean() < 0.002 * span
+                          and np.array_equal(pooled, tiled),
+                          details=f"16-cell tiles, largest difference {worst / span:.2%} of the range")
+    except Exception as e:
+        report.add_result("Tiled RBF vs single tile", False, error=str(e))
+
+    # FFT filters: the blocked passes vs one rfft2 of the padded, tapered grid
+    ny, nx, dx, dy = 45, 70, 10.0, 12.0
+    rows, cols = np.mgrid[0:ny, 0:nx]
+    grid = np.sin(cols / 7.0) + np.cos(rows / 5.0) + 0.3 * rng.standard_normal((ny, nx)) + 50
+    holes = grid.copy()
+    holes[10, 20] = np.nan
+    holes[30:32, 5] = np.nan
+
+    def whole_fft_filter(grid, passband, pad=geo.FFT_PAD):
+        mean = np.nanmean(grid)
+        py, px = int(round(ny * pad)), int(round(nx * pad))
+        NY, NX = next_fast_len(ny + 2 * py), next_fast_len(nx + 2 * px)
+        padded = np.pad(np.where(np.isfinite(grid), grid - mean, 0.0),
+                        ((py, NY - ny - py), (px, NX - nx - px)), mode='symmetric')
+        padded *= np.outer(geo._fft_taper(py, ny, NY - ny - py), geo._fft_taper(px, nx, NX - nx - px))
+        K = np.sqrt(np.fft.rfftfreq(NX, dx)[None, :] ** 2 + np.fft.fftfreq(NY, dy)[:, None] ** 2)
+        out = np.fft.irfft2(np.fft.rfft2(padded) * passband(K), s=(NY, NX))[py:py + ny, px:px + nx]
+        out += mean if passband(np.zeros(1))[0] else 0.0
+        out[~np.isfinite(grid)] = np.nan
+        return out
+
+    passbands = {'low-pass': lambda K: K <= 0.02, 'high-pass': lambda K: K >= 0.02,
+                 'vertical derivative': lambda K: 2 * np.pi * K}
+    default_chunk = geo.GRID_CHUNK_BYTES
+    try:
+        ok, worst = True, 0.0
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, passband in passbands.items():
+                expected = whole_fft_filter(holes, passband)
+                whole = geo.chunked_fft_filter(holes, dx, dy, passband)
+                geo.GRID_CHUNK_BYTES = 3 * nx * 8          # 3-row blocks, 1-column spectrum blocks
+                chunked = geo.chunked_fft_filter(holes, dx, dy, passband,
+                                                 path=os.path.join(tmp, f"{name.replace(' ', '_')}.grid"))
+                geo.GRID_CHUNK_BYTES = default_chunk
+                worst = max(worst, np.nanmax(np.abs(chunked - expected)))
+                ok &= (np.allclose(whole, expected, rtol=0, atol=1e-10, equal_nan=True)
+                       and np.allclose(chunked, whole, rtol=0, atol=1e-12, equal_nan=True)
+                       and isinstance(chunked, np.memmap))
+        report.add_result("Chunked FFT filter vs whole grid", bool(ok),
+                          details=f"{len(passbands)} passbands, 3 NaN cells, largest difference {worst:.1e}")
+    except Exception as e:
+        report.add_result("Chunked FFT filter vs whole grid", False, error=str(e))
+    finally:
+        geo.GRID_CHUNK_BYTES = default_chunk
+
+    # Derivatives: row blocks with a halo give exactly the whole-grid operators
+    def tilt(block):
+        gy, gx = np.gradient(block, dy, dx)
+        d2x = np.gradient(np.gradient(block, dx, axis=1), dx, axis=1)
+        d2y = np.gradient(np.gradient(block, dy, axis=0), dy, axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.nan_to_num(np.arctan2(d2x + d2y, np.sqrt(gx ** 2 + gy ** 2)))
+
+    try:
+        gy, gx = np.gradient(grid, dy, dx)
+        whole_gz = geo.grid_derivatives(grid, dx, dy)[2]
+        geo.GRID_CHUNK_BYTES = 2 * nx * 8 * 4              # 2-row blocks
+        hgrad = geo.GriddingEngine.horizontal_gradient(grid, dx, dy)
+        tilt_chunked = geo.GriddingEngine.tilt_derivative(grid, dx, dy)
+        cx, cy, cz = geo.grid_derivatives(grid, dx, dy)
+        report.add_result("Chunked derivatives vs whole grid",
+                          np.array_equal(hgrad, np.sqrt(gx ** 2 + gy ** 2))
+                          and np.array_equal(tilt_chunked, tilt(grid))
+                          and np.array_equal(cx, gx) and np.array_equal(cy, gy)
+                          and np.allclose(cz, whole_gz, rtol=0, atol=1e-12)
+                          and np.allclose(cz, whole_fft_filter(grid, passbands['vertical derivative']),
+                                          rtol=0, atol=1e-10),
+                          details="gradient, tilt and dT/dx, dT/dy, dT/dz in 2-row blocks")
+    except Exception as e:
+        report.add_result("Chunked derivatives vs whole grid", False, error=str(e))
+    finally:
+        geo.GRID_CHUNK_BYTES = default_chunk
+
+
+def test_euler(report: TestReport):
+    """Geophysics: batched Euler deconvolution vs the per-window loop, and grid Euler depths"""
+
+    try:
+        import warnings
+        import numpy as np
+        geo = _load_plugin("geophysics_analysis_suite")
+    except ImportError as e:
+        _import_failed(report, "Euler deconvolution", e)
+        return
+
+    def euler_windows(x, z, field, structural_index, window):
+        """The per-window lstsq loop euler_deconvolution_2d used to run."""
+        solutions = []
+        for i in range(window, len(x) - window):
+            x_win, z_win, field_win = x[i-window:i+window], z[i-window:i+window], field[i-window:i+window]
+            A = np.column_stack([np.gradient(field_win, x_win), np.gradient(field_win, z_win),
+                                 np.ones(2 * window)])
+            sol = np.linalg.lstsq(A, -structural_index * field_win, rcond=None)[0]
+            solutions.append({'x': x_win[window], 'x0': sol[0], 'z0': sol[1], 'base': sol[2]})
+        return solutions
+
+    rng = np.random.default_rng(25)
+    n = 500
+    x = np.sort(rng.uniform(0, 1000, n))
+    z = rng.normal(0, 5, n)
+    field = 100 / np.sqrt((x - 400) ** 2 + 30 ** 2) + rng.normal(0, 0.01, n)
+    try:
+        ok, worst = True, 0.0
+        for window in (3, 10):
+            expected = euler_windows(x, z, field, 1, window)
+            got = geo.ModelingEngine.euler_deconvolution_2d(x, z, field, None, 1, window)
+            ok &= len(got) == len(expected) == n - 2 * window
+            worst = max([worst] + [abs(a[key] - b[key]) / (1 + abs(a[key]))
+                                   for a, b in zip(expected, got) for key in a])
+        report.add_result("Batched Euler profile vs window loop", bool(ok) and worst < 1e-8,
+                          details=f"{n} samples, windows 3 and 10, largest relative difference {worst:.1e}")
+    except Exception as e:
+        report.add_result("Batched Euler profile vs window loop", False, error=str(e))
+
+    try:
+        several = geo.euler_profile(x, z, field, [0, 1, 2], 10)
+        ok = True
+        for k, N in enumerate((0, 1, 2)):
+            single = geo.euler_profile(x, z, field, N, 10)
+            ok &= all(np.allclose(several[key][k::3], single[key], rtol=1e-10, atol=1e-10)
+                      for key in ('x', 'x0', 'z0', 'base'))
+        short = geo.euler_profile(x[:15], z[:15], field[:15], 1, 10)
+        report.add_result("Euler profile with several indices",
+                          bool(ok) and (several['structural_index'][:3] == [0, 1, 2]).all()
+                          and all(len(v) == 0 for v in short.values()),
+                          details=f"{len(several['x0'])} solutions for indices 0, 1, 2")
+    except Exception as e:
+        report.add_result("Euler profile with several indices", False, error=str(e))
+
+    # A vertical dipole (structural index 3) at 80 m below (700, 600) on a 5 m grid
+    X, Y = np.meshgrid(np.linspace(0, 2000, 401), np.linspace(0, 1500, 301))
+    x0, y0, z0 = 700.0, 600.0, 80.0
+    h2 = (X - x0) ** 2 + (Y - y0) ** 2
+    Z = 1e8 * (2 * z0 ** 2 - h2) / (h2 + z0 ** 2) ** 2.5 + 5.0
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            found = geo.ModelingEngine.euler_deconvolution_grid(X, Y, Z, window=12)
+        dipole = found['structural_index'] == 3
+        best = np.argsort(found['uncertainty'][dipole])[:20]
+        ex, ey, ez = (np.median(found[key][dipole][best]) for key in ('x0', 'y0', 'z0'))
+        report.add_result("Grid Euler dipole depth",
+                          abs(ex - x0) < 5 and abs(ey - y0) < 5 and abs(ez - z0) < 0.03 * z0,
+                          details=f"source ({x0:g}, {y0:g}, {z0:g}) -> ({ex:.1f}, {ey:.1f}, {ez:.1f}) "
+                                  f"from the 20 best of {dipole.sum()} index-3 solutions")
+    except Exception as e:
+        report.add_result("Grid Euler dipole depth", False, error=str(e))
+
+
+def test_survey_files(report: TestReport):
+    """Geophysics: memory-mapped SAC / GPR readers, trace headers and the survey header index"""
+
+    try:
+        import struct
+        import tempfile
+        import numpy as np
+        geo = _load_plugin("geophysics_analysis_suite")
+    except ImportError as e:
+        _import_failed(report, "Survey files", e)
+        return
+
+    rng = np.random.default_rng(23)
+
+    def write_sac(path, samples, delta, scale):
+        header = [0.0] * 70
+        header[0], header[3] = delta, scale
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<70f', *header))
+            f.write(np.asarray(samples, dtype='<i4').tobytes())
+
+    def write_dzt(path, radargram, declared_traces, time_window_ns):
+        header = bytearray(1024)
+        header[16:18] = struct.pack('<H', radargram.shape[1])
+        header[20:22] = struct.pack('<H', declared_traces)
+        header[24:28] = struct.pack('<f', time_window_ns)
+        header[30:32] = struct.pack('<H', 16)
+        with open(path, 'wb') as f:
+            f.write(bytes(header))
+            f.write(np.asarray(radargram, dtype='<i2').tobytes())
+
+    def write_dt1(path, radargram, time_window_ns, frequency):
+        with open(str(path).replace('.dt1', '.hd'), 'w') as f:
+            f.write(f"NSAMP = {radargram.shape[1]}\nTIMEWINDOW = {time_window_ns}\n"
+                    f"FREQUENCY = {frequency}\n")
+        with open(path, 'wb') as f:
+            f.write(np.asarray(radargram, dtype='<i2').tobytes())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        survey = Path(tmp) / "survey"
+        survey.mkdir()
+        index_dir = Path(tmp) / "index"
+
+        sac_samples = rng.integers(-50000, 50000, 1000)
+        sac_path = survey / "XX.STA1.00.BHZ.sac"
+        write_sac(sac_path, sac_samples, 0.01, 2.0)
+        try:
+            header = geo.SacParser.header(str(sac_path))
+            mapped = header.memmap()
+            trace = geo.SacParser.parse(str(sac_path))[0]
+            report.add_result("SAC header and memmap",
+                              isinstance(mapped, np.memmap) and np.array_equal(mapped, sac_samples)
+                              and header.n_samples == 1000 and header.scale == 2.0
+                              and (header.network, header.station, header.channel) == ("XX", "STA1", "BHZ")
+                              and np.array_equal(header.read(100, 200, 2), sac_samples[100:200:2] / 2.0)
+                              and np.allclose(trace.data, sac_samples / 2.0) and np.isclose(trace.sampling_rate, 100.0),
+                              details=f"{header.describe()}, scale {header.scale:g}")
+        except Exception as e:
+            report.add_result("SAC header and memmap", False, error=str(e))
+
+        dzt_radargram = rng.integers(-3000, 3000, (12, 64))
+        dzt_path = survey / "line01.dzt"
+        write_dzt(dzt_path, dzt_radargram, 20, 50.0)
+        try:
+            header = geo.GSSIDZTParser.header(str(dzt_path))
+            gpr = geo.GSSIDZTParser.parse(str(dzt_path))
+            report.add_result("DZT header and memmap",
+                              header.n_traces == 12 and header.dtype == '<i2'
+                              and isinstance(gpr.data, np.memmap) and gpr.data.shape == (12, 64)
+                              and np.array_equal(gpr.data, dzt_radargram)
+                              and np.array_equal(header.read(2, 8, 3), dzt_radargram[2:8:3])
+                              and np.isclose(header.sample_interval, 50.0 / 64),
+                              details=f"{header.describe()} (header declares 20, file stores 12)")
+        except Exception as e:
+            report.add_result("DZT header and memmap", False, error=str(e))
+
+        dt1_radargram = rng.integers(-3000, 3000, (7, 32))
+        dt1_path = survey / "line02.dt1"
+        write_dt1(dt1_path, dt1_radargram, 80.0, 250)
+        try:
+            header = geo.SensorsSoftwareDT1Parser.header(str(dt1_path))
+            gpr = geo.SensorsSoftwareDT1Parser.parse(str(dt1_path))
+            report.add_result("DT1 header and memmap",
+                              gpr.data.shape == (7, 32) and np.array_equal(gpr.data, dt1_radargram)
+                              and header.antenna_frequency_mhz == 250 and header.time_window_ns == 80.0,
+                              details=header.describe())
+        except Exception as e:
+            report.add_result("DT1 header and memmap", False, error=str(e))
+
+        # A header built by hand maps the same bytes
+        try:
+            st = os.stat(dzt_path)
+            header = geo.TraceHeader(path=str(dzt_path), format='dzt', n_traces=12, n_samples=64,
+                                     offset=1024, dtype='<i2', scale=4.0,
+                                     mtime_ns=st.st_mtime_ns, size=st.st_size)
+            sliced = header.read(1, None, 5)
+            current = header.is_current()
+            os.utime(dzt_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            report.add_result("TraceHeader read and staleness",
+                              np.array_equal(sliced, dzt_radargram[1::5] / 4.0)
+                              and current and not header.is_current()
+                              and geo.trace_data(header).shape == (12, 64),
+                              details=f"rows 1::5 -> {sliced.shape}")
+        except Exception as e:
+            report.add_result("TraceHeader read and staleness", False, error=str(e))
+
+        # Header index: no header re-read while nothing changes, nothing written beside the data
+        (survey / "broken.dzt").write_bytes(bytes(1024))      # 0 samples per trace
+        (survey / "notes.txt").write_text("not a trace")
+        try:
+            before = sorted(p.name for p in survey.iterdir())
+            index = geo.HeaderIndex(survey, index_dir=index_dir)
+            first = index.scan()
+            first_read = index.headers_read
+            again = geo.HeaderIndex(survey, index_dir=index_dir)
+            second = again.scan()
+            report.add_result("Header index rescan",
+                              first_read == 4 and again.headers_read == 0
+                              and [h.name for h in first] == ["XX.STA1.00.BHZ.sac", "line01.dzt", "line02.dt1"]
+                              and [geo.asdict(h) for h in second] == [geo.asdict(h) for h in first]
+                              and sorted(p.name for p in survey.iterdir()) == before
+                              and index.index_file.parent == index_dir and index.index_file.exists(),
+                              details=f"first scan read {first_read} headers, second {again.headers_read}")
+        except Exception as e:
+            report.add_result("Header index rescan", False, error=str(e))
+
+        try:
+            st = os.stat(sac_path)
+            write_sac(sac_path, sac_samples[:600], 0.01, 2.0)
+            os.utime(sac_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            changed = geo.HeaderIndex(survey, index_dir=index_dir)
+            headers = {h.name: h for h in changed.scan()}
+            changed_read = changed.headers_read
+            write_sac(survey / "XX.STA2.00.BHZ.sac", sac_samples, 0.01, 1.0)
+            added = geo.HeaderIndex(survey, index_dir=index_dir)
+            names = [h.name for h in added.scan()]
+            nested = geo.HeaderIndex(survey, recursive=True, index_dir=index_dir)
+            report.add_result("Header index picks up changes",
+                              changed_read == 1 and headers["XX.STA1.00.BHZ.sac"].n_samples == 600
+                              and added.headers_read == 1 and "XX.STA2.00.BHZ.sac" in names
+                              and nested.index_file != added.index_file,
+                              details=f"changed file re-read: {changed_read}, new file read: {added.headers_read}")
+        except Exception as e:
+            report.add_result("Header index picks up changes", False, error=str(e))
+
+
 # ============================================================================
 # MAIN
 # ============================================================================
@@ -1145,6 +3805,7 @@ def list_categories():
     """List available test categories"""
     print("\n📋 Available test categories:")
     print("  datahub     - Test DataHub functionality")
+    print("  columnar    - Test columnar DataHub backend")
     print("  engine      - Test ClassificationEngine")
     print("  schemes     - Test JSON scheme files")
     print("  normalize   - Test column name normalization")
@@ -1152,8 +3813,26 @@ def list_categories():
     print("  ui          - Test UI component structure")
     print("  plugins     - Test plugin directory structure")
     print("  derived     - Test derived field calculations")
+    print("  formula     - Test compiled formula evaluator")
     print("  scientific  - Test scientific classifications")
     print("  batch       - Test batch processing")
+    print("  parity      - Test vectorized vs scalar classification")
+    print("  lazy        - Test per-scheme derived fields and memo")
+    print("  scheduler   - Test run-all scheduler")
+    print("  cache       - Test scheme cache and lazy loading")
+    print("  diagrams    - Test diagram engine point-in-polygon")
+    print("  view        - Test incremental table view")
+    print("  search      - Test table search index")
+    print("  sort        - Test cached table sort orders")
+    print("  project     - Test binary project format")
+    print("  journal     - Test auto-save change journal")
+    print("  montecarlo  - Test vectorized uncertainty Monte Carlo")
+    print("  mixing      - Test vectorized isotope mixing models")
+    print("  kriging     - Test batched kriging and IDW")
+    print("  seismic     - Test vectorized seismic processing")
+    print("  survey      - Test memory-mapped trace files and header index")
+    print("  gridding    - Test tiled RBF gridding and chunked grid filters")
+    print("  euler       - Test batched Euler deconvolution")
     print("  all         - Run all tests (default)")
     print("\nUsage: python test_toolkit.py --category <category>")
     print("       python test_toolkit.py --verbose")
@@ -1191,6 +3870,7 @@ def main():
     # Run selected tests
     categories = {
         'datahub': test_data_hub,
+        'columnar': test_columnar_backend,
         'engine': test_classification_engine,
         'schemes': test_scheme_files,
         'normalize': test_column_normalization,
@@ -1198,8 +3878,26 @@ def main():
         'ui': test_ui_components,
         'plugins': test_plugin_structure,
         'derived': test_derived_fields_calculations,
+        'formula': test_compiled_formulas,
         'scientific': test_scientific_classifications,
         'batch': test_batch_processing,
+        'parity': test_batch_parity,
+        'lazy': test_lazy_derived_fields,
+        'scheduler': test_run_all_scheduler,
+        'cache': test_scheme_cache,
+        'diagrams': test_diagram_engine,
+        'view': test_table_view,
+        'search': test_search_index,
+        'sort': test_sort_index,
+        'project': test_project_format,
+        'journal': test_change_journal,
+        'montecarlo': test_monte_carlo,
+        'mixing': test_mixing_models,
+        'kriging': test_kriging,
+        'seismic': test_seismic_processing,
+        'survey': test_survey_files,
+        'gridding': test_gridding,
+        'euler': test_euler,
     }
 
     if args.category == 'all':
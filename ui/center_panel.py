@@ -5,6 +5,12 @@ Fully converted to ttkbootstrap with minimal borders
 FIXED: Added null checks and background processing for large datasets
 ADDED: Copy/Paste functionality (Ctrl+C, Ctrl+V)
 FIXED: Field panel selection sync — notifies active field panel on every selection change
+ADDED: Incremental refresh — row-level DataHub events patch the filtered/sorted
+       view (ui/table_view.py) and only the visible page is redrawn
+ADDED: Cached typed sort orders (ui/sort_index.py); Shift+click a header to
+       add it as a tie-breaker (multi-column sort)
+ADDED: Each rendered page is published as a view model (ui/view_model.py);
+       the HUD reads its rows from it
 """
 
 import tkinter as tk
@@ -16,7 +22,12 @@ import os
 import json
 import threading
 import time
+from bisect import bisect_left
 from ui.all_schemes_detail_dialog import generate_explanation_text
+from ui.table_view import TableView
+from ui.search_index import SearchIndex, HAS_NUMPY
+from ui.sort_index import SortIndex
+from ui.view_model import ViewModel
 
 class CenterPanel:
     # Icon map shared by set_status / show_progress / show_operation_complete
@@ -39,6 +50,35 @@ class CenterPanel:
         "complete":   "✅",
     }
 
+    # ============ TABLE COLUMN ORDER ============
+    PRIORITY_COLUMNS = [
+        "Sample_ID", "Notes", "Museum_Code", "Date", "Latitude", "Longitude",
+    ]
+
+    EARLY_METADATA_COLUMNS = [
+        "Depth_cm", "C14_age_BP", "C14_error",
+        "Zr_ppm", "Nb_ppm", "Ba_ppm", "Rb_ppm", "Cr_ppm", "Ni_ppm",
+        "SiO2_wt", "TiO2_wt", "Al2O3_wt", "Fe2O3_T_wt",
+    ]
+
+    CLASSIFICATION_COLUMNS = [
+        "Auto_Classification", "TAS_Classification", "Weathering_State",
+        "Enrichment_Status", "Planetary_Analog", "Provenance_Fingerprint",
+        "CIPW_Category", "Anomaly_Status", "Eruption_Style",
+        "Slag_Basicity_Class", "Magmatic_Series", "Collagen_Status",
+        "Apatite_Classification", "Trophic_Level", "Estimated_Firing_Temp",
+        "Chondrite_Class", "Carbonate_Type", "Bone_Preservation_Status",
+        "Pollution_Grade_Igeo", "Glass_Family_Type", "Shock_Stage",
+        "Weathering_Grade", "Exploration_Priority", "REE_Pattern_Type",
+        "Wentworth_Class", "Salinity_Class", "Sodicity_Class",
+        "USDA_Texture_Class", "Full_USDA_Class", "Hardness_Level",
+        "Dietary_Group", "IUGS_Volcanic_Class", "TAS_Magmatic_Series",
+        "Auto_Confidence", "Flag_For_Review", "Display_Color"
+    ]
+
+    # Row events touching more rows than this rebuild the view instead
+    INCREMENTAL_MAX_ROWS = 1000
+
     def __init__(self, parent, app):
         self.app = app
         self.frame = ttk.Frame(parent, bootstyle="dark")
@@ -49,10 +89,26 @@ class CenterPanel:
         self.selected_rows = set()
         self.filtered_indices = None
 
+        # Filtered/sorted row index, patched in place by row-level DataHub events
+        self.view = TableView()
+        self._view_ready = False
+        self._pending_rows = set()
+        self._row_after_id = None
+        self._page_after_id = None
+        self._rendered_column_count = 0
+        self._rebuild_again = False
+        # The view + page as last rendered, shared with the HUD
+        self.view_model = ViewModel()
+        # Inverted index behind the search box, kept current from the same events
+        self.search_index = SearchIndex() if HAS_NUMPY else None
+
         # >>> COLUMNS SORTING <<<
         self.sort_column = None
         self.sort_reverse = False
+        self.sort_keys = []             # [(column, reverse), ...], primary first
         self.sorted_indices = None
+        # Cached per-column sort ranks / permutations, dropped on any data change
+        self.sort_index = SortIndex()
 
         # Track if this is the first refresh (for auto-sizing columns)
         self._first_refresh = True
@@ -714,7 +770,68 @@ class CenterPanel:
             self._update_ai_dropdown()
 
     def on_data_changed(self, event, *args):
-        self._schedule_refresh()
+        """
+        Patch the view for row-level events, rebuild it for everything else.
+        'update' / 'samples_updated' carry row indices, 'samples_added' the
+        first new row and count, 'samples_deleted' the deleted rows.
+        """
+        self._update_search_index(event, args)
+        self.sort_index.invalidate()
+        if not self._view_ready:
+            self._schedule_refresh()
+            return
+
+        if event == 'update' and args:
+            self._pending_rows.add(args[0])
+            self._schedule_row_refresh()
+        elif event == 'samples_updated' and args and len(args[0]) <= self.INCREMENTAL_MAX_ROWS:
+            self._pending_rows.update(args[0])
+            self._schedule_row_refresh()
+        elif (event == 'samples_added' and len(args) >= 2 and args[1] <= self.INCREMENTAL_MAX_ROWS
+              and self.filter_var.get() == "All"):
+            # Classification results are reset on add/delete, so only the
+            # unfiltered-by-class view can be patched
+            self._apply_row_updates()
+            start, count = args[0], args[1]
+            samples = self.app.data_hub.get_all()
+            self.view.rows_added(start, [samples[i] for i in range(start, start + count)],
+                                 self._results())
+            self._schedule_page_redraw()
+        elif event == 'samples_deleted' and len(args) >= 2 and self.filter_var.get() == "All":
+            self._apply_row_updates()
+            deleted = args[1]
+            self.view.rows_deleted(deleted)
+            self.selected_rows = self._shift_selection(deleted)
+            self._schedule_page_redraw()
+        else:
+            self._schedule_refresh()
+
+    def _update_search_index(self, event, args):
+        index = self.search_index
+        if index is None:
+            return
+        samples = self.app.data_hub.get_all()
+        if event == 'samples_added' and len(args) >= 2:
+            start, count = args[0], args[1]
+            index.rows_added(start, [samples[i] for i in range(start, start + count)])
+        elif event == 'update' and args:
+            index.row_updated(args[0], samples[args[0]])
+        elif event == 'samples_updated' and args:
+            for idx in args[0]:
+                index.row_updated(idx, samples[idx])
+        elif event == 'samples_deleted' and len(args) >= 2:
+            index.rows_deleted(args[1])
+        else:
+            index.invalidate()
+
+    def _results(self):
+        return getattr(self.app.right, 'classification_results', [])
+
+    def _shift_selection(self, deleted):
+        """Selected rows after a deletion moved the rows below up."""
+        deleted = sorted(deleted)
+        gone = set(deleted)
+        return {idx - bisect_left(deleted, idx) for idx in self.selected_rows if idx not in gone}
 
     def _schedule_filter(self):
         """Schedule filter operation with debouncing"""
@@ -724,10 +841,60 @@ class CenterPanel:
 
     def _schedule_refresh(self):
         """Schedule refresh with debouncing"""
+        self._view_ready = False
         if hasattr(self, '_refresh_after_id'):
             self.frame.after_cancel(self._refresh_after_id)
         self._refresh_after_id = self.frame.after(100, self._refresh)
 
+    def _schedule_row_refresh(self):
+        """Debounce edited-row redraws (many edits in a burst -> one pass)."""
+        if self._row_after_id is None:
+            self._row_after_id = self.frame.after(50, self._apply_row_updates)
+
+    def _schedule_page_redraw(self):
+        if self._page_after_id is None:
+            self._page_after_id = self.frame.after(50, self._redraw_page)
+
+    def _apply_row_updates(self):
+        """Re-test edited rows against the filter; redraw only what is visible."""
+        if self._row_after_id is not None:
+            self.frame.after_cancel(self._row_after_id)
+            self._row_after_id = None
+        rows, self._pending_rows = self._pending_rows, set()
+        if not rows or not self._view_ready:
+            return
+
+        samples = self.app.data_hub.get_all()
+        results = self._results()
+        moved = False
+        for idx in rows:
+            if idx < len(samples):
+                moved |= self.view.row_resorted(idx, samples, self.sort_keys)
+                moved |= self.view.row_updated(idx, samples[idx], results)
+
+        if moved or self._columns_changed():
+            self._schedule_page_redraw()
+            return
+        for idx in rows:
+            if idx < len(samples):
+                self._redraw_row(idx, samples[idx])
+
+    def _columns_changed(self):
+        return len(self.app.data_hub.columns) != self._rendered_column_count
+
+    def _redraw_row(self, actual_idx, sample):
+        """Rewrite one Treeview item in place (no-op when it is not on this page)."""
+        item_id = f"row_{actual_idx}"
+        if not self.tree.exists(item_id):
+            return
+        values = self._row_values(actual_idx, sample, list(self.tree["columns"]))
+        self.tree.item(item_id, values=values, tags=(self._get_row_tag(actual_idx, sample),))
+
+    def _redraw_page(self):
+        self._page_after_id = None
+        if self._view_ready:
+            self._render_page()
+
     def _refresh(self):
         """Refresh table with background processing for large datasets"""
         # 🔧 Prevent concurrent refreshes
@@ -760,117 +927,93 @@ class CenterPanel:
 
         # Cancel any existing background thread
         if self._background_thread and self._background_thread.is_alive():
+            self._rebuild_again = True
             return
 
+        self._view_ready = False
+        self._pending_rows.clear()   # the rebuild sees every edit made so far
+
         def worker():
             # Capture current state
-            search = self.search_var.get().lower().strip()
-            filter_class = self.filter_var.get()
-            all_samples = self.app.data_hub.get_all()
-            all_results = getattr(self.app.right, 'classification_results', [])
-
-            # Do heavy processing
-            filtered_data = self._process_filtering(all_samples, all_results, search, filter_class)
+            view = self._build_view()
 
             # Schedule UI update on main thread
-            self.frame.after(0, lambda: self._update_ui_with_filtered(filtered_data))
+            self.frame.after(0, lambda: self._update_ui_with_filtered(view))
 
         self._background_thread = threading.Thread(target=worker, daemon=True)
         self._background_thread.start()
 
-    def _process_filtering(self, all_samples, all_results, search, filter_class):
-        """Process filtering logic (can run in background)"""
-        filtered = []
-
-        for idx, sample in enumerate(all_samples):
-            # Search filter
-            if search:
-                if not any(search in str(v).lower() for v in sample.values() if v is not None):
-                    continue
-
-            # Classification filter
-            if filter_class and filter_class != "All":
-                cls = ''
-                if idx < len(all_results) and all_results[idx]:
-                    cls = all_results[idx].get('classification', '')
-                if not cls:
-                    cls = (sample.get('Auto_Classification') or
-                          sample.get('Classification') or '')
-                if cls != filter_class:
-                    continue
-
-            filtered.append((idx, sample))
-
-        return filtered
-
-    def _update_ui_with_filtered(self, filtered_data):
-        """Update UI with filtered data from background thread"""
-        self.filtered_indices = [idx for idx, _ in filtered_data]
-        self._refresh_ui_with_filtered(filtered_data)
+    def _update_ui_with_filtered(self, view):
+        """Update UI with the view rebuilt by the background thread"""
+        self._set_view(view)
         self.clear_status()
+        if self._rebuild_again:
+            # Data or filters changed while this view was being built
+            self._rebuild_again = False
+            self._schedule_refresh()
 
     def _refresh_ui(self):
         """Refresh UI directly (for small datasets)"""
-        search = self.search_var.get().lower().strip()
-        filter_class = self.filter_var.get()
-
+        self._set_view(self._build_view())
+
+    def _build_view(self):
+        """A fresh TableView for the current search, filter and sort order."""
+        view = TableView()
+        view.rebuild(self.app.data_hub.get_all(), self._results(),
+                     self.search_var.get().lower().strip(), self.filter_var.get(),
+                     self.sorted_indices, index=self.search_index,
+                     columns=self.app.data_hub.get_column_names())
+        return view
+
+    def _set_view(self, view):
+        self.view = view
+        self.filtered_indices = view.indices
+        self._view_ready = True
+        self._pending_rows.clear()
+        self._render_page()
+
+    def _row_values(self, actual_idx, sample, columns):
+        """Display strings for one row, in Treeview column order."""
+        checkbox = "☑" if actual_idx in self.selected_rows else "☐"
+        values = [checkbox]
+
+        for col in columns[1:]:
+            # 🔐 Null check for value
+            val = sample.get(col)
+            if val is None or val == "":
+                values.append("")
+            elif isinstance(val, (int, float)):
+                if abs(val) < 0.01 or abs(val) > 1000:
+                    values.append(f"{val:.2e}")
+                elif val == int(val):
+                    values.append(str(int(val)))
+                else:
+                    values.append(f"{val:.2f}")
+            else:
+                if col in self.CLASSIFICATION_COLUMNS and len(str(val)) > 30:
+                    values.append(str(val)[:27] + "...")
+                else:
+                    values.append(str(val))
+        return tuple(values)
+
+    def _render_page(self):
+        """Redraw the current page of the view (only the visible rows)."""
+        self.filtered_indices = self.view.indices
+        total = len(self.view)
+        self.current_page = min(self.current_page, self.view.page_count(self.page_size) - 1)
         all_samples = self.app.data_hub.get_all()
-        all_results = getattr(self.app.right, 'classification_results', [])
-        total_rows = len(all_samples)
-
-        # =====================================================
-        # MASTER ORDER
-        # =====================================================
-        if getattr(self, "sorted_indices", None):
-            ordered_indices = self.sorted_indices
-        else:
-            ordered_indices = list(range(total_rows))
-
-        # =====================================================
-        # FILTERING (applied on ordered list)
-        # =====================================================
-        filtered = self._process_filtering(all_samples, all_results, search, filter_class)
-        self._refresh_ui_with_filtered(filtered)
-
-    def _refresh_ui_with_filtered(self, filtered):
-        """Common UI update after filtering"""
-        total = len(filtered)
 
         # =====================================================
         # PAGINATION
         # =====================================================
-        start = self.current_page * self.page_size
-        page_items = filtered[start:start + self.page_size]
-        samples = [s for _, s in page_items]
-        page_actual_indices = [i for i, _ in page_items]
+        page_actual_indices = [i for i in self.view.page(self.current_page, self.page_size)
+                               if i < len(all_samples)]
+        samples = [all_samples[i] for i in page_actual_indices]
 
         all_columns = self.app.data_hub.get_column_names()
-
-        # ============ PRIORITY COLUMN ORDER ============
-        priority_order = [
-            "Sample_ID", "Notes", "Museum_Code", "Date", "Latitude", "Longitude",
-        ]
-
-        early_metadata = [
-            "Depth_cm", "C14_age_BP", "C14_error",
-            "Zr_ppm", "Nb_ppm", "Ba_ppm", "Rb_ppm", "Cr_ppm", "Ni_ppm",
-            "SiO2_wt", "TiO2_wt", "Al2O3_wt", "Fe2O3_T_wt",
-        ]
-
-        classification_columns = [
-            "Auto_Classification", "TAS_Classification", "Weathering_State",
-            "Enrichment_Status", "Planetary_Analog", "Provenance_Fingerprint",
-            "CIPW_Category", "Anomaly_Status", "Eruption_Style",
-            "Slag_Basicity_Class", "Magmatic_Series", "Collagen_Status",
-            "Apatite_Classification", "Trophic_Level", "Estimated_Firing_Temp",
-            "Chondrite_Class", "Carbonate_Type", "Bone_Preservation_Status",
-            "Pollution_Grade_Igeo", "Glass_Family_Type", "Shock_Stage",
-            "Weathering_Grade", "Exploration_Priority", "REE_Pattern_Type",
-            "Wentworth_Class", "Salinity_Class", "Sodicity_Class",
-            "USDA_Texture_Class", "Full_USDA_Class", "Hardness_Level",
-            "Dietary_Group", "IUGS_Volcanic_Class", "TAS_Magmatic_Series",
-            "Auto_Confidence", "Flag_For_Review", "Display_Color"
-        ]
+        self._rendered_column_count = len(all_columns)
+        priority_order = self.PRIORITY_COLUMNS
+        classification_columns = self.CLASSIFICATION_COLUMNS
 
         final_cols = ["☐"]
 
@@ -878,7 +1021,7 @@ class CenterPanel:
             if col in all_columns and col not in final_cols:
                 final_cols.append(col)
 
-        for col in early_metadata:
+        for col in self.EARLY_METADATA_COLUMNS:
             if col in all_columns and col not in final_cols:
                 final_cols.append(col)
 
@@ -902,39 +1045,19 @@ class CenterPanel:
         self.tree.delete(*self.tree.get_children())
 
         # Insert new items with null checks
-        for i, sample in enumerate(samples):
+        for actual_idx, sample in zip(page_actual_indices, samples):
             # 🔐 Null check for sample
             if sample is None:
                 continue
 
-            actual_idx = page_actual_indices[i]
-            checkbox = "☑" if actual_idx in self.selected_rows else "☐"
-            values = [checkbox]
-
-            for col in final_cols[1:]:
-                # 🔐 Null check for value
-                val = sample.get(col)
-                if val is None or val == "":
-                    values.append("")
-                elif isinstance(val, (int, float)):
-                    if abs(val) < 0.01 or abs(val) > 1000:
-                        values.append(f"{val:.2e}")
-                    elif val == int(val):
-                        values.append(str(int(val)))
-                    else:
-                        values.append(f"{val:.2f}")
-                else:
-                    if col in classification_columns and len(str(val)) > 30:
-                        values.append(str(val)[:27] + "...")
-                    else:
-                        values.append(str(val))
+            values = self._row_values(actual_idx, sample, final_cols)
 
             # Tag logic with null checks
             tag = self._get_row_tag(actual_idx, sample)
 
             item_id = f"row_{actual_idx}"
             try:
-                self.tree.insert("", tk.END, iid=item_id, values=tuple(values), tags=(tag,))
+                self.tree.insert("", tk.END, iid=item_id, values=values, tags=(tag,))
             except tk.TclError:
                 # Item might already exist, skip
                 pass
@@ -948,8 +1071,8 @@ class CenterPanel:
             self.app.auto_size_columns(self.tree, samples, force=False)
             self._first_refresh = False
 
-        pages = (total + self.page_size - 1) // self.page_size if total > 0 else 1
-        self.app.update_pagination(self.current_page, pages, total)
+        self.app.update_pagination(self.current_page, self.view.page_count(self.page_size), total)
+        self.view_model.publish(self.view, self.current_page, self.page_size)
         self._notify_selection_changed()
 
     def _update_tree_columns(self, final_cols, priority_order, classification_columns):
@@ -1058,7 +1181,7 @@ class CenterPanel:
                 col_index = int(column[1:]) - 1
                 cols = self.tree["columns"]
                 if col_index < len(cols):
-                    self._sort_by_column(cols[col_index])
+                    self._sort_by_column(cols[col_index], add=bool(event.state & 0x0001))
         elif region == "cell":
             item = self.tree.identify_row(event.y)
             if item:
@@ -1099,12 +1222,12 @@ class CenterPanel:
         for i in range(total):
             self.selected_rows.add(i)
         self._notify_selection_changed()
-        self._refresh()
+        self._show_page()
 
     def deselect_all(self):
         self.selected_rows.clear()
         self._notify_selection_changed()
-        self._refresh()
+        self._show_page()
 
     def _notify_selection_changed(self):
         """Notify all listeners of selection change, including active field panels."""
@@ -1158,21 +1281,27 @@ class CenterPanel:
     def get_selected_indices(self):
         return list(self.selected_rows)
 
+    def _show_page(self):
+        """Redraw the current page from the view; rebuild it first if it is stale."""
+        if self._view_ready:
+            self._render_page()
+        else:
+            self._refresh()
+
     def prev_page(self):
         if self.current_page > 0:
             self.current_page -= 1
-            self._refresh()
-            if hasattr(self.app.right, '_update_hud'):
-                self.app.right._update_hud()
+            self._show_page()
 
     def next_page(self):
-        total = self.app.data_hub.row_count()
-        pages = (total + self.page_size - 1) // self.page_size if total > 0 else 1
+        if self._view_ready:
+            pages = self.view.page_count(self.page_size)
+        else:
+            total = self.app.data_hub.row_count()
+            pages = (total + self.page_size - 1) // self.page_size if total > 0 else 1
         if self.current_page < pages - 1:
             self.current_page += 1
-            self._refresh()
-            if hasattr(self.app.right, '_update_hud'):
-                self.app.right._update_hud()
+            self._show_page()
 
     def _get_display_name(self, column_name):
         if hasattr(self.app, 'chemical_elements'):
@@ -1193,16 +1322,12 @@ class CenterPanel:
     def _apply_filter(self):
         self.current_page = 0
         self._refresh()
-        if hasattr(self.app.right, '_update_hud'):
-            self.app.right._update_hud()
 
     def _clear_filter(self):
         self.search_var.set("")
         self.filter_var.set("All")
         self.current_page = 0
         self._refresh()
-        if hasattr(self.app.right, '_update_hud'):
-            self.app.right._update_hud()
 
     def _on_header_click(self, event):
         """Handle click on column header for sorting"""
@@ -1212,22 +1337,34 @@ class CenterPanel:
             if column and column != "#1":
                 col_index = int(column[1:]) - 1
                 col_name = self.tree["columns"][col_index]
-                self._sort_by_column(col_name)
+                self._sort_by_column(col_name, add=bool(event.state & 0x0001))
 
-    def _sort_by_column(self, column_name):
-        """Sort all data by the given column — runs in background thread"""
-        if self.sort_column == column_name:
-            self.sort_reverse = not self.sort_reverse
+    def _sort_by_column(self, column_name, add=False):
+        """
+        Sort all data by the given column (again: reverse it). With add
+        (Shift+click) the column becomes the next tie-breaker instead.
+        """
+        keys = list(self.sort_keys)
+        columns = [column for column, _ in keys]
+        if column_name in columns and (add or columns[0] == column_name):
+            i = columns.index(column_name)
+            keys[i] = (column_name, not keys[i][1])
+        elif add and keys:
+            keys.append((column_name, False))
         else:
-            self.sort_column = column_name
-            self.sort_reverse = False
+            keys = [(column_name, False)]
+        self._apply_sort(keys)
+
+    def _apply_sort(self, keys):
+        """Sort by keys = [(column, reverse), ...] — cached orders come back at once."""
+        self.sort_keys = list(keys)
+        self.sort_column, self.sort_reverse = self.sort_keys[0] if self.sort_keys else (None, False)
 
         all_samples = self.app.data_hub.get_all()
-        if not all_samples:
+        if not all_samples or not self.sort_keys:
             return
 
-        col_snapshot = column_name
-        rev_snapshot = self.sort_reverse
+        keys_snapshot = list(self.sort_keys)
 
         self.set_status("Sorting...", "processing")
 
@@ -1237,12 +1374,7 @@ class CenterPanel:
         current_gen = getattr(self, '_sort_generation', 0)
 
         def worker():
-            indexed = list(enumerate(all_samples))
-            indexed.sort(
-                key=lambda x: self._get_sort_value(x[1], col_snapshot),
-                reverse=rev_snapshot
-            )
-            sorted_indices = [orig_idx for orig_idx, _ in indexed]
+            sorted_indices = self.sort_index.order(all_samples, keys_snapshot)
             self.frame.after(0, lambda: self._apply_sort_result(sorted_indices, current_gen))
 
         self._sort_thread = threading.Thread(target=worker, daemon=True)
@@ -1261,24 +1393,6 @@ class CenterPanel:
         if hasattr(self.app, "right") and hasattr(self.app.right, "update_hud_with_sort"):
             self.app.right.update_hud_with_sort(self.sorted_indices, is_sorted=True)
 
-    def _get_sort_value(self, sample, column_name):
-        """Extract and normalize value for sorting"""
-        if sample is None:
-            return (1, "")
-
-        value = sample.get(column_name, "")
-
-        if value == "" or value is None:
-            return (1, "")
-
-        try:
-            if isinstance(value, (int, float)):
-                return (0, value)
-            num_val = float(value)
-            return (0, num_val)
-        except (ValueError, TypeError):
-            return (2, str(value).lower())
-
     def _update_header_indicators(self):
         """Update column headers to show sort direction"""
         for col in self.tree["columns"]:
@@ -1286,8 +1400,11 @@ class CenterPanel:
                 continue
 
             display_name = self._get_display_name(col)
-            if col == self.sort_column:
-                indicator = " ↑" if not self.sort_reverse else " ↓"
+            keys = dict(self.sort_keys)
+            if col in keys:
+                indicator = " ↑" if not keys[col] else " ↓"
+                if len(keys) > 1:
+                    indicator += str([c for c, _ in self.sort_keys].index(col) + 1)
                 self.tree.heading(col, text=display_name + indicator)
             else:
                 self.tree.heading(col, text=display_name)
@@ -1296,6 +1413,7 @@ class CenterPanel:
         """Clear sorting and restore natural order"""
         self.sort_column = None
         self.sort_reverse = False
+        self.sort_keys = []
         self.sorted_indices = None
 
         self._update_header_indicators()
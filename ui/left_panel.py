@@ -7,6 +7,10 @@ Manual Entry takes fixed height, Hardware at bottom with scrollbar for 8+ plugin
 ✓ SCROLLBAR on left for 16+ plugins
 ✓ MANUAL ENTRY expands to fill remaining space
 FIXED: Added file encoding detection for CSV imports
+ADDED: CSV files are streamed in chunks on a worker thread
+       (features/csv_import.py) and fill the table as they are read
+ADDED: Excel/ODS workbooks import every sheet column by column
+       (features/sheet_import.py), no per-row DataFrame walk
 """
 
 import tkinter as tk
@@ -15,8 +19,18 @@ from tkinter import filedialog, messagebox
 
 import re
 import json
-import chardet
+import time
+import queue
+import threading
 from pathlib import Path
+from features.csv_import import CsvStreamReader, detect_encoding, normalize_column_name as _normalize_column_name
+from features.sheet_import import HAS_PANDAS, read_sheets, frame_columns
+
+# Parsed CSV chunks allowed to wait for the UI thread (bounds import memory)
+IMPORT_QUEUE_CHUNKS = 4
+# How often the UI thread picks up parsed chunks, and how long it may spend
+IMPORT_POLL_MS = 20
+IMPORT_TICK_SECONDS = 0.05
 
 class LeftPanel:
     def __init__(self, parent, app):
@@ -25,6 +39,8 @@ class LeftPanel:
 
         # Load column mappings from JSON
         self.column_mappings = self._load_column_mappings()
+        # True while a CSV is streamed in (observers see one add per chunk)
+        self.importing = False
 
         # Entry variables
         self.sample_id_var = tk.StringVar()
@@ -73,59 +89,11 @@ class LeftPanel:
         3. Match against loaded JSON mappings
         4. If no match, preserve original with minimal cleanup
         """
-        if not name:
-            return name
-
-        # Strip whitespace from ends
-        cleaned = str(name).strip()
-
-        # Create lookup key (lowercase, normalized spacing)
-        lookup_key = cleaned.lower()
-        lookup_key = re.sub(r'\s+', ' ', lookup_key)  # Normalize multiple spaces
-
-        # Try with spaces
-        if mappings and lookup_key in mappings:
-            return mappings[lookup_key]
-
-        # Try with underscores (replace spaces with underscores)
-        lookup_key_underscore = lookup_key.replace(' ', '_')
-        if mappings and lookup_key_underscore in mappings:
-            return mappings[lookup_key_underscore]
-
-        # Try without any separators
-        lookup_key_nosep = re.sub(r'[\s_]+', '', lookup_key)
-        if mappings and lookup_key_nosep in mappings:
-            return mappings[lookup_key_nosep]
-
-        # If no mapping found, preserve original but clean it up minimally
-        # Just replace multiple spaces with single underscore
-        result = re.sub(r'\s+', '_', cleaned)
-
-        return result
+        return _normalize_column_name(name, mappings)
 
     def _detect_encoding(self, filepath):
         """Detect file encoding using chardet"""
-        try:
-            with open(filepath, 'rb') as f:
-                raw_data = f.read(10000)  # Read first 10KB for detection
-                result = chardet.detect(raw_data)
-                encoding = result.get('encoding', 'utf-8')
-                confidence = result.get('confidence', 0)
-
-                if confidence > 0.7:
-                    return encoding
-                else:
-                    # Fallback encodings in order of likelihood
-                    for enc in ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']:
-                        try:
-                            with open(filepath, 'r', encoding=enc) as test_f:
-                                test_f.read(1000)
-                            return enc
-                        except:
-                            continue
-                    return 'utf-8'  # Default fallback
-        except:
-            return 'utf-8'  # Default fallback
+        return detect_encoding(filepath)
 
     def _build_ui(self):
         """Build left panel UI with proper spacing"""
@@ -278,20 +246,29 @@ class LeftPanel:
             return
 
         total = len(paths)
-        for i, path in enumerate(paths):
+
+        # One file at a time: CSV imports finish on a worker thread
+        def import_next(i=0):
+            if i == total:
+                self.app.center.set_status(f"Imported {total} files", "success")
+                messagebox.showinfo("Batch Import Complete", f"Successfully imported {total} files.")
+                return
             self.app.center.set_status(
-                f"Importing file {i+1} of {total}: {Path(path).name}",
+                f"Importing file {i+1} of {total}: {Path(paths[i]).name}",
                 "processing"
             )
-            self.import_csv(path, silent=True)   # suppress per‑file success dialogs
+            # suppress per‑file success dialogs
+            self.import_csv(paths[i], silent=True, on_done=lambda: import_next(i + 1))
 
-        self.app.center.set_status(f"Imported {total} files", "success")
-        messagebox.showinfo("Batch Import Complete", f"Successfully imported {total} files.")
+        import_next()
 
-    def import_csv(self, path=None, silent=False):
+    def import_csv(self, path=None, silent=False, on_done=None, wait=False):
         """
         Unified import dispatcher.
         If silent=True, suppress success/warning messageboxes (errors still shown).
+        CSV files are read in the background and added chunk by chunk;
+        on_done() runs once the file is finished (wait=True reads it
+        before returning instead).
         """
         if path is None:
             path = filedialog.askopenfilename(
@@ -309,27 +286,29 @@ class LeftPanel:
                 return
             silent = False   # when user picks a single file, show dialogs
 
+        if path.lower().endswith('.csv'):
+            self._import_csv_stream(path, silent, on_done, wait)
+            return
+
         try:
             ext = path.lower()
             rows = []
 
-            if ext.endswith('.csv'):
-                rows = self._parse_csv(path)
-            elif ext.endswith(('.xlsx', '.xls', '.ods')):
-                rows = self._parse_excel_ods(path)
+            if ext.endswith(('.xlsx', '.xls', '.ods')):
+                imported = self._import_excel_ods(path)
             elif ext.endswith(('.txt', '.mca', '.spec')):
                 rows = self._parse_amptek_spectrum(path)
+                imported = self.app.data_hub.add_samples(rows) if rows else 0
             else:
                 self.app.center.show_error('import', f"Unsupported file format: {path}")
                 messagebox.showerror("Error", f"Unsupported file format: {path}")
-                return
+                imported = None
 
-            if rows:
-                self.app.data_hub.add_samples(rows)
-                self.app.center.show_operation_complete('import', f"{len(rows)} rows imported")
+            if imported:
+                self.app.center.show_operation_complete('import', f"{imported} rows imported")
                 if not silent:
-                    messagebox.showinfo("Success", f"Imported {len(rows)} rows from {path}")
-            else:
+                    messagebox.showinfo("Success", f"Imported {imported} rows from {path}")
+            elif imported is not None:
                 self.app.center.show_warning('import', "No data found in file")
                 if not silent:
                     messagebox.showwarning("Warning", f"No data found in {path}")
@@ -338,45 +317,117 @@ class LeftPanel:
             self.app.center.show_error('import', str(e))
             messagebox.showerror("Error", f"Failed to import {path}: {e}")
 
-    def _parse_excel_ods(self, path):
-        """Parse Excel or LibreOffice ODS file, return list of row dictionaries."""
+        if on_done:
+            on_done()
+
+    def _import_csv_stream(self, path, silent=False, on_done=None, wait=False):
+        """
+        Stream a CSV file into the DataHub: a worker thread parses chunks into
+        a small bounded queue, the UI thread adds each chunk as it arrives.
+        """
         try:
-            import pandas as pd
-        except ImportError:
+            reader = CsvStreamReader(path, self.column_mappings, self._detect_encoding(path))
+        except OSError as e:
+            self.app.center.show_error('import', str(e))
+            messagebox.showerror("Error", f"Failed to import {path}: {e}")
+            if on_done:
+                on_done()
+            return
+
+        def finish(imported, error=None):
+            self.importing = False
+            right = getattr(self.app, 'right', None)
+            if right is not None and hasattr(right, 'on_import_finished'):
+                right.on_import_finished()
+            if error is not None:
+                self.app.center.show_error('import', str(error))
+                messagebox.showerror("Error", f"Failed to import {path}: {error}")
+            elif imported:
+                self.app.center.show_operation_complete('import', f"{imported} rows imported")
+                if not silent:
+                    messagebox.showinfo("Success", f"Imported {imported} rows from {path}")
+            else:
+                self.app.center.show_warning('import', "No data found in file")
+                if not silent:
+                    messagebox.showwarning("Warning", f"No data found in {path}")
+            if on_done:
+                on_done()
+
+        def progress(imported):
+            total_kb = max(reader.total_bytes // 1024, 1)
+            self.app.center.show_progress('import', min(reader.bytes_read // 1024, total_kb), total_kb,
+                                          f"{imported} rows")
+
+        self.importing = True
+        if wait:
+            imported = 0
+            try:
+                for rows in reader.chunks():
+                    imported += self.app.data_hub.add_samples(rows)
+                    progress(imported)
+            except Exception as e:
+                finish(imported, e)
+                return
+            finish(imported)
+            return
+
+        chunks = queue.Queue(maxsize=IMPORT_QUEUE_CHUNKS)
+
+        def worker():
+            try:
+                for rows in reader.chunks():
+                    chunks.put(('rows', rows))
+                chunks.put(('done', None))
+            except Exception as e:
+                chunks.put(('error', e))
+
+        state = {'imported': 0}
+
+        def drain():
+            deadline = time.perf_counter() + IMPORT_TICK_SECONDS
+            while time.perf_counter() < deadline:
+                try:
+                    kind, payload = chunks.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == 'rows':
+                    state['imported'] += self.app.data_hub.add_samples(payload)
+                    progress(state['imported'])
+                else:
+                    finish(state['imported'], payload)
+                    return
+            self.frame.after(IMPORT_POLL_MS, drain)
+
+        self.app.center.show_progress('import', 0, None, f"Reading {Path(path).name}")
+        threading.Thread(target=worker, daemon=True).start()
+        self.frame.after(IMPORT_POLL_MS, drain)
+
+    def _import_excel_ods(self, path):
+        """
+        Import every sheet of an Excel or LibreOffice ODS workbook, column by
+        column (features/sheet_import.py). Returns the number of rows added, or None
+        if pandas is missing.
+        """
+        if not HAS_PANDAS:
             self.app.center.show_error('import', "pandas not installed")
             messagebox.showerror(
                 "Error",
                 "Excel/ODS import requires pandas. Install with:\n"
                 "pip install pandas openpyxl odfpy"
             )
-            return []
+            return None
 
-        rows = []
-        ext = path.lower()
-        engine = 'odf' if ext.endswith('.ods') else None
-        df = pd.read_excel(path, engine=engine)
-
-        total_rows = len(df)
+        self.app.center.show_progress('import', 0, None, f"Reading {Path(path).name}")
+        sheets = read_sheets(path)
+        total_rows = sum(len(frame) for _, frame in sheets)
         self.app.center.show_progress('import', 0, total_rows, f"Found {total_rows} rows")
 
-        data_rows = []
-        for _, row in df.iterrows():
-            row_dict = {}
-            for col in df.columns:
-                val = row[col]
-                row_dict[col] = '' if pd.isna(val) else str(val).strip()
-            data_rows.append(row_dict)
-
-        for i, raw_row in enumerate(data_rows):
-            if i % 10 == 0 or i == total_rows - 1:
-                self.app.center.show_progress('import', i+1, total_rows,
-                                            f"Processing row {i+1}")
-
-            clean_row = self._normalize_row(raw_row, rows)
-            if clean_row:
-                rows.append(clean_row)
-
-        return rows
+        imported = 0
+        for name, frame in sheets:
+            count, columns = frame_columns(frame, self.column_mappings, first_serial=imported + 1)
+            imported += self.app.data_hub.add_columns(columns, count)
+            self.app.center.show_progress('import', imported, total_rows, f"Sheet {name}")
+        return imported
 
     def _parse_pptx(self, path):
         """Parse PowerPoint file and extract tables as data rows"""
@@ -646,86 +697,8 @@ class LeftPanel:
         return clean_row if clean_row else None
 
     def _parse_csv(self, path):
-        """Parse a CSV file with automatic encoding detection"""
-        import csv
-        import io
-
-        # 🔐 Detect file encoding
-        encoding = self._detect_encoding(path)
-
-        rows = []
-        try:
-            with open(path, 'r', encoding=encoding) as f:
-                # Skip comment lines (lines starting with #)
-                non_comment_lines = []
-                for line in f:
-                    if not line.strip().startswith('#'):
-                        non_comment_lines.append(line)
-
-                # Create a StringIO object from filtered lines
-                filtered_file = io.StringIO(''.join(non_comment_lines))
-
-                # Try different delimiters
-                sample = filtered_file.read(2048)
-                filtered_file.seek(0)
-
-                # Detect delimiter — validate sniffer result against known candidates
-                delimiter = ','  # safe default
-                try:
-                    dialect = csv.Sniffer().sniff(sample, delimiters=',;\t|')
-                    candidate = dialect.delimiter
-                    # Only accept the sniffer's result if it's a plausible delimiter
-                    if candidate in (',', ';', '\t', '|'):
-                        delimiter = candidate
-                except csv.Error:
-                    pass  # keep default comma
-
-                # Reopen with detected delimiter
-                filtered_file.seek(0)
-                reader = csv.DictReader(filtered_file, delimiter=delimiter)
-
-                if not reader.fieldnames:
-                    return rows
-
-                data_rows = list(reader)
-                total_rows = len(data_rows)
-                self.app.center.show_progress('import', 0, total_rows, f"Found {total_rows} rows")
-
-                for i, raw_row in enumerate(data_rows):
-                    if i % 10 == 0 or i == total_rows - 1:
-                        self.app.center.show_progress('import', i+1, total_rows,
-                                                    f"Processing row {i+1}")
-
-                    clean_row = self._normalize_row(raw_row, rows)
-                    if clean_row:
-                        rows.append(clean_row)
-
-        except UnicodeDecodeError:
-            # Fallback to binary mode with error handling
-            with open(path, 'rb') as f:
-                raw_data = f.read()
-                # Try to decode with error replacement
-                text = raw_data.decode('utf-8', errors='replace')
-                filtered_file = io.StringIO(text)
-                reader = csv.DictReader(filtered_file)
-                data_rows = list(reader)
-                for raw_row in data_rows:
-                    clean_row = self._normalize_row(raw_row, rows)
-                    if clean_row:
-                        rows.append(clean_row)
-        except csv.Error as e:
-            # Try with default settings if sniffing fails
-            with open(path, 'r', encoding=encoding) as f:
-                non_comment_lines = [line for line in f if not line.strip().startswith('#')]
-                filtered_file = io.StringIO(''.join(non_comment_lines))
-                reader = csv.DictReader(filtered_file)
-                data_rows = list(reader)
-                for raw_row in data_rows:
-                    clean_row = self._normalize_row(raw_row, rows)
-                    if clean_row:
-                        rows.append(clean_row)
-
-        return rows
+        """Parse a CSV file with automatic encoding detection (all rows at once)"""
+        return CsvStreamReader(path, self.column_mappings, self._detect_encoding(path)).read_all()
 
     def _add_row(self):
         """Add manual row - preserves column order"""
@@ -13,6 +13,9 @@ from collections import Counter
 import json
 from pathlib import Path
 from .all_schemes_detail_dialog import AllSchemesDetailDialog
+from engines.classification_scheduler import RunAllScheduler
+from ui.sort_index import order_by_keys
+from ui.view_model import column_widths, page_changes
 
 class RightPanel:
     def __init__(self, parent, app):
@@ -46,11 +49,24 @@ class RightPanel:
         self.all_mode = False
         self.all_schemes_list = []
 
+        # Background "Run All Schemes" job (see engines/classification_scheduler.py)
+        self._run_all_job = None
+        self._run_all_indices = []
+        self._run_all_schemes = []
+
+        # HUD rows as shown: [(row index, (values, tag)), ...]
+        self._hud_rows = []
+        # Pending field-panel detection (one per burst of data changes)
+        self._field_check_id = None
+
         # Build the UI
         self._build_ui()
         self.hud_tree.bind("<Button-1>", self._on_hud_header_click)
         self._refresh_results_cache()
 
+        # Render from the table's published view (no filtering of our own)
+        self.app.center.view_model.subscribe(self._on_view_changed)
+
     def _on_hud_header_click(self, event):
         region = self.hud_tree.identify("region", event.x, event.y)
         if region == "heading":
@@ -73,12 +89,7 @@ class RightPanel:
         total = len(all_samples)
 
         def get_key(idx):
-            sample = all_samples[idx]
-
-            if col_name == "ID":
-                return sample.get('Sample_ID', '')
-
-            elif col_name == "Class":
+            if col_name == "Class":
                 if self.all_mode and self.all_results and self.all_results[idx]:
                     best_class = "UNCLASSIFIED"
                     best_conf = -1.0
@@ -115,16 +126,19 @@ class RightPanel:
                         return 1 if self.classification_results[idx].get('flag_for_review', False) else 0
                     return 0
 
-        indexed = list(range(total))
-        indexed.sort(key=get_key, reverse=self.hud_sort_reverse)
+        if col_name == "ID":
+            # Same cached typed order as the table's Sample_ID header
+            indexed = self.app.center.sort_index.order(all_samples, [('Sample_ID', self.hud_sort_reverse)])
+        else:
+            indexed = order_by_keys([get_key(idx) for idx in range(total)], self.hud_sort_reverse)
 
         self.app.center.sorted_indices = indexed
         self.app.center.sort_column = None
         self.app.center.sort_reverse = False
+        self.app.center.sort_keys = []
         self.app.center._update_header_indicators()
-        self.app.center._refresh()
+        self.app.center._refresh()     # publishes the new view to the HUD
 
-        self._update_hud()
         self._update_hud_header_indicators()
 
     def _update_hud_header_indicators(self):
@@ -226,7 +240,6 @@ class RightPanel:
         self.hud_sort_column = None
         self.hud_sort_reverse = False
         self._update_hud_header_indicators()
-        self._update_hud()
 
     # ============ ENGINE SWITCHING ============
 
@@ -417,15 +430,7 @@ class RightPanel:
             if not values or len(values) < 1:
                 return
 
-            short_id = values[0]
-            samples = self.app.data_hub.get_all()
-            target_idx = None
-
-            for idx, sample in enumerate(samples):
-                full_id = sample.get('Sample_ID', '')
-                if full_id.endswith(short_id) or full_id == short_id:
-                    target_idx = idx
-                    break
+            target_idx = self._hud_index(item)
 
             if target_idx is not None and hasattr(self._active_field_panel, 'on_sample_double_click'):
                 self._active_field_panel.on_sample_double_click(target_idx)
@@ -441,15 +446,8 @@ class RightPanel:
         if not values or len(values) < 1:
             return
 
-        short_id = values[0]
         samples = self.app.data_hub.get_all()
-        target_idx = None
-
-        for idx, sample in enumerate(samples):
-            full_id = sample.get('Sample_ID', '')
-            if full_id.endswith(short_id) or full_id == short_id:
-                target_idx = idx
-                break
+        target_idx = self._hud_index(item)
 
         if target_idx is None:
             return
@@ -527,6 +525,34 @@ class RightPanel:
 
     def on_data_changed(self, event, *args):
         """When data changes, reset all caches and refresh HUD."""
+        if event == 'update' and args and self._run_all_job is None:
+            # One edited row: only its own results are stale
+            idx = args[0]
+            if idx < len(self.classification_results):
+                self.classification_results[idx] = None
+            if self.all_results is not None and idx < len(self.all_results):
+                self.all_results[idx] = None
+            self._update_hud()
+            return
+        if (event == 'samples_added' and len(args) >= 2
+                and args[0] == len(self.classification_results)):
+            # Rows appended (e.g. one chunk of a streaming import): extend the
+            # caches; results of the rows already there still apply
+            count = args[1]
+            self.classification_results.extend([None] * count)
+            if self.all_results is not None:
+                self.all_results.extend([None] * count)
+            if self.all_derived_fields is not None:
+                self.all_derived_fields.extend([None] * count)
+            self._update_hud()
+            self._schedule_field_check()
+            return
+        if self._run_all_job is not None:
+            # Row positions may have shifted - results of this run no longer apply
+            self._run_all_job.cancel()
+            self._run_all_job = None
+            self._set_run_all_button(running=False)
+            self.app.center.show_warning('classification', "Run all cancelled - data changed")
         self._refresh_results_cache()
         self.all_results = None
         self.all_mode = False
@@ -542,7 +568,30 @@ class RightPanel:
             return
 
         self._update_hud()
-        self.app.root.after(300, lambda: self._check_for_field_switch(samples))
+        self._schedule_field_check()
+
+    def _schedule_field_check(self):
+        """
+        Look for a better field panel once the data settles: repeated changes
+        re-arm one timer, and nothing runs while the left panel is still
+        streaming an import (it calls on_import_finished() at the end).
+        """
+        if self._field_check_id is not None:
+            self.app.root.after_cancel(self._field_check_id)
+            self._field_check_id = None
+        if getattr(getattr(self.app, 'left', None), 'importing', False):
+            return
+        self._field_check_id = self.app.root.after(300, self._run_field_check)
+
+    def _run_field_check(self):
+        self._field_check_id = None
+        samples = self.app.data_hub.get_all()
+        if samples:
+            self._check_for_field_switch(samples)
+
+    def on_import_finished(self):
+        """The left panel finished streaming an import: check the field panel once."""
+        self._schedule_field_check()
 
     def _refresh_results_cache(self):
         """Reset single‑scheme cache to empty."""
@@ -551,144 +600,122 @@ class RightPanel:
 
     # ============ HUD MANAGEMENT ============
 
+    def _on_view_changed(self, model):
+        """CenterPanel published a new view/page: redraw the HUD from it."""
+        self._update_hud()
+
     def _update_hud(self):
-        """Update HUD with EXACT same rows shown in CenterPanel (fully synced)"""
+        """
+        Show the rows of CenterPanel's current page (its published view model),
+        touching only HUD items whose row, content or position changed.
+        """
 
         if not self.hud_tree:
             return
 
-        for item in self.hud_tree.get_children():
-            self.hud_tree.delete(item)
-
-        center = self.app.center
         all_samples = self.app.data_hub.get_all()
-
-        if hasattr(center, "sorted_indices") and center.sorted_indices:
-            ordered_indices = center.sorted_indices
-        else:
-            ordered_indices = list(range(len(all_samples)))
-
-        search = center.search_var.get().lower().strip()
-        filter_class = center.filter_var.get()
-        all_results = getattr(self, 'classification_results', [])
-
-        filtered_indices = []
-
-        for idx in ordered_indices:
-            if idx >= len(all_samples):
+        page_indices = [idx for idx in self.app.center.view_model.page_indices()
+                        if idx < len(all_samples) and all_samples[idx] is not None]
+        rows = [(idx, self._hud_row(idx, all_samples[idx])) for idx in page_indices]
+
+        removed, inserted, updated, reorder = page_changes(self._hud_rows, rows)
+        tree = self.hud_tree
+        if removed:
+            tree.delete(*[f"hud_{idx}" for idx in removed])
+        for position, (idx, (values, tag)) in enumerate(rows):
+            item_id = f"hud_{idx}"
+            tags = (tag,) if tag not in ['UNCLASSIFIED', 'INVALID_SAMPLE', 'SCHEME_NOT_FOUND', ''] else ()
+            if idx in inserted:
+                tree.insert("", position, iid=item_id, values=values, tags=tags)
                 continue
-
-            s = all_samples[idx]
-
-            if search:
-                if not any(search in str(v).lower() for v in s.values()):
-                    continue
-
-            if filter_class and filter_class != "All":
-                cls = ''
-                if idx < len(all_results) and all_results[idx]:
-                    cls = all_results[idx].get('classification', '')
-                if not cls:
-                    cls = (s.get('Auto_Classification') or s.get('Classification') or '')
-                if cls != filter_class:
-                    continue
-
-            filtered_indices.append(idx)
-
-        start = center.current_page * center.page_size
-        page_indices = filtered_indices[start:start + center.page_size]
-
-        if not page_indices:
-            return
-
-        for actual_idx in page_indices:
-
-            sample = all_samples[actual_idx]
-            sample_id = sample.get('Sample_ID', 'N/A')
-            if len(sample_id) > 8:
-                sample_id = sample_id[:8]
-
-            if self.all_mode and self.all_results is not None and actual_idx < len(self.all_results):
-                results_list = self.all_results[actual_idx]
-                if results_list:
-                    best_class = "UNCLASSIFIED"
-                    best_conf = 0.0
-                    match_count = 0
-
-                    for scheme_name, classification, confidence in results_list:
-                        if classification not in ['UNCLASSIFIED', 'INVALID_SAMPLE', 'SCHEME_NOT_FOUND', '']:
-                            match_count += 1
-                            if confidence > best_conf:
-                                best_class = classification
-                                best_conf = confidence
-
-                    if match_count > 0:
-                        flag = f"🎯 {match_count}"
-                        classification_tag = 'MULTI_MATCH' if match_count > 1 else best_class
-                    else:
-                        flag = "0"
-                        classification_tag = 'ALL_NONE'
-
-                    classification = best_class
-                    confidence = f"{best_conf:.2f}" if best_conf > 0 else ""
+            if idx in updated:
+                tree.item(item_id, values=values, tags=tags)
+            if reorder:
+                tree.move(item_id, "", position)
+        self._hud_rows = rows
+
+        if inserted or updated:
+            tree.tag_configure('MULTI_MATCH', background='#8B4513', foreground='white')
+            self._auto_size_hud_columns()
+
+    def _hud_row(self, actual_idx, sample):
+        """((ID, classification, confidence, flag) display values, color tag) for one row."""
+
+        sample_id = sample.get('Sample_ID', 'N/A')
+        if len(sample_id) > 8:
+            sample_id = sample_id[:8]
+
+        if self.all_mode and self.all_results is not None and actual_idx < len(self.all_results):
+            results_list = self.all_results[actual_idx]
+            if results_list:
+                best_class = "UNCLASSIFIED"
+                best_conf = 0.0
+                match_count = 0
+
+                for scheme_name, classification, confidence in results_list:
+                    if classification not in ['UNCLASSIFIED', 'INVALID_SAMPLE', 'SCHEME_NOT_FOUND', '']:
+                        match_count += 1
+                        if confidence > best_conf:
+                            best_class = classification
+                            best_conf = confidence
+
+                if match_count > 0:
+                    flag = f"🎯 {match_count}"
+                    classification_tag = 'MULTI_MATCH' if match_count > 1 else best_class
                 else:
-                    classification = "UNCLASSIFIED"
-                    confidence = ""
                     flag = "0"
                     classification_tag = 'ALL_NONE'
-            else:
-                result = self.classification_results[actual_idx] if actual_idx < len(self.classification_results) else None
-                if result:
-                    classification = result.get('classification', 'UNCLASSIFIED')
-                    confidence = result.get('confidence', '')
-                    flag = "🚩" if result.get('flag_for_review', False) else ""
-                    classification_tag = classification if classification not in ['UNCLASSIFIED'] else 'UNCLASSIFIED'
-                else:
-                    classification = "UNCLASSIFIED"
-                    confidence = ""
-                    flag = ""
-                    classification_tag = 'UNCLASSIFIED'
-
-                if confidence and confidence not in ('', 'N/A'):
-                    try:
-                        conf_val = float(confidence)
-                        confidence = f"{conf_val:.2f}" if conf_val <= 1.0 else str(int(conf_val))
-                    except (ValueError, TypeError):
-                        confidence = str(confidence)
-
-            item_id = self.hud_tree.insert(
-                "",
-                tk.END,
-                values=(sample_id, classification[:20], confidence, flag)
-            )
-
-            if classification_tag not in ['UNCLASSIFIED', 'INVALID_SAMPLE', 'SCHEME_NOT_FOUND', '']:
-                self.hud_tree.item(item_id, tags=(classification_tag,))
 
-        self.hud_tree.tag_configure('MULTI_MATCH', background='#8B4513', foreground='white')
-        self._auto_size_hud_columns()
+                classification = best_class
+                confidence = f"{best_conf:.2f}" if best_conf > 0 else ""
+            elif self._run_all_job is not None:
+                classification = "⏳ Pending"
+                confidence = ""
+                flag = ""
+                classification_tag = 'UNCLASSIFIED'
+            else:
+                classification = "UNCLASSIFIED"
+                confidence = ""
+                flag = "0"
+                classification_tag = 'ALL_NONE'
+        else:
+            result = self.classification_results[actual_idx] if actual_idx < len(self.classification_results) else None
+            if result:
+                classification = result.get('classification', 'UNCLASSIFIED')
+                confidence = result.get('confidence', '')
+                flag = "🚩" if result.get('flag_for_review', False) else ""
+                classification_tag = classification if classification not in ['UNCLASSIFIED'] else 'UNCLASSIFIED'
+            else:
+                classification = "UNCLASSIFIED"
+                confidence = ""
+                flag = ""
+                classification_tag = 'UNCLASSIFIED'
+
+            if confidence and confidence not in ('', 'N/A'):
+                try:
+                    conf_val = float(confidence)
+                    confidence = f"{conf_val:.2f}" if conf_val <= 1.0 else str(int(conf_val))
+                except (ValueError, TypeError):
+                    confidence = str(confidence)
+
+        return (sample_id, classification[:20], confidence, flag), classification_tag
+
+    def _hud_index(self, item):
+        """Row index behind a HUD item."""
+        try:
+            return int(str(item).rsplit("_", 1)[1])
+        except (IndexError, ValueError):
+            return None
 
     def _auto_size_hud_columns(self):
-        """Auto-size HUD columns based on content"""
-        if not self.hud_tree or not self.hud_tree.get_children():
+        """Auto-size HUD columns from the values just rendered"""
+        if not self.hud_tree or not self._hud_rows:
             return
 
         self.hud_tree.column('#0', width=50)
-        self.hud_tree.column('#1', width=80)
-        self.hud_tree.column('#2', width=150)
-        self.hud_tree.column('#3', width=60)
-        self.hud_tree.column('#4', width=60)
-
-        for col in ['#1', '#2', '#3', '#4']:
-            max_width = 0
-            for item in self.hud_tree.get_children():
-                text = self.hud_tree.item(item, 'values')[int(col[1:])-1]
-                width = len(str(text)) * 8
-                if width > max_width:
-                    max_width = width
-
-            max_width = min(max(max_width, 50), 200)
-            self.hud_tree.column(col, width=max_width)
+        widths = column_widths([values for _, (values, _) in self._hud_rows], 4)
+        for i, width in enumerate(widths, start=1):
+            self.hud_tree.column(f'#{i}', width=width)
 
     # ============ CLASSIFICATION ============
 
@@ -736,7 +763,8 @@ class RightPanel:
             self.app.center.show_progress('classification', 0, total_samples,
                                         f"Starting classification with {selected_display}...")
 
-            results = self.app.classification_engine.classify_all_samples(samples, scheme_id)
+            results = self.app.classification_engine.classify_all_samples(
+                samples, scheme_id, version=self.app.data_hub.version)
 
             for i, idx in enumerate(indices):
                 if i < len(results) and idx < len(self.classification_results):
@@ -767,12 +795,15 @@ class RightPanel:
             messagebox.showerror("Classification Error", f"Failed to classify: {e}", parent=self.app.root)
 
     def _run_all_classifications(self):
-        """Run all available classification schemes."""
+        """Run all available classification schemes in the background."""
         if not hasattr(self.app, 'classification_engine') or self.app.classification_engine is None:
             self.app.center.show_error('classification', "Classification engine not available")
             messagebox.showerror("Error", "Classification engine not available", parent=self.app.root)
             return
 
+        if self._run_all_job is not None:
+            return
+
         schemes = self.app.classification_engine.get_available_schemes()
         disabled = self._load_disabled_schemes()
         schemes = [s for s in schemes if s['id'] not in disabled]
@@ -793,49 +824,97 @@ class RightPanel:
             messagebox.showinfo("Info", "No samples to classify", parent=self.app.root)
             return
 
-        total_samples = len(samples)
-        total_schemes = len(schemes)
-        self.app.center.show_progress('classification', 0, total_samples * total_schemes,
-                                      f"Running {total_schemes} schemes on {total_samples} samples...")
-
-        all_results = [[] for _ in range(len(samples))]
-        all_derived = [{} for _ in range(len(samples))]
-
-        processed = 0
-        for s_idx, scheme in enumerate(schemes):
-            scheme_id = scheme['id']
-            scheme_name = f"{scheme.get('icon', '📊')} {scheme['name']}"
-
-            results = self.app.classification_engine.classify_all_samples(samples, scheme_id)
-
-            for samp_idx, res in enumerate(results):
-                classification = res.get('classification', 'UNCLASSIFIED')
-                confidence = res.get('confidence', 0.0)
-                derived = res.get('derived_fields', {})
-                all_results[samp_idx].append((scheme_name, classification, confidence))
-                all_derived[samp_idx][scheme_name] = derived
-
-            processed += len(samples)
-            self.app.center.show_progress('classification', processed, total_samples * total_schemes,
-                                          f"Completed {s_idx+1}/{total_schemes} schemes")
+        max_workers = self.app.settings.get('classification', 'max_workers') or 0
+        job = RunAllScheduler(self.app.classification_engine, samples,
+                              [s['id'] for s in schemes], max_workers).start()
+        self._run_all_job = job
+        self._run_all_indices = indices
+        self._run_all_schemes = [(s['id'], f"{s.get('icon', '📊')} {s['name']}") for s in schemes]
 
+        # Rows fill in as shards finish; rows not yet classified show as pending
         total_data_rows = self.app.data_hub.row_count()
         self.all_results = [None] * total_data_rows
         self.all_derived_fields = [None] * total_data_rows
-        for batch_idx, global_idx in enumerate(indices):
-            self.all_results[global_idx] = all_results[batch_idx]
-            self.all_derived_fields[global_idx] = all_derived[batch_idx]
-
         self.all_mode = True
+        self._set_run_all_button(running=True)
+        self._update_hud()
+
+        self.app.center.show_progress('classification', 0, job.total,
+                                      f"Running {len(schemes)} schemes on {job.total} samples...")
+        self.frame.after(100, self._poll_run_all)
+
+    def _poll_run_all(self):
+        """Pull finished shards from the scheduler into the HUD (main thread)."""
+        job = self._run_all_job
+        if job is None:
+            return
+
+        shards = job.drain()
+        for start, results in shards:
+            count = len(next(iter(results.values()))[0]) if results else 0
+            for offset in range(count):
+                global_idx = self._run_all_indices[start + offset]
+                if global_idx >= len(self.all_results):
+                    continue
+                row_results = []
+                row_derived = {}
+                for scheme_id, scheme_name in self._run_all_schemes:
+                    if scheme_id not in results:
+                        continue
+                    classes, confidences, derived = results[scheme_id]
+                    row_results.append((scheme_name, classes[offset], confidences[offset]))
+                    row_derived[scheme_name] = derived[offset]
+                self.all_results[global_idx] = row_results
+                self.all_derived_fields[global_idx] = row_derived
+
+        if job.finished:
+            self._finish_run_all(job)
+            return
+
+        if shards:
+            self._update_hud()
+            self.app.center.show_progress('classification', job.completed, job.total,
+                                          f"{len(self._run_all_schemes)} schemes"
+                                          f" ({job.mode}, click Stop to cancel)")
+        self.frame.after(100, self._poll_run_all)
+
+    def _finish_run_all(self, job):
+        """Wrap up a run-all job once every shard has been drained."""
+        self._run_all_job = None
+        self._set_run_all_button(running=False)
         self._update_hud()
         self.app.center._refresh()
 
-        self.app.center.show_operation_complete('classification',
-                                                f"Ran {total_schemes} schemes on {total_samples} samples")
-        messagebox.showinfo("Batch Complete",
-                            f"Ran {total_schemes} schemes on {total_samples} samples.\n"
-                            "Double‑click any row in the HUD to see full details.",
-                            parent=self.app.root)
+        total_schemes = len(self._run_all_schemes)
+        if job.error is not None:
+            self.app.center.show_error('classification', str(job.error)[:50])
+            messagebox.showerror("Classification Error", f"Failed to run all schemes: {job.error}",
+                                 parent=self.app.root)
+        elif job.cancelled:
+            self.app.center.show_warning('classification',
+                                         f"Cancelled after {job.completed}/{job.total} samples")
+        else:
+            self.app.center.show_operation_complete('classification',
+                                                    f"Ran {total_schemes} schemes on {job.total} samples")
+            messagebox.showinfo("Batch Complete",
+                                f"Ran {total_schemes} schemes on {job.total} samples.\n"
+                                "Double‑click any row in the HUD to see full details.",
+                                parent=self.app.root)
+
+    def _cancel_run_all(self):
+        """Stop a running run-all job; rows already classified are kept."""
+        if self._run_all_job is not None:
+            self._run_all_job.cancel()
+
+    def _set_run_all_button(self, running):
+        """Turn the Apply button into Stop while a run-all job is active."""
+        btn = getattr(self, 'apply_btn', None)
+        if btn is None or not btn.winfo_exists():
+            return
+        if running:
+            btn.configure(text="Stop", command=self._cancel_run_all, bootstyle="danger")
+        else:
+            btn.configure(text="Apply", command=self._run_classification, bootstyle="primary")
 
     # ============ v3.0 FIELD DETECTION & PANEL SWITCHING ============
 
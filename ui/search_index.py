@@ -0,0 +1,397 @@
+"""
+Search Index - inverted index behind the data table search box
+
+Query syntax (terms separated by spaces must all match):
+    basalt              substring of any cell (the whole text, as before,
+                        when no term below is used)
+    bas*                a cell starting with "bas"
+    Notes:core          substring within one column
+    Zr_ppm>200          numeric comparison: >, >=, <, <=, =, !=
+    Classification=Basalt   exact cell value
+Column names and text are case-insensitive. A name:, name= ... prefix
+only scopes a term when it names a known column; otherwise the term is
+plain text (http://x.org and "note: core" are substrings as before). Numeric cells are searched
+as their text, like any other cell (15 and 15* find 150), and a plain
+term also matches them by value (150.0 finds 150).
+
+SearchIndex keeps, per column, an int array of distinct-string ids (the
+text of every cell, numbers included) and a float array (numeric cells),
+plus a trigram index over the distinct strings. A query resolves its terms against the few distinct
+strings that can match and then turns them into a row mask with NumPy.
+The index is built on the first search and then kept current from
+DataHub add / update / delete events.
+
+SearchQuery.match_row() evaluates the same query on one sample, for rows
+checked one at a time.
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as _np
+    HAS_NUMPY = True
+except ImportError:
+    _np = None
+    HAS_NUMPY = False
+
+_SCOPED = re.compile(r'^([a-z_][\w.]*)(>=|<=|!=|=|>|<|:)(.*)$')
+_OPERATOR_SPACES = re.compile(r'([a-z_][\w.]*)\s*(>=|<=|!=|=|>|<|:)\s*')
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _cell_text(value) -> str:
+    """What a cell looks like to text and prefix terms."""
+    return str(value).lower()
+
+
+def _parse_number(text: str) -> Optional[float]:
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    return number if number == number else None
+
+
+class _Term:
+    """One query term: kind 'text' | 'prefix' | 'cmp', optional column (lowercase)."""
+
+    __slots__ = ('kind', 'column', 'op', 'text', 'number')
+
+    def __init__(self, kind: str, text: str, column: Optional[str] = None, op: str = ':'):
+        self.kind = kind
+        self.column = column
+        self.op = op
+        self.text = text
+        self.number = _parse_number(text)
+
+    def match_value(self, value) -> bool:
+        if value is None or value != value:     # missing or NaN
+            return False
+        if _is_number(value):
+            if self.kind == 'text':
+                return self.text in _cell_text(value) or value == self.number
+            if self.kind == 'prefix':
+                return _cell_text(value).startswith(self.text)
+            if self.number is None:
+                return self.op == '!='
+            if self.op == '=':
+                return value == self.number
+            return {'>': value > self.number, '>=': value >= self.number,
+                    '<': value < self.number, '<=': value <= self.number,
+                    '!=': value != self.number}[self.op]
+        text = _cell_text(value)
+        if self.kind == 'text':
+            return self.text in text
+        if self.kind == 'prefix':
+            return text.startswith(self.text)
+        if self.op == '=':
+            return text == self.text
+        if self.op == '!=':
+            return text != self.text
+        return False
+
+
+class SearchQuery:
+    """
+    A parsed search string. columns: the table's column names, which decide
+    what counts as a column prefix (None takes any name-like prefix).
+    """
+
+    def __init__(self, text: str, columns: Optional[Sequence[str]] = None):
+        self.text = text.lower().strip()
+        self.terms: List[_Term] = []
+        if not self.text:
+            return
+        known = None if columns is None else {str(c).lower() for c in columns}
+
+        def scope(word):
+            scoped = _SCOPED.match(word)
+            if scoped and (known is None or scoped.group(1) in known):
+                return scoped
+            return None
+
+        # "Zr_ppm > 200" -> "Zr_ppm>200", but only after a column name
+        words = _OPERATOR_SPACES.sub(
+            lambda m: m.group(1) + m.group(2) if scope(m.group(1) + m.group(2)) else m.group(0),
+            self.text).split()
+        special = [w for w in words if scope(w) or w.endswith('*')]
+        if not special:
+            # Plain text: the whole string is one substring, as before
+            self.terms = [_Term('text', self.text)]
+            return
+        for word in words:
+            scoped = scope(word)
+            column = op = None
+            if scoped:
+                column, op, word = scoped.groups()
+            if op is not None and op != ':':
+                self.terms.append(_Term('cmp', word, column, op))
+            elif word.endswith('*'):
+                self.terms.append(_Term('prefix', word.rstrip('*'), column))
+            else:
+                self.terms.append(_Term('text', word, column))
+
+    def __bool__(self):
+        return bool(self.terms)
+
+    def match_row(self, sample: Any) -> bool:
+        """Does one sample (a mapping) satisfy every term?"""
+        if sample is None:
+            return False
+        for term in self.terms:
+            if term.column is None:
+                values = sample.values()
+            else:
+                values = [v for k, v in sample.items() if str(k).lower() == term.column]
+            if not any(term.match_value(v) for v in values):
+                return False
+        return True
+
+
+class SearchIndex:
+    """
+    Column-wise, incrementally maintained search index.
+
+    Call mask(query, samples) to get a bool array over rows; the index is
+    (re)built from `samples` when stale. rows_added / row_updated /
+    rows_deleted keep a built index current; invalidate() forces a rebuild.
+    """
+
+    def __init__(self):
+        if not HAS_NUMPY:
+            raise ImportError("SearchIndex requires numpy")
+        self._lock = threading.Lock()
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop everything; the next query rebuilds from the samples."""
+        self.ready = False
+        self._stale = False     # changed while a build held the lock
+        self._n = 0
+        self._capacity = 0
+        self._sids: Dict[str, Any] = {}      # column -> int32 (distinct string id, -1 = none)
+        self._nums: Dict[str, Any] = {}      # column -> float64 (NaN = none)
+        self._strings: List[str] = []
+        self._string_id: Dict[str, int] = {}
+        self._trigrams: Dict[str, List[int]] = {}
+
+    # ---------- storage ----------
+
+    def _reserve(self, needed: int):
+        if needed <= self._capacity:
+            return
+        capacity = max(self._capacity, 1024)
+        while capacity < needed:
+            capacity *= 2
+        for name in self._sids:
+            sids = _np.full(capacity, -1, dtype=_np.int32)
+            sids[:self._n] = self._sids[name][:self._n]
+            self._sids[name] = sids
+            nums = _np.full(capacity, _np.nan)
+            nums[:self._n] = self._nums[name][:self._n]
+            self._nums[name] = nums
+        self._capacity = capacity
+
+    def _column(self, name: str):
+        if name not in self._sids:
+            self._sids[name] = _np.full(self._capacity, -1, dtype=_np.int32)
+            self._nums[name] = _np.full(self._capacity, _np.nan)
+        return self._sids[name], self._nums[name]
+
+    def _intern(self, text: str) -> int:
+        sid = self._string_id.get(text)
+        if sid is None:
+            sid = self._string_id[text] = len(self._strings)
+            self._strings.append(text)
+            for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                self._trigrams.setdefault(gram, []).append(sid)
+        return sid
+
+    def _set_cell(self, sids, nums, row: int, value):
+        if value is None or value != value:     # missing or NaN never match
+            return
+        if _is_number(value):
+            nums[row] = value
+        sids[row] = self._intern(_cell_text(value))
+
+    def _set_row(self, row: int, sample: Any):
+        for key, value in sample.items():
+            if value is not None:
+                sids, nums = self._column(key)
+                self._set_cell(sids, nums, row, value)
+
+    def _clear_row(self, row: int):
+        for name in self._sids:
+            self._sids[name][row] = -1
+            self._nums[name][row] = _np.nan
+
+    def _build(self, samples: Sequence, columns: Optional[Sequence[str]] = None):
+        self.invalidate()
+        n = len(samples)
+        self._reserve(n)
+        self._n = n
+        if columns is not None and hasattr(samples, 'column'):
+            # Columnar DataHub rows: numeric columns are copied as arrays
+            for name in columns:
+                values, present = samples.column(name)
+                sids, nums = self._column(name)
+                if values.dtype == _np.float64:
+                    nums[:n] = _np.where(present, values, _np.nan)
+                    rows = _np.flatnonzero(present & ~_np.isnan(values))
+                    distinct, inverse = _np.unique(values[rows], return_inverse=True)
+                    ids = [self._intern(_cell_text(value)) for value in distinct.tolist()]
+                    sids[rows] = _np.asarray(ids, dtype=_np.int32)[inverse]
+                    continue
+                for row in _np.flatnonzero(present):
+                    self._set_cell(sids, nums, row, values[row])
+        else:
+            for row, sample in enumerate(samples):
+                if sample is not None:
+                    self._set_row(row, sample)
+        self.ready = True
+
+    # ---------- incremental maintenance ----------
+
+    def _try_lock(self) -> bool:
+        """Lock for an update; if a build holds it, mark the index stale instead."""
+        if self._lock.acquire(blocking=False):
+            return True
+        self._stale = True
+        return False
+
+    def rows_added(self, start: int, samples: Sequence):
+        if not self._try_lock():
+            return
+        try:
+            if not self.ready or start != self._n:
+                self.ready = False
+                return
+            self._reserve(start + len(samples))
+            self._n = start + len(samples)
+            for offset, sample in enumerate(samples):
+                if sample is not None:
+                    self._set_row(start + offset, sample)
+        finally:
+            self._lock.release()
+
+    def row_updated(self, row: int, sample: Any):
+        if not self._try_lock():
+            return
+        try:
+            if not self.ready or row >= self._n:
+                self.ready = False
+                return
+            self._clear_row(row)
+            if sample is not None:
+                self._set_row(row, sample)
+        finally:
+            self._lock.release()
+
+    def rows_deleted(self, deleted: Sequence[int]):
+        if not self._try_lock():
+            return
+        try:
+            if not self.ready:
+                return
+            keep = _np.ones(self._n, dtype=bool)
+            keep[[row for row in deleted if 0 <= row < self._n]] = False
+            n = int(keep.sum())
+            for name in self._sids:
+                self._sids[name][:n] = self._sids[name][:self._n][keep]
+                self._sids[name][n:] = -1
+                self._nums[name][:n] = self._nums[name][:self._n][keep]
+                self._nums[name][n:] = _np.nan
+            self._n = n
+        finally:
+            self._lock.release()
+
+    # ---------- queries ----------
+
+    def _candidates(self, text: str) -> Sequence[int]:
+        """Distinct-string ids that may contain `text` (the rarest trigram's list)."""
+        if len(text) < 3:
+            return range(len(self._strings))
+        best = None
+        for i in range(len(text) - 2):
+            ids = self._trigrams.get(text[i:i + 3])
+            if ids is None:
+                return ()
+            if best is None or len(ids) < len(best):
+                best = ids
+        return best
+
+    def _string_hits(self, term: _Term):
+        """bool lookup over (string id + 1): which distinct strings satisfy the term."""
+        hits = _np.zeros(len(self._strings) + 1, dtype=bool)
+        strings = self._strings
+        if term.kind == 'text':
+            ids = [sid for sid in self._candidates(term.text) if term.text in strings[sid]]
+        elif term.kind == 'prefix':
+            ids = [sid for sid in self._candidates(term.text[:3]) if strings[sid].startswith(term.text)]
+        elif term.op in ('=', '!='):
+            sid = self._string_id.get(term.text)
+            ids = [] if sid is None else [sid]
+        else:
+            ids = []
+        if ids:
+            hits[_np.asarray(ids) + 1] = True
+        if term.kind == 'cmp' and term.op == '!=':
+            hits = ~hits
+            hits[0] = False
+        return hits
+
+    def _term_mask(self, term: _Term):
+        n = self._n
+        mask = _np.zeros(n, dtype=bool)
+        if term.column is None:
+            columns = list(self._sids)
+        else:
+            columns = [name for name in self._sids if str(name).lower() == term.column]
+        if not columns:
+            return mask
+
+        hits = self._string_hits(term)
+        number = term.number
+        for name in columns:
+            nums = self._nums[name][:n]
+            matched = hits[self._sids[name][:n] + 1]
+            if term.kind == 'cmp':
+                # Comparisons take numeric cells by value only
+                matched &= _np.isnan(nums)
+            mask |= matched
+            if term.kind == 'prefix':
+                continue
+            if number is None:
+                if term.kind == 'cmp' and term.op == '!=':
+                    mask |= ~_np.isnan(nums)
+                continue
+            with _np.errstate(invalid='ignore'):
+                if term.kind != 'cmp' or term.op == '=':
+                    mask |= nums == number
+                elif term.op == '!=':
+                    mask |= ~_np.isnan(nums) & (nums != number)
+                elif term.op == '>':
+                    mask |= nums > number
+                elif term.op == '>=':
+                    mask |= nums >= number
+                elif term.op == '<':
+                    mask |= nums < number
+                elif term.op == '<=':
+                    mask |= nums <= number
+        return mask
+
+    def mask(self, query: SearchQuery, samples: Sequence,
+             columns: Optional[Sequence[str]] = None):
+        """bool array: which of `samples` satisfy the query (builds the index if stale)."""
+        with self._lock:
+            if not self.ready or self._stale or self._n != len(samples):
+                self._build(samples, columns)
+            mask = _np.ones(self._n, dtype=bool)
+            for term in query.terms:
+                mask &= self._term_mask(term)
+            return mask
@@ -0,0 +1,228 @@
+"""
+Sort Index - cached, typed sort orders behind the data table headers
+
+Sorting follows the table's typed key: numbers (and strings that parse as
+numbers) first in numeric order, then empty cells, then text in
+case-insensitive order. Each column is reduced once to an int array of
+dense ranks under that key; a sort is then an argsort of the ranks, a
+reversed sort is derived from the ascending permutation in O(n), and a
+multi-column sort is one np.lexsort over the columns' ranks. Ranks and
+orders are cached until invalidate() - call it from DataHub change events.
+A single edited row is moved within an existing order with insertion_point(),
+a bisection over the typed keys, instead of re-sorting everything.
+
+All sorts are stable, reversed ones included (rows with equal keys keep
+their natural order), as with list.sort(reverse=True).
+"""
+
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+
+try:
+    import numpy as _np
+    HAS_NUMPY = True
+except ImportError:
+    _np = None
+    HAS_NUMPY = False
+
+# Key groups: numbers < empty < text
+_NUMBER, _EMPTY, _TEXT = 0, 1, 2
+
+
+def sort_value(value) -> tuple:
+    """Typed sort key for one cell: (group, value)."""
+    if value is None or value == "":
+        return (_EMPTY, "")
+    if isinstance(value, (int, float)):
+        return (_NUMBER, value) if value == value else (_EMPTY, "")
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        return (_TEXT, str(value).lower())
+    return (_NUMBER, number) if number == number else (_EMPTY, "")
+
+
+def rank_keys(keys: Sequence):
+    """
+    Dense ranks (int64) for a list of comparable keys: equal keys share a
+    rank, and rank order is key order.
+    """
+    distinct = sorted(set(keys))
+    position = {key: rank for rank, key in enumerate(distinct)}
+    return _np.fromiter((position[key] for key in keys), dtype=_np.int64, count=len(keys))
+
+
+def _dense(values):
+    """Dense ranks of a float array."""
+    _, inverse = _np.unique(values, return_inverse=True)
+    return inverse.reshape(-1).astype(_np.int64)
+
+
+def column_ranks(samples: Sequence, column: str):
+    """Dense ranks of one column under the typed sort key."""
+    n = len(samples)
+    if hasattr(samples, 'column'):
+        values, present = samples.column(column)
+        if values.dtype == _np.float64:
+            # Columnar numeric column: no per-row Python work
+            numbers = present & ~_np.isnan(values)
+            ranks = _np.empty(n, dtype=_np.int64)
+            dense = _dense(values[numbers])
+            ranks[numbers] = dense
+            ranks[~numbers] = dense.max() + 1 if len(dense) else 0
+            return ranks
+        cells = [value if ok else None for value, ok in zip(values.tolist(), present.tolist())]
+    else:
+        cells = [None if sample is None else sample.get(column) for sample in samples]
+
+    keys = [sort_value(value) for value in cells]
+    groups = _np.fromiter((key[0] for key in keys), dtype=_np.int8, count=n)
+    ranks = _np.empty(n, dtype=_np.int64)
+    numbers = _np.flatnonzero(groups == _NUMBER)
+    offset = 0
+    if len(numbers):
+        dense = _dense(_np.array([keys[i][1] for i in numbers.tolist()], dtype=_np.float64))
+        ranks[numbers] = dense
+        offset = int(dense.max()) + 1
+    ranks[groups == _EMPTY] = offset
+    texts = _np.flatnonzero(groups == _TEXT)
+    if len(texts):
+        ranks[texts] = rank_keys([keys[i][1] for i in texts.tolist()]) + offset + 1
+    return ranks
+
+
+def ascending_order(ranks):
+    """Stable ascending permutation of rows by rank."""
+    return _np.argsort(ranks, kind='stable')
+
+
+def reversed_order(order, ranks):
+    """
+    Stable descending permutation from the ascending one, in O(n): runs of
+    equal rank come out in reverse order, rows inside a run do not.
+    """
+    n = len(order)
+    if n == 0:
+        return order.copy()
+    sorted_ranks = ranks[order]
+    starts = _np.flatnonzero(_np.concatenate(([True], sorted_ranks[1:] != sorted_ranks[:-1])))
+    lengths = _np.diff(_np.append(starts, n))
+    run = _np.repeat(_np.arange(len(starts)), lengths)
+    position = _np.arange(n)
+    start = starts[run]
+    out = _np.empty_like(order)
+    out[n - start - lengths[run] + (position - start)] = order
+    return out
+
+
+class SortIndex:
+    """
+    Per-column rank arrays and sort permutations, cached until invalidate().
+
+    order(samples, [(column, reverse), ...]) returns row indices sorted by
+    the first column, ties broken by the next, and so on.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ranks: Dict[str, Any] = {}
+        self._orders: Dict[Tuple, Any] = {}
+        self._n = None
+
+    def invalidate(self):
+        """Forget every cached rank and order (the data changed)."""
+        with self._lock:
+            self._ranks.clear()
+            self._orders.clear()
+            self._n = None
+
+    def ranks(self, samples: Sequence, column: str):
+        """Cached dense ranks of a column."""
+        with self._lock:
+            return self._column_ranks(samples, column)
+
+    def _column_ranks(self, samples, column):
+        if self._n != len(samples):
+            self._ranks.clear()
+            self._orders.clear()
+            self._n = len(samples)
+        ranks = self._ranks.get(column)
+        if ranks is None:
+            ranks = self._ranks[column] = column_ranks(samples, column)
+        return ranks
+
+    def order(self, samples: Sequence, keys: Sequence[Tuple[str, bool]]) -> List[int]:
+        """Row indices sorted by keys = [(column, reverse), ...], primary first."""
+        keys = tuple((column, bool(reverse)) for column, reverse in keys)
+        if not HAS_NUMPY:
+            return self._python_order(samples, keys)
+        with self._lock:
+            return self._order(samples, keys).tolist()
+
+    def _order(self, samples, keys):
+        if len(samples) != self._n:
+            self._column_ranks(samples, keys[0][0])
+        cached = self._orders.get(keys)
+        if cached is not None:
+            return cached
+
+        if len(keys) == 1:
+            column, reverse = keys[0]
+            ranks = self._column_ranks(samples, column)
+            ascending = self._orders.get(((column, False),))
+            if ascending is None:
+                ascending = self._orders[((column, False),)] = ascending_order(ranks)
+            order = reversed_order(ascending, ranks) if reverse else ascending
+        else:
+            # np.lexsort sorts by its last key first; negated ranks sort descending
+            order = _np.lexsort([-self._column_ranks(samples, column) if reverse
+                                 else self._column_ranks(samples, column)
+                                 for column, reverse in reversed(keys)])
+        self._orders[keys] = order
+        return order
+
+    @staticmethod
+    def _python_order(samples, keys):
+        """Without numpy: successive stable sorts, least significant key first."""
+        order = list(range(len(samples)))
+        for column, reverse in reversed(keys):
+            order.sort(key=lambda i: sort_value(None if samples[i] is None else samples[i].get(column)),
+                       reverse=reverse)
+        return order
+
+
+def insertion_point(samples: Sequence, order: Sequence[int], idx: int,
+                    keys: Sequence[Tuple[str, bool]]) -> int:
+    """
+    Slot of row idx in a sorted order that does not contain it, by bisection
+    over keys = [(column, reverse), ...]; ties keep natural row order.
+    """
+    def key_of(i):
+        sample = samples[i]
+        return [sort_value(None if sample is None else sample.get(column)) for column, _ in keys]
+
+    target = key_of(idx)
+
+    def before(i):
+        for a, b, (_, reverse) in zip(key_of(i), target, keys):
+            if a != b:
+                return a > b if reverse else a < b
+        return i < idx
+
+    lo, hi = 0, len(order)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if before(order[mid]):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def order_by_keys(keys: Sequence, reverse: bool = False) -> List[int]:
+    """Stable sort permutation for a list of precomputed keys (e.g. HUD columns)."""
+    if not HAS_NUMPY:
+        return sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+    ranks = rank_keys(keys)
+    order = ascending_order(ranks)
+    return (reversed_order(order, ranks) if reverse else order).tolist()
@@ -0,0 +1,208 @@
+"""
+Table View - which DataHub rows the data table shows, and in what order
+
+Holds the filtered (search + classification filter) and ordered (natural
+or sorted) list of row indices behind the CenterPanel table. A full
+rebuild walks every sample once; after that DataHub change events patch
+the list in place - an edited row is moved to its new slot in the sort
+order and re-tested and moved in or out, added rows are tested and appended, deleted rows are dropped and the
+rest renumbered - so the cost follows the change, not the dataset.
+
+The search box text is parsed by search_index.SearchQuery; a full rebuild
+takes its row mask from a SearchIndex when one is given.
+
+No tkinter here: the same view can be built off the UI thread.
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence
+
+from ui.search_index import SearchQuery
+from ui.sort_index import insertion_point
+
+
+class TableView:
+    """
+    Filtered, ordered row indices.
+
+    indices: row indices in display order. Their positions in the master
+    order (the sort permutation, or the row index itself when unsorted) are
+    kept alongside, so a row's slot is found by bisection.
+    """
+
+    def __init__(self):
+        self.indices: List[int] = []
+        self._ranks: List[int] = []
+        self.search = ""
+        self._query = SearchQuery("")
+        self.filter_class = "All"
+        self.order: Optional[List[int]] = None
+        self._rank_of: Optional[Dict[int, int]] = None
+
+    def __len__(self):
+        return len(self.indices)
+
+    # ---------- filtering ----------
+
+    def matches(self, idx: int, sample: Any, results: Sequence) -> bool:
+        """Does one row pass the search text and classification filter?"""
+        if sample is None:
+            return False
+        if self._query and not self._query.match_row(sample):
+            return False
+
+        return self._class_matches(idx, sample, results)
+
+    def _class_matches(self, idx: int, sample: Any, results: Sequence) -> bool:
+        if self.filter_class and self.filter_class != "All":
+            cls = ''
+            if idx < len(results) and results[idx]:
+                cls = results[idx].get('classification', '')
+            if not cls:
+                cls = (sample.get('Auto_Classification') or
+                       sample.get('Classification') or '')
+            if cls != self.filter_class:
+                return False
+        return True
+
+    def rebuild(self, samples: Sequence, results: Sequence, search: str = "",
+                filter_class: str = "All", order: Optional[List[int]] = None,
+                index: Any = None, columns: Optional[Sequence[str]] = None):
+        """
+        Recompute the whole view: walk the master order, keep matching rows.
+        index: optional SearchIndex answering the search for all rows at once.
+        """
+        self.search = search
+        self._query = SearchQuery(search, columns)
+        self.filter_class = filter_class
+        self.order = order if order else None
+        total = len(samples)
+        if self.order is not None:
+            self._rank_of = {idx: rank for rank, idx in enumerate(order)}
+            master = order
+        else:
+            self._rank_of = None
+            master = range(total)
+
+        hits = None
+        if self._query and index is not None:
+            hits = index.mask(self._query, samples, columns)
+
+        indices = []
+        ranks = []
+        for rank, idx in enumerate(master):
+            if idx >= total:
+                continue
+            if hits is not None:
+                if not hits[idx]:
+                    continue
+                sample = samples[idx]
+                if sample is None or not self._class_matches(idx, sample, results):
+                    continue
+                indices.append(idx)
+                ranks.append(rank)
+            elif self.matches(idx, samples[idx], results):
+                indices.append(idx)
+                ranks.append(rank)
+        self.indices = indices
+        self._ranks = ranks
+
+    # ---------- paging ----------
+
+    def page(self, page: int, page_size: int) -> List[int]:
+        start = page * page_size
+        return self.indices[start:start + page_size]
+
+    def page_count(self, page_size: int) -> int:
+        total = len(self.indices)
+        return (total + page_size - 1) // page_size if total > 0 else 1
+
+    def position(self, idx: int) -> Optional[int]:
+        """Display position of a row, or None when it is filtered out."""
+        rank = self._rank(idx)
+        pos = bisect_left(self._ranks, rank)
+        if pos < len(self.indices) and self.indices[pos] == idx:
+            return pos
+        return None
+
+    def _rank(self, idx: int) -> int:
+        if self._rank_of is None:
+            return idx
+        rank = self._rank_of.get(idx)
+        if rank is None:
+            # Not in the sort permutation (added since the sort): goes last
+            rank = self._rank_of[idx] = len(self._rank_of)
+        return rank
+
+    # ---------- incremental updates ----------
+
+    def row_updated(self, idx: int, sample: Any, results: Sequence) -> bool:
+        """Re-test one edited row; True if it entered or left the view."""
+        rank = self._rank(idx)
+        pos = bisect_left(self._ranks, rank)
+        present = pos < len(self.indices) and self.indices[pos] == idx
+        wanted = self.matches(idx, sample, results)
+        if wanted == present:
+            return False
+        if wanted:
+            self.indices.insert(pos, idx)
+            self._ranks.insert(pos, rank)
+        else:
+            del self.indices[pos]
+            del self._ranks[pos]
+        return True
+
+    def row_resorted(self, idx: int, samples: Sequence, keys: Sequence) -> bool:
+        """
+        Move an edited row to its new slot in the sort order (keys as given
+        to SortIndex.order); True if it moved. Call before row_updated().
+        """
+        if self.order is None or not keys:
+            return False
+        old = self._rank(idx)
+        if old >= len(self.order) or self.order[old] != idx:
+            return False
+        del self.order[old]
+        new = insertion_point(samples, self.order, idx, keys)
+        self.order.insert(new, idx)
+        if new == old:
+            return False
+
+        for rank in range(min(old, new), max(old, new) + 1):
+            self._rank_of[self.order[rank]] = rank
+        if idx in self.indices:
+            self.indices.remove(idx)
+        self._ranks = [self._rank_of[i] for i in self.indices]
+        return True
+
+    def rows_added(self, start: int, samples: Sequence, results: Sequence) -> int:
+        """Test rows appended at start..; returns how many joined the view."""
+        added = 0
+        for offset, sample in enumerate(samples):
+            idx = start + offset
+            if self.order is not None:
+                self.order.append(idx)
+            if self.matches(idx, sample, results):
+                rank = self._rank(idx)
+                pos = bisect_left(self._ranks, rank)
+                self.indices.insert(pos, idx)
+                self._ranks.insert(pos, rank)
+                added += 1
+        return added
+
+    def rows_deleted(self, deleted: Sequence[int]):
+        """Drop deleted rows and renumber the rest (DataHub shifts rows up)."""
+        deleted = sorted(set(deleted))
+        if not deleted:
+            return
+        gone = set(deleted)
+
+        def shifted(idx):
+            return idx - bisect_left(deleted, idx)
+
+        if self.order is not None:
+            self.order[:] = [shifted(i) for i in self.order if i not in gone]
+            self._rank_of = {idx: rank for rank, idx in enumerate(self.order)}
+        kept = [shifted(i) for i in self.indices if i not in gone]
+        self.indices = kept
+        self._ranks = [self._rank(i) for i in kept]
@@ -0,0 +1,97 @@
+"""
+View Model - the data table's rows, shared with the HUD
+
+CenterPanel owns the filtered, ordered TableView (ui/table_view.py) and
+the page window onto it. Each time it renders a page it publishes both
+here; subscribers (the HUD) read the page rows
+from the model instead of filtering the samples again, so a refresh does
+the search / class-filter work once.
+
+page_changes() compares the rows a widget shows with the rows it should
+show, so the HUD only inserts, rewrites, moves or deletes the items that
+actually changed.
+"""
+
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Set, Tuple
+
+from ui.table_view import TableView
+
+
+class ViewModel:
+    """
+    Published table view: view (TableView), page and page_size.
+    subscribe(callback) calls callback(model) after every publish().
+    """
+
+    def __init__(self):
+        self.view = TableView()
+        self.page = 0
+        self.page_size = 50
+        self.version = 0
+        self._subscribers: List[Callable[['ViewModel'], Any]] = []
+
+    def subscribe(self, callback: Callable[['ViewModel'], Any]):
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[['ViewModel'], Any]):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def publish(self, view: TableView, page: int, page_size: int):
+        """Make view / page current and tell every subscriber."""
+        self.view = view
+        self.page = page
+        self.page_size = page_size
+        self.version += 1
+        for callback in list(self._subscribers):
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"View subscriber error: {e}")
+
+    @property
+    def indices(self) -> List[int]:
+        """Every row in the view, in display order."""
+        return self.view.indices
+
+    def page_indices(self) -> List[int]:
+        """Rows on the current page, in display order."""
+        return self.view.page(self.page, self.page_size)
+
+    @property
+    def total(self) -> int:
+        return len(self.view)
+
+    def page_count(self) -> int:
+        return self.view.page_count(self.page_size)
+
+
+def page_changes(old: Sequence[Tuple[Hashable, Any]], new: Sequence[Tuple[Hashable, Any]]
+                 ) -> Tuple[List[Hashable], Set[Hashable], Dict[Hashable, Any], bool]:
+    """
+    Compare two ordered lists of (key, row). Returns (removed keys, inserted
+    keys, {kept key: new row} for rows whose content changed, reorder) -
+    reorder is True when kept keys are no longer in their old relative
+    order. Deleting `removed`, then walking `new` and inserting each new key
+    at its position (moving kept keys too when reorder is set) gives `new`.
+    """
+    old_rows = dict(old)
+    new_keys = {key for key, _ in new}
+    removed = [key for key, _ in old if key not in new_keys]
+    inserted = {key for key, _ in new if key not in old_rows}
+    updated = {key: row for key, row in new
+               if key in old_rows and old_rows[key] != row}
+    kept_old = [key for key, _ in old if key in new_keys]
+    kept_new = [key for key, _ in new if key in old_rows]
+    return removed, inserted, updated, kept_old != kept_new
+
+
+def column_widths(rows: Sequence[Sequence[Any]], columns: int, char_width: int = 8,
+                  minimum: int = 50, maximum: int = 200) -> List[int]:
+    """Pixel width per column from the longest text in it, clamped."""
+    widths = [0] * columns
+    for values in rows:
+        for i in range(min(columns, len(values))):
+            widths[i] = max(widths[i], len(str(values[i])) * char_width)
+    return [min(max(width, minimum), maximum) for width in widths]